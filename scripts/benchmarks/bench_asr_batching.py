@@ -0,0 +1,125 @@
+"""
+Faster-Whisper 批量调度基准测试
+
+对比逐条解码（batch_size=1）与跨会话批量解码，在不同并发度下的：
+- 吞吐（utterances/sec）
+- 单条延迟 p50 / p95（从提交到拿到文本）
+
+需要安装 faster-whisper；默认使用 tiny 模型在 CPU 上运行。
+
+用法:
+    python scripts/benchmarks/bench_asr_batching.py --model tiny --concurrency 1,2,4,8
+    python scripts/benchmarks/bench_asr_batching.py --audio sample.wav --output result.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anima.services.asr.implementations.whisper_scheduler import WhisperBatchScheduler  # noqa: E402
+
+
+def load_audio(path: str, seconds: float) -> np.ndarray:
+    """读取 16kHz 16-bit 单声道 WAV；未指定时生成带包络的合成信号"""
+    if path:
+        with wave.open(path, "rb") as wf:
+            if wf.getframerate() != 16000 or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                raise SystemExit("请提供 16kHz 16-bit 单声道 WAV")
+            return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(16000 * seconds)) / 16000
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+    tone = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t)
+    return (0.2 * envelope * tone + 0.01 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+async def run_level(scheduler, audio, concurrency: int, rounds: int, options: dict):
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        await scheduler.transcribe(audio, options)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ms = np.asarray(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "utterances_per_sec": len(latencies) / elapsed,
+        "latency_p50_ms": float(np.percentile(ms, 50)),
+        "latency_p95_ms": float(np.percentile(ms, 95)),
+    }
+
+
+async def main_async(args):
+    audio = load_audio(args.audio, args.seconds)
+    options = {"language": args.language, "beam_size": args.beam_size, "condition_on_previous_text": False}
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    base = WhisperBatchScheduler(
+        args.model, device=args.device, compute_type=args.compute_type,
+        num_workers=args.workers, cpu_threads=args.cpu_threads, max_batch_size=1
+    )
+    batched = WhisperBatchScheduler(
+        args.model, device=args.device, compute_type=args.compute_type,
+        num_workers=args.workers, cpu_threads=args.cpu_threads,
+        max_batch_size=args.batch_size, batch_wait_ms=args.batch_wait_ms
+    )
+    # 两个调度器共用同一份模型
+    batched._model = base.get_model()
+    batched._pipeline = base._pipeline
+
+    # 预热
+    await base.transcribe(audio, options)
+
+    results = {"model": args.model, "device": args.device, "audio_seconds": len(audio) / 16000, "runs": []}
+    for name, scheduler in (("sequential", base), ("batched", batched)):
+        for level in levels:
+            result = await run_level(scheduler, audio, level, args.rounds, options)
+            result["mode"] = name
+            results["runs"].append(result)
+            print(json.dumps(result))
+
+    base.shutdown()
+    batched.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faster-Whisper 批量调度基准测试")
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--language", default="zh")
+    parser.add_argument("--beam-size", type=int, default=1)
+    parser.add_argument("--audio", default="", help="16kHz 单声道 WAV（默认合成信号）")
+    parser.add_argument("--seconds", type=float, default=4.0, help="合成信号时长")
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cpu-threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--batch-wait-ms", type=float, default=20.0)
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
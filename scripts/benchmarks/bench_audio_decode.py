@@ -0,0 +1,225 @@
+"""
+ASR 输入音频解码 / 重采样基准测试
+
+对比旧路径与 anima.utils.audio_codec：
+- 旧路径：wave 模块读取 + np.interp 线性插值重采样
+  （如安装了 pydub + ffmpeg，另外测量「写临时 .mp3 文件再用 pydub 读取」的路径）
+- 新路径：内存中解析 WAV + 多相 windowed-sinc 重采样
+
+输出：
+- 解码 + 重采样吞吐（实时倍数）
+- 重采样质量：通带信噪比（与解析参考信号比较）、混叠能量（高于目标奈奎斯特频率的单音）
+- 可选：用 faster-whisper 在数据集上比较两种重采样的 WER / CER
+  （--dataset 目录中放置同名的 xxx.wav 与 xxx.txt）
+
+用法:
+    python scripts/benchmarks/bench_audio_decode.py
+    python scripts/benchmarks/bench_audio_decode.py --seconds 10 --output result.json
+    python scripts/benchmarks/bench_audio_decode.py --dataset data/asr_eval --model small
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anima.utils.audio_codec import decode_audio, decode_wav, resample  # noqa: E402
+
+
+TARGET_SR = 16000
+SOURCE_RATES = [8000, 22050, 24000, 44100, 48000]
+
+
+def make_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def speech_like(sample_rate: int, seconds: float) -> np.ndarray:
+    """带音节包络的谐波信号 + 噪声"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    voice = sum(np.sin(2 * np.pi * 180 * k * t) / k for k in range(1, 20))
+    return (0.1 * envelope * voice + 0.005 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def interp_resample(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """旧实现：np.interp 线性插值"""
+    if sample_rate == TARGET_SR:
+        return samples
+    target_length = int(len(samples) * TARGET_SR / sample_rate)
+    return np.interp(
+        np.linspace(0, len(samples), target_length), np.arange(len(samples)), samples
+    ).astype(np.float32)
+
+
+def legacy_decode(data: bytes) -> np.ndarray:
+    """旧实现：wave 模块 + np.interp"""
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        sample_rate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+    samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    return interp_resample(samples, sample_rate)
+
+
+def pydub_tempfile_decode(data: bytes) -> np.ndarray:
+    """旧实现：写临时文件后用 pydub（ffmpeg 子进程）读取"""
+    from pydub import AudioSegment
+
+    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        segment = AudioSegment.from_file(tmp.name)
+        samples = np.array(segment.get_array_of_samples(), dtype=np.float32) / 32768.0
+        return interp_resample(samples, segment.frame_rate)
+    finally:
+        os.unlink(tmp.name)
+
+
+def time_call(fn, data, repeats: int) -> float:
+    fn(data)  # 预热（滤波器设计缓存）
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(data)
+    return (time.perf_counter() - start) / repeats
+
+
+def bench_throughput(seconds: float, repeats: int) -> list:
+    paths = {"wave+interp": legacy_decode, "audio_codec": decode_audio}
+    try:
+        import pydub  # noqa: F401
+        import shutil
+        if shutil.which("ffmpeg"):
+            paths["tempfile+pydub"] = pydub_tempfile_decode
+    except ImportError:
+        pass
+
+    rows = []
+    for sample_rate in SOURCE_RATES:
+        data = make_wav(speech_like(sample_rate, seconds), sample_rate)
+        row = {"source_rate": sample_rate, "seconds": seconds}
+        for name, fn in paths.items():
+            elapsed = time_call(fn, data, repeats)
+            row[f"{name}_ms"] = round(elapsed * 1000, 3)
+            row[f"{name}_x_realtime"] = round(seconds / elapsed, 1)
+        rows.append(row)
+    return rows
+
+
+def snr_db(reference: np.ndarray, estimate: np.ndarray) -> float:
+    margin = 256
+    ref, est = reference[margin:-margin], estimate[margin:len(reference) - margin]
+    noise = np.mean((ref - est) ** 2)
+    return float(10 * np.log10(np.mean(ref ** 2) / max(noise, 1e-20)))
+
+
+def bench_quality() -> list:
+    rows = []
+    for sample_rate in SOURCE_RATES:
+        if sample_rate == TARGET_SR:
+            continue
+        seconds = 2.0
+        # 只取两侧采样率都能表示的频率
+        nyquist = min(sample_rate, TARGET_SR) / 2
+        freqs = [f for f in (300.0, 1200.0, 3400.0, 6500.0) if f < 0.9 * nyquist]
+        t_in = np.arange(int(sample_rate * seconds)) / sample_rate
+        t_out = np.arange(int(TARGET_SR * seconds)) / TARGET_SR
+        signal = sum(np.sin(2 * np.pi * f * t_in) for f in freqs).astype(np.float32) / len(freqs)
+        reference = sum(np.sin(2 * np.pi * f * t_out) for f in freqs) / len(freqs)
+
+        row = {
+            "source_rate": sample_rate,
+            "interp_snr_db": round(snr_db(reference, interp_resample(signal, sample_rate)), 1),
+            "polyphase_snr_db": round(snr_db(reference, resample(signal, sample_rate)), 1),
+        }
+
+        # 高于 8kHz 的单音在 16kHz 输出中应被完全滤除
+        if sample_rate > 2 * 9000:
+            alias = np.sin(2 * np.pi * 9000 * t_in).astype(np.float32)
+            row["interp_alias_db"] = round(float(20 * np.log10(
+                np.sqrt(np.mean(interp_resample(alias, sample_rate)[256:-256] ** 2)) + 1e-12)), 1)
+            row["polyphase_alias_db"] = round(float(20 * np.log10(
+                np.sqrt(np.mean(resample(alias, sample_rate)[256:-256] ** 2)) + 1e-12)), 1)
+        rows.append(row)
+    return rows
+
+
+def edit_distance(ref: list, hyp: list) -> int:
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h))
+        previous = current
+    return previous[-1]
+
+
+def bench_wer(dataset: str, model_name: str, language: str) -> dict:
+    from faster_whisper import WhisperModel
+
+    model = WhisperModel(model_name, device="cpu", compute_type="int8")
+    totals = {"interp": [0, 0, 0, 0], "polyphase": [0, 0, 0, 0]}  # 词错误, 词数, 字错误, 字数
+
+    for wav_path in sorted(Path(dataset).glob("*.wav")):
+        txt_path = wav_path.with_suffix(".txt")
+        if not txt_path.exists():
+            continue
+        reference = txt_path.read_text(encoding="utf-8").strip()
+        samples, sample_rate = decode_wav(wav_path.read_bytes())
+
+        for name, audio in (("interp", interp_resample(samples, sample_rate)),
+                            ("polyphase", resample(samples, sample_rate))):
+            segments, _ = model.transcribe(audio, language=language, beam_size=5, vad_filter=False)
+            hypothesis = "".join(s.text for s in segments).strip()
+            stats = totals[name]
+            stats[0] += edit_distance(reference.split(), hypothesis.split())
+            stats[1] += max(1, len(reference.split()))
+            stats[2] += edit_distance(list(reference.replace(" ", "")), list(hypothesis.replace(" ", "")))
+            stats[3] += max(1, len(reference.replace(" ", "")))
+
+    return {
+        name: {"wer": round(s[0] / max(s[1], 1), 4), "cer": round(s[2] / max(s[3], 1), 4)}
+        for name, s in totals.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR 输入音频解码 / 重采样基准测试")
+    parser.add_argument("--seconds", type=float, default=5.0, help="合成音频时长")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--dataset", default="", help="WER 评测目录（xxx.wav + xxx.txt）")
+    parser.add_argument("--model", default="small", help="WER 评测使用的 Whisper 模型")
+    parser.add_argument("--language", default="zh")
+    parser.add_argument("--output", default="", help="结果输出 JSON 路径")
+    args = parser.parse_args()
+
+    result = {
+        "throughput": bench_throughput(args.seconds, args.repeats),
+        "quality": bench_quality(),
+    }
+    if args.dataset:
+        result["accuracy"] = bench_wer(args.dataset, args.model, args.language)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+GLM ASR 上传编码基准测试
+
+对比 GLMASR._convert_to_supported_audio_bytes 的三种上传格式：
+- wav：直接拼接文件头与 int16 数据
+- flac：soundfile 进程内无损压缩
+- mp3：pydub 导出（每次启动 ffmpeg 子进程，原实现）
+
+输出每种格式的编码耗时、上传体积，以及按给定上行带宽估算的「编码 + 上传」总耗时。
+未安装 soundfile / pydub / ffmpeg 时跳过对应格式。
+只测量本地编码，不发送请求：GLM ASR 接口文档只列出 wav / mp3，flac 是否被接受需对真实接口另行确认。
+
+用法:
+    python scripts/benchmarks/bench_glm_upload_encoding.py
+    python scripts/benchmarks/bench_glm_upload_encoding.py --input sample.wav --uplink-mbps 5
+    python scripts/benchmarks/bench_glm_upload_encoding.py --output result.json
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anima.services.asr.implementations.glm_asr import GLMASR  # noqa: E402
+from anima.utils.audio_codec import decode_audio  # noqa: E402
+
+
+SAMPLE_RATE = 16000
+
+
+def speech_like(seconds: float) -> np.ndarray:
+    """带音节包络和停顿的谐波信号 + 噪声"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None) * (np.sin(2 * np.pi * 0.3 * t) > -0.5)
+    pitch = 150 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 15))
+    return (0.15 * envelope * voice + 0.003 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def available_formats() -> list:
+    formats = ["wav"]
+    try:
+        import soundfile  # noqa: F401
+        formats.append("flac")
+    except ImportError:
+        print("soundfile 未安装，跳过 flac", file=sys.stderr)
+    try:
+        import pydub  # noqa: F401
+        if shutil.which("ffmpeg"):
+            formats.append("mp3")
+        else:
+            print("ffmpeg 不在 PATH 中，跳过 mp3", file=sys.stderr)
+    except ImportError:
+        print("pydub 未安装，跳过 mp3", file=sys.stderr)
+    return formats
+
+
+def bench_format(audio: np.ndarray, upload_format: str, repeats: int, uplink_mbps: float) -> dict:
+    encode = GLMASR._convert_to_supported_audio_bytes
+    data, ext = encode(audio, SAMPLE_RATE, upload_format)  # 预热
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encode(audio, SAMPLE_RATE, upload_format)
+        timings.append(time.perf_counter() - start)
+
+    encode_ms = statistics.median(timings) * 1000
+    upload_ms = len(data) * 8 / (uplink_mbps * 1e6) * 1000
+    return {
+        "format": ext,
+        "encode_ms_p50": round(encode_ms, 3),
+        "encode_ms_max": round(max(timings) * 1000, 3),
+        "bytes": len(data),
+        "kbps": round(len(data) * 8 / (len(audio) / SAMPLE_RATE) / 1000, 1),
+        "est_upload_ms": round(upload_ms, 2),
+        "est_total_ms": round(encode_ms + upload_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GLM ASR 上传编码基准测试")
+    parser.add_argument("--input", default="", help="使用真实录音（任意格式，解码为 16kHz）")
+    parser.add_argument("--durations", default="1,3,8", help="合成音频时长（秒，逗号分隔）")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--uplink-mbps", type=float, default=10.0, help="估算上传耗时使用的上行带宽")
+    parser.add_argument("--output", default="", help="结果输出 JSON 路径")
+    args = parser.parse_args()
+
+    if args.input:
+        clips = {Path(args.input).name: decode_audio(args.input, SAMPLE_RATE)}
+    else:
+        clips = {f"synthetic_{d}s": speech_like(float(d)) for d in args.durations.split(",")}
+
+    formats = available_formats()
+    results = []
+    for name, audio in clips.items():
+        for upload_format in formats:
+            row = {"clip": name, "seconds": round(len(audio) / SAMPLE_RATE, 2)}
+            row.update(bench_format(audio, upload_format, args.repeats, args.uplink_mbps))
+            results.append(row)
+            print(
+                f"{name:>16} {row['format']:>5}  编码 {row['encode_ms_p50']:8.3f} ms  "
+                f"{row['bytes']:>8} B ({row['kbps']:6.1f} kbps)  "
+                f"编码+上传 {row['est_total_ms']:8.2f} ms"
+            )
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({"uplink_mbps": args.uplink_mbps, "results": results}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
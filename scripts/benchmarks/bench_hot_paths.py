@@ -0,0 +1,518 @@
+"""
+热路径基准测试套件
+
+覆盖每个音频块 / 每轮对话都会执行的代码路径，全部离线运行（VAD 默认使用按能量给出概率的模拟模型）：
+- vad.state_machine.process        SileroStateMachine.process（每个 512 采样点窗口）
+- vad.detect_speech.{20,100}ms     SileroVAD.detect_speech（前端 20ms / 100ms 一块）
+- emotion.{llm_tag,keyword}.extract StandaloneLLMTagAnalyzer / KeywordAnalyzer.extract
+- timeline.<策略名>.calculate       TimelineStrategyFactory 中注册的每个 ITimelineStrategy
+- audio.volume_envelope            AudioAnalyzer.compute_volume_envelope（需要 pydub）
+- event_bus.emit.{N}subs           EventBus.emit，N 个异步订阅者
+- event_bus.emit.slow_handler.*    一个 1ms 慢 Handler 时的发射耗时（serial / concurrent 分发）
+- socket_adapter.send              SocketEventAdapter.send（sentence 事件）
+- output_pipeline.process.{raw,coalesced}  一条回复按 1-3 字符的片段流式输出，逐片段 / 合并后发出的耗时与消息数
+- memory.long_term.{store,search}.{rows}  LongTermMemory 在 1 万 / 10 万行数据库上的写入与全文搜索
+
+结果以 JSON 保存（含 git commit），用 --compare 与另一次结果对比，
+p50 变慢超过 --threshold 的用例记为回归（退出码 1），可直接用于 CI。
+
+用法:
+    python scripts/benchmarks/bench_hot_paths.py --output bench/$(git rev-parse --short HEAD).json
+    python scripts/benchmarks/bench_hot_paths.py --quick --only vad,emotion
+    python scripts/benchmarks/bench_hot_paths.py --output new.json --compare bench/baseline.json --threshold 0.15
+    python scripts/benchmarks/bench_hot_paths.py --vad-backend onnx      # 包含真实 Silero 推理
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anima.avatar.analyzers.keyword_analyzer import KeywordAnalyzer  # noqa: E402
+from anima.avatar.analyzers.standalone_llm_analyzer import StandaloneLLMTagAnalyzer  # noqa: E402
+from anima.avatar.audio_analyzer import PYDUB_AVAILABLE, AudioAnalyzer  # noqa: E402
+from anima.avatar.factory import TimelineStrategyFactory  # noqa: E402
+from anima.core.context import PipelineContext  # noqa: E402
+from anima.core.events import OutputEvent  # noqa: E402
+from anima.events.core import DispatchMode, EventBus, OverflowPolicy  # noqa: E402
+from anima.events.handlers.socket_adapter import SocketEventAdapter  # noqa: E402
+from anima.memory.long_term import LongTermMemory  # noqa: E402
+from anima.pipeline.output_pipeline import OutputPipeline  # noqa: E402
+from anima.memory.memory_turn import MemoryTurn  # noqa: E402
+from anima.services.vad.implementations.silero_vad import SileroVAD  # noqa: E402
+
+
+SAMPLE_RATE = 16000
+WINDOW = 512
+
+LLM_REPLIES = [
+    "[happy] 你好呀！今天过得怎么样？",
+    "嗯……[thinking] 这个问题有点难，让我想想。[surprised] 原来是这样！",
+    "[sad] 听到这个消息我也很难过。不过别担心，[happy] 明天会更好的！",
+    "哈哈哈，[happy] 太好笑了！[surprised] 你居然真的这么做了？[angry] 下次可不许这样！",
+    "我们来聊聊游戏吧，最近有一款新游戏特别好玩，剧情和音乐都很棒。",
+    "[neutral] 好的，我明白了。",
+]
+
+TOPICS = ["game", "music", "anime", "weather", "coffee", "travel", "coding", "movie", "cat", "dinner"]
+
+
+# ---------------------------------------------------------------------------
+# 计时
+# ---------------------------------------------------------------------------
+
+def summarize(timings: np.ndarray, **extra) -> Dict[str, Any]:
+    """单次耗时（秒）-> 统计结果（微秒）"""
+    us = timings * 1e6
+    row = {
+        "n": int(us.size),
+        "mean_us": round(float(us.mean()), 2),
+        "p50_us": round(float(np.percentile(us, 50)), 2),
+        "p90_us": round(float(np.percentile(us, 90)), 2),
+        "p99_us": round(float(np.percentile(us, 99)), 2),
+        "ops_per_s": round(float(us.size / timings.sum()), 1) if timings.sum() > 0 else None,
+    }
+    row.update(extra)
+    return row
+
+
+def measure(fn: Callable[[int], Any], n: int, warmup: int) -> np.ndarray:
+    """逐次计时 fn(i)；计时期间关闭 GC，避免偶发回收混入个别样本"""
+    for i in range(warmup):
+        fn(i)
+    timings = np.empty(n)
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(n):
+            start = time.perf_counter()
+            fn(i)
+            timings[i] = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return timings
+
+
+async def measure_async(fn: Callable[[int], Any], n: int, warmup: int) -> np.ndarray:
+    """measure 的协程版本（fn(i) 返回 awaitable）"""
+    for i in range(warmup):
+        await fn(i)
+    timings = np.empty(n)
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(n):
+            start = time.perf_counter()
+            await fn(i)
+            timings[i] = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return timings
+
+
+# ---------------------------------------------------------------------------
+# VAD
+# ---------------------------------------------------------------------------
+
+class EnergyModel:
+    """模拟 Silero 模型：按窗口 RMS 给出语音概率（确定性，无需模型文件）"""
+
+    name = "mock-energy"
+
+    def __call__(self, chunk: np.ndarray) -> float:
+        rms = float(np.sqrt(np.dot(chunk, chunk) / chunk.size))
+        return min(1.0, rms * 20)
+
+    def reset_states(self) -> None:
+        pass
+
+
+class MockModelVAD(SileroVAD):
+    """使用 EnergyModel 的 SileroVAD（状态机、端点检测与正式实现一致）"""
+
+    def _load_vad_model(self, backend: str = "onnx", onnx_model_path: Optional[str] = None):
+        return EnergyModel()
+
+
+def make_vad(backend: str) -> SileroVAD:
+    if backend == "mock":
+        return MockModelVAD(sample_rate=SAMPLE_RATE)
+    return SileroVAD(sample_rate=SAMPLE_RATE, backend=backend)
+
+
+def synth_speech(seconds: float) -> np.ndarray:
+    """「说话 2 秒 / 停顿 1 秒」交替的合成信号（float32，[-1, 1]）"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    talking = ((t % 3.0) < 2.0).astype(np.float32)
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.8 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8)) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    return (0.2 * talking * voice + 0.003 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def bench_vad(args, audio: np.ndarray) -> Dict[str, Dict[str, Any]]:
+    results = {}
+
+    # 状态机：预先算好每个窗口的概率，只计 process 本身
+    vad = make_vad(args.vad_backend)
+    windows = [audio[i:i + WINDOW] for i in range(0, len(audio) - WINDOW + 1, WINDOW)]
+    probs = [vad.model(w) for w in windows]
+    machine = vad.state_machine
+    events = [0]
+
+    def process(i: int):
+        k = i % len(windows)
+        if k == 0:
+            machine.reset()
+        if machine.process(probs[k], windows[k]) is not None:
+            events[0] += 1
+
+    timings = measure(process, args.windows, warmup=len(windows))
+    results["vad.state_machine.process"] = summarize(timings, events=events[0])
+
+    # detect_speech：前端实际的发送粒度（包含模型推理）
+    for chunk_ms in (20, 100):
+        vad = make_vad(args.vad_backend)
+        step = SAMPLE_RATE * chunk_ms // 1000
+        chunks = [audio[i:i + step] for i in range(0, len(audio) - step + 1, step)]
+
+        def detect(i: int):
+            vad.detect_speech(chunks[i % len(chunks)])
+
+        n = max(len(chunks), args.windows * 512 // (step * 4))
+        timings = measure(detect, n, warmup=min(50, len(chunks)))
+        results[f"vad.detect_speech.{chunk_ms}ms"] = summarize(
+            timings,
+            backend=vad.model.name,
+            x_realtime=round(float(chunk_ms / 1000 / timings.mean()), 1),
+        )
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 情绪 / 时间轴 / 口型
+# ---------------------------------------------------------------------------
+
+def bench_emotion(args) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    analyzers = {
+        "emotion.llm_tag.extract": StandaloneLLMTagAnalyzer(),
+        "emotion.keyword.extract": KeywordAnalyzer(),
+    }
+    for name, analyzer in analyzers.items():
+        timings = measure(lambda i: analyzer.extract(LLM_REPLIES[i % len(LLM_REPLIES)]), args.iterations, 100)
+        results[name] = summarize(timings)
+    return results
+
+
+def bench_timeline(args) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    analyzer = StandaloneLLMTagAnalyzer()
+    inputs = []
+    for text in LLM_REPLIES:
+        tags = analyzer.extract_legacy(text)
+        inputs.append(([tag.emotion for tag in tags.emotions], tags.cleaned_text, 1.5 + len(text) / 20))
+    for name in TimelineStrategyFactory.list_all():
+        strategy = TimelineStrategyFactory.create(name)
+
+        def calculate(i: int):
+            emotions, text, duration = inputs[i % len(inputs)]
+            strategy.calculate(emotions or ["neutral"], text, duration)
+
+        results[f"timeline.{name}.calculate"] = summarize(measure(calculate, args.iterations, 100))
+    return results
+
+
+def bench_volume_envelope(args, audio: np.ndarray, workdir: Path) -> Dict[str, Dict[str, Any]]:
+    if not PYDUB_AVAILABLE:
+        return {"audio.volume_envelope": {"skipped": "pydub 未安装"}}
+
+    import soundfile as sf
+
+    path = workdir / "tts.wav"
+    seconds = 5.0
+    sf.write(str(path), audio[:int(SAMPLE_RATE * seconds)], SAMPLE_RATE, subtype="PCM_16")
+    analyzer = AudioAnalyzer()
+    timings = measure(lambda i: analyzer.compute_volume_envelope(str(path)), max(10, args.iterations // 100), 2)
+    return {"audio.volume_envelope": summarize(timings, audio_s=seconds)}
+
+
+# ---------------------------------------------------------------------------
+# 事件分发
+# ---------------------------------------------------------------------------
+
+async def bench_events(args) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    event = OutputEvent(type="sentence", data="你好呀！今天过得怎么样？", seq=1)
+
+    for subscribers in args.subscribers:
+        bus = EventBus()
+        for _ in range(subscribers):
+            async def handler(evt):
+                return None
+            bus.subscribe("sentence", handler)
+        timings = await measure_async(lambda i: bus.emit(event), args.iterations, 100)
+        results[f"event_bus.emit.{subscribers}subs"] = summarize(timings)
+
+    # 一个 1ms 的慢 Handler（socket 发送）对发射方的影响：serial 逐个等待，concurrent 只入队
+    for mode in DispatchMode:
+        bus = EventBus(mode=mode, overflow=OverflowPolicy.COALESCE)
+
+        async def slow_handler(evt):
+            await asyncio.sleep(0.001)
+
+        bus.subscribe("sentence", slow_handler)
+        timings = await measure_async(lambda i: bus.emit(event), min(args.iterations, 200), 10)
+        await bus.join()
+        results[f"event_bus.emit.slow_handler.{mode.value}"] = summarize(timings)
+        bus.clear()
+
+    async def raw_send(message: str) -> None:
+        return None
+
+    adapter = SocketEventAdapter(raw_send)
+    messages = [{"type": "sentence", "text": text, "seq": i} for i, text in enumerate(LLM_REPLIES)]
+    timings = await measure_async(lambda i: adapter.send(messages[i % len(messages)]), args.iterations, 100)
+    results["socket_adapter.send"] = summarize(timings)
+
+    # 一条完整回复按 1-3 个字符一个片段流式输出，经 EventBus -> SocketEventAdapter 发出
+    reply = "".join(LLM_REPLIES)
+    rng = np.random.default_rng(0)
+    deltas, pos = [], 0
+    while pos < len(reply):
+        step = int(rng.integers(1, 4))
+        deltas.append(reply[pos:pos + step])
+        pos += step
+
+    async def agent_stream():
+        for delta in deltas:
+            yield delta
+
+    for name, window_ms in (("raw", 0.0), ("coalesced", 40.0)):
+        sent = []
+
+        async def counting_send(message: str) -> None:
+            sent.append(message)
+
+        bus = EventBus()
+        socket_adapter = SocketEventAdapter(counting_send)
+        bus.subscribe("sentence", lambda evt: socket_adapter.send({"type": "sentence", "text": evt.data, "seq": evt.seq}))
+        pipeline = OutputPipeline(event_bus=bus, coalesce_window_ms=window_ms)
+        runs = max(10, args.iterations // 20)
+        timings = await measure_async(
+            lambda i: pipeline.process(PipelineContext(raw_input=""), agent_stream()), runs, 3
+        )
+        results[f"output_pipeline.process.{name}"] = summarize(
+            timings, deltas=len(deltas), messages=len(sent) // (runs + 3),
+        )
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 长期记忆
+# ---------------------------------------------------------------------------
+
+def fill_memories(memory: LongTermMemory, rows: int) -> None:
+    """直接批量写入 rows 行（FTS 由触发器同步），比逐条 store 快得多"""
+    base = datetime(2025, 1, 1)
+    rng = np.random.default_rng(rows)
+    batch = []
+    for i in range(rows):
+        a, b = rng.choice(TOPICS, 2, replace=False)
+        batch.append((
+            f"seed-{i:08d}",
+            f"session_{i % 50}",
+            (base + timedelta(seconds=i)).isoformat(),
+            f"user message {i} about {a} and {b}",
+            f"reply {i}: let's talk about {b}",
+            '["neutral"]',
+            "{}",
+            float(rng.random()),
+        ))
+        if len(batch) == 10000:
+            memory.conn.executemany(
+                "INSERT INTO memories (turn_id, session_id, timestamp, user_input, agent_response, "
+                "emotions, metadata, importance) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            batch.clear()
+    if batch:
+        memory.conn.executemany(
+            "INSERT INTO memories (turn_id, session_id, timestamp, user_input, agent_response, "
+            "emotions, metadata, importance) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+    memory.conn.commit()
+
+
+async def bench_memory(args, workdir: Path) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for rows in args.memory_rows:
+        memory = LongTermMemory(str(workdir / f"memories_{rows}.db"))
+        try:
+            fill_memories(memory, rows)
+            now = datetime(2026, 1, 1)
+
+            stored = [0]  # 预热与计时共用自增序号（turn_id 唯一）
+
+            async def store(i: int):
+                stored[0] += 1
+                await memory.store(MemoryTurn(
+                    f"bench-{stored[0]:08d}", "session_bench", now + timedelta(seconds=stored[0]),
+                    f"new message about {TOPICS[i % len(TOPICS)]}", "ok!", ["happy"], {"source": "bench"},
+                ))
+
+            n = max(50, args.iterations // 20)
+            results[f"memory.long_term.store.{rows}"] = summarize(await measure_async(store, n, 10))
+
+            queries = [f"{TOPICS[i]} {TOPICS[(i + 3) % len(TOPICS)]}" for i in range(len(TOPICS))]
+
+            async def search(i: int):
+                await memory.search(queries[i % len(queries)], top_k=3)
+
+            async def search_session(i: int):
+                await memory.search(queries[i % len(queries)], top_k=3, session_id=f"session_{i % 50}")
+
+            results[f"memory.long_term.search.{rows}"] = summarize(await measure_async(search, n, 10))
+            results[f"memory.long_term.search_session.{rows}"] = summarize(
+                await measure_async(search_session, n, 10)
+            )
+        finally:
+            memory.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 结果 / 对比
+# ---------------------------------------------------------------------------
+
+def git_commit() -> Dict[str, Any]:
+    root = Path(__file__).resolve().parents[2]
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=root, capture_output=True, text=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """与基线对比 p50，返回回归的用例名"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    base_results = baseline.get("results", {})
+    print(f"\n对比基线 {baseline_path}（commit {baseline.get('meta', {}).get('commit')}）")
+    regressions = []
+    for name, row in results.items():
+        base = base_results.get(name)
+        if not base or "p50_us" not in base or "p50_us" not in row:
+            continue
+        change = row["p50_us"] / base["p50_us"] - 1 if base["p50_us"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- 回归"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  (变快)"
+        print(f"{name:<42} {base['p50_us']:>10.2f} -> {row['p50_us']:>10.2f}us  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热路径基准测试套件")
+    parser.add_argument("--only", default="", help="只运行名称以这些前缀开头的用例组（逗号分隔：vad,emotion,timeline,audio,event,memory）")
+    parser.add_argument("--quick", action="store_true", help="缩小规模（记忆库 1 万行，迭代次数减少）")
+    parser.add_argument("--iterations", type=int, default=5000, help="普通用例的计时次数")
+    parser.add_argument("--windows", type=int, default=20000, help="VAD 状态机的计时窗口数")
+    parser.add_argument("--seconds", type=float, default=30.0, help="VAD 合成音频时长")
+    parser.add_argument("--vad-backend", default="mock", choices=["mock", "onnx", "torch"], help="VAD 概率模型")
+    parser.add_argument("--subscribers", default="1,10,50", help="EventBus 订阅者数量（逗号分隔）")
+    parser.add_argument("--memory-rows", default="10000,100000", help="长期记忆的数据行数（逗号分隔）")
+    parser.add_argument("--output", default="", help="结果输出 JSON 路径")
+    parser.add_argument("--compare", default="", help="基线 JSON 路径（与之对比 p50）")
+    parser.add_argument("--threshold", type=float, default=0.15, help="p50 变慢超过该比例视为回归")
+    args = parser.parse_args()
+
+    args.subscribers = [int(n) for n in args.subscribers.split(",") if n]
+    args.memory_rows = [int(n) for n in args.memory_rows.split(",") if n]
+    if args.quick:
+        args.iterations = min(args.iterations, 1000)
+        args.windows = min(args.windows, 3000)
+        args.seconds = min(args.seconds, 10.0)
+        args.memory_rows = [min(args.memory_rows)]
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+
+    def enabled(group: str) -> bool:
+        return not groups or any(group.startswith(g) for g in groups)
+
+    # 日志输出本身会主导耗时，只保留警告以上
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    audio = synth_speech(args.seconds)
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="anima-bench-") as tmp:
+        workdir = Path(tmp)
+        if enabled("vad"):
+            results.update(bench_vad(args, audio))
+        if enabled("emotion"):
+            results.update(bench_emotion(args))
+        if enabled("timeline"):
+            results.update(bench_timeline(args))
+        if enabled("audio"):
+            results.update(bench_volume_envelope(args, audio, workdir))
+        if enabled("event"):
+            results.update(asyncio.run(bench_events(args)))
+        if enabled("memory"):
+            results.update(asyncio.run(bench_memory(args, workdir)))
+
+    for name, row in results.items():
+        if "skipped" in row:
+            print(f"{name:<42} 跳过: {row['skipped']}")
+        else:
+            print(f"{name:<42} p50 {row['p50_us']:>10.2f}us  p99 {row['p99_us']:>10.2f}us  n={row['n']}")
+
+    report = {
+        "meta": {
+            **git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "vad_backend": args.vad_backend,
+            "iterations": args.iterations,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n结果已保存: {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 个用例回归超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
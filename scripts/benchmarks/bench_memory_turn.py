@@ -0,0 +1,114 @@
+"""
+MemoryTurn 内存占用测量
+
+在 ShortTermMemory 中保存 N 轮对话（默认 10 万），用 tracemalloc 统计：
+- 当前 MemoryTurn（__slots__ + 懒解码）
+- 对照组：普通 dataclass（每实例 __dict__，立即解码 JSON / datetime）
+
+用法:
+    python scripts/benchmarks/bench_memory_turn.py --turns 100000 --output result.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anima.memory.memory_turn import MemoryTurn  # noqa: E402
+from anima.memory.short_term import ShortTermMemory  # noqa: E402
+
+
+@dataclass
+class DataclassTurn:
+    """对照组：原先的 dataclass 表示"""
+    turn_id: str
+    session_id: str
+    timestamp: datetime
+    user_input: str
+    agent_response: str
+    emotions: List[str]
+    metadata: Dict[str, Any]
+    importance: float = 0.5
+    embedding: Optional[Any] = None
+
+
+def make_rows(n: int, sessions: int):
+    """模拟从数据库读出的原始行（JSON 字符串 / ISO 时间）"""
+    base = datetime(2025, 1, 1)
+    for i in range(n):
+        yield (
+            f"turn-{i:08d}",
+            "session_" + str(i % sessions),  # 运行时拼接，模拟每行独立的字符串对象
+            (base + timedelta(seconds=i)).isoformat(),
+            f"用户第 {i} 条消息：今天想聊点什么呢？",
+            f"AI 第 {i} 条回复：我们来聊聊游戏吧！",
+            json.dumps(["happy"]),
+            json.dumps({"importance": 0.5, "source": "bench"}),
+            0.5,
+        )
+
+
+def build_compact(row):
+    return MemoryTurn(*row)
+
+
+def build_dataclass(row):
+    turn_id, session_id, timestamp, user_input, agent_response, emotions, metadata, importance = row
+    return DataclassTurn(
+        turn_id, session_id, datetime.fromisoformat(timestamp), user_input, agent_response,
+        json.loads(emotions), json.loads(metadata), importance
+    )
+
+
+def measure(builder, n: int, sessions: int) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    memory = ShortTermMemory(max_turns=n)
+
+    async def fill():
+        for row in make_rows(n, sessions):
+            await memory.add(builder(row))
+
+    asyncio.run(fill())
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # 保持引用直到测量完成
+    assert sum(len(d) for d in memory.sessions.values()) == n
+    return {
+        "mb_per_100k": current / n * 100_000 / 1e6,
+        "bytes_per_turn": current / n,
+        "peak_mb": peak / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MemoryTurn 内存占用测量")
+    parser.add_argument("--turns", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    args = parser.parse_args()
+
+    results = {
+        "turns": args.turns,
+        "compact": measure(build_compact, args.turns, args.sessions),
+        "dataclass": measure(build_dataclass, args.turns, args.sessions),
+    }
+    results["saving_ratio"] = 1 - results["compact"]["bytes_per_turn"] / results["dataclass"]["bytes_per_turn"]
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+向量后端基准测试
+
+对比 numpy（memmap）与 chroma 后端的：
+- 冷启动耗时（打开已有数据）
+- 写入吞吐
+- 查询延迟（p50 / p95，按会话过滤与全局）
+
+用法:
+    python scripts/benchmarks/bench_vector_store.py --rows 20000 --dim 384
+    python scripts/benchmarks/bench_vector_store.py --backends numpy --index-type ivf --output result.json
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from anima.memory.backends import VectorBackendFactory  # noqa: E402
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(np.asarray(samples) * 1000.0, q))
+
+
+def bench_backend(name, args, vectors, queries, workdir):
+    storage = workdir / name
+    options = {"index_type": args.index_type, "ivf_min_rows": args.ivf_min_rows} if name == "numpy" else {}
+    sessions = [f"session_{i % args.sessions}" for i in range(args.rows)]
+
+    backend = VectorBackendFactory.create(name, str(storage), **options)
+
+    # 写入
+    start = time.perf_counter()
+    for i in range(0, args.rows, args.batch):
+        end = min(i + args.batch, args.rows)
+        backend.add(
+            "conversations",
+            ids=[f"doc_{j}" for j in range(i, end)],
+            embeddings=vectors[i:end],
+            documents=[f"User: q{j}\nAI: a{j}" for j in range(i, end)],
+            metadatas=[{"session_id": sessions[j]} for j in range(i, end)],
+        )
+    add_seconds = time.perf_counter() - start
+    backend.close()
+    del backend
+
+    # 冷启动：重新打开并完成第一次查询
+    start = time.perf_counter()
+    backend = VectorBackendFactory.create(name, str(storage), **options)
+    open_seconds = time.perf_counter() - start
+    backend.query("conversations", queries[0], n_results=args.k)
+    first_query_seconds = time.perf_counter() - start - open_seconds
+
+    global_latency, session_latency = [], []
+    for i, q in enumerate(queries):
+        t = time.perf_counter()
+        backend.query("conversations", q, n_results=args.k)
+        global_latency.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        backend.query("conversations", q, n_results=args.k, session_id=f"session_{i % args.sessions}")
+        session_latency.append(time.perf_counter() - t)
+
+    backend.close()
+
+    return {
+        "backend": name,
+        "rows": args.rows,
+        "dim": args.dim,
+        "add_rows_per_sec": args.rows / add_seconds,
+        "open_ms": open_seconds * 1000.0,
+        "first_query_ms": first_query_seconds * 1000.0,
+        "query_global_p50_ms": percentile_ms(global_latency, 50),
+        "query_global_p95_ms": percentile_ms(global_latency, 95),
+        "query_session_p50_ms": percentile_ms(session_latency, 50),
+        "query_session_p95_ms": percentile_ms(session_latency, 95),
+        "disk_mb": sum(f.stat().st_size for f in storage.rglob("*") if f.is_file()) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量后端基准测试")
+    parser.add_argument("--backends", default="numpy,chroma", help="逗号分隔的后端列表")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--index-type", default="flat", choices=["flat", "ivf"])
+    parser.add_argument("--ivf-min-rows", type=int, default=50000)
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.rows, args.dim)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    results = []
+    workdir = Path(tempfile.mkdtemp(prefix="anima_vector_bench_"))
+    try:
+        for name in args.backends.split(","):
+            name = name.strip()
+            try:
+                result = bench_backend(name, args, vectors, queries, workdir)
+            except ImportError as e:
+                print(f"[skip] {name}: {e}")
+                continue
+            results.append(result)
+            print(json.dumps(result, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+"""
+Socket.IO 端到端压测：模拟 N 个同时说话的观众
+
+每个模拟客户端按实时速度通过 raw_audio_data 发送 16kHz 音频（合成的「说话 / 停顿」交替信号或录音文件），
+并按配置的节奏发送 text_input / interrupt_signal，统计：
+- time-to-transcript   说完（最后一个语音块发出）-> 收到最终转录
+- time-to-first-text   说完 / 发出 text_input -> 收到第一段回复文本
+- time-to-first-audio  说完 / 发出 text_input -> 收到第一段音频
+各自的 p50 / p95 / p99，以及服务端进程的 CPU / RSS。
+
+默认自动启动一个使用 mock ASR / LLM / TTS（VAD 默认 silero）的服务端子进程；
+也可以用 --url 压测已运行的服务（--server-pid 指定进程以采集 CPU / RSS）。
+
+依赖：python-socketio 的异步客户端需要 aiohttp（pip install aiohttp）；
+CPU / RSS 优先使用 psutil，未安装时在 Linux 上读取 /proc。
+
+用法:
+    python scripts/benchmarks/loadgen.py --clients 20 --duration 60
+    python scripts/benchmarks/loadgen.py --clients 50 --ramp 10 --text-every 15 --interrupt-prob 0.2 --output load.json
+    python scripts/benchmarks/loadgen.py --url http://localhost:12394 --server-pid 12345 --audio sample.wav
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import socketio
+import yaml
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+
+from anima.utils.audio_codec import decode_audio  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+SAMPLE_RATE = 16000
+METRICS = ("time_to_transcript_ms", "time_to_first_text_ms", "time_to_first_audio_ms")
+TEXT_INPUTS = ["你好呀", "今天天气怎么样？", "给我讲个笑话吧", "你喜欢什么游戏？", "晚饭吃什么好呢"]
+
+
+# ---------------------------------------------------------------------------
+# 音频
+# ---------------------------------------------------------------------------
+
+def synth_utterances(count: int, seed: int) -> List[np.ndarray]:
+    """合成若干段长度不一的「语音」（谐波 + 音节包络），每段 1.2 - 3 秒"""
+    rng = np.random.default_rng(seed)
+    utterances = []
+    for _ in range(count):
+        t = np.arange(int(SAMPLE_RATE * rng.uniform(1.2, 3.0))) / SAMPLE_RATE
+        pitch = rng.uniform(120, 220) + 30 * np.sin(2 * np.pi * 0.8 * t)
+        phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+        voice = sum(np.sin(k * phase) / k for k in range(1, 10))
+        syllables = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 5) * t)
+        utterances.append((0.25 * voice * syllables).astype(np.float32))
+    return utterances
+
+
+def load_utterances(path: str, count: int, seed: int) -> List[np.ndarray]:
+    """录音文件整段作为一句话（两句之间由客户端补停顿）"""
+    if path:
+        return [decode_audio(path, SAMPLE_RATE).astype(np.float32)]
+    return synth_utterances(count, seed)
+
+
+def silence(seconds: float, rng: np.random.Generator) -> np.ndarray:
+    return (0.002 * rng.standard_normal(int(SAMPLE_RATE * seconds))).astype(np.float32)
+
+
+# ---------------------------------------------------------------------------
+# 模拟客户端
+# ---------------------------------------------------------------------------
+
+class TurnProbe:
+    """一轮交互的计时（以客户端单调时钟为准）"""
+
+    __slots__ = ("kind", "reference", "transcript", "first_text", "first_audio", "interrupted")
+
+    def __init__(self, kind: str, reference: float):
+        self.kind = kind              # "audio" / "text"
+        self.reference = reference    # 说完 / 发出 text_input 的时刻
+        self.transcript: Optional[float] = None
+        self.first_text: Optional[float] = None
+        self.first_audio: Optional[float] = None
+        self.interrupted = False
+
+    def latencies(self) -> Dict[str, Optional[float]]:
+        def ms(t: Optional[float]) -> Optional[float]:
+            return None if t is None else (t - self.reference) * 1000
+
+        return {
+            "time_to_transcript_ms": ms(self.transcript) if self.kind == "audio" else None,
+            "time_to_first_text_ms": ms(self.first_text),
+            "time_to_first_audio_ms": ms(self.first_audio),
+        }
+
+
+class SimulatedViewer:
+    """一个模拟观众：实时推流麦克风音频，偶尔打字、打断"""
+
+    def __init__(self, index: int, url: str, utterances: List[np.ndarray], args):
+        self.index = index
+        self.url = url
+        self.utterances = utterances
+        self.args = args
+        self.rng = np.random.default_rng(args.seed + index)
+        self.random = random.Random(args.seed + index)
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.probe: Optional[TurnProbe] = None
+        self.turns: List[TurnProbe] = []
+        self.errors = 0
+        self.chunks_sent = 0
+        self.interrupts_sent = 0
+        self._tasks: set = set()
+        self._register()
+
+    def _register(self) -> None:
+        sio = self.sio
+
+        @sio.on("transcript")
+        async def on_transcript(data):
+            if data.get("is_final", True) and data.get("text"):
+                self._mark("transcript")
+
+        @sio.on("user-transcript")
+        async def on_user_transcript(data):
+            await on_transcript(data)
+
+        @sio.on("text")
+        async def on_text(data):
+            if data.get("text"):
+                self._mark("first_text")
+
+        @sio.on("sentence")
+        async def on_sentence(data):
+            await on_text(data)
+
+        @sio.on("audio_with_expression")
+        async def on_audio(data):
+            probe = self._mark("first_audio")
+            if probe is not None and not probe.interrupted and self.random.random() < self.args.interrupt_prob:
+                # 听了一小段之后打断（不阻塞事件接收）
+                probe.interrupted = True
+                task = asyncio.create_task(self._interrupt_later(self.random.uniform(0.1, 0.8)))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        @sio.on("audio")
+        async def on_plain_audio(data):
+            await on_audio(data)
+
+        @sio.on("error")
+        async def on_error(data):
+            self.errors += 1
+
+    def _mark(self, field: str) -> Optional[TurnProbe]:
+        probe = self.probe
+        if probe is not None and getattr(probe, field) is None:
+            setattr(probe, field, time.perf_counter())
+        return probe
+
+    def _start_turn(self, kind: str) -> None:
+        self.probe = TurnProbe(kind, time.perf_counter())
+        self.turns.append(self.probe)
+
+    async def _interrupt_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._emit("interrupt_signal", {"text": ""})
+        self.interrupts_sent += 1
+
+    async def _emit(self, event: str, data: Dict[str, Any]) -> None:
+        try:
+            await self.sio.emit(event, data)
+        except socketio.exceptions.SocketIOError:
+            self.errors += 1
+
+    async def run(self, deadline: float) -> None:
+        await self.sio.connect(self.url, transports=["websocket"])
+        try:
+            tasks = [asyncio.create_task(self._stream_audio(deadline))]
+            if self.args.text_every > 0:
+                tasks.append(asyncio.create_task(self._type_text(deadline)))
+            await asyncio.gather(*tasks)
+            # 给最后一轮留出回复时间
+            await asyncio.sleep(self.args.drain)
+        finally:
+            await self.sio.disconnect()
+
+    async def _stream_audio(self, deadline: float) -> None:
+        """按实时速度推流：语音 -> 停顿 -> 语音 ...（按绝对时间排程，避免累积漂移）"""
+        chunk = SAMPLE_RATE * self.args.chunk_ms // 1000
+        interval = self.args.chunk_ms / 1000
+        next_send = time.perf_counter()
+        # 错开各客户端的起始相位
+        pending = silence(self.random.uniform(0.2, 1.5), self.rng)
+        speech_end_at: Optional[int] = None
+
+        while time.perf_counter() < deadline:
+            if len(pending) < chunk:
+                if speech_end_at is None:
+                    utterance = self.utterances[self.random.randrange(len(self.utterances))]
+                    speech_end_at = len(pending) + len(utterance)
+                    gap = silence(self.random.uniform(self.args.min_gap, self.args.max_gap), self.rng)
+                    pending = np.concatenate([pending, utterance, gap])
+
+            piece, pending = pending[:chunk], pending[chunk:]
+            if speech_end_at is not None:
+                speech_end_at -= len(piece)
+
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_send += interval
+
+            await self._emit("raw_audio_data", {"audio": piece.tolist()})
+            self.chunks_sent += 1
+
+            if speech_end_at is not None and speech_end_at <= 0:
+                # 最后一个语音块已发出：从此刻开始计时
+                self._start_turn("audio")
+                speech_end_at = None
+
+    async def _type_text(self, deadline: float) -> None:
+        while True:
+            await asyncio.sleep(self.args.text_every * self.random.uniform(0.5, 1.5))
+            if time.perf_counter() >= deadline:
+                return
+            self._start_turn("text")
+            await self._emit("text_input", {"text": self.random.choice(TEXT_INPUTS)})
+
+
+# ---------------------------------------------------------------------------
+# 服务端进程
+# ---------------------------------------------------------------------------
+
+def write_server_config(args, workdir: Path, base_config: Optional[Path] = None, mock: bool = True) -> Path:
+    """
+    生成服务端配置：默认在 config/config.yaml 基础上切换到 mock 服务；
+    mock=False 时保留 base_config 中的服务（真实 ASR / LLM / TTS），只改地址、端口和日志级别
+    """
+    base_config = base_config or ROOT / "config" / "config.yaml"
+    base = yaml.safe_load(Path(base_config).read_text(encoding="utf-8")) or {}
+    if mock:
+        base["services"] = {
+            **base.get("services", {}),
+            "asr": "mock",
+            "tts": "mock",
+            "agent": "mock",
+            "local_llm": "mock",
+            "vad": args.vad,
+        }
+    base.setdefault("system", {}).update({
+        "host": "127.0.0.1",
+        "port": args.port,
+        "debug": False,
+        "log_level": args.server_log_level,
+    })
+    path = workdir / "server.yaml"
+    path.write_text(yaml.safe_dump(base, allow_unicode=True), encoding="utf-8")
+    return path
+
+
+def spawn_server(args, workdir: Path, base_config: Optional[Path] = None, mock: bool = True) -> subprocess.Popen:
+    config_path = write_server_config(args, workdir, base_config, mock)
+    env = {
+        **os.environ,
+        "ANIMA_CONFIG": str(config_path),
+        "ANIMA_PORT": str(args.port),
+        "PYTHONPATH": str(ROOT / "src") + os.pathsep + os.environ.get("PYTHONPATH", ""),
+    }
+    log = open(workdir / "server.log", "wb")
+    return subprocess.Popen(
+        [sys.executable, "-m", "anima.socketio_server", str(config_path)],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def wait_ready(url: str, proc: Optional[subprocess.Popen], timeout: float) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"服务端已退出（退出码 {proc.returncode}）")
+        try:
+            with urllib.request.urlopen(f"{url}/metrics", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"服务端 {timeout:.0f}s 内未就绪: {url}")
+
+
+class ResourceSampler:
+    """每秒采集一次服务端进程的 CPU（单核百分比）和 RSS"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.cpu: List[float] = []
+        self.rss_mb: List[float] = []
+        self._proc = psutil.Process(pid) if psutil is not None else None
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def _cpu_seconds(self) -> float:
+        if self._proc is not None:
+            times = self._proc.cpu_times()
+            return times.user + times.system
+        fields = Path(f"/proc/{self.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self._ticks   # utime + stime
+
+    def _rss_mb(self) -> float:
+        if self._proc is not None:
+            return self._proc.memory_info().rss / 2**20
+        for line in Path(f"/proc/{self.pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+        return 0.0
+
+    async def run(self) -> None:
+        try:
+            last_cpu, last_wall = self._cpu_seconds(), time.perf_counter()
+            while True:
+                await asyncio.sleep(1.0)
+                cpu, wall = self._cpu_seconds(), time.perf_counter()
+                self.cpu.append(100 * (cpu - last_cpu) / (wall - last_wall))
+                self.rss_mb.append(self._rss_mb())
+                last_cpu, last_wall = cpu, wall
+        except (OSError, ValueError) as e:
+            print(f"停止采集服务端资源: {e}", file=sys.stderr)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.cpu:
+            return {}
+        return {
+            "cpu_percent_mean": round(float(np.mean(self.cpu)), 1),
+            "cpu_percent_max": round(float(np.max(self.cpu)), 1),
+            "rss_mb_start": round(self.rss_mb[0], 1),
+            "rss_mb_max": round(float(np.max(self.rss_mb)), 1),
+            "rss_mb_end": round(self.rss_mb[-1], 1),
+        }
+
+
+# ---------------------------------------------------------------------------
+# 主流程
+# ---------------------------------------------------------------------------
+
+def percentiles(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    arr = np.asarray(values)
+    return {
+        "count": int(arr.size),
+        "p50": round(float(np.percentile(arr, 50)), 1),
+        "p95": round(float(np.percentile(arr, 95)), 1),
+        "p99": round(float(np.percentile(arr, 99)), 1),
+        "max": round(float(arr.max()), 1),
+    }
+
+
+async def run_load(args, url: str, pid: Optional[int]) -> Dict[str, Any]:
+    utterances = load_utterances(args.audio, 8, args.seed)
+    sampler = ResourceSampler(pid) if pid else None
+    sampler_task = asyncio.create_task(sampler.run()) if sampler else None
+
+    start = time.perf_counter()
+    deadline = start + args.ramp + args.duration
+    viewers = [SimulatedViewer(i, url, utterances, args) for i in range(args.clients)]
+
+    async def launch(viewer: SimulatedViewer) -> Optional[BaseException]:
+        # 在 ramp 时间内均匀接入
+        await asyncio.sleep(args.ramp * viewer.index / max(1, args.clients))
+        try:
+            await viewer.run(deadline)
+        except Exception as e:  # 单个客户端失败不影响其它客户端
+            return e
+        return None
+
+    failures = [e for e in await asyncio.gather(*(launch(v) for v in viewers)) if e is not None]
+    elapsed = time.perf_counter() - start
+    if sampler_task is not None:
+        sampler_task.cancel()
+
+    samples: Dict[str, List[float]] = {metric: [] for metric in METRICS}
+    turns = answered = 0
+    for viewer in viewers:
+        for probe in viewer.turns:
+            turns += 1
+            latencies = probe.latencies()
+            if latencies["time_to_first_text_ms"] is not None:
+                answered += 1
+            for metric, value in latencies.items():
+                if value is not None:
+                    samples[metric].append(value)
+
+    return {
+        "clients": args.clients,
+        "connect_failures": len(failures),
+        "failure_examples": sorted({repr(e) for e in failures})[:5],
+        "elapsed_s": round(elapsed, 1),
+        "turns": turns,
+        "turns_answered": answered,
+        "chunks_sent": sum(v.chunks_sent for v in viewers),
+        "interrupts_sent": sum(v.interrupts_sent for v in viewers),
+        "errors": sum(v.errors for v in viewers),
+        "latency_ms": {metric: percentiles(values) for metric, values in samples.items()},
+        "server": sampler.summary() if sampler else {},
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"\n{report['clients']} 个客户端，{report['elapsed_s']}s，"
+        f"{report['turns']} 轮（{report['turns_answered']} 轮收到回复），"
+        f"打断 {report['interrupts_sent']} 次，错误 {report['errors']} 次，连接失败 {report['connect_failures']} 个"
+    )
+    for metric, row in report["latency_ms"].items():
+        if row["count"]:
+            print(f"{metric:>24}: n={row['count']:<5} p50 {row['p50']:8.1f}ms  p95 {row['p95']:8.1f}ms  p99 {row['p99']:8.1f}ms")
+        else:
+            print(f"{metric:>24}: 无样本")
+    server = report["server"]
+    if server:
+        print(
+            f"{'server':>24}: CPU 平均 {server['cpu_percent_mean']:.0f}% / 峰值 {server['cpu_percent_max']:.0f}%，"
+            f"RSS {server['rss_mb_start']:.0f} -> {server['rss_mb_max']:.0f}MB（峰值）"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO 端到端压测")
+    parser.add_argument("--clients", type=int, default=10, help="模拟客户端数")
+    parser.add_argument("--duration", type=float, default=60.0, help="全部接入后的持续时间（秒）")
+    parser.add_argument("--ramp", type=float, default=5.0, help="客户端逐个接入的时间（秒）")
+    parser.add_argument("--drain", type=float, default=5.0, help="停止推流后等待最后一轮回复的时间（秒）")
+    parser.add_argument("--audio", default="", help="录音文件（任意格式，默认使用合成语音）")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="每个 raw_audio_data 块的时长")
+    parser.add_argument("--min-gap", type=float, default=2.0, help="两句话之间的最短停顿（秒）")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="两句话之间的最长停顿（秒）")
+    parser.add_argument("--text-every", type=float, default=0.0, help="平均每隔多少秒发送一次 text_input（0 表示不发送）")
+    parser.add_argument("--interrupt-prob", type=float, default=0.0, help="收到音频后发送 interrupt_signal 的概率")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--url", default="", help="压测已运行的服务（不自动启动）")
+    parser.add_argument("--server-pid", type=int, default=0, help="--url 模式下服务端进程 PID（采集 CPU / RSS）")
+    parser.add_argument("--port", type=int, default=12399, help="自动启动服务端时使用的端口")
+    parser.add_argument("--vad", default="silero", help="自动启动服务端时使用的 VAD（silero / mock）")
+    parser.add_argument("--server-log-level", default="WARNING", help="自动启动服务端的日志级别")
+    parser.add_argument("--output", default="", help="结果输出 JSON 路径")
+    args = parser.parse_args()
+
+    # 只在运行压测时检查（模块可被 replay_session 等导入）
+    try:
+        import aiohttp  # noqa: F401  AsyncClient 的传输层
+    except ImportError as e:
+        print(f"缺少依赖: {e}。请运行: pip install python-socketio aiohttp", file=sys.stderr)
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory(prefix="anima-load-") as tmp:
+        proc = None
+        if args.url:
+            url, pid = args.url.rstrip("/"), args.server_pid or None
+        else:
+            proc = spawn_server(args, Path(tmp))
+            url, pid = f"http://127.0.0.1:{args.port}", proc.pid
+        try:
+            wait_ready(url, proc, timeout=60)
+            report = asyncio.run(run_load(args, url, pid))
+        except Exception:
+            if proc is not None and (Path(tmp) / "server.log").exists():
+                print((Path(tmp) / "server.log").read_text(encoding="utf-8", errors="replace")[-3000:], file=sys.stderr)
+            raise
+        finally:
+            if proc is not None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    report["args"] = vars(args)
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+会话回放：把录制的入站事件按原速或加速重新发给服务端，并对比两次运行的每轮时序
+
+录制：在 config.yaml 中设置 system.session_recording: true，每个会话写入
+logs/sessions/<时间>_<sid>.jsonl.gz（见 anima.utils.session_recording）。
+
+回放时按录制的时间戳发送 raw_audio_data / mic_audio_data / text_input / mic_audio_end / interrupt_signal，
+同时在客户端记录收到的全部事件，写成同样格式的录制文件，再按轮次对比：
+- transcript_ms    每轮起点 -> 最终转录
+- first_text_ms    每轮起点 -> 第一段回复文本
+- first_audio_ms   每轮起点 -> 第一段音频
+- last_out_ms      每轮起点 -> 该轮最后一个出站事件
+每轮起点为 text_input / mic_audio_end，或服务端 VAD 判定说完（control: mic-audio-end）。
+
+默认自动启动一个使用 mock 服务的服务端子进程；--server-config 指定配置文件时使用其中的真实服务；
+也可以用 --url 回放到已运行的服务。--speed 2 表示两倍速，0 表示不等待（VAD 的时序会与原始会话不同）。
+
+依赖：python-socketio 的异步客户端需要 aiohttp（pip install aiohttp）；--diff 模式不需要。
+
+用法:
+    python scripts/benchmarks/replay_session.py logs/sessions/20260101-120000_abc.jsonl.gz
+    python scripts/benchmarks/replay_session.py session.jsonl.gz --speed 2 --save replay.jsonl.gz --output diff.json
+    python scripts/benchmarks/replay_session.py session.jsonl.gz --server-config config/config.yaml
+    python scripts/benchmarks/replay_session.py --diff before.jsonl.gz after.jsonl.gz
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from anima.utils.session_recording import (  # noqa: E402
+    AUDIO_EVENTS,
+    PROFILE_METRICS,
+    SessionRecorder,
+    decode_audio,
+    diff_profiles,
+    iter_inbound,
+    load_session,
+    timing_profile,
+)
+
+
+# ---------------------------------------------------------------------------
+# 回放
+# ---------------------------------------------------------------------------
+
+def _payload(event: Dict[str, Any]) -> Any:
+    """录制的入站数据 -> 前端发送的格式（音频还原为浮点列表）"""
+    data = event["data"]
+    if event["event"] in AUDIO_EVENTS and isinstance(data, dict) and isinstance(data.get("audio"), dict):
+        return {**data, "audio": decode_audio(data["audio"]).tolist()}
+    return data
+
+
+async def replay(events: List[Dict[str, Any]], url: str, speed: float, drain: float, save: Path) -> int:
+    """
+    把入站事件发给服务端，收到的事件写入 save
+
+    Returns:
+        发送的事件数
+    """
+    import socketio
+
+    inbound = list(iter_inbound(events))
+    client = socketio.AsyncClient(reconnection=False)
+    recorder: SessionRecorder = None  # 连接成功后创建，时间零点与第一个入站事件对齐
+
+    @client.on("*")
+    async def on_any(event, data=None):
+        if recorder is not None:
+            recorder.record("out", event, data)
+
+    await client.connect(url, transports=["websocket"])
+    recorder = SessionRecorder(save, client.sid, {"replay_of": len(inbound), "speed": speed, "url": url})
+    # 录制的第一个入站事件之前的空闲不回放
+    offset = inbound[0]["t"] if inbound else 0.0
+    start = time.perf_counter()
+    try:
+        for event in inbound:
+            if speed > 0:
+                delay = start + (event["t"] - offset) / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            payload = _payload(event)
+            recorder.record("in", event["event"], payload)
+            await client.emit(event["event"], payload)
+        await asyncio.sleep(drain)
+    finally:
+        await client.disconnect()
+        recorder.close()
+    return len(inbound)
+
+
+# ---------------------------------------------------------------------------
+# 报告
+# ---------------------------------------------------------------------------
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:.0f}"
+
+
+def print_diff(diff: Dict[str, Any]) -> None:
+    header = f"{'turn':>4} {'kind':<11}" + "".join(f"{metric:>28}" for metric in PROFILE_METRICS)
+    print(header)
+    print(f"{'':>16}" + f"{'base / new / delta':>28}" * len(PROFILE_METRICS))
+    for row in diff["turns"]:
+        cells = "".join(
+            f"{_fmt(row[m]['base']) + ' / ' + _fmt(row[m]['new']) + ' / ' + _fmt(row[m]['delta']):>28}"
+            for m in PROFILE_METRICS
+        )
+        print(f"{row['index']:>4} {row['kind']:<11}{cells}")
+
+    unmatched = diff["unmatched"]
+    if unmatched["baseline"] or unmatched["candidate"]:
+        print(f"\n未对齐的轮次: 原始多 {unmatched['baseline']} 轮, 回放多 {unmatched['candidate']} 轮")
+
+    print(f"\n{'metric':<16}{'base p50':>10}{'new p50':>10}{'base p95':>10}{'new p95':>10}")
+    for metric in PROFILE_METRICS:
+        base = diff["summary"]["baseline"][metric]
+        new = diff["summary"]["candidate"][metric]
+        print(
+            f"{metric:<16}{_fmt(base.get('p50')):>10}{_fmt(new.get('p50')):>10}"
+            f"{_fmt(base.get('p95')):>10}{_fmt(new.get('p95')):>10}"
+        )
+
+
+def compare(baseline_path: str, candidate_path: str) -> Dict[str, Any]:
+    _, baseline = load_session(baseline_path)
+    _, candidate = load_session(candidate_path)
+    diff = diff_profiles(timing_profile(baseline), timing_profile(candidate))
+    diff["baseline"] = str(baseline_path)
+    diff["candidate"] = str(candidate_path)
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话回放与时序对比")
+    parser.add_argument("recording", nargs="?", help="录制文件（.jsonl.gz）")
+    parser.add_argument("--diff", nargs=2, metavar=("BASE", "NEW"), help="只对比两个录制文件，不回放")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放倍速（1 为原速，0 为不等待）")
+    parser.add_argument("--drain", type=float, default=10.0, help="最后一个入站事件之后等待回复的时间（秒）")
+    parser.add_argument("--save", default="", help="回放录制的保存路径（默认写入临时目录）")
+    parser.add_argument("--url", default="", help="回放到已运行的服务（不自动启动）")
+    parser.add_argument("--server-config", default="", help="自动启动服务端时使用的配置（保留其中的真实服务）")
+    parser.add_argument("--port", type=int, default=12399, help="自动启动服务端时使用的端口")
+    parser.add_argument("--vad", default="silero", help="mock 服务端使用的 VAD（silero / mock）")
+    parser.add_argument("--server-log-level", default="WARNING", help="自动启动服务端的日志级别")
+    parser.add_argument("--output", default="", help="对比结果输出 JSON 路径")
+    args = parser.parse_args()
+
+    if args.diff:
+        diff = compare(*args.diff)
+    elif args.recording:
+        from loadgen import spawn_server, wait_ready
+
+        _, events = load_session(args.recording)
+        with tempfile.TemporaryDirectory(prefix="anima-replay-") as tmp:
+            save = Path(args.save) if args.save else Path(tmp) / "replay.jsonl.gz"
+            proc = None
+            if args.url:
+                url = args.url.rstrip("/")
+            else:
+                base_config = Path(args.server_config) if args.server_config else None
+                proc = spawn_server(args, Path(tmp), base_config, mock=base_config is None)
+                url = f"http://127.0.0.1:{args.port}"
+            try:
+                wait_ready(url, proc, timeout=120)
+                sent = asyncio.run(replay(events, url, args.speed, args.drain, save))
+                print(f"已回放 {sent} 个入站事件（{args.speed}x）-> {save}\n")
+                diff = compare(args.recording, save)
+            except Exception:
+                if proc is not None and (Path(tmp) / "server.log").exists():
+                    print((Path(tmp) / "server.log").read_text(encoding="utf-8", errors="replace")[-3000:], file=sys.stderr)
+                raise
+            finally:
+                if proc is not None:
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+            diff["speed"] = args.speed
+    else:
+        parser.error("需要指定录制文件或 --diff BASE NEW")
+
+    print_diff(diff)
+    if args.output:
+        Path(args.output).write_text(json.dumps(diff, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+对话轮次追踪 JSONL -> Chrome trace
+
+把 system.trace_file 导出的 JSONL 转成 Chrome trace（chrome://tracing 或 https://ui.perfetto.dev 打开），
+并打印各派生指标（ASR / 首 token / 首段音频 / 总耗时）的分布。
+
+用法:
+    python scripts/trace_to_chrome.py logs/traces.jsonl -o trace.json
+    python scripts/trace_to_chrome.py logs/traces.jsonl --session <sid> --last 20
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from anima.utils.latency_histogram import LatencyHistogram  # noqa: E402
+from anima.utils.tracing import load_jsonl, to_chrome_trace  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对话轮次追踪 JSONL -> Chrome trace")
+    parser.add_argument("input", help="追踪 JSONL 文件")
+    parser.add_argument("-o", "--output", default="trace.json", help="Chrome trace 输出路径")
+    parser.add_argument("--session", default="", help="只导出指定会话")
+    parser.add_argument("--last", type=int, default=0, help="只导出最后 N 轮")
+    args = parser.parse_args()
+
+    records = load_jsonl(args.input)
+    if args.session:
+        records = [r for r in records if r["session_id"] == args.session]
+    if args.last:
+        records = records[-args.last:]
+
+    Path(args.output).write_text(json.dumps(to_chrome_trace(records), ensure_ascii=False), encoding="utf-8")
+    print(f"{len(records)} 轮 -> {args.output}")
+
+    histograms = {}
+    for record in records:
+        for metric, value in record["metrics"].items():
+            if value is not None:
+                histograms.setdefault(metric, LatencyHistogram(metric)).observe(value)
+    for metric, hist in histograms.items():
+        snap = hist.snapshot()
+        print(f"{metric:>9}: n={snap['count']:<4} p50 {snap['p50']:8.1f}ms  p90 {snap['p90']:8.1f}ms  p99 {snap['p99']:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -59,3 +59,89 @@ class FasterWhisperASRConfig(ASRBaseConfig):
         },
         description="VAD 参数"
     )
+
+    # 调度配置（同一模型配置的所有会话共享）
+    num_workers: int = Field(
+        default=1,
+        ge=1,
+        description="专用解码线程数"
+    )
+
+    cpu_threads: int = Field(
+        default=0,
+        ge=0,
+        description="每个解码线程的 CPU 线程数 (0=默认)"
+    )
+
+    batch_size: int = Field(
+        default=8,
+        ge=1,
+        description="跨会话批量解码的最大片段数 (1=不批量)"
+    )
+
+    batch_wait_ms: float = Field(
+        default=20.0,
+        ge=0,
+        description="收集批次的等待窗口（毫秒）"
+    )
+
+    # 多进程解码（ASR 负载不再挤占 Socket.IO 事件循环）
+    worker_processes: int = Field(
+        default=0,
+        ge=0,
+        description="独立解码进程数 (0=服务进程内线程池解码)，每个进程加载一份模型"
+    )
+
+    worker_timeout_s: float = Field(
+        default=60.0,
+        gt=0,
+        description="多进程模式下单个请求的最长解码时间（秒），超时重启 worker"
+    )
+
+    # 流式部分识别（说话过程中推送 user-transcript 部分结果）
+    streaming_partials: bool = Field(
+        default=True,
+        description="说话过程中是否推送部分识别结果"
+    )
+
+    partial_interval_ms: float = Field(
+        default=800.0,
+        ge=100,
+        description="部分识别的解码间隔（毫秒）"
+    )
+
+    partial_beam_size: int = Field(
+        default=1,
+        ge=1,
+        le=10,
+        description="部分识别使用的束搜索大小"
+    )
+
+    # 自适应解码（按语音时长和负载选择 beam_size，可选草稿模型）
+    adaptive_decoding: bool = Field(
+        default=True,
+        description="短句或高负载时使用贪心解码，空闲时的长句使用 beam_size"
+    )
+
+    short_clip_s: float = Field(
+        default=2.0,
+        ge=0,
+        description="短句阈值（秒），短于该时长使用贪心解码"
+    )
+
+    busy_pending: int = Field(
+        default=2,
+        ge=1,
+        description="排队 + 解码中的请求数达到该值时视为高负载"
+    )
+
+    draft_model: Optional[str] = Field(
+        default=None,
+        description="草稿模型（如 small），先用它贪心解码，置信度不足再用主模型"
+    )
+
+    draft_logprob_threshold: float = Field(
+        default=-0.8,
+        le=0,
+        description="草稿结果的平均对数概率低于该值时回退到主模型"
+    )
@@ -13,3 +13,7 @@ class GLMASRConfig(ASRBaseConfig):
     type: Literal["glm"] = "glm"
     model: str = Field(default="glm-asr", description="ASR 模型名称")
     stream: bool = Field(default=False, description="是否流式识别")
+    upload_format: Literal["wav", "flac", "mp3"] = Field(
+        default="wav",
+        description="PCM 输入的上传编码：wav（默认，零开销）/ flac（试验性，接口文档只列出 wav / mp3，需 soundfile）/ mp3（pydub + ffmpeg）"
+    )
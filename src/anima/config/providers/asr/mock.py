@@ -1,6 +1,8 @@
 """Mock ASR 提供者配置"""
 
-from typing import Literal
+from typing import Literal, Optional
+
+from pydantic import Field
 
 from ...core.registry import ProviderRegistry
 from .base import ASRBaseConfig
@@ -9,4 +11,8 @@ from .base import ASRBaseConfig
 @ProviderRegistry.register("asr", "mock")
 class MockASRConfig(ASRBaseConfig):
     """Mock ASR 配置 - 用于测试"""
-    type: Literal["mock"] = "mock"
\ No newline at end of file
+    type: Literal["mock"] = "mock"
+    base_latency_ms: float = Field(default=100.0, ge=0, description="每次识别的固定平均耗时（毫秒）")
+    ms_per_audio_second: float = Field(default=100.0, ge=0, description="每秒音频的平均识别耗时（毫秒）")
+    jitter: float = Field(default=0.0, ge=0, description="延迟的变异系数（标准差 / 均值，0 为固定延迟）")
+    seed: Optional[int] = Field(default=None, description="随机种子（固定后识别结果和延迟可复现）")
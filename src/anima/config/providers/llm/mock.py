@@ -1,6 +1,8 @@
 """Mock LLM 提供者配置"""
 
-from typing import Literal
+from typing import Literal, Optional
+
+from pydantic import Field
 
 from ...core.registry import ProviderRegistry
 from .base import LLMBaseConfig
@@ -9,4 +11,8 @@ from .base import LLMBaseConfig
 @ProviderRegistry.register("llm", "mock")
 class MockLLMConfig(LLMBaseConfig):
     """Mock LLM 配置 - 用于测试"""
-    type: Literal["mock"] = "mock"
\ No newline at end of file
+    type: Literal["mock"] = "mock"
+    first_token_ms: float = Field(default=100.0, ge=0, description="首 token 平均延迟（毫秒）")
+    token_interval_ms: float = Field(default=0.0, ge=0, description="逐 token 平均间隔（毫秒）")
+    jitter: float = Field(default=0.0, ge=0, description="延迟的变异系数（标准差 / 均值，0 为固定延迟）")
+    seed: Optional[int] = Field(default=None, description="随机种子（固定后延迟序列可复现）")
@@ -1,6 +1,8 @@
 """Mock TTS 提供者配置"""
 
-from typing import Literal
+from typing import Literal, Optional
+
+from pydantic import Field
 
 from ...core.registry import ProviderRegistry
 from .base import TTSBaseConfig
@@ -9,4 +11,10 @@ from .base import TTSBaseConfig
 @ProviderRegistry.register("tts", "mock")
 class MockTTSConfig(TTSBaseConfig):
     """Mock TTS 配置 - 用于测试"""
-    type: Literal["mock"] = "mock"
\ No newline at end of file
+    type: Literal["mock"] = "mock"
+    chars_per_second: float = Field(default=4.0, gt=0, description="语速：每秒音频对应的字数（决定生成音频的时长）")
+    real_time_factor: float = Field(default=0.1, ge=0, description="合成耗时 / 音频时长")
+    base_latency_ms: float = Field(default=50.0, ge=0, description="每次合成的固定平均耗时（毫秒）")
+    jitter: float = Field(default=0.0, ge=0, description="延迟的变异系数（标准差 / 均值，0 为固定延迟）")
+    sample_rate: int = Field(default=16000, description="生成音频的采样率")
+    seed: Optional[int] = Field(default=None, description="随机种子（固定后音频和延迟可复现）")
@@ -1,6 +1,6 @@
 """Mock VAD 配置"""
 
-from typing import Literal
+from typing import Literal, Optional
 from pydantic import Field
 from ...core.registry import ProviderRegistry
 from .base import VADBaseConfig
@@ -13,4 +13,7 @@ class MockVADConfig(VADBaseConfig):
     sample_rate: int = Field(default=16000, description="采样率")
     db_threshold: float = Field(default=-30.0, description="分贝阈值")
     min_speech_duration: int = Field(default=5, description="最小语音帧数")
-    min_silence_duration: int = Field(default=15, description="最小静音帧数")
\ No newline at end of file
+    min_silence_duration: int = Field(default=15, description="最小静音帧数")
+    ms_per_window: float = Field(default=0.0, ge=0, description="每 512 采样点窗口模拟的推理耗时（毫秒，忙等占用 CPU）")
+    jitter: float = Field(default=0.0, ge=0, description="推理耗时的变异系数")
+    seed: Optional[int] = Field(default=None, description="随机种子")
@@ -1,6 +1,6 @@
 """Silero VAD 配置"""
 
-from typing import Literal
+from typing import Literal, Optional
 from pydantic import Field
 from ...core.registry import ProviderRegistry
 from .base import VADBaseConfig
@@ -15,4 +15,18 @@ class SileroVADConfig(VADBaseConfig):
     db_threshold: float = Field(default=60.0, description="分贝阈值")
     required_hits: int = Field(default=3, description="开始说话需要的连续命中次数")
     required_misses: int = Field(default=24, description="停止说话需要的连续未命中次数")
-    smoothing_window: int = Field(default=5, description="平滑窗口大小")
\ No newline at end of file
+    smoothing_window: int = Field(default=5, description="平滑窗口大小")
+    backend: Literal["onnx", "torch"] = Field(
+        default="onnx",
+        description="推理后端：onnx（onnxruntime 单线程，无需 torch）/ torch（TorchScript）"
+    )
+    onnx_model_path: Optional[str] = Field(
+        default=None,
+        description="ONNX 模型路径（默认使用 silero-vad 包自带的 silero_vad.onnx）"
+    )
+    adaptive_endpointing: bool = Field(
+        default=True,
+        description="自适应端点检测：按说话人停顿习惯和部分识别文本决定静音多久算说完"
+    )
+    min_hangover_ms: float = Field(default=250.0, description="自适应端点检测的最短静音等待（毫秒）")
+    max_hangover_ms: float = Field(default=1200.0, description="自适应端点检测的最长静音等待（毫秒）")
\ No newline at end of file
@@ -1,5 +1,6 @@
 """系统配置"""
 
+from typing import Optional
 from pydantic import Field
 from .core.base import BaseConfig
 
@@ -9,4 +10,18 @@ class SystemConfig(BaseConfig):
     host: str = Field(default="localhost", description="服务器地址")
     port: int = Field(default=12394, description="服务器端口")
     debug: bool = Field(default=False, description="调试模式")
-    log_level: str = Field(default="INFO", description="日志级别")
\ No newline at end of file
+    log_level: str = Field(default="INFO", description="日志级别")
+    tracing: bool = Field(default=True, description="记录每轮对话的延迟追踪（span + 派生指标）")
+    trace_file: Optional[str] = Field(default=None, description="每轮结束时追加追踪记录的 JSONL 文件（为空则只保留在内存）")
+    loop_monitor: bool = Field(default=True, description="监控事件循环调度延迟，卡顿时记录阻塞位置的调用栈")
+    loop_lag_interval_ms: float = Field(default=50.0, description="事件循环延迟采样间隔（毫秒）")
+    loop_lag_threshold_ms: float = Field(default=100.0, description="事件循环卡顿阈值（毫秒）")
+    loop_lag_stats_event: bool = Field(default=False, description="允许客户端通过 loop_lag_stats 事件获取卡顿调用栈（含服务端文件路径，仅调试时开启）")
+    session_recording: bool = Field(default=False, description="录制每个会话的入站 / 出站事件（可用 scripts/benchmarks/replay_session.py 回放）")
+    session_record_dir: str = Field(default="logs/sessions", description="会话录制文件目录")
+    event_dispatch: str = Field(default="serial", description="EventBus 分发模式：serial（依次等待每个 Handler）/ concurrent（每个订阅独立队列）")
+    event_queue_size: int = Field(default=64, description="concurrent 模式下每个订阅队列的容量")
+    event_overflow: str = Field(default="block", description="concurrent 模式下队列满时的处理：block / drop_oldest / coalesce")
+    sentence_coalesce_ms: float = Field(default=40.0, description="合并 LLM 文本片段再发给前端的时间窗口（毫秒，0 表示每个片段单独发送）")
+    sentence_coalesce_chars: int = Field(default=64, description="合并后单条文本消息的最大字符数")
+    turn_queue_size: int = Field(default=2, description="上一轮对话未结束时最多排队的输入数（超出时丢弃最早的）")
\ No newline at end of file
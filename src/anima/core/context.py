@@ -22,6 +22,10 @@ class PipelineContext:
     # 处理后的文本（由 ASR 步骤填充，或直接使用原始文本）
     text: str = ""
     
+    # 语音区间（由 VAD 填充，采样点 [{"start", "end"}]，相对于 raw_input）
+    # 存在时 ASR 直接使用这些区间，不再运行自己的 VAD
+    speech_timestamps: Optional[List[Dict[str, int]]] = None
+
     # 可选的图片列表
     images: Optional[List[Dict[str, Any]]] = None
     
@@ -4,12 +4,14 @@ EventBus 系统
 支持优先级、异常隔离、取消订阅
 """
 
-from .bus import EventBus, EventPriority, Subscription
+from .bus import DispatchMode, EventBus, EventPriority, OverflowPolicy, Subscription
 from .router import EventRouter
 
 __all__ = [
     "EventBus",
     "EventPriority",
+    "DispatchMode",
+    "OverflowPolicy",
     "Subscription",
     "EventRouter",
 ]
@@ -2,12 +2,25 @@
 EventBus - 事件总线
 基于观察者模式的事件分发系统
 支持优先级、异常隔离、取消订阅
+
+两种分发模式：
+- serial（默认）：emit 依次 await 每个订阅者，全部处理完才返回
+- concurrent：每个订阅一个有界队列 + 工作任务，emit 只入队；同一订阅内保持事件顺序，
+  慢的 Handler（socket 发送、音频解码）不再拖慢 LLM 流的消费
 """
 
-from typing import TYPE_CHECKING, List, Callable, Dict, Optional, Any
+import asyncio
+import contextvars
+import dataclasses
+import weakref
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Callable, Dict, Optional, Any, Tuple
 from loguru import logger
 from enum import Enum
 
+from anima.utils.metrics import ERRORS_TOTAL, METRICS
+from anima.utils.tracing import span
+
 if TYPE_CHECKING:
     from anima.core import OutputEvent
 
@@ -25,6 +38,204 @@ class EventPriority(int, Enum):
     MONITOR = 200  # 监控器，最后执行
 
 
+class DispatchMode(str, Enum):
+    """事件分发模式"""
+    SERIAL = "serial"          # emit 依次 await 每个订阅者
+    CONCURRENT = "concurrent"  # 每个订阅独立的队列和工作任务，emit 只入队
+
+
+class OverflowPolicy(str, Enum):
+    """并发模式下订阅队列已满时的处理方式"""
+    BLOCK = "block"              # 发射方等待队列有空位（不丢事件）
+    DROP_OLDEST = "drop_oldest"  # 丢弃最早的待处理事件
+    COALESCE = "coalesce"        # 与队尾同类型事件合并；无法合并时等待
+
+
+# 所有订阅队列（/metrics 抓取时汇总）
+_QUEUES: "weakref.WeakSet[SubscriptionQueue]" = weakref.WeakSet()
+
+EVENT_QUEUE_OVERFLOW = METRICS.counter(
+    "anima_event_queue_overflow_total", "事件队列溢出次数（按处理方式）", label="action"
+)
+METRICS.gauge(
+    "anima_event_queue_depth", "各订阅队列中待处理事件总数",
+    fn=lambda: sum(len(queue) for queue in list(_QUEUES)),
+)
+METRICS.gauge(
+    "anima_event_queue_max_depth", "单个订阅队列的最大待处理事件数",
+    fn=lambda: max((len(queue) for queue in list(_QUEUES)), default=0),
+)
+
+
+def coalesce_events(old: "OutputEvent", new: "OutputEvent") -> Optional["OutputEvent"]:
+    """
+    合并同一订阅中排队的两个事件（无法合并时返回 None）
+
+    - sentence：文本拼接（完成标记不合并）
+    - expression：只保留最新的表情
+    """
+    if old.type != new.type:
+        return None
+    if new.type == "sentence":
+        if (
+            isinstance(old.data, str) and isinstance(new.data, str)
+            and not old.metadata.get("is_complete") and not new.metadata.get("is_complete")
+        ):
+            return dataclasses.replace(
+                new, data=old.data + new.data, metadata={**old.metadata, **new.metadata}
+            )
+        return None
+    if new.type == "expression":
+        return new
+    return None
+
+
+async def _call_handler(handler: EventHandler, event: "OutputEvent") -> bool:
+    """调用处理器（同步或异步），异常只记录不抛出"""
+    try:
+        result = handler(event)
+        if hasattr(result, '__await__'):
+            await result
+        return True
+    except Exception as e:
+        ERRORS_TOTAL.inc("event_handler")
+        logger.error(
+            f"EventBus handler 错误 [{event.type}]: "
+            f"{handler.__name__ if hasattr(handler, '__name__') else handler} - {e}"
+        )
+        return False
+
+
+class SubscriptionQueue:
+    """
+    单个订阅的有界队列和工作任务（并发分发模式）
+
+    事件连同发射时的 contextvars 一起入队，每个事件的 Handler 在该上下文的副本中运行，
+    追踪 span 仍记在发射事件的那一轮上，发射方之后 reset 的变量也不会残留到后续事件。
+    """
+
+    def __init__(
+        self,
+        subscription: "Subscription",
+        maxsize: int = 64,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+    ):
+        self.subscription = subscription
+        self.maxsize = max(1, maxsize)
+        self.overflow = OverflowPolicy(overflow)
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_watermark = 0
+        self._items: Deque[Tuple["OutputEvent", contextvars.Context]] = deque()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+        # Event 在第一次入队时（事件循环中）创建
+        self._not_empty: Optional[asyncio.Event] = None
+        self._not_full: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        _QUEUES.add(self)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _ensure_worker(self) -> None:
+        if self._task is None:
+            self._not_empty = asyncio.Event()
+            self._not_full = asyncio.Event()
+            self._not_full.set()
+            self._idle = asyncio.Event()
+            self._idle.set()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def put(self, event: "OutputEvent") -> bool:
+        """
+        入队（只有 block / coalesce 策略在队列满且无法合并时才会等待）
+
+        Returns:
+            bool: 事件是否进入队列（合并也算）
+        """
+        if self._closed:
+            return False
+        self._ensure_worker()
+        context = contextvars.copy_context()
+
+        blocked = False
+        while len(self._items) >= self.maxsize:
+            if self.overflow is OverflowPolicy.DROP_OLDEST:
+                self._items.popleft()
+                self.dropped += 1
+                EVENT_QUEUE_OVERFLOW.inc("drop")
+                break
+            if self.overflow is OverflowPolicy.COALESCE:
+                merged = coalesce_events(self._items[-1][0], event)
+                if merged is not None:
+                    self._items[-1] = (merged, context)
+                    self.coalesced += 1
+                    EVENT_QUEUE_OVERFLOW.inc("coalesce")
+                    return True
+            if not blocked:
+                blocked = True
+                EVENT_QUEUE_OVERFLOW.inc("block")
+            self._not_full.clear()
+            await self._not_full.wait()
+            if self._closed:
+                return False
+
+        self._items.append((event, context))
+        self.high_watermark = max(self.high_watermark, len(self._items))
+        self._idle.clear()
+        self._not_empty.set()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            if not self._items:
+                self._idle.set()
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+
+            event, context = self._items.popleft()
+            self._not_full.set()
+            if self.subscription.is_active:
+                # 任务创建时复制当前上下文：在 context.run 中创建即运行于发射时的上下文
+                # （兼容 3.8，等价于 3.11 的 create_task(..., context=context)）
+                await context.run(asyncio.ensure_future, _call_handler(self.subscription.handler, event))
+
+    async def join(self) -> None:
+        """等待已入队的事件全部处理完"""
+        if self._idle is not None and not self._closed:
+            await self._idle.wait()
+
+    def discard(self) -> int:
+        """丢弃尚未处理的事件（正在处理的不受影响），返回丢弃数量"""
+        count = len(self._items)
+        self._items.clear()
+        if self._not_full is not None:
+            self._not_full.set()
+        return count
+
+    def close(self) -> None:
+        """丢弃待处理事件并停止工作任务"""
+        self._closed = True
+        self.discard()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._idle is not None:
+            self._idle.set()
+        _QUEUES.discard(self)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "event_type": self.subscription.event_type,
+            "depth": len(self._items),
+            "high_watermark": self.high_watermark,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
 class Subscription:
     """
     订阅信息容器
@@ -44,6 +255,14 @@ class Subscription:
         self.priority = priority
         self.is_global = is_global
         self.is_active = True
+        # 并发分发模式下的订阅队列
+        self.queue: Optional[SubscriptionQueue] = None
+    
+    def deactivate(self) -> None:
+        """标记为非活跃并停止订阅队列"""
+        self.is_active = False
+        if self.queue is not None:
+            self.queue.close()
     
     def __repr__(self) -> str:
         return f"Subscription({self.event_type}, priority={self.priority}, active={self.is_active})"
@@ -76,10 +295,30 @@ class EventBus:
         
         # 发射事件
         await bus.emit(OutputEvent(type="sentence", data="Hello"))
+        
+        # 并发分发：emit 只入队，每个订阅按顺序在自己的任务中处理
+        bus = EventBus(mode=DispatchMode.CONCURRENT, queue_size=64, overflow=OverflowPolicy.COALESCE)
+        await bus.emit(event)
+        await bus.join()  # 等待所有订阅处理完（如一轮对话结束时）
     """
     
-    def __init__(self):
-        """初始化事件总线"""
+    def __init__(
+        self,
+        mode: DispatchMode = DispatchMode.SERIAL,
+        queue_size: int = 64,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+    ):
+        """
+        初始化事件总线
+        
+        Args:
+            mode: 分发模式
+            queue_size: 并发模式下每个订阅队列的容量
+            overflow: 并发模式下队列已满时的处理方式
+        """
+        self.mode = DispatchMode(mode)
+        self.queue_size = queue_size
+        self.overflow = OverflowPolicy(overflow)
         # 按事件类型分组的订阅者 {event_type: [(priority, handler, subscription)]}
         self._subscribers: Dict[str, List[tuple]] = {}
         # 全局订阅者 [(priority, handler, subscription)]
@@ -94,6 +333,10 @@ class EventBus:
         self._subscription_counter += 1
         return self._subscription_counter
     
+    def _attach_queue(self, subscription: Subscription) -> None:
+        if self.mode is DispatchMode.CONCURRENT:
+            subscription.queue = SubscriptionQueue(subscription, self.queue_size, self.overflow)
+    
     def subscribe(
         self,
         event_type: str,
@@ -120,6 +363,7 @@ class EventBus:
             is_global=False,
         )
         self._all_subscriptions[sub_id] = subscription
+        self._attach_queue(subscription)
         
         # 添加到对应事件类型的列表
         if event_type not in self._subscribers:
@@ -156,6 +400,7 @@ class EventBus:
             is_global=True,
         )
         self._all_subscriptions[sub_id] = subscription
+        self._attach_queue(subscription)
         
         entry = (-priority, handler, subscription)
         self._global_subscribers.append(entry)
@@ -177,7 +422,7 @@ class EventBus:
         if not subscription.is_active:
             return False
         
-        subscription.is_active = False
+        subscription.deactivate()
         
         if subscription.is_global:
             # 从全局订阅中移除
@@ -212,7 +457,7 @@ class EventBus:
         if event_type in self._subscribers:
             count = len(self._subscribers[event_type])
             for _, _, sub in self._subscribers[event_type]:
-                sub.is_active = False
+                sub.deactivate()
             del self._subscribers[event_type]
         
         logger.debug(f"EventBus: 取消 '{event_type}' 的所有订阅 ({count} 个)")
@@ -226,45 +471,86 @@ class EventBus:
             event: 输出事件
             
         Returns:
-            int: 成功处理的处理器数量
+            int: 成功处理的处理器数量（并发模式下为入队的订阅数量）
         """
+        if self.mode is DispatchMode.CONCURRENT:
+            return await self._enqueue(event)
+
         processed_count = 0
-        
-        # 分发到特定类型的订阅者
-        if event.type in self._subscribers:
-            for _, handler, sub in self._subscribers[event.type]:
+
+        event_name = getattr(event.type, "value", event.type)
+        with span(f"emit.{event_name}", "event") as emit_span:
+            # 分发到特定类型的订阅者
+            if event.type in self._subscribers:
+                for _, handler, sub in self._subscribers[event.type]:
+                    if not sub.is_active:
+                        continue
+
+                    try:
+                        result = handler(event)
+                        if hasattr(result, '__await__'):
+                            await result
+                        processed_count += 1
+                    except Exception as e:
+                        ERRORS_TOTAL.inc("event_handler")
+                        logger.error(
+                            f"EventBus handler 错误 [{event.type}]: "
+                            f"{handler.__name__ if hasattr(handler, '__name__') else handler} - {e}"
+                        )
+
+            # 分发到全局订阅者
+            for _, handler, sub in self._global_subscribers:
                 if not sub.is_active:
                     continue
-                    
+
                 try:
                     result = handler(event)
                     if hasattr(result, '__await__'):
                         await result
                     processed_count += 1
                 except Exception as e:
+                    ERRORS_TOTAL.inc("event_handler")
                     logger.error(
-                        f"EventBus handler 错误 [{event.type}]: "
+                        f"EventBus 全局 handler 错误: "
                         f"{handler.__name__ if hasattr(handler, '__name__') else handler} - {e}"
                     )
-        
-        # 分发到全局订阅者
-        for _, handler, sub in self._global_subscribers:
-            if not sub.is_active:
-                continue
-                
-            try:
-                result = handler(event)
-                if hasattr(result, '__await__'):
-                    await result
-                processed_count += 1
-            except Exception as e:
-                logger.error(
-                    f"EventBus 全局 handler 错误: "
-                    f"{handler.__name__ if hasattr(handler, '__name__') else handler} - {e}"
-                )
-        
+            emit_span.set("handlers", processed_count)
+
         return processed_count
     
+    async def _enqueue(self, event: "OutputEvent") -> int:
+        """并发模式：按优先级顺序放入各订阅的队列"""
+        queued = 0
+        for _, _, sub in self._subscribers.get(event.type, ()):
+            if sub.is_active and await sub.queue.put(event):
+                queued += 1
+        for _, _, sub in self._global_subscribers:
+            if sub.is_active and await sub.queue.put(event):
+                queued += 1
+        return queued
+    
+    def _queues(self) -> List[SubscriptionQueue]:
+        return [
+            sub.queue for sub in self._all_subscriptions.values()
+            if sub.is_active and sub.queue is not None
+        ]
+    
+    async def join(self) -> None:
+        """等待所有订阅队列处理完（串行模式下立即返回）"""
+        for queue in self._queues():
+            await queue.join()
+    
+    def discard_pending(self) -> int:
+        """丢弃所有订阅队列中尚未处理的事件（打断时使用），返回丢弃数量"""
+        count = sum(queue.discard() for queue in self._queues())
+        if count:
+            logger.debug(f"EventBus: 丢弃 {count} 个待处理事件")
+        return count
+    
+    def queue_stats(self) -> List[Dict[str, Any]]:
+        """各订阅队列的深度、峰值、丢弃 / 合并次数"""
+        return [queue.stats() for queue in self._queues()]
+    
     def emit_sync(self, event: "OutputEvent") -> int:
         """
         同步发射事件（仅用于同步处理器）
@@ -296,7 +582,7 @@ class EventBus:
         """清除所有订阅"""
         # 标记所有订阅为非活跃
         for sub in self._all_subscriptions.values():
-            sub.is_active = False
+            sub.deactivate()
         
         self._subscribers.clear()
         self._global_subscribers.clear()
@@ -112,5 +112,5 @@ class SocketEventAdapter:
         return {
             "type": "transcript",
             "text": event.get("text", ""),
-            "is_final": True,
+            "is_final": event.get("is_final", True),
         }
@@ -0,0 +1,12 @@
+"""
+向量存储后端
+
+提供可插拔的向量索引实现：
+- numpy: 内置实现（memmap float16 矩阵 + 元数据 sidecar），启动快、无额外依赖
+- chroma: ChromaDB 持久化实现（需要安装 chromadb）
+"""
+
+from .interface import VectorBackend
+from .factory import VectorBackendFactory
+
+__all__ = ["VectorBackend", "VectorBackendFactory"]
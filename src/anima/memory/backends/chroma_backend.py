@@ -0,0 +1,134 @@
+"""
+ChromaDB 向量后端
+
+保留原有的 ChromaDB 持久化方案，chromadb 仅在创建该后端时才导入
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from loguru import logger
+
+from .interface import VectorBackend
+
+
+class ChromaBackend(VectorBackend):
+    """
+    基于 ChromaDB PersistentClient 的向量后端
+
+    集合使用 cosine 空间（hnsw:space=cosine）
+    """
+
+    def __init__(self, storage_path: str):
+        """
+        初始化 ChromaDB 客户端
+
+        Args:
+            storage_path: ChromaDB 数据目录
+        """
+        import chromadb
+        from chromadb.config import Settings
+
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+
+        self.client = chromadb.PersistentClient(
+            path=str(self.storage_path),
+            settings=Settings(
+                anonymized_telemetry=False,
+                allow_reset=True
+            )
+        )
+        self._collections: Dict[str, Any] = {}
+        logger.info(f"[ChromaBackend] 初始化完成: {self.storage_path}")
+
+    def _get_collection(self, name: str):
+        """获取或创建集合"""
+        if name not in self._collections:
+            self._collections[name] = self.client.get_or_create_collection(
+                name=name,
+                metadata={"hnsw:space": "cosine"}  # 使用余弦相似度
+            )
+        return self._collections[name]
+
+    def add(
+        self,
+        collection: str,
+        ids: List[str],
+        embeddings: Union[np.ndarray, Sequence[Sequence[float]]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        embeddings = np.asarray(embeddings, dtype=np.float32).tolist()
+        self._get_collection(collection).add(
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            ids=ids
+        )
+
+    def query(
+        self,
+        collection: str,
+        embedding: Union[np.ndarray, Sequence[float]],
+        n_results: int = 3,
+        session_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1).tolist()
+
+        results = self._get_collection(collection).query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            where={"session_id": session_id} if session_id else None
+        )
+
+        contexts = []
+        if results["documents"] and results["documents"][0]:
+            for i, doc in enumerate(results["documents"][0]):
+                contexts.append({
+                    "id": results["ids"][0][i],
+                    "text": doc,
+                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
+                    "distance": results["distances"][0][i] if "distances" in results else 0.0
+                })
+        return contexts
+
+    def delete(self, collection: str, ids: List[str]) -> int:
+        coll = self._get_collection(collection)
+        before = coll.count()
+        coll.delete(ids=ids)
+        return before - coll.count()
+
+    def delete_session(self, collection: str, session_id: str) -> int:
+        coll = self._get_collection(collection)
+        before = coll.count()
+        coll.delete(where={"session_id": session_id})
+        return before - coll.count()
+
+    def count(self, collection: str) -> int:
+        return self._get_collection(collection).count()
+
+    def records(self, collection: str, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        coll = self._get_collection(collection)
+        where = {"session_id": session_id} if session_id else None
+
+        records = []
+        offset, page_size = 0, 1000
+        while True:
+            page = coll.get(
+                where=where,
+                include=["documents", "metadatas"],
+                limit=page_size,
+                offset=offset
+            )
+            for i, doc_id in enumerate(page["ids"]):
+                records.append({
+                    "id": doc_id,
+                    "text": page["documents"][i],
+                    "metadata": page["metadatas"][i] or {}
+                })
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+        return records
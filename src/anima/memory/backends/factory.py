@@ -0,0 +1,47 @@
+"""
+向量后端工厂 - 根据配置创建向量存储后端
+"""
+
+from typing import List
+from loguru import logger
+
+from .interface import VectorBackend
+
+
+class VectorBackendFactory:
+    """向量后端工厂类"""
+
+    @staticmethod
+    def create(provider: str, storage_path: str, **kwargs) -> VectorBackend:
+        """
+        根据名称创建向量后端
+
+        Args:
+            provider: 后端名称（numpy / chroma）
+            storage_path: 数据存储目录
+            **kwargs: 传递给具体实现的参数
+
+        Returns:
+            VectorBackend: 后端实例
+        """
+        if provider == "chroma":
+            from .chroma_backend import ChromaBackend
+            return ChromaBackend(storage_path=storage_path)
+
+        if provider != "numpy":
+            logger.warning(f"未知的向量后端: {provider}，使用 numpy 实现")
+
+        from .numpy_backend import NumpyBackend
+        # 同一目录在进程内共享一个实例（多个会话同时写入）
+        return NumpyBackend.shared(
+            storage_path,
+            index_type=kwargs.get("index_type", "flat"),
+            ivf_min_rows=kwargs.get("ivf_min_rows", 50000),
+            ivf_nlist=kwargs.get("ivf_nlist", 256),
+            ivf_nprobe=kwargs.get("ivf_nprobe", 16),
+        )
+
+    @staticmethod
+    def get_available_providers() -> List[str]:
+        """获取所有可用的后端列表"""
+        return ["numpy", "chroma"]
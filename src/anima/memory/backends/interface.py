@@ -0,0 +1,119 @@
+"""
+向量存储后端接口定义
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+class VectorBackend(ABC):
+    """
+    向量存储后端的抽象基类
+
+    所有后端都按「集合（collection）」组织数据，每条记录包含：
+    - id: 文档 ID
+    - embedding: 向量
+    - document: 原始文本
+    - metadata: 元数据（必须包含 session_id，用于按会话过滤和删除）
+
+    查询结果统一为字典列表：
+        {"id": str, "text": str, "metadata": dict, "distance": float}
+    其中 distance 为余弦距离（1 - 余弦相似度），与 ChromaDB 的 cosine 空间一致。
+    """
+
+    @abstractmethod
+    def add(
+        self,
+        collection: str,
+        ids: List[str],
+        embeddings: Union[np.ndarray, Sequence[Sequence[float]]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """
+        追加记录到集合
+
+        Args:
+            collection: 集合名称
+            ids: 文档 ID 列表
+            embeddings: 向量（N x dim）
+            documents: 文本列表
+            metadatas: 元数据列表
+        """
+        pass
+
+    @abstractmethod
+    def query(
+        self,
+        collection: str,
+        embedding: Union[np.ndarray, Sequence[float]],
+        n_results: int = 3,
+        session_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        余弦相似度 top-k 查询
+
+        Args:
+            collection: 集合名称
+            embedding: 查询向量
+            n_results: 返回结果数量
+            session_id: 可选，只在该会话的记录中搜索
+
+        Returns:
+            List[Dict]: 按相似度降序排列的结果
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, collection: str, ids: List[str]) -> int:
+        """
+        按 ID 删除记录
+
+        Returns:
+            int: 实际删除的数量
+        """
+        pass
+
+    @abstractmethod
+    def delete_session(self, collection: str, session_id: str) -> int:
+        """
+        删除某个会话的所有记录
+
+        Returns:
+            int: 实际删除的数量
+        """
+        pass
+
+    @abstractmethod
+    def count(self, collection: str) -> int:
+        """获取集合中的有效记录数"""
+        pass
+
+    @abstractmethod
+    def records(self, collection: str, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        列出集合中的有效记录（不含向量）
+
+        Args:
+            collection: 集合名称
+            session_id: 可选，只列出该会话的记录
+
+        Returns:
+            List[Dict]: {"id": str, "text": str, "metadata": dict}
+        """
+        pass
+
+    def compact(self, collection: str) -> int:
+        """
+        回收已删除记录占用的空间
+
+        Returns:
+            int: 回收的记录数（不支持时返回 0）
+        """
+        return 0
+
+    def close(self) -> None:
+        """刷新并释放资源"""
+        pass
@@ -0,0 +1,676 @@
+"""
+NumPy 向量后端 - 内置的轻量级向量索引
+
+每个集合一个目录：
+    {storage_path}/{collection}/
+    ├── index.json     # 头信息（维度、行数、容量、会话编码表）
+    ├── vectors.f16    # float16 向量矩阵（memmap，行已 L2 归一化）
+    ├── sessions.i32   # 每行的会话编码（memmap）
+    ├── flags.u8       # 每行是否有效（memmap，0 = 已删除）
+    ├── meta.jsonl     # id / 文本 / 元数据 sidecar（按行追加，懒加载）
+    └── ivf.npz        # 可选的 IVF 索引（质心 + 行分配）
+
+特点：
+- 启动只打开 memmap 和读取头信息，sidecar 在首次需要时才解析
+- 精确余弦 top-k：分块矩阵乘法 + argpartition
+- 按会话过滤/删除是向量化的掩码操作
+- 行数较多时可选 IVF 索引（球面 k-means 粗排 + 精排）
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from loguru import logger
+
+from .interface import VectorBackend
+
+
+class IVFIndex:
+    """
+    倒排文件索引（IVF）
+
+    用球面 k-means 把向量划分为 nlist 个簇，查询时只扫描
+    与查询向量最相近的 nprobe 个簇
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, nprobe: int):
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = assignments.astype(np.int32)
+        self.nprobe = nprobe
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        nlist: int,
+        nprobe: int,
+        iterations: int = 10,
+        sample_size: int = 65536,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        训练索引
+
+        Args:
+            vectors: 已归一化的向量（N x dim）
+            nlist: 簇数量
+            nprobe: 查询时扫描的簇数量
+            iterations: k-means 迭代次数
+            sample_size: 训练采样数
+            seed: 随机种子
+        """
+        rng = np.random.default_rng(seed)
+        n = len(vectors)
+        nlist = max(1, min(nlist, n))
+
+        sample_idx = rng.choice(n, size=min(sample_size, n), replace=False)
+        sample = np.asarray(vectors[np.sort(sample_idx)], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members) == 0:
+                    # 空簇：重新随机选一个点
+                    centroids[c] = sample[rng.integers(len(sample))]
+                    continue
+                centroid = members.sum(axis=0)
+                norm = np.linalg.norm(centroid)
+                centroids[c] = centroid / norm if norm > 0 else centroid
+
+        index = cls(centroids, np.empty(0, dtype=np.int32), nprobe)
+        index.assignments = index.assign_blocks(vectors)
+        return index
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """计算向量所属的簇"""
+        return np.argmax(
+            np.asarray(vectors, dtype=np.float32) @ self.centroids.T, axis=1
+        ).astype(np.int32)
+
+    def assign_blocks(self, vectors: np.ndarray, block_rows: int = 16384) -> np.ndarray:
+        """分块计算簇分配（避免一次性把 memmap 转成 float32）"""
+        parts = [
+            self.assign(vectors[i: i + block_rows])
+            for i in range(0, len(vectors), block_rows)
+        ]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+
+    def probe_mask(self, query: np.ndarray, n_rows: int) -> np.ndarray:
+        """返回需要精排的行掩码"""
+        scores = self.centroids @ query
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        return np.isin(self.assignments[:n_rows], probes)
+
+    def save(self, path: Path) -> None:
+        np.savez(path, centroids=self.centroids, assignments=self.assignments)
+
+    @classmethod
+    def load(cls, path: Path, nprobe: int) -> "IVFIndex":
+        data = np.load(path)
+        return cls(data["centroids"], data["assignments"], nprobe)
+
+
+class _Collection:
+    """单个集合的 memmap 存储"""
+
+    HEADER = "index.json"
+    VECTORS = "vectors.f16"
+    SESSIONS = "sessions.i32"
+    FLAGS = "flags.u8"
+    META = "meta.jsonl"
+    IVF = "ivf.npz"
+
+    # 精确搜索时每次参与矩阵乘法的行数
+    BLOCK_ROWS = 4096
+
+    def __init__(
+        self,
+        path: Path,
+        index_type: str,
+        ivf_min_rows: int,
+        ivf_nlist: int,
+        ivf_nprobe: int,
+    ):
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.index_type = index_type
+        self.ivf_min_rows = ivf_min_rows
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+
+        header = {}
+        header_path = self.path / self.HEADER
+        if header_path.exists():
+            header = json.loads(header_path.read_text(encoding="utf-8"))
+
+        self.dim: Optional[int] = header.get("dim")
+        self.count: int = header.get("count", 0)
+        self.capacity: int = header.get("capacity", 0)
+        self.session_codes: Dict[str, int] = header.get("sessions", {})
+
+        self._vectors: Optional[np.memmap] = None
+        self._sessions: Optional[np.memmap] = None
+        self._flags: Optional[np.memmap] = None
+        if self.capacity > 0:
+            self._open_arrays()
+
+        # sidecar（懒加载）
+        self._ids: Optional[List[str]] = None
+        self._documents: Optional[List[str]] = None
+        self._metadatas: Optional[List[Dict[str, Any]]] = None
+        self._id_to_row: Optional[Dict[str, int]] = None
+
+        # IVF 索引（懒加载）
+        self._ivf: Optional[IVFIndex] = None
+        self._ivf_loaded = False
+
+    # ---------- 文件管理 ----------
+
+    def _open_arrays(self) -> None:
+        """以读写模式打开 memmap"""
+        self._vectors = np.memmap(
+            self.path / self.VECTORS, dtype=np.float16, mode="r+",
+            shape=(self.capacity, self.dim)
+        )
+        self._sessions = np.memmap(
+            self.path / self.SESSIONS, dtype=np.int32, mode="r+",
+            shape=(self.capacity,)
+        )
+        self._flags = np.memmap(
+            self.path / self.FLAGS, dtype=np.uint8, mode="r+",
+            shape=(self.capacity,)
+        )
+
+    def _close_arrays(self) -> None:
+        """
+        落盘并释放 memmap
+
+        截断或替换数据文件之前必须调用：Windows 上仍被映射的文件无法替换，
+        POSIX 上旧映射会继续指向被替换掉的文件
+        """
+        self.flush()
+        self._vectors = self._sessions = self._flags = None
+
+    def _grow(self, required: int) -> None:
+        """扩容（容量翻倍），通过截断扩展文件后重新映射"""
+        new_capacity = max(1024, self.capacity * 2, required)
+        self._close_arrays()
+
+        for name, row_bytes in (
+            (self.VECTORS, self.dim * 2),
+            (self.SESSIONS, 4),
+            (self.FLAGS, 1),
+        ):
+            file_path = self.path / name
+            with open(file_path, "ab") as f:
+                f.truncate(new_capacity * row_bytes)
+
+        self.capacity = new_capacity
+        self._open_arrays()
+        logger.debug(f"[NumpyBackend] {self.path.name} 扩容至 {new_capacity} 行")
+
+    def _write_header(self) -> None:
+        header = {
+            "dim": self.dim,
+            "count": self.count,
+            "capacity": self.capacity,
+            "sessions": self.session_codes,
+        }
+        tmp_path = self.path / (self.HEADER + ".tmp")
+        tmp_path.write_text(json.dumps(header, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self.path / self.HEADER)
+
+    def _load_sidecar(self) -> None:
+        """解析 meta.jsonl（只在需要 id/文本/元数据时调用）"""
+        if self._ids is not None:
+            return
+
+        ids, documents, metadatas = [], [], []
+        meta_path = self.path / self.META
+        if meta_path.exists():
+            with open(meta_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if len(ids) >= self.count:
+                        break  # 头信息未写入的尾部数据（写入中途崩溃）
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    ids.append(record["id"])
+                    documents.append(record["document"])
+                    metadatas.append(record["metadata"])
+
+        self._ids = ids
+        self._documents = documents
+        self._metadatas = metadatas
+        self._id_to_row = {
+            doc_id: row for row, doc_id in enumerate(ids)
+            if self._flags is not None and self._flags[row]
+        }
+
+    def flush(self) -> None:
+        for arr in (self._vectors, self._sessions, self._flags):
+            if arr is not None:
+                arr.flush()
+        if self._ivf is not None:
+            self._ivf.save(self.path / self.IVF)
+
+    # ---------- 写入 ----------
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        vectors = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        n = len(vectors)
+        if n == 0:
+            return
+
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"向量维度不匹配: 期望 {self.dim}，收到 {vectors.shape[1]}")
+
+        # 行归一化：查询时点积即余弦相似度
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        if self.count + n > self.capacity:
+            self._grow(self.count + n)
+
+        codes = []
+        for metadata in metadatas:
+            session_id = str(metadata.get("session_id", ""))
+            if session_id not in self.session_codes:
+                self.session_codes[session_id] = len(self.session_codes)
+            codes.append(self.session_codes[session_id])
+
+        start, end = self.count, self.count + n
+        self._vectors[start:end] = vectors.astype(np.float16)
+        self._sessions[start:end] = codes
+        self._flags[start:end] = 1
+
+        # sidecar：追加写
+        with open(self.path / self.META, "a", encoding="utf-8") as f:
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                f.write(json.dumps(
+                    {"id": doc_id, "document": document, "metadata": metadata},
+                    ensure_ascii=False
+                ) + "\n")
+
+        if self._ids is not None:
+            for offset, (doc_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+                self._ids.append(doc_id)
+                self._documents.append(document)
+                self._metadatas.append(metadata)
+                self._id_to_row[doc_id] = start + offset
+
+        ivf = self._get_ivf()
+        if ivf is not None:
+            ivf.assignments = np.concatenate([ivf.assignments, ivf.assign(vectors)])
+
+        self.count = end
+        self._write_header()
+
+    def delete_rows(self, rows: np.ndarray) -> int:
+        rows = rows[self._flags[rows] == 1]
+        if rows.size == 0:
+            return 0
+        self._flags[rows] = 0
+        if self._id_to_row is not None:
+            for row in rows.tolist():
+                self._id_to_row.pop(self._ids[row], None)
+        return int(rows.size)
+
+    def delete_ids(self, ids: List[str]) -> int:
+        if self.count == 0:
+            return 0
+        self._load_sidecar()
+        rows = [self._id_to_row[doc_id] for doc_id in ids if doc_id in self._id_to_row]
+        return self.delete_rows(np.asarray(rows, dtype=np.int64))
+
+    def delete_session(self, session_id: str) -> int:
+        code = self.session_codes.get(session_id)
+        if code is None or self.count == 0:
+            return 0
+        rows = np.flatnonzero(self._sessions[:self.count] == code)
+        return self.delete_rows(rows)
+
+    # ---------- 查询 ----------
+
+    def _get_ivf(self) -> Optional[IVFIndex]:
+        """加载或（达到阈值时）训练 IVF 索引"""
+        if self.index_type != "ivf":
+            return None
+        if not self._ivf_loaded:
+            self._ivf_loaded = True
+            ivf_path = self.path / self.IVF
+            if ivf_path.exists():
+                self._ivf = IVFIndex.load(ivf_path, self.ivf_nprobe)
+                # 补齐上次保存后新增的行
+                missing = self.count - len(self._ivf.assignments)
+                if missing > 0:
+                    extra = self._ivf.assign_blocks(self._vectors[self.count - missing:self.count])
+                    self._ivf.assignments = np.concatenate([self._ivf.assignments, extra])
+        if self._ivf is None and self.count >= self.ivf_min_rows:
+            self.rebuild_index()
+        return self._ivf
+
+    def rebuild_index(self) -> None:
+        """重新训练 IVF 索引"""
+        if self.count == 0:
+            return
+        logger.info(f"[NumpyBackend] 训练 IVF 索引: {self.path.name}, {self.count} 行, nlist={self.ivf_nlist}")
+        self._ivf = IVFIndex.train(
+            self._vectors[:self.count], nlist=self.ivf_nlist, nprobe=self.ivf_nprobe
+        )
+        self._ivf_loaded = True
+        self._ivf.save(self.path / self.IVF)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        session_id: Optional[str] = None,
+    ) -> List[tuple]:
+        """
+        精确（或 IVF 粗排后精确）余弦 top-k
+
+        Returns:
+            [(row, score)]，按 score 降序
+        """
+        n = self.count
+        if n == 0 or k <= 0:
+            return []
+
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q = q / norm
+
+        mask = self._flags[:n] == 1
+        if session_id is not None:
+            code = self.session_codes.get(session_id)
+            if code is None:
+                return []
+            mask &= self._sessions[:n] == code
+
+        ivf = self._get_ivf()
+        if ivf is not None and mask.sum() >= self.ivf_min_rows:
+            mask &= ivf.probe_mask(q, n)
+
+        if mask.all():
+            # 全量扫描：连续切片，无需花式索引拷贝
+            rows = None
+            scores = np.concatenate([
+                self._vectors[i: min(i + self.BLOCK_ROWS, n)].astype(np.float32) @ q
+                for i in range(0, n, self.BLOCK_ROWS)
+            ])
+        else:
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return []
+            scores = np.concatenate([
+                self._vectors[rows[i: i + self.BLOCK_ROWS]].astype(np.float32) @ q
+                for i in range(0, rows.size, self.BLOCK_ROWS)
+            ])
+
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        if rows is None:
+            return [(int(i), float(scores[i])) for i in top]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def record(self, row: int) -> tuple:
+        """获取某一行的 (id, 文本, 元数据)"""
+        self._load_sidecar()
+        return self._ids[row], self._documents[row], self._metadatas[row]
+
+    def records(self, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """列出有效记录"""
+        if self.count == 0:
+            return []
+        mask = self._flags[:self.count] == 1
+        if session_id is not None:
+            code = self.session_codes.get(session_id)
+            if code is None:
+                return []
+            mask &= self._sessions[:self.count] == code
+
+        self._load_sidecar()
+        return [
+            {"id": self._ids[row], "text": self._documents[row], "metadata": self._metadatas[row]}
+            for row in np.flatnonzero(mask).tolist()
+        ]
+
+    def compact(self) -> int:
+        """
+        重写数据文件，去掉已删除的行
+
+        新文件先写到临时路径，再原子替换
+        """
+        if self.count == 0:
+            return 0
+        alive = np.flatnonzero(self._flags[:self.count])
+        removed = self.count - int(alive.size)
+        if removed == 0:
+            return 0
+
+        self._load_sidecar()
+        new_count = int(alive.size)
+        new_capacity = max(1024, new_count)
+
+        tmp = {name: self.path / (name + ".tmp") for name in (self.VECTORS, self.SESSIONS, self.FLAGS, self.META)}
+        vectors = np.memmap(tmp[self.VECTORS], dtype=np.float16, mode="w+", shape=(new_capacity, self.dim))
+        sessions = np.memmap(tmp[self.SESSIONS], dtype=np.int32, mode="w+", shape=(new_capacity,))
+        flags = np.memmap(tmp[self.FLAGS], dtype=np.uint8, mode="w+", shape=(new_capacity,))
+
+        for i in range(0, new_count, self.BLOCK_ROWS):
+            rows = alive[i: i + self.BLOCK_ROWS]
+            vectors[i: i + rows.size] = self._vectors[rows]
+            sessions[i: i + rows.size] = self._sessions[rows]
+        flags[:new_count] = 1
+        for arr in (vectors, sessions, flags):
+            arr.flush()
+        del vectors, sessions, flags
+
+        rows = alive.tolist()
+        ids = [self._ids[row] for row in rows]
+        documents = [self._documents[row] for row in rows]
+        metadatas = [self._metadatas[row] for row in rows]
+        with open(tmp[self.META], "w", encoding="utf-8") as f:
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                f.write(json.dumps(
+                    {"id": doc_id, "document": document, "metadata": metadata},
+                    ensure_ascii=False
+                ) + "\n")
+
+        # 释放旧映射后替换文件（同一目录只有这一个实例映射，见 NumpyBackend.shared）
+        self._close_arrays()
+        for name, tmp_path in tmp.items():
+            os.replace(tmp_path, self.path / name)
+
+        self.count = new_count
+        self.capacity = new_capacity
+        self._open_arrays()
+        self._ids, self._documents, self._metadatas = ids, documents, metadatas
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(ids)}
+
+        # 行号已变化，IVF 索引需要重新训练
+        self._ivf = None
+        self._ivf_loaded = False
+        ivf_path = self.path / self.IVF
+        if ivf_path.exists():
+            ivf_path.unlink()
+
+        self._write_header()
+        logger.info(f"[NumpyBackend] {self.path.name} 压缩完成: 回收 {removed} 行, 剩余 {new_count} 行")
+        return removed
+
+    def alive_count(self) -> int:
+        if self.count == 0:
+            return 0
+        return int(np.count_nonzero(self._flags[:self.count]))
+
+
+class NumpyBackend(VectorBackend):
+    """
+    基于 NumPy memmap 的向量后端
+
+    适用于单机、几十万条以内的对话嵌入，无需额外依赖，启动只需毫秒级
+
+    每个集合的行数和会话编码表保存在实例内存中，同一目录在进程内只能有一个实例写入：
+    通过 shared() 获取（按目录共享、引用计数），各会话的 close() 只释放自己的引用
+    """
+
+    # 进程级共享实例（按数据目录区分）
+    _shared: Dict[str, "NumpyBackend"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        storage_path: str,
+        index_type: str = "flat",
+        ivf_min_rows: int = 50000,
+        ivf_nlist: int = 256,
+        ivf_nprobe: int = 16,
+    ):
+        """
+        初始化 NumPy 后端
+
+        Args:
+            storage_path: 数据目录
+            index_type: 索引类型（flat=精确搜索, ivf=行数达到阈值后使用 IVF 粗排）
+            ivf_min_rows: 启用 IVF 的最小行数
+            ivf_nlist: IVF 簇数量
+            ivf_nprobe: 查询时扫描的簇数量
+        """
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.index_type = index_type
+        self.ivf_min_rows = ivf_min_rows
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.RLock()
+        self._shared_key: Optional[str] = None
+        self._refs = 0
+        logger.info(f"[NumpyBackend] 初始化完成: {self.storage_path} (index={index_type})")
+
+    @classmethod
+    def shared(cls, storage_path: str, **kwargs) -> "NumpyBackend":
+        """
+        获取（或创建）进程级共享后端
+
+        同一目录的所有会话共用一个实例，写入在实例锁内串行，不会互相覆盖行；
+        每次调用增加一次引用，对应一次 close()
+        """
+        key = str(Path(storage_path).resolve())
+        with cls._shared_lock:
+            backend = cls._shared.get(key)
+            if backend is None:
+                backend = cls(storage_path, **kwargs)
+                backend._shared_key = key
+                cls._shared[key] = backend
+            backend._refs += 1
+            return backend
+
+    def _get_collection(self, name: str) -> _Collection:
+        if name not in self._collections:
+            self._collections[name] = _Collection(
+                self.storage_path / name,
+                index_type=self.index_type,
+                ivf_min_rows=self.ivf_min_rows,
+                ivf_nlist=self.ivf_nlist,
+                ivf_nprobe=self.ivf_nprobe,
+            )
+        return self._collections[name]
+
+    def add(
+        self,
+        collection: str,
+        ids: List[str],
+        embeddings: Union[np.ndarray, Sequence[Sequence[float]]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        with self._lock:
+            self._get_collection(collection).add(ids, embeddings, documents, metadatas)
+
+    def query(
+        self,
+        collection: str,
+        embedding: Union[np.ndarray, Sequence[float]],
+        n_results: int = 3,
+        session_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            coll = self._get_collection(collection)
+            hits = coll.search(np.asarray(embedding), n_results, session_id=session_id)
+
+            results = []
+            for row, score in hits:
+                doc_id, document, metadata = coll.record(row)
+                results.append({
+                    "id": doc_id,
+                    "text": document,
+                    "metadata": metadata,
+                    "distance": 1.0 - score,
+                })
+            return results
+
+    def delete(self, collection: str, ids: List[str]) -> int:
+        with self._lock:
+            return self._get_collection(collection).delete_ids(ids)
+
+    def delete_session(self, collection: str, session_id: str) -> int:
+        with self._lock:
+            return self._get_collection(collection).delete_session(session_id)
+
+    def count(self, collection: str) -> int:
+        with self._lock:
+            return self._get_collection(collection).alive_count()
+
+    def records(self, collection: str, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._get_collection(collection).records(session_id)
+
+    def compact(self, collection: str) -> int:
+        with self._lock:
+            return self._get_collection(collection).compact()
+
+    def rebuild_index(self, collection: str) -> None:
+        """手动重新训练某个集合的 IVF 索引"""
+        with self._lock:
+            self._get_collection(collection).rebuild_index()
+
+    def close(self) -> None:
+        if self._shared_key is not None:
+            with self._shared_lock:
+                self._refs -= 1
+                if self._refs > 0:
+                    # 其他会话仍在使用：只落盘
+                    with self._lock:
+                        for coll in self._collections.values():
+                            coll.flush()
+                    return
+                self._shared.pop(self._shared_key, None)
+
+        with self._lock:
+            for coll in self._collections.values():
+                coll.flush()
+            self._collections.clear()
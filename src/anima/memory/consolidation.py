@@ -0,0 +1,445 @@
+"""
+记忆整理（consolidation / compaction）
+
+定期执行：
+1. 合并：把超过 min_age_days、重要性低于 importance_ceiling 的旧对话，
+   按「会话 + 周期（天/周）」合并成一条摘要，只对摘要重新生成嵌入，
+   原始对话从 SQLite 和向量存储中删除
+2. 容量限制：超过 max_age_days 的记录直接删除；
+   超过 max_long_term_rows / max_vector_rows 时按（重要性, 时间）淘汰
+3. 维护：增量 VACUUM、FTS 段合并、PRAGMA optimize、向量后端压缩
+
+所有数据库操作在线程池中用独立连接执行，并按批次提交，避免阻塞在线请求
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .long_term import LongTermMemory
+from .memory_turn import MemoryTurn
+from .vector_store import VectorStore
+
+
+# 摘要记录的 turn_id 前缀（摘要本身不会被再次合并）
+SUMMARY_PREFIX = "summary:"
+
+# 摘要生成函数：(同一周期的对话, 周期标识) -> 摘要文本
+Summarizer = Callable[[List[MemoryTurn], str], str]
+
+
+def extractive_summary(turns: List[MemoryTurn], period: str, max_chars: int = 300) -> str:
+    """
+    默认摘要：按时间顺序抽取用户话题，附带出现最多的情感
+
+    Args:
+        turns: 同一周期的对话（按时间排序）
+        period: 周期标识
+        max_chars: 摘要最大长度
+
+    Returns:
+        str: 摘要文本
+    """
+    topics = []
+    for turn in turns:
+        topic = " ".join(turn.user_input.split())
+        if len(topic) > 40:
+            topic = topic[:40] + "..."
+        if topic and topic not in topics:
+            topics.append(topic)
+
+    summary = f"{period} 共 {len(turns)} 轮对话。用户聊到：" + "；".join(topics)
+    if len(summary) > max_chars:
+        summary = summary[:max_chars - 3] + "..."
+
+    emotions = Counter(e for turn in turns for e in turn.emotions if e)
+    if emotions:
+        summary += "（情绪：" + "、".join(e for e, _ in emotions.most_common(3)) + "）"
+    return summary
+
+
+class MemoryConsolidator:
+    """
+    记忆整理任务
+
+    每个会话创建一个实例，但同一个数据库在进程内只运行一个定期整理任务：
+    第一个 start() 的实例负责运行，其余实例只登记（接收 on_change 通知）；
+    运行者 stop() 时把任务交给下一个仍在登记的实例
+    """
+
+    # db_path -> 锁 / 上次执行时间（进程级共享）
+    _locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+    _last_run: Dict[str, float] = {}
+    # db_path -> 已登记的实例 / 正在运行定期任务的实例
+    _members: Dict[str, List["MemoryConsolidator"]] = defaultdict(list)
+    _runners: Dict[str, "MemoryConsolidator"] = {}
+
+    def __init__(
+        self,
+        long_term: LongTermMemory,
+        vector_store: Optional[VectorStore],
+        config: Dict,
+        summarizer: Optional[Summarizer] = None,
+        on_change: Optional[Callable[[], None]] = None
+    ):
+        """
+        初始化整理任务
+
+        Args:
+            long_term: 长期记忆
+            vector_store: 向量存储（可选）
+            config: 整理配置
+                - interval_minutes: 执行间隔
+                - min_age_days: 超过该天数的对话才会被合并
+                - importance_ceiling: 低于该重要性的对话才会被合并
+                - period: 合并周期（day / week）
+                - min_group_size: 每组至少多少轮才合并
+                - max_turns_per_run: 每次最多处理的对话数
+                - max_age_days: 超过该天数直接删除（0 不限制）
+                - max_long_term_rows / max_vector_rows: 行数上限（0 不限制）
+                - vacuum_pages: 每次增量 VACUUM 回收的页数
+                - batch_size: 每个事务删除的行数
+            summarizer: 自定义摘要函数（默认抽取式摘要）
+            on_change: 整理删除/合并了记录后的回调（用于清空检索缓存）
+        """
+        self.long_term = long_term
+        self.vector_store = vector_store
+        self.summarizer = summarizer or extractive_summary
+        self.on_change = on_change
+
+        self.db_path = long_term.db_path
+        self.interval = config.get("interval_minutes", 60) * 60
+        self.min_age_days = config.get("min_age_days", 7)
+        self.importance_ceiling = config.get("importance_ceiling", 0.85)
+        self.period = config.get("period", "day")
+        self.min_group_size = config.get("min_group_size", 3)
+        self.max_turns_per_run = config.get("max_turns_per_run", 2000)
+        self.max_age_days = config.get("max_age_days", 0)
+        self.max_long_term_rows = config.get("max_long_term_rows", 0)
+        self.max_vector_rows = config.get("max_vector_rows", 0)
+        self.vacuum_pages = config.get("vacuum_pages", 500)
+        self.batch_size = config.get("batch_size", 200)
+
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- 调度 ----------
+
+    def start(self) -> None:
+        """登记并在当前事件循环中启动定期整理（同一数据库已有任务在运行时只登记）"""
+        members = self._members[self.db_path]
+        if self not in members:
+            members.append(self)
+
+        runner = self._runners.get(self.db_path)
+        if runner is not None and runner._task is not None and not runner._task.done():
+            return
+        self._runners[self.db_path] = self
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+        logger.info(f"[MemoryConsolidator] 定期整理已启动 (间隔 {self.interval // 60} 分钟)")
+
+    def stop(self) -> None:
+        """取消登记；若本实例负责运行定期整理，交给下一个登记的实例"""
+        members = self._members.get(self.db_path, [])
+        if self in members:
+            members.remove(self)
+
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+        if self._runners.get(self.db_path) is self:
+            del self._runners[self.db_path]
+            if members:
+                try:
+                    members[0].start()
+                except RuntimeError:
+                    # 不在事件循环中（进程退出时），无需交接
+                    pass
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[MemoryConsolidator] 整理失败: {e}")
+
+    async def run_once(self, force: bool = False) -> Dict[str, int]:
+        """
+        执行一次整理（在线程池中运行）
+
+        Args:
+            force: 忽略执行间隔，立即执行
+
+        Returns:
+            Dict[str, int]: 统计信息
+        """
+        return await asyncio.to_thread(self._run_sync, force)
+
+    def _run_sync(self, force: bool) -> Dict[str, int]:
+        lock = self._locks[self.db_path]
+        if not lock.acquire(blocking=False):
+            return {}
+
+        try:
+            last_run = self._last_run.get(self.db_path, 0.0)
+            if not force and time.time() - last_run < self.interval * 0.9:
+                return {}
+
+            start = time.perf_counter()
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                stats = self._consolidate(conn)
+                stats.update(self._enforce_caps(conn))
+                stats.update(self._maintain(conn, stats))
+            finally:
+                conn.close()
+
+            self._last_run[self.db_path] = time.time()
+            changed = any(
+                stats.get(key) for key in (
+                    "merged_turns", "expired_rows", "evicted_rows", "expired_vectors", "evicted_vectors"
+                )
+            )
+            if changed:
+                # 通知共享该数据库的所有会话（各自的检索缓存）
+                members = list(self._members.get(self.db_path, []))
+                if self not in members:
+                    members.append(self)
+                for member in members:
+                    if member.on_change:
+                        member.on_change()
+            logger.info(
+                f"[MemoryConsolidator] 整理完成 ({time.perf_counter() - start:.1f}s): {stats}"
+            )
+            return stats
+        finally:
+            lock.release()
+
+    # ---------- 合并 ----------
+
+    def _period_key(self, timestamp: datetime) -> str:
+        if self.period == "week":
+            year, week, _ = timestamp.isocalendar()
+            return f"{year}-W{week:02d}"
+        return timestamp.strftime("%Y-%m-%d")
+
+    def _collect_candidates(self, conn: sqlite3.Connection) -> Dict[str, Tuple[MemoryTurn, bool, Optional[str]]]:
+        """
+        收集待合并的对话
+
+        Returns:
+            turn_id -> (MemoryTurn, 是否在 SQLite 中, 向量文档ID)
+        """
+        cutoff = datetime.now() - timedelta(days=self.min_age_days)
+        candidates: Dict[str, Tuple[MemoryTurn, bool, Optional[str]]] = {}
+
+        rows = conn.execute(
+            """
+            SELECT turn_id, session_id, timestamp, user_input, agent_response, emotions, importance
+            FROM memories
+            WHERE timestamp < ? AND importance < ? AND turn_id NOT LIKE ?
+            ORDER BY timestamp
+            LIMIT ?
+            """,
+            (cutoff.isoformat(), self.importance_ceiling, SUMMARY_PREFIX + "%", self.max_turns_per_run)
+        ).fetchall()
+        for turn_id, session_id, timestamp, user_input, agent_response, emotions, importance in rows:
+            turn = MemoryTurn(
+                turn_id=turn_id,
+                session_id=session_id,
+                timestamp=datetime.fromisoformat(timestamp),
+                user_input=user_input,
+                agent_response=agent_response,
+                emotions=json.loads(emotions) if emotions else [],
+                metadata={},
+                importance=importance
+            )
+            candidates[turn_id] = (turn, True, None)
+
+        if self.vector_store:
+            for record in self.vector_store.list_conversations():
+                turn = VectorStore.hit_to_turn(record, "")
+                if turn is not None and turn.turn_id in candidates:
+                    # SQLite 中已有的对话：记录向量文档ID，一起删除
+                    candidates[turn.turn_id] = (candidates[turn.turn_id][0], True, record["id"])
+                    continue
+                if len(candidates) >= self.max_turns_per_run:
+                    continue
+                if (
+                    turn is None
+                    or turn.turn_id.startswith(SUMMARY_PREFIX)
+                    or turn.timestamp >= cutoff
+                    or turn.importance >= self.importance_ceiling
+                ):
+                    continue
+                candidates[turn.turn_id] = (turn, False, record["id"])
+
+        return candidates
+
+    def _consolidate(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        candidates = self._collect_candidates(conn)
+
+        groups: Dict[Tuple[str, str], list] = defaultdict(list)
+        for entry in candidates.values():
+            turn = entry[0]
+            groups[(turn.session_id, self._period_key(turn.timestamp))].append(entry)
+
+        stats = {"summaries": 0, "merged_turns": 0}
+        for (session_id, period), entries in groups.items():
+            if len(entries) < self.min_group_size:
+                continue
+
+            entries.sort(key=lambda entry: entry[0].timestamp)
+            turns = [entry[0] for entry in entries]
+            summary = MemoryTurn(
+                turn_id=f"{SUMMARY_PREFIX}{session_id}:{period}:{uuid.uuid4().hex[:8]}",
+                session_id=session_id,
+                timestamp=turns[-1].timestamp,
+                user_input=f"[{period} 对话摘要]",
+                agent_response=self.summarizer(turns, period),
+                emotions=[],
+                metadata={"type": "summary", "period": period, "source_turns": len(turns)},
+                importance=max(turn.importance for turn in turns)
+            )
+
+            # SQLite：写入摘要并删除原始对话（同一事务）
+            sqlite_ids = [turn.turn_id for turn, in_sqlite, _ in entries if in_sqlite]
+            with conn:
+                self._insert_turn(conn, summary)
+                for i in range(0, len(sqlite_ids), self.batch_size):
+                    chunk = sqlite_ids[i: i + self.batch_size]
+                    conn.execute(
+                        f"DELETE FROM memories WHERE turn_id IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    )
+
+            # 向量存储：只对摘要生成嵌入
+            if self.vector_store:
+                self.vector_store.add_conversation(
+                    session_id=session_id,
+                    user_input=summary.user_input,
+                    ai_response=summary.agent_response,
+                    metadata={
+                        "importance": summary.importance,
+                        "timestamp": summary.timestamp.isoformat(),
+                        "type": "summary"
+                    },
+                    turn_id=summary.turn_id
+                )
+                self.vector_store.delete_conversations(
+                    [doc_id for _, _, doc_id in entries if doc_id]
+                )
+
+            stats["summaries"] += 1
+            stats["merged_turns"] += len(turns)
+
+        return stats
+
+    @staticmethod
+    def _insert_turn(conn: sqlite3.Connection, turn: MemoryTurn) -> None:
+        conn.execute(
+            """
+            INSERT INTO memories
+            (turn_id, session_id, timestamp, user_input, agent_response,
+             emotions, metadata, importance)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                turn.turn_id,
+                turn.session_id,
+                turn.timestamp.isoformat(),
+                turn.user_input,
+                turn.agent_response,
+                json.dumps(turn.emotions),
+                json.dumps(turn.metadata),
+                turn.importance
+            )
+        )
+
+    # ---------- 容量限制 ----------
+
+    def _delete_where(self, conn: sqlite3.Connection, where: str, params: tuple, limit: Optional[int] = None) -> int:
+        """分批删除，每批一个事务"""
+        deleted = 0
+        while limit is None or deleted < limit:
+            batch = self.batch_size if limit is None else min(self.batch_size, limit - deleted)
+            with conn:
+                cursor = conn.execute(
+                    f"DELETE FROM memories WHERE id IN (SELECT id FROM memories WHERE {where} LIMIT ?)",
+                    params + (batch,)
+                )
+            deleted += cursor.rowcount
+            if cursor.rowcount < batch:
+                break
+        return deleted
+
+    def _enforce_caps(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        stats = {"expired_rows": 0, "evicted_rows": 0, "expired_vectors": 0, "evicted_vectors": 0}
+
+        # 1. 按年龄删除
+        if self.max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            stats["expired_rows"] = self._delete_where(conn, "timestamp < ?", (cutoff,))
+
+        # 2. SQLite 行数上限
+        if self.max_long_term_rows > 0:
+            total = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+            excess = total - self.max_long_term_rows
+            if excess > 0:
+                stats["evicted_rows"] = self._delete_where(
+                    conn, "1 ORDER BY importance ASC, timestamp ASC", (), limit=excess
+                )
+
+        # 3. 向量存储
+        if self.vector_store and (self.max_age_days > 0 or self.max_vector_rows > 0):
+            records = [
+                (turn.timestamp, turn.importance, record["id"])
+                for record in self.vector_store.list_conversations()
+                for turn in [VectorStore.hit_to_turn(record, "")]
+                if turn is not None
+            ]
+
+            if self.max_age_days > 0:
+                cutoff = datetime.now() - timedelta(days=self.max_age_days)
+                expired = [doc_id for ts, _, doc_id in records if ts < cutoff]
+                stats["expired_vectors"] = self.vector_store.delete_conversations(expired)
+                records = [r for r in records if r[0] >= cutoff]
+
+            if self.max_vector_rows > 0 and len(records) > self.max_vector_rows:
+                records.sort(key=lambda r: (r[1], r[0]))
+                evicted = [doc_id for _, _, doc_id in records[:len(records) - self.max_vector_rows]]
+                stats["evicted_vectors"] = self.vector_store.delete_conversations(evicted)
+
+        return stats
+
+    # ---------- 维护 ----------
+
+    def _maintain(self, conn: sqlite3.Connection, stats: Dict[str, int]) -> Dict[str, int]:
+        # 不在这里做完整 VACUUM（会话正在写入）；旧库在服务启动时迁移，未迁移时 incremental_vacuum 无效果
+        freelist_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})")
+        freelist_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        # FTS 增量段合并（比 'optimize' 轻量）
+        with conn:
+            conn.execute("INSERT INTO memories_fts(memories_fts, rank) VALUES ('merge', 200)")
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+        compacted = 0
+        deleted_vectors = stats.get("merged_turns", 0) + stats.get("expired_vectors", 0) + stats.get("evicted_vectors", 0)
+        if self.vector_store and deleted_vectors > 0:
+            compacted = self.vector_store.compact()
+
+        return {"vacuumed_pages": freelist_before - freelist_after, "compacted_vectors": compacted}
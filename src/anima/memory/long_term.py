@@ -6,8 +6,8 @@
 
 import sqlite3
 import json
+from pathlib import Path
 from typing import List, Optional
-from datetime import datetime
 from .memory_turn import MemoryTurn
 
 
@@ -27,6 +27,13 @@ class LongTermMemory:
         >>> results = await memory.search("你好", top_k=3)
     """
 
+    # _row_to_turn 依赖的列顺序（避免 SELECT *）
+    _TURN_COLUMNS = (
+        "turn_id, session_id, timestamp, user_input, agent_response, "
+        "emotions, metadata, importance"
+    )
+    _TURN_COLUMNS_M = ", ".join(f"m.{col.strip()}" for col in _TURN_COLUMNS.split(","))
+
     def __init__(self, db_path: str = "memory_db/memories.db"):
         """
         初始化长期记忆
@@ -35,11 +42,16 @@ class LongTermMemory:
             db_path: 数据库文件路径
         """
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
         self._init_database()
 
     def _init_database(self) -> None:
         """初始化数据库表"""
+        # WAL：后台整理任务写入时不阻塞在线读取
+        # 增量 VACUUM：只对新建的数据库生效，旧库在服务启动时迁移（migrate_auto_vacuum）
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+
         # 创建主表
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS memories (
@@ -67,6 +79,30 @@ class LongTermMemory:
             USING fts5(user_input, agent_response, content=memories, content_rowid=id)
         """)
 
+        # 外部内容 FTS 表需要触发器同步（删除/整理时保持索引一致）
+        has_triggers = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'memories_ai'"
+        ).fetchone()
+        if not has_triggers:
+            self.conn.executescript("""
+                CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts(rowid, user_input, agent_response)
+                    VALUES (new.id, new.user_input, new.agent_response);
+                END;
+                CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, user_input, agent_response)
+                    VALUES ('delete', old.id, old.user_input, old.agent_response);
+                END;
+                CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, user_input, agent_response)
+                    VALUES ('delete', old.id, old.user_input, old.agent_response);
+                    INSERT INTO memories_fts(rowid, user_input, agent_response)
+                    VALUES (new.id, new.user_input, new.agent_response);
+                END;
+            """)
+            # 补建已有数据的索引
+            self.conn.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+
         self.conn.commit()
 
     async def store(self, turn: MemoryTurn) -> None:
@@ -116,28 +152,34 @@ class LongTermMemory:
         Returns:
             相关记忆列表
         """
+        fts_query = self._build_fts_query(query)
+        if not fts_query:
+            return []
+
         if session_id:
             # 在特定会话中搜索
             results = self.conn.execute(
-                """
-                SELECT * FROM memories
-                WHERE session_id = ?
-                  AND memories_fts MATCH ?
-                ORDER BY importance DESC, timestamp DESC
+                f"""
+                SELECT {self._TURN_COLUMNS_M} FROM memories_fts
+                JOIN memories AS m ON m.id = memories_fts.rowid
+                WHERE memories_fts MATCH ?
+                  AND m.session_id = ?
+                ORDER BY m.importance DESC, m.timestamp DESC
                 LIMIT ?
                 """,
-                (session_id, query, top_k)
+                (fts_query, session_id, top_k)
             ).fetchall()
         else:
             # 全局搜索
             results = self.conn.execute(
-                """
-                SELECT * FROM memories
+                f"""
+                SELECT {self._TURN_COLUMNS_M} FROM memories_fts
+                JOIN memories AS m ON m.id = memories_fts.rowid
                 WHERE memories_fts MATCH ?
-                ORDER BY importance DESC, timestamp DESC
+                ORDER BY m.importance DESC, m.timestamp DESC
                 LIMIT ?
                 """,
-                (query, top_k)
+                (fts_query, top_k)
             ).fetchall()
 
         return [self._row_to_turn(row) for row in results]
@@ -158,8 +200,8 @@ class LongTermMemory:
             历史对话列表（按时间倒序）
         """
         results = self.conn.execute(
-            """
-            SELECT * FROM memories
+            f"""
+            SELECT {self._TURN_COLUMNS} FROM memories
             WHERE session_id = ?
             ORDER BY timestamp DESC
             LIMIT ?
@@ -169,20 +211,60 @@ class LongTermMemory:
 
         return [self._row_to_turn(row) for row in results]
 
+    @staticmethod
+    def _build_fts_query(query: str) -> str:
+        """
+        把用户输入转换为 FTS5 查询
+
+        每个词加引号（避免标点被当成 FTS 语法），词之间用 OR 连接
+        """
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " OR ".join(f'"{term}"' for term in terms if term)
+
     def _row_to_turn(self, row) -> MemoryTurn:
-        """数据库行 → MemoryTurn"""
+        """
+        数据库行 → MemoryTurn
+
+        emotions / metadata / timestamp 保留原始值，首次访问时才解码
+        """
         return MemoryTurn(
-            turn_id=str(row[1]),
-            session_id=row[2],
-            timestamp=datetime.fromisoformat(row[3]),
-            user_input=row[4],
-            agent_response=row[5],
-            emotions=json.loads(row[6]),
-            metadata=json.loads(row[7]),
-            importance=row[8],
+            turn_id=row[0],
+            session_id=row[1],
+            timestamp=row[2],
+            user_input=row[3],
+            agent_response=row[4],
+            emotions=row[5],
+            metadata=row[6],
+            importance=row[7],
             embedding=None  # 暂不使用向量嵌入
         )
 
+    @staticmethod
+    def migrate_auto_vacuum(db_path: str) -> bool:
+        """
+        把旧数据库迁移到增量 VACUUM 模式
+
+        需要一次完整 VACUUM（重写整个文件并独占数据库），
+        只能在没有其他连接时执行（服务启动、会话创建之前）
+
+        Args:
+            db_path: 数据库文件路径
+
+        Returns:
+            bool: 是否执行了迁移（新库或已迁移的库返回 False）
+        """
+        if not Path(db_path).exists():
+            return False
+        conn = sqlite3.connect(db_path, timeout=30)
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return True
+        finally:
+            conn.close()
+
     def close(self) -> None:
         """关闭数据库连接"""
         self.conn.close()
@@ -4,13 +4,17 @@
 统一管理四层存储：短期、长期、向量搜索、知识图谱
 """
 
-from typing import List, Optional, Dict
+import time
+from typing import Any, List, Optional, Dict
 from loguru import logger
 from .memory_turn import MemoryTurn
+from .recall import DEFAULT_RRF_K, fuse_results, trim_to_budget
 from .short_term import ShortTermMemory
 from .long_term import LongTermMemory
 from .importance_scorer import ImportanceScorer
 from .vector_store import VectorStore
+from .consolidation import MemoryConsolidator
+from .retrieval_cache import RetrievalCache, normalize_query
 
 
 class MemorySystem:
@@ -47,6 +51,16 @@ class MemorySystem:
                 - long_term_db_path: 长期记忆数据库路径
                 - importance_threshold: 长期存储阈值
                 - enable_vector_search: 是否启用向量搜索
+                - vector_backend: 向量后端（numpy / chroma）
+                - vector_backend_options: 向量后端参数
+                - embedding_cache_dir: 嵌入模型缓存目录
+                - recall_rrf_k: RRF 平滑常数
+                - recall_weights: 各召回来源的 RRF 权重（short_term / vector / long_term）
+                - recall_token_budget: 召回结果的 token 预算（<= 0 不限制）
+                - recall_max_results: 召回结果数量上限
+                - recall_vector_top_k / recall_fts_top_k: 向量 / 全文搜索召回数量
+                - consolidation: 记忆整理配置（见 MemoryConsolidator）
+                - cache: 检索缓存配置（enabled / ttl_seconds / max_entries）
         """
         max_turns = config.get("short_term_max_turns", 20)
 
@@ -61,6 +75,24 @@ class MemorySystem:
         self.importance_threshold = config.get("importance_threshold", 0.7)
         self.importance_scorer = ImportanceScorer()
 
+        # 召回融合参数
+        self.recall_rrf_k = config.get("recall_rrf_k", DEFAULT_RRF_K)
+        self.recall_weights = config.get("recall_weights", {})
+        self.recall_token_budget = config.get("recall_token_budget", 600)
+        self.recall_max_results = config.get("recall_max_results", 6)
+        self.recall_vector_top_k = config.get("recall_vector_top_k", 3)
+        self.recall_fts_top_k = config.get("recall_fts_top_k", 3)
+
+        # 检索缓存：会话结果（本实例）+ 全文搜索结果（同一数据库的所有会话共享）
+        cache_config = config.get("cache") or {}
+        self.retrieval_cache: Optional[RetrievalCache] = None
+        self.shared_cache: Optional[RetrievalCache] = None
+        if cache_config.get("enabled", False):
+            ttl = cache_config.get("ttl_seconds", 300)
+            max_entries = cache_config.get("max_entries", 256)
+            self.retrieval_cache = RetrievalCache(ttl_seconds=ttl, max_entries=max_entries)
+            self.shared_cache = RetrievalCache.shared(db_path, ttl_seconds=ttl, max_entries=max_entries * 4)
+
         # 4. 向量存储（可选）
         self.vector_store = None
         if config.get("enable_vector_search", False):
@@ -70,7 +102,10 @@ class MemorySystem:
 
                 self.vector_store = VectorStore(
                     storage_path=vector_path,
-                    embedding_model=embedding_model
+                    embedding_model=embedding_model,
+                    backend=config.get("vector_backend", "numpy"),
+                    model_cache_dir=config.get("embedding_cache_dir", "E:/AnimaData/models/huggingface"),
+                    backend_options=config.get("vector_backend_options")
                 )
                 logger.info("[MemorySystem] 向量搜索已启用")
             except Exception as e:
@@ -79,6 +114,17 @@ class MemorySystem:
         else:
             logger.info("[MemorySystem] 向量搜索未启用")
 
+        # 5. 记忆整理（可选）
+        self.consolidator = None
+        consolidation_config = config.get("consolidation") or {}
+        if consolidation_config.get("enabled", False):
+            self.consolidator = MemoryConsolidator(
+                long_term=self.long_term,
+                vector_store=self.vector_store,
+                config=consolidation_config,
+                on_change=self._invalidate_all_caches
+            )
+
     async def store_turn(self, turn: MemoryTurn) -> None:
         """
         存储对话轮次
@@ -101,6 +147,12 @@ class MemorySystem:
         # 3. 高重要性 → 长期记忆
         if turn.importance >= self.importance_threshold:
             await self.long_term.store(turn)
+            if self.shared_cache:
+                self.shared_cache.invalidate("fts")
+
+        # 该会话的检索结果已过期
+        if self.retrieval_cache:
+            self.retrieval_cache.invalidate(turn.session_id)
 
         # 4. 存储到向量搜索（第二层个性化）
         if self.vector_store:
@@ -113,7 +165,8 @@ class MemorySystem:
                     metadata={
                         "importance": turn.importance,
                         "timestamp": turn.timestamp.isoformat()
-                    }
+                    },
+                    turn_id=turn.turn_id
                 )
             except Exception as e:
                 logger.warning(f"[MemorySystem] 向量存储失败: {e}")
@@ -127,10 +180,12 @@ class MemorySystem:
         """
         检索相关记忆（增强版：向量搜索 + 关键词搜索）
 
-        策略：多路召回
-        1. 短期记忆：最近 N 轮
+        策略：多路召回 + RRF 融合
+        1. 短期记忆：最近 N 轮（越新排名越高）
         2. 向量搜索：语义相关对话（如果启用）
         3. 长期记忆：全文搜索（FTS）
+        4. RRF 融合打分，按 turn_id + 内容哈希去重
+        5. 按 token 预算截断
 
         Args:
             query: 查询文本
@@ -138,16 +193,27 @@ class MemorySystem:
             max_turns: 短期记忆返回数量
 
         Returns:
-            相关记忆列表
+            相关记忆列表（按融合得分降序）
         """
-        results = []
+        # 0. 检索缓存（键包含全文搜索缓存的版本号，其他会话写入长期记忆后自动失效）
+        normalized = normalize_query(query)
+        cache_key = None
+        if self.retrieval_cache:
+            cache_key = (normalized, max_turns, self.shared_cache.generation("fts"))
+            hit, cached = self.retrieval_cache.get(session_id, cache_key)
+            if hit:
+                logger.debug(f"[MemorySystem] 检索缓存命中: {normalized[:30]}")
+                return list(cached)
+        start = time.perf_counter()
+
+        ranked_lists: Dict[str, List[MemoryTurn]] = {}
 
         # 1. 短期记忆：最近 N 轮
         recent = await self.short_term.get_recent(
             session_id=session_id,
             n=max_turns
         )
-        results.extend(recent)
+        ranked_lists["short_term"] = list(reversed(recent))
 
         # 2. 向量搜索：语义相关（第二层个性化）
         if self.vector_store:
@@ -155,63 +221,80 @@ class MemorySystem:
                 vector_results = self.vector_store.search_relevant_context(
                     query=query,
                     session_id=session_id,
-                    n_results=3
+                    n_results=self.recall_vector_top_k
                 )
-
-                # 将向量搜索结果转换为MemoryTurn
-                for vr in vector_results:
-                    # 从文本中解析用户输入和AI回复
-                    text = vr["text"]
-                    lines = text.split("\n")
-                    user_input = ""
-                    agent_response = ""
-
-                    for i, line in enumerate(lines):
-                        if line.startswith("User: "):
-                            user_input = line[6:]
-                        elif line.startswith("AI: "):
-                            agent_response = line[4:]
-
-                    if user_input and agent_response:
-                        from datetime import datetime
-                        import uuid
-
-                        memory_turn = MemoryTurn(
-                            turn_id=str(uuid.uuid4()),
-                            session_id=session_id,
-                            timestamp=datetime.fromisoformat(vr["metadata"].get("timestamp", datetime.now().isoformat())),
-                            user_input=user_input,
-                            agent_response=agent_response,
-                            emotions=vr["metadata"].get("emotions", "").split(",") if vr["metadata"].get("emotions") else [],
-                            metadata=vr["metadata"],
-                            importance=vr["metadata"].get("importance", 0.5)
-                        )
-                        results.append(memory_turn)
-
+                ranked_lists["vector"] = [
+                    turn for turn in (
+                        VectorStore.hit_to_turn(vr, session_id) for vr in vector_results
+                    ) if turn is not None
+                ]
                 logger.debug(f"[MemorySystem] 向量搜索返回 {len(vector_results)} 条结果")
             except Exception as e:
                 logger.warning(f"[MemorySystem] 向量搜索失败: {e}")
 
         # 3. 长期记忆：全文搜索（FTS）
         try:
-            relevant = await self.long_term.search(
-                query=query,
-                top_k=3,
-                session_id=None  # 全局搜索
-            )
-            results.extend(relevant)
+            ranked_lists["long_term"] = await self._search_long_term(query, normalized)
         except Exception as e:
             logger.warning(f"[MemorySystem] 长期记忆搜索失败: {e}")
 
-        # 4. 去重（按 turn_id）
-        seen = set()
-        unique_results = []
-        for turn in results:
-            if turn.turn_id not in seen:
-                seen.add(turn.turn_id)
-                unique_results.append(turn)
+        # 4. RRF 融合 + 去重（turn_id / 内容哈希）
+        fused = fuse_results(ranked_lists, k=self.recall_rrf_k, weights=self.recall_weights)
 
-        return unique_results
+        # 5. 按 token 预算截断
+        selected = trim_to_budget(
+            [turn for turn, _ in fused],
+            token_budget=self.recall_token_budget,
+            max_results=self.recall_max_results
+        )
+
+        total = sum(len(turns) for turns in ranked_lists.values())
+        logger.debug(
+            f"[MemorySystem] 召回 {total} 条 → 去重 {len(fused)} 条 → 预算内 {len(selected)} 条"
+        )
+
+        if cache_key is not None:
+            self.retrieval_cache.put(session_id, cache_key, list(selected), time.perf_counter() - start)
+        return selected
+
+    async def _search_long_term(self, query: str, normalized: str) -> List[MemoryTurn]:
+        """长期记忆全文搜索（全局，结果在会话间共享缓存）"""
+        key = (normalized, self.recall_fts_top_k)
+        if self.shared_cache:
+            hit, cached = self.shared_cache.get("fts", key)
+            if hit:
+                return list(cached)
+
+        start = time.perf_counter()
+        results = await self.long_term.search(
+            query=query,
+            top_k=self.recall_fts_top_k,
+            session_id=None  # 全局搜索
+        )
+        if self.shared_cache:
+            self.shared_cache.put("fts", key, list(results), time.perf_counter() - start)
+        return results
+
+    def _invalidate_all_caches(self) -> None:
+        """记忆整理修改了存储后，清空检索缓存"""
+        if self.shared_cache:
+            self.shared_cache.invalidate("fts")
+        if self.retrieval_cache:
+            self.retrieval_cache.invalidate()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        检索缓存统计
+
+        Returns:
+            Dict: {"session": {...}, "global": {...}}，包含命中率和节省的检索时间
+        """
+        if not self.retrieval_cache:
+            return {}
+        return {
+            "session": self.retrieval_cache.stats(),
+            "global": self.shared_cache.stats(),
+        }
 
     async def get_user_history(
         self,
@@ -241,7 +324,32 @@ class MemorySystem:
             session_id: 会话 ID
         """
         await self.short_term.clear(session_id)
+        if self.retrieval_cache:
+            self.retrieval_cache.invalidate(session_id)
+
+    def start_consolidation(self) -> None:
+        """启动定期记忆整理（需要在事件循环中调用）"""
+        if self.consolidator:
+            self.consolidator.start()
+
+    async def consolidate(self, force: bool = True) -> Dict[str, int]:
+        """
+        立即执行一次记忆整理
+
+        Args:
+            force: 忽略执行间隔
+
+        Returns:
+            Dict[str, int]: 统计信息
+        """
+        if not self.consolidator:
+            return {}
+        return await self.consolidator.run_once(force=force)
 
     def close(self) -> None:
         """关闭记忆系统"""
+        if self.consolidator:
+            self.consolidator.stop()
         self.long_term.close()
+        if self.vector_store:
+            self.vector_store.close()
@@ -2,16 +2,21 @@
 记忆数据模型
 """
 
-from dataclasses import dataclass, field
+import json
+import sys
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import numpy as np
 
-@dataclass
 class MemoryTurn:
     """
     单次对话数据
 
+    使用 __slots__ 存储（没有每实例的 __dict__），会话 ID 会被驻留（intern）。
+    emotions / metadata / timestamp 可以直接传入数据库中的原始值
+    （JSON 字符串 / ISO 时间字符串），首次访问时才解码。
+
     Attributes:
         turn_id: 唯一标识符
         session_id: 会话 ID
@@ -23,15 +28,91 @@ class MemoryTurn:
         importance: 重要性评分 (0-1)
         embedding: 向量嵌入（可选）
     """
-    turn_id: str
-    session_id: str
-    timestamp: datetime
-    user_input: str
-    agent_response: str
-    emotions: List[str]
-    metadata: Dict[str, Any]
-    importance: float = 0.5
-    embedding: Optional[np.ndarray] = None
+
+    __slots__ = (
+        "turn_id",
+        "session_id",
+        "_timestamp",
+        "user_input",
+        "agent_response",
+        "_emotions",
+        "_metadata",
+        "importance",
+        "embedding",
+    )
+
+    def __init__(
+        self,
+        turn_id: str,
+        session_id: str,
+        timestamp: Union[datetime, str],
+        user_input: str,
+        agent_response: str,
+        emotions: Union[List[str], str, None],
+        metadata: Union[Dict[str, Any], str, None],
+        importance: float = 0.5,
+        embedding: Optional[np.ndarray] = None,
+    ):
+        self.turn_id = turn_id
+        self.session_id = sys.intern(session_id) if isinstance(session_id, str) else session_id
+        self._timestamp = timestamp
+        self.user_input = user_input
+        self.agent_response = agent_response
+        self._emotions = emotions
+        self._metadata = metadata
+        self.importance = importance
+        self.embedding = embedding
+
+    @property
+    def timestamp(self) -> datetime:
+        if isinstance(self._timestamp, str):
+            self._timestamp = datetime.fromisoformat(self._timestamp)
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: Union[datetime, str]) -> None:
+        self._timestamp = value
+
+    @property
+    def emotions(self) -> List[str]:
+        if not isinstance(self._emotions, list):
+            self._emotions = json.loads(self._emotions) if self._emotions else []
+        return self._emotions
+
+    @emotions.setter
+    def emotions(self, value: Union[List[str], str, None]) -> None:
+        self._emotions = value
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if not isinstance(self._metadata, dict):
+            self._metadata = json.loads(self._metadata) if self._metadata else {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Union[Dict[str, Any], str, None]) -> None:
+        self._metadata = value
+
+    def _astuple(self) -> tuple:
+        return (
+            self.turn_id, self.session_id, self.timestamp, self.user_input,
+            self.agent_response, self.emotions, self.metadata, self.importance,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MemoryTurn):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    __hash__ = None  # 与 dataclass 一致：可变对象不可哈希
+
+    def __repr__(self) -> str:
+        return (
+            f"MemoryTurn(turn_id={self.turn_id!r}, session_id={self.session_id!r}, "
+            f"timestamp={self.timestamp!r}, user_input={self.user_input!r}, "
+            f"agent_response={self.agent_response!r}, emotions={self.emotions!r}, "
+            f"metadata={self.metadata!r}, importance={self.importance!r})"
+        )
 
 
 @dataclass
@@ -0,0 +1,137 @@
+"""
+多路召回结果融合
+
+- 倒数排名融合（Reciprocal Rank Fusion, RRF）：score = Σ weight / (k + rank)
+- 去重：同一 turn_id 或相同内容（归一化后哈希）只保留一条
+- 按 token 预算截断最终结果
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .memory_turn import MemoryTurn
+
+
+# RRF 平滑常数（原论文推荐值）
+DEFAULT_RRF_K = 60
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_CJK_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+def content_hash(turn: MemoryTurn) -> str:
+    """
+    计算对话内容哈希（忽略大小写和空白差异）
+
+    Args:
+        turn: 对话轮次
+
+    Returns:
+        str: 十六进制哈希
+    """
+    text = f"{turn.user_input}\x1f{turn.agent_response}"
+    normalized = _WHITESPACE_RE.sub(" ", text).strip().lower()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数
+
+    中日韩字符按 1 字 1 token 计算，其余字符按 4 字符 1 token 计算
+
+    Args:
+        text: 文本
+
+    Returns:
+        int: 估算的 token 数
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def turn_tokens(turn: MemoryTurn) -> int:
+    """估算一轮对话注入提示词后的 token 数"""
+    return estimate_tokens(turn.user_input) + estimate_tokens(turn.agent_response) + 8
+
+
+def fuse_results(
+    ranked_lists: Dict[str, List[MemoryTurn]],
+    k: int = DEFAULT_RRF_K,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Tuple[MemoryTurn, float]]:
+    """
+    RRF 融合多路召回结果，并按 turn_id / 内容哈希去重
+
+    同一条对话在多路中出现时得分累加，保留第一次出现的对象
+
+    Args:
+        ranked_lists: 来源名称 -> 按相关性降序排列的结果
+        k: RRF 平滑常数
+        weights: 来源权重（默认 1.0）
+
+    Returns:
+        List[Tuple[MemoryTurn, float]]: 按融合得分降序排列
+    """
+    weights = weights or {}
+    scores: Dict[str, float] = {}
+    turns: Dict[str, MemoryTurn] = {}
+    alias: Dict[str, str] = {}  # turn_id / 内容哈希 -> 规范键
+
+    for source, turns_in_source in ranked_lists.items():
+        weight = weights.get(source, 1.0)
+        seen_in_source = set()
+
+        for rank, turn in enumerate(turns_in_source, 1):
+            id_key = f"id:{turn.turn_id}"
+            hash_key = f"hash:{content_hash(turn)}"
+            key = alias.get(id_key) or alias.get(hash_key) or id_key
+            alias[id_key] = key
+            alias[hash_key] = key
+
+            # 同一来源内的重复只计一次
+            if key in seen_in_source:
+                continue
+            seen_in_source.add(key)
+
+            if key not in turns:
+                turns[key] = turn
+                scores[key] = 0.0
+            scores[key] += weight / (k + rank)
+
+    ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(turns[key], score) for key, score in ordered]
+
+
+def trim_to_budget(
+    turns: List[MemoryTurn],
+    token_budget: int,
+    max_results: Optional[int] = None,
+) -> List[MemoryTurn]:
+    """
+    按顺序选取对话，直到达到 token 预算或数量上限
+
+    放不下的对话会被跳过，后面更短的对话仍可能被选中
+
+    Args:
+        turns: 按优先级排序的对话
+        token_budget: token 预算（<= 0 表示不限制）
+        max_results: 最多返回数量
+
+    Returns:
+        List[MemoryTurn]: 选中的对话
+    """
+    selected = []
+    used = 0
+    for turn in turns:
+        if max_results is not None and len(selected) >= max_results:
+            break
+        cost = turn_tokens(turn)
+        if token_budget > 0 and used + cost > token_budget:
+            continue
+        selected.append(turn)
+        used += cost
+    return selected
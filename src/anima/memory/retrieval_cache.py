@@ -0,0 +1,173 @@
+"""
+记忆检索缓存
+
+直播场景里同一个话题会被反复询问，而两次询问之间往往没有写入新记忆。
+缓存按「命名空间 + 归一化查询」存放检索结果：
+- 会话命名空间（session_id）：retrieve_context 的最终结果，该会话 store_turn 时失效
+- 全局命名空间（fts）：长期记忆全文搜索结果，多个会话共享，任意长期写入时失效
+
+每个条目有 TTL，超出容量时按 LRU 淘汰；命中时累计节省的检索耗时
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from loguru import logger
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCT_RE = re.compile(r"^[\W_]+|[\W_]+$")
+
+
+def normalize_query(query: str) -> str:
+    """
+    归一化查询文本：NFKC、小写、合并空白、去掉首尾标点
+
+    "你好！ " 和 "你好" 会得到相同的键
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return _EDGE_PUNCT_RE.sub("", text)
+
+
+class RetrievalCache:
+    """
+    带 TTL 和命名空间失效的 LRU 缓存
+
+    线程安全（记忆整理任务在线程池中执行失效）
+    """
+
+    # 进程级共享实例（按数据库路径区分）
+    _shared: Dict[str, "RetrievalCache"] = {}
+    _shared_lock = threading.Lock()
+
+    # 进程级累计命中 / 未命中（所有实例，供 /metrics 使用；查询只发生在事件循环线程）
+    total_hits = 0
+    total_misses = 0
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 1024):
+        """
+        初始化缓存
+
+        Args:
+            ttl_seconds: 条目有效期（秒，<= 0 表示不过期）
+            max_entries: 最大条目数
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # (namespace, key) -> (value, expires_at, cost_seconds)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, float, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+
+    @classmethod
+    def shared(cls, name: str, ttl_seconds: float = 300.0, max_entries: int = 1024) -> "RetrievalCache":
+        """获取（或创建）进程级共享缓存"""
+        with cls._shared_lock:
+            if name not in cls._shared:
+                cls._shared[name] = cls(ttl_seconds=ttl_seconds, max_entries=max_entries)
+            return cls._shared[name]
+
+    def get(self, namespace: str, key: Hashable) -> Tuple[bool, Any]:
+        """
+        查找缓存
+
+        Returns:
+            (是否命中, 值)
+        """
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self.misses += 1
+                RetrievalCache.total_misses += 1
+                return False, None
+
+            value, expires_at, cost = entry
+            if expires_at and time.monotonic() > expires_at:
+                del self._entries[(namespace, key)]
+                self.expirations += 1
+                self.misses += 1
+                RetrievalCache.total_misses += 1
+                return False, None
+
+            self._entries.move_to_end((namespace, key))
+            self.hits += 1
+            RetrievalCache.total_hits += 1
+            self.saved_seconds += cost
+            return True, value
+
+    def put(self, namespace: str, key: Hashable, value: Any, cost_seconds: float = 0.0) -> None:
+        """
+        写入缓存
+
+        Args:
+            namespace: 命名空间
+            key: 键
+            value: 值
+            cost_seconds: 计算该值的耗时（命中时计入节省时间）
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+        with self._lock:
+            self._entries[(namespace, key)] = (value, expires_at, cost_seconds)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """
+        使某个命名空间（或全部）的缓存失效
+
+        Returns:
+            int: 删除的条目数
+        """
+        with self._lock:
+            if namespace is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                for ns in self._generations:
+                    self._generations[ns] += 1
+            else:
+                keys = [k for k in self._entries if k[0] == namespace]
+                for k in keys:
+                    del self._entries[k]
+                removed = len(keys)
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self.invalidations += 1
+
+        if removed:
+            logger.debug(f"[RetrievalCache] 失效 {namespace or '全部'}: {removed} 条")
+        return removed
+
+    def generation(self, namespace: str) -> int:
+        """
+        命名空间的版本号（每次失效 +1）
+
+        其他缓存条目可以把它作为键的一部分，依赖的数据失效时自然不再命中
+        """
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计：命中率、节省的检索时间等"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "saved_seconds": round(self.saved_seconds, 4),
+            }
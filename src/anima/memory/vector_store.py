@@ -1,81 +1,71 @@
 """
 向量存储服务 - 第二层个性化
-使用ChromaDB和sentence-transformers实现语义搜索
-数据存储在E盘
+使用可插拔的向量后端（默认 NumPy memmap，可选 ChromaDB）和 sentence-transformers 实现语义搜索
 """
 
+import uuid
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-import chromadb
-from chromadb.config import Settings
 from loguru import logger
 
+from .memory_turn import MemoryTurn
+
+from .backends import VectorBackend, VectorBackendFactory
+
 
 class VectorStore:
     """
     向量存储服务
 
-    使用ChromaDB持久化向量数据到E盘
+    使用 VectorBackend 持久化向量数据（numpy / chroma）
     使用sentence-transformers生成文本嵌入
     """
 
+    # 集合（collections）
+    COLLECTIONS = [
+        "conversations",  # 对话历史
+        "user_profiles",   # 用户画像
+        "knowledge_base"   # 知识库（可选）
+    ]
+
     def __init__(
         self,
         storage_path: str = "E:/AnimaData/vector_db",
-        embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2"
+        embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2",
+        backend: str = "numpy",
+        model_cache_dir: Optional[str] = "E:/AnimaData/models/huggingface",
+        backend_options: Optional[Dict[str, Any]] = None
     ):
         """
         初始化向量存储
 
         Args:
-            storage_path: E盘存储路径（ChromaDB数据）
+            storage_path: 向量数据存储路径
             embedding_model: 嵌入模型名称（支持中文）
+            backend: 向量后端（numpy / chroma）
+            model_cache_dir: 嵌入模型缓存目录（None 使用 sentence-transformers 默认目录）
+            backend_options: 传递给后端的参数（如 index_type / ivf_nlist）
         """
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
 
-        logger.info(f"[VectorStore] 初始化向量存储: {self.storage_path}")
+        logger.info(f"[VectorStore] 初始化向量存储: {self.storage_path} (backend={backend})")
 
-        # 初始化ChromaDB客户端（持久化到磁盘）
-        self.client = chromadb.PersistentClient(
-            path=str(self.storage_path),
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
+        self.backend: VectorBackend = VectorBackendFactory.create(
+            backend,
+            storage_path=str(self.storage_path),
+            **(backend_options or {})
         )
 
         # 延迟加载嵌入模型（首次使用时加载）
         self._embedding_model = None
         self._embedding_model_name = embedding_model
 
-        # 模型缓存目录（E盘）
-        self._cache_dir = Path("E:/AnimaData/models/huggingface")
-        self._cache_dir.mkdir(parents=True, exist_ok=True)
-
-        # 集合（collections）
-        self.collections = {}
-        self._init_collections()
-
-    def _init_collections(self):
-        """初始化ChromaDB集合"""
-        collection_names = [
-            "conversations",  # 对话历史
-            "user_profiles",   # 用户画像
-            "knowledge_base"   # 知识库（可选）
-        ]
-
-        for name in collection_names:
-            try:
-                collection = self.client.get_or_create_collection(
-                    name=name,
-                    metadata={"hnsw:space": "cosine"}  # 使用余弦相似度
-                )
-                self.collections[name] = collection
-                logger.info(f"[VectorStore] Collection '{name}' ready")
-            except Exception as e:
-                logger.error(f"[VectorStore] Failed to init collection '{name}': {e}")
+        # 模型缓存目录
+        self._cache_dir = Path(model_cache_dir) if model_cache_dir else None
+        if self._cache_dir:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
 
     @property
     def embedding_model(self):
@@ -88,7 +78,7 @@ class VectorStore:
 
                 self._embedding_model = SentenceTransformer(
                     self._embedding_model_name,
-                    cache_folder=str(self._cache_dir)
+                    cache_folder=str(self._cache_dir) if self._cache_dir else None
                 )
                 logger.info("[VectorStore] 嵌入模型加载成功")
             except Exception as e:
@@ -103,7 +93,8 @@ class VectorStore:
         user_input: str,
         ai_response: str,
         emotions: List[str] = None,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        turn_id: Optional[str] = None
     ) -> str:
         """
         添加对话到向量存储
@@ -114,6 +105,7 @@ class VectorStore:
             ai_response: AI回复
             emotions: 情感标签
             metadata: 额外元数据
+            turn_id: 对话轮次ID（作为文档ID，并写入元数据用于召回去重）
 
         Returns:
             str: 文档ID
@@ -122,7 +114,7 @@ class VectorStore:
         text = f"User: {user_input}\nAI: {ai_response}"
 
         # 生成嵌入
-        embedding = self.embedding_model.encode(text).tolist()
+        embedding = self.embedding_model.encode(text)
 
         # 准备元数据
         doc_metadata = {
@@ -138,16 +130,20 @@ class VectorStore:
         if metadata:
             doc_metadata.update(metadata)
 
+        if turn_id:
+            doc_metadata["turn_id"] = turn_id
+
         # 生成唯一ID
-        doc_id = f"{session_id}_{datetime.now().timestamp()}"
+        doc_id = turn_id or f"{session_id}_{datetime.now().timestamp()}"
 
         # 存储到conversations集合
         try:
-            self.collections["conversations"].add(
-                documents=[text],
+            self.backend.add(
+                "conversations",
+                ids=[doc_id],
                 embeddings=[embedding],
-                metadatas=[doc_metadata],
-                ids=[doc_id]
+                documents=[text],
+                metadatas=[doc_metadata]
             )
             logger.debug(f"[VectorStore] 添加对话: {doc_id}")
             return doc_id
@@ -172,32 +168,24 @@ class VectorStore:
         Returns:
             List[Dict]: 相关对话列表
             {
+                "id": str,
                 "text": str,
                 "metadata": dict,
                 "distance": float
             }
         """
         # 生成查询嵌入
-        query_embedding = self.embedding_model.encode(query).tolist()
+        query_embedding = self.embedding_model.encode(query)
 
         # 搜索
         try:
-            results = self.collections["conversations"].query(
-                query_embeddings=[query_embedding],
+            contexts = self.backend.query(
+                "conversations",
+                query_embedding,
                 n_results=n_results,
-                where={"session_id": session_id}  # 只搜索该会话的对话
+                session_id=session_id  # 只搜索该会话的对话
             )
 
-            # 格式化结果
-            contexts = []
-            if results["documents"] and results["documents"][0]:
-                for i, doc in enumerate(results["documents"][0]):
-                    contexts.append({
-                        "text": doc,
-                        "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                        "distance": results["distances"][0][i] if "distances" in results else 0.0
-                    })
-
             logger.debug(f"[VectorStore] 搜索到 {len(contexts)} 条相关对话")
             return contexts
 
@@ -205,6 +193,46 @@ class VectorStore:
             logger.error(f"[VectorStore] 搜索失败: {e}")
             return []
 
+    @staticmethod
+    def hit_to_turn(hit: Dict[str, Any], session_id: str) -> Optional[MemoryTurn]:
+        """
+        将向量记录（搜索结果或 list_conversations 的条目）还原为 MemoryTurn
+
+        turn_id 优先取元数据中存储的原始 ID，以便与短期/长期记忆去重
+
+        Args:
+            hit: 向量记录 {"id", "text", "metadata", ...}
+            session_id: 会话 ID
+
+        Returns:
+            MemoryTurn，无法解析时返回 None
+        """
+        metadata = hit.get("metadata") or {}
+
+        # 文本格式为 "User: ...\nAI: ..."，回复本身可能包含换行
+        text = hit.get("text", "")
+        head, sep, agent_response = text.partition("\nAI: ")
+        if not sep or not head.startswith("User: "):
+            return None
+        user_input = head[len("User: "):]
+
+        timestamp = metadata.get("timestamp")
+        try:
+            timestamp = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+        except ValueError:
+            timestamp = datetime.now()
+
+        return MemoryTurn(
+            turn_id=metadata.get("turn_id") or hit.get("id") or str(uuid.uuid4()),
+            session_id=metadata.get("session_id", session_id),
+            timestamp=timestamp,
+            user_input=user_input,
+            agent_response=agent_response,
+            emotions=metadata["emotions"].split(",") if metadata.get("emotions") else [],
+            metadata=metadata,
+            importance=metadata.get("importance", 0.5)
+        )
+
     def build_user_profile(
         self,
         session_id: str,
@@ -229,7 +257,7 @@ class VectorStore:
                 profile_text += f"{key}: {value}\n"
 
         # 生成嵌入
-        embedding = self.embedding_model.encode(profile_text).tolist()
+        embedding = self.embedding_model.encode(profile_text)
 
         # 元数据
         metadata = {
@@ -243,17 +271,18 @@ class VectorStore:
 
         # 删除旧的画像（如果存在）
         try:
-            self.collections["user_profiles"].delete(ids=[doc_id])
-        except:
+            self.backend.delete("user_profiles", [doc_id])
+        except Exception:
             pass
 
         # 添加新画像
         try:
-            self.collections["user_profiles"].add(
-                documents=[profile_text],
+            self.backend.add(
+                "user_profiles",
+                ids=[doc_id],
                 embeddings=[embedding],
-                metadatas=[metadata],
-                ids=[doc_id]
+                documents=[profile_text],
+                metadatas=[metadata]
             )
             logger.info(f"[VectorStore] 更新用户画像: {session_id}")
             return doc_id
@@ -269,24 +298,86 @@ class VectorStore:
             Dict: 各集合的文档数量
         """
         stats = {}
-        for name, collection in self.collections.items():
+        for name in self.COLLECTIONS:
             try:
-                count = collection.count()
-                stats[name] = count
-            except:
+                stats[name] = self.backend.count(name)
+            except Exception:
                 stats[name] = 0
 
         return stats
 
-    def clear_session(self, session_id: str) -> None:
+    def clear_session(self, session_id: str) -> int:
         """
         清除会话的所有向量数据
 
         Args:
             session_id: 会话ID
+
+        Returns:
+            int: 删除的记录数
         """
-        # 注意：ChromaDB不支持按metadata删除
-        # 需要查询所有数据然后逐个删除
-        # 这里暂时跳过，实际使用时可以考虑重建集合
+        removed = 0
+        for name in self.COLLECTIONS:
+            try:
+                removed += self.backend.delete_session(name, session_id)
+            except Exception as e:
+                logger.error(f"[VectorStore] 清除会话失败 ({name}): {e}")
+
+        logger.info(f"[VectorStore] 清除会话 {session_id}: 删除 {removed} 条向量")
+        return removed
+
+    def list_conversations(self, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        列出对话记录（不含向量，供整理任务使用）
+
+        Args:
+            session_id: 可选，只列出该会话
+
+        Returns:
+            List[Dict]: {"id": str, "text": str, "metadata": dict}
+        """
+        try:
+            return self.backend.records("conversations", session_id=session_id)
+        except Exception as e:
+            logger.error(f"[VectorStore] 列出对话失败: {e}")
+            return []
+
+    def delete_conversations(self, doc_ids: List[str]) -> int:
+        """
+        按文档ID删除对话
+
+        Args:
+            doc_ids: 文档ID列表
+
+        Returns:
+            int: 删除的记录数
+        """
+        if not doc_ids:
+            return 0
+        try:
+            return self.backend.delete("conversations", doc_ids)
+        except Exception as e:
+            logger.error(f"[VectorStore] 删除对话失败: {e}")
+            return 0
+
+    def compact(self) -> int:
+        """
+        回收已删除记录占用的空间
 
-        logger.warning(f"[VectorStore] 清除会话功能尚未实现: {session_id}")
+        Returns:
+            int: 回收的记录数
+        """
+        removed = 0
+        for name in self.COLLECTIONS:
+            try:
+                removed += self.backend.compact(name)
+            except Exception as e:
+                logger.error(f"[VectorStore] 压缩集合失败 ({name}): {e}")
+        return removed
+
+    def close(self) -> None:
+        """刷新并关闭向量后端"""
+        try:
+            self.backend.close()
+        except Exception as e:
+            logger.error(f"[VectorStore] 关闭向量后端失败: {e}")
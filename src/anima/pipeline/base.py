@@ -7,6 +7,8 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, List, Optional
 from loguru import logger
 
+from anima.utils.tracing import span
+
 if TYPE_CHECKING:
     from anima.core import PipelineContext
 
@@ -82,7 +84,8 @@ class PipelineStep(ABC):
         
         try:
             logger.debug(f"执行步骤: {self.name}")
-            await self.process(ctx)
+            with span(f"step.{self.name}", "pipeline"):
+                await self.process(ctx)
             return ctx
         except PipelineStepError:
             raise
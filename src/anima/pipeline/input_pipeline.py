@@ -50,6 +50,7 @@ class InputPipeline(BasePipeline):
         metadata: Dict[str, Any] = None,
         images: List[Dict[str, Any]] = None,
         from_name: str = "User",
+        speech_timestamps: List[Dict[str, int]] = None,
     ) -> "PipelineContext":
         """
         执行输入管线
@@ -59,6 +60,7 @@ class InputPipeline(BasePipeline):
             metadata: 元数据
             images: 图片列表
             from_name: 发送者名称
+            speech_timestamps: VAD 输出的语音区间（音频输入时）
             
         Returns:
             PipelineContext: 处理后的上下文
@@ -71,6 +73,7 @@ class InputPipeline(BasePipeline):
             metadata=metadata or {},
             images=images,
             from_name=from_name,
+            speech_timestamps=speech_timestamps,
         )
         
         # 如果是文本输入，直接设置 text
@@ -3,11 +3,119 @@
 处理 Agent 响应 -> 分发到各个 Handler
 """
 
-from typing import TYPE_CHECKING, AsyncIterator, Any, Dict
+import asyncio
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Any, Awaitable, Callable, Dict, List, Optional
 from loguru import logger
 
 from .base import BasePipeline, PipelineStepError
 from anima.core import OutputEvent, EventType
+from anima.utils.metrics import METRICS
+from anima.utils.tracing import span
+
+
+LLM_DELTAS_TOTAL = METRICS.counter("anima_llm_deltas_total", "LLM 流式输出的文本片段数")
+SENTENCE_EVENTS_TOTAL = METRICS.counter("anima_sentence_events_total", "输出管线发出的 sentence 事件数（合并后）")
+
+# 片段以这些字符结尾时立即发出（句子 / 分句边界）
+FLUSH_PUNCTUATION = frozenset("。！？!?…~～，,；;：:\n")
+
+
+class SentenceCoalescer:
+    """
+    合并 LLM 的细碎文本片段（常见 1-3 个字符一个）再发出
+
+    满足任一条件时发出缓冲的文本：
+    - 距缓冲区第一个片段超过 window_ms（LLM 停顿时由定时任务发出）
+    - 缓冲的字符数达到 max_chars
+    - 片段以标点结尾
+
+    发出按调用顺序串行进行，定时发出与生产方发出之间不会乱序。
+    discard() 之后，之前缓冲的文本都不会再发出（包括正在进行或等待锁的定时发出）。
+
+    Example:
+        >>> coalescer = SentenceCoalescer(emit_sentence, window_ms=40, max_chars=64)
+        >>> await coalescer.push("你")
+        >>> await coalescer.flush()   # 流结束时发出剩余文本
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str], Awaitable[None]],
+        window_ms: float = 40.0,
+        max_chars: int = 64,
+    ):
+        self._emit = emit
+        self.window = window_ms / 1000
+        self.max_chars = max_chars
+        self.flushes = 0
+        self._parts: List[str] = []
+        self._size = 0
+        self._started = 0.0
+        self._timer: Optional[asyncio.Task] = None
+        # 正在发出的定时任务（生产方 flush 不取消它，discard 取消）
+        self._timer_flush: Optional[asyncio.Task] = None
+        # discard 次数：发出前检查，被丢弃的文本不再发出
+        self._epoch = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def push(self, text: str) -> None:
+        if not self._parts:
+            self._started = time.perf_counter()
+        self._parts.append(text)
+        self._size += len(text)
+
+        stripped = text.rstrip(" ")
+        if (
+            self._size >= self.max_chars
+            or (stripped and stripped[-1] in FLUSH_PUNCTUATION)
+            or time.perf_counter() - self._started >= self.window
+        ):
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(max(0.0, self._started + self.window - time.perf_counter()))
+        # 转为发出中：生产方的 flush 不会取消这个任务，discard 仍可以取消
+        task = asyncio.current_task()
+        self._timer, self._timer_flush = None, task
+        try:
+            await self.flush()
+        finally:
+            if self._timer_flush is task:
+                self._timer_flush = None
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def flush(self) -> None:
+        """发出缓冲的文本"""
+        self._cancel_timer()
+        text = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        epoch = self._epoch
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # 缓冲为空时也等待进行中的定时发出，保证之后的事件（如完成标记）排在它后面
+        async with self._lock:
+            if text and epoch == self._epoch:
+                self.flushes += 1
+                await self._emit(text)
+
+    def discard(self) -> None:
+        """丢弃缓冲的文本（打断时使用），并取消进行中的定时发出"""
+        self._epoch += 1
+        self._cancel_timer()
+        if self._timer_flush is not None:
+            self._timer_flush.cancel()
+            self._timer_flush = None
+        self._parts.clear()
+        self._size = 0
 
 if TYPE_CHECKING:
     from anima.core import PipelineContext
@@ -31,15 +139,24 @@ class OutputPipeline(BasePipeline):
             pass
     """
     
-    def __init__(self, event_bus: "EventBus" = None):
+    def __init__(
+        self,
+        event_bus: "EventBus" = None,
+        coalesce_window_ms: float = 0.0,
+        coalesce_max_chars: int = 64,
+    ):
         """
         初始化输出管线
         
         Args:
             event_bus: 事件总线
+            coalesce_window_ms: 合并文本片段的时间窗口（毫秒，0 表示每个片段单独发出）
+            coalesce_max_chars: 合并后单个 sentence 事件的最大字符数
         """
         super().__init__()
         self.event_bus = event_bus
+        self.coalesce_window_ms = coalesce_window_ms
+        self.coalesce_max_chars = coalesce_max_chars
         self._seq = 0
         self._interrupted = False
     
@@ -58,53 +175,83 @@ class OutputPipeline(BasePipeline):
         Returns:
             str: 完整的响应文本
         """
-        full_response = ""
+        parts: List[str] = []
+        deltas = 0
         self._seq = 0
         self._interrupted = False
+
+        if self.coalesce_window_ms > 0:
+            coalescer = SentenceCoalescer(self._emit_sentence, self.coalesce_window_ms, self.coalesce_max_chars)
+            emit_text = coalescer.push
+        else:
+            coalescer = None
+            emit_text = self._emit_sentence
         
         try:
-            async for chunk in agent_stream:
-                if self._interrupted or ctx.skip_remaining:
-                    logger.info("输出管线被中断")
-                    break
+            with span("output_pipeline", "pipeline") as output_span:
+                async for chunk in agent_stream:
+                    if self._interrupted or ctx.skip_remaining:
+                        logger.info("输出管线被中断")
+                        output_span.set("interrupted", True)
+                        break
+
+                    # 处理不同类型的 chunk
+                    if isinstance(chunk, dict):
+                        chunk_type = chunk.get("type", "text")
+                        chunk_data = chunk.get("content", chunk.get("data", ""))
 
-                # 处理不同类型的 chunk
-                if isinstance(chunk, dict):
-                    chunk_type = chunk.get("type", "text")
-                    chunk_data = chunk.get("content", chunk.get("data", ""))
+                        if chunk_type in ("text", "sentence"):
+                            await emit_text(chunk_data)
+                            parts.append(chunk_data)
+                            deltas += 1
 
-                    if chunk_type == "text":
-                        await self._emit_sentence(chunk_data)
-                        full_response += chunk_data
+                        elif chunk_type == "tool_call":
+                            # 先发出已缓冲的文本，保持事件顺序
+                            if coalescer is not None:
+                                await coalescer.flush()
+                            await self._emit_event(EventType.TOOL_CALL, chunk)
 
-                    elif chunk_type == "sentence":
-                        await self._emit_sentence(chunk_data)
-                        full_response += chunk_data
+                    elif isinstance(chunk, str):
+                        await emit_text(chunk)
+                        parts.append(chunk)
+                        deltas += 1
 
-                    elif chunk_type == "tool_call":
-                        await self._emit_event(EventType.TOOL_CALL, chunk)
+                if coalescer is not None:
+                    if self._interrupted or ctx.skip_remaining:
+                        coalescer.discard()
+                    else:
+                        await coalescer.flush()
+                LLM_DELTAS_TOTAL.inc(amount=deltas)
+                output_span.set("deltas", deltas)
 
-                elif isinstance(chunk, str):
-                    await self._emit_sentence(chunk)
-                    full_response += chunk
+                # 发送完成标记（只要没被中断就发送，即使内容为空）
+                if not self._interrupted:
+                    await self._emit_completion_marker()
 
-            # 发送完成标记（只要没被中断就发送，即使内容为空）
-            if not self._interrupted:
-                await self._emit_completion_marker()
+                output_span.set("events", self._seq)
 
             # 更新上下文
+            full_response = "".join(parts)
             ctx.response = full_response
             return full_response
             
         except Exception as e:
             logger.error(f"输出管线处理出错: {e}")
             raise
+        finally:
+            if coalescer is not None:
+                coalescer.discard()
+            # 被打断提前退出（或轮次被取消）时立即关闭 LLM 流，停止生成
+            aclose = getattr(agent_stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
     
     async def _emit_sentence(self, text: str) -> None:
         """发射句子事件"""
         if not text or not text.strip():
             return
 
+        SENTENCE_EVENTS_TOTAL.inc()
         await self._emit_event(EventType.SENTENCE, text)
 
     async def _emit_completion_marker(self) -> None:
@@ -7,6 +7,8 @@ from typing import TYPE_CHECKING
 from loguru import logger
 
 from ..base import PipelineStep, PipelineStepError
+from anima.services.asr.streaming import STREAM_PREFIX_KEY, join_transcript
+from anima.utils.tracing import mark, span
 
 if TYPE_CHECKING:
     from anima.core import PipelineContext, WebSocketSend
@@ -19,6 +21,9 @@ class ASRStep(PipelineStep):
     
     如果输入是音频，调用 ASR 引擎转换为文字
     如果输入是文本，直接使用
+
+    流式部分识别已确认的前缀（metadata[STREAM_PREFIX_KEY]）存在时，只解码剩余的尾部音频
+    VAD 语音区间（ctx.speech_timestamps）存在时一并传给 ASR 引擎，避免二次 VAD
     """
     
     def __init__(
@@ -65,18 +70,45 @@ class ASRStep(PipelineStep):
                 ctx.set_error(self.name, "ASR 引擎未初始化")
                 return
             
-            # 调用 ASR 识别
-            logger.debug(f"ASR 处理中，音频长度: {len(audio_data)} 采样点")
-            text = await self.asr_engine.transcribe(audio_data)
+            speech_timestamps = self._valid_timestamps(ctx.speech_timestamps, len(audio_data))
+
+            prefix = ctx.metadata.get(STREAM_PREFIX_KEY)
+            if prefix and 0 < prefix["samples"] <= len(audio_data):
+                # 只解码未确认的尾部
+                offset = prefix["samples"]
+                tail = audio_data[offset:]
+                logger.debug(
+                    f"ASR 处理中，已确认 {offset} 采样点，尾部 {len(tail)} 采样点"
+                )
+                tail_timestamps = None
+                if speech_timestamps is not None:
+                    tail_timestamps = [
+                        {"start": max(ts["start"] - offset, 0), "end": ts["end"] - offset}
+                        for ts in speech_timestamps if ts["end"] > offset
+                    ]
+                tail_text = ""
+                if len(tail) > 1600 and tail_timestamps != []:
+                    with span("asr.transcribe", "asr", engine=type(self.asr_engine).__name__,
+                              samples=len(tail), prefix_samples=offset):
+                        tail_text = await self.asr_engine.transcribe(tail, speech_timestamps=tail_timestamps)
+                text = join_transcript(prefix["text"], tail_text)
+            else:
+                # 调用 ASR 识别
+                logger.debug(f"ASR 处理中，音频长度: {len(audio_data)} 采样点")
+                with span("asr.transcribe", "asr", engine=type(self.asr_engine).__name__,
+                          samples=len(audio_data)):
+                    text = await self.asr_engine.transcribe(audio_data, speech_timestamps=speech_timestamps)
             
             # 更新上下文
             ctx.text = text
+            mark("asr.text")
             logger.info(f"ASR 结果: {text}")
             
             # 发送转录结果到前端
             await self.websocket_send(json.dumps({
                 "type": "user-transcript",
-                "text": text
+                "text": text,
+                "is_final": True,
             }))
             
         except Exception as e:
@@ -91,6 +123,16 @@ class ASRStep(PipelineStep):
             
             raise PipelineStepError(self.name, str(e), e)
     
+    @staticmethod
+    def _valid_timestamps(timestamps, length: int):
+        """语音区间超出音频范围（音频与 VAD 输出不一致）时丢弃"""
+        if not timestamps:
+            return None
+        if timestamps[-1]["end"] > length:
+            logger.warning("VAD 语音区间超出音频长度，忽略")
+            return None
+        return timestamps
+
     async def _send_control(self, text: str) -> None:
         """发送控制信号到前端"""
         await self.websocket_send(json.dumps({
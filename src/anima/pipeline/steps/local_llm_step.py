@@ -9,6 +9,7 @@ from loguru import logger
 from ..base import PipelineStep
 from ...core.context import PipelineContext
 from ...services.llm.interface import LLMInterface
+from ...utils.tracing import span
 
 
 class LocalLLMStep(PipelineStep):
@@ -57,7 +58,8 @@ class LocalLLMStep(PipelineStep):
             logger.info(f"[LocalLLMStep] 🔄 正在调用LocalLLM生成简单应答...")
 
             # 调用LocalLLM生成简单应答（非流式）
-            simple_response = await self.local_llm.chat(original_text)
+            with span("llm.local_chat", "llm", engine=type(self.local_llm).__name__):
+                simple_response = await self.local_llm.chat(original_text)
 
             if simple_response:
                 # 将LocalLLM的输出保存到metadata，供后续步骤使用
@@ -3,6 +3,7 @@
 管理所有服务实例（ASR, TTS, LLM）的初始化、存储和生命周期
 """
 
+from pathlib import Path
 from typing import Callable, Optional
 from loguru import logger
 
@@ -13,6 +14,35 @@ from .services.tts import TTSFactory
 from .services.llm import LLMFactory
 from .services.vad import VADInterface, VADFactory
 from .memory import MemorySystem
+from .memory.long_term import LongTermMemory
+
+
+MEMORY_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "features" / "memory.yaml"
+
+
+def load_memory_config() -> Optional[dict]:
+    """读取 config/features/memory.yaml（文件不存在时返回 None）"""
+    import yaml
+
+    if not MEMORY_CONFIG_PATH.exists():
+        return None
+    with open(MEMORY_CONFIG_PATH, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def prepare_memory_storage() -> None:
+    """
+    服务启动时（任何会话打开数据库之前）执行的记忆库迁移
+
+    旧数据库迁移到增量 VACUUM 需要完整 VACUUM，会独占数据库，不能在会话写入时执行
+    """
+    memory_config = load_memory_config()
+    if not memory_config or not memory_config.get('memory', {}).get('enabled', False):
+        return
+    db_path = memory_config['memory']['long_term']['db_path']
+    logger.debug(f"检查记忆数据库: {db_path}")
+    if LongTermMemory.migrate_auto_vacuum(db_path):
+        logger.info(f"记忆数据库已迁移到 auto_vacuum=INCREMENTAL: {db_path}")
 
 
 class ServiceContext:
@@ -135,13 +165,32 @@ class ServiceContext:
             language=asr_config.language,
             base_url=getattr(asr_config, 'base_url', None),
             stream=getattr(asr_config, 'stream', False),
+            upload_format=getattr(asr_config, 'upload_format', 'wav'),
             # faster-whisper 特定参数
             device=getattr(asr_config, 'device', 'auto'),
             compute_type=getattr(asr_config, 'compute_type', 'default'),
             download_root=getattr(asr_config, 'download_root', None),
             beam_size=getattr(asr_config, 'beam_size', 5),
             vad_filter=getattr(asr_config, 'vad_filter', True),
-            vad_parameters=getattr(asr_config, 'vad_parameters', {})
+            vad_parameters=getattr(asr_config, 'vad_parameters', {}),
+            num_workers=getattr(asr_config, 'num_workers', 1),
+            cpu_threads=getattr(asr_config, 'cpu_threads', 0),
+            batch_size=getattr(asr_config, 'batch_size', 8),
+            batch_wait_ms=getattr(asr_config, 'batch_wait_ms', 20.0),
+            streaming_partials=getattr(asr_config, 'streaming_partials', True),
+            partial_interval_ms=getattr(asr_config, 'partial_interval_ms', 800.0),
+            partial_beam_size=getattr(asr_config, 'partial_beam_size', 1),
+            worker_processes=getattr(asr_config, 'worker_processes', 0),
+            worker_timeout_s=getattr(asr_config, 'worker_timeout_s', 60.0),
+            adaptive_decoding=getattr(asr_config, 'adaptive_decoding', True),
+            short_clip_s=getattr(asr_config, 'short_clip_s', 2.0),
+            busy_pending=getattr(asr_config, 'busy_pending', 2),
+            draft_model=getattr(asr_config, 'draft_model', None),
+            draft_logprob_threshold=getattr(asr_config, 'draft_logprob_threshold', -0.8),
+            base_latency_ms=getattr(asr_config, 'base_latency_ms', 100.0),
+            ms_per_audio_second=getattr(asr_config, 'ms_per_audio_second', 100.0),
+            jitter=getattr(asr_config, 'jitter', 0.0),
+            seed=getattr(asr_config, 'seed', None)
         )
 
     async def init_tts(self, tts_config: TTSConfig) -> None:
@@ -167,7 +216,13 @@ class ServiceContext:
             base_url=getattr(tts_config, 'base_url', None),
             response_format=getattr(tts_config, 'response_format', 'wav'),
             speed=getattr(tts_config, 'speed', 1.0),
-            volume=getattr(tts_config, 'volume', 1.0)
+            volume=getattr(tts_config, 'volume', 1.0),
+            chars_per_second=getattr(tts_config, 'chars_per_second', 4.0),
+            real_time_factor=getattr(tts_config, 'real_time_factor', 0.1),
+            base_latency_ms=getattr(tts_config, 'base_latency_ms', 50.0),
+            jitter=getattr(tts_config, 'jitter', 0.0),
+            sample_rate=getattr(tts_config, 'sample_rate', 16000),
+            seed=getattr(tts_config, 'seed', None)
         )
 
     async def init_llm(self, agent_config: AgentConfig, persona_config: PersonaConfig, app_config: AppConfig = None) -> None:
@@ -318,18 +373,11 @@ class ServiceContext:
         支持向量搜索（第二层个性化）
         """
         try:
-            from pathlib import Path
-            import yaml
-
-            memory_config_path = Path(__file__).parent.parent.parent / "config" / "features" / "memory.yaml"
-
-            if not memory_config_path.exists():
-                logger.warning(f"[{self.session_id}] 记忆系统配置文件不存在: {memory_config_path}")
+            memory_config = load_memory_config()
+            if memory_config is None:
+                logger.warning(f"[{self.session_id}] 记忆系统配置文件不存在: {MEMORY_CONFIG_PATH}")
                 return
 
-            with open(memory_config_path, 'r', encoding='utf-8') as f:
-                memory_config = yaml.safe_load(f)
-
             if not memory_config.get('memory', {}).get('enabled', False):
                 logger.info(f"[{self.session_id}] 记忆系统未启用")
                 return
@@ -341,18 +389,35 @@ class ServiceContext:
                 "importance_threshold": memory_config['memory']['importance']['threshold']
             }
 
+            # 召回融合配置
+            recall_config = memory_config['memory'].get('recall', {})
+            for key in ("rrf_k", "weights", "token_budget", "max_results", "vector_top_k", "fts_top_k"):
+                if key in recall_config:
+                    config[f"recall_{key}"] = recall_config[key]
+
+            # 检索缓存配置
+            config['cache'] = memory_config['memory'].get('cache', {})
+
+            # 记忆整理配置
+            config['consolidation'] = memory_config['memory'].get('consolidation', {})
+
             # 向量搜索配置（第二层个性化）
             vector_search_config = memory_config.get('memory', {}).get('vector_search', {})
             if vector_search_config.get('enabled', False):
                 config['enable_vector_search'] = True
                 config['vector_storage_path'] = vector_search_config.get('storage_path', 'E:/AnimaData/vector_db')
                 config['embedding_model'] = vector_search_config.get('embedding_model', 'paraphrase-multilingual-MiniLM-L12-v2')
+                config['vector_backend'] = vector_search_config.get('backend', 'numpy')
+                config['vector_backend_options'] = vector_search_config.get('backend_options', {})
+                config['embedding_cache_dir'] = vector_search_config.get('model_cache_dir', 'E:/AnimaData/models/huggingface')
 
                 logger.info(f"[{self.session_id}] 向量搜索已启用")
+                logger.info(f"[{self.session_id}] 向量后端: {config['vector_backend']}")
                 logger.info(f"[{self.session_id}] 存储路径: {config['vector_storage_path']}")
                 logger.info(f"[{self.session_id}] 嵌入模型: {config['embedding_model']}")
 
             self.memory_system = MemorySystem(config)
+            self.memory_system.start_consolidation()
             logger.info(f"[{self.session_id}] ✅ 记忆系统初始化完成")
 
         except Exception as e:
@@ -2,7 +2,7 @@
 ASR (语音识别) 服务模块
 """
 
-from .interface import ASRInterface
+from .interface import ASRInterface, ASRSegment
 from .factory import ASRFactory
 
 # 导入实现以触发 ProviderRegistry 注册
@@ -11,4 +11,4 @@ try:
 except ImportError:
     pass
 
-__all__ = ["ASRInterface", "ASRFactory"]
\ No newline at end of file
+__all__ = ["ASRInterface", "ASRSegment", "ASRFactory"]
\ No newline at end of file
@@ -42,7 +42,8 @@ class ASRFactory:
             return GLMASR(
                 api_key=kwargs.get("api_key"),
                 model=kwargs.get("model", "glm-asr-2512"),
-                stream=kwargs.get("stream", False)
+                stream=kwargs.get("stream", False),
+                upload_format=kwargs.get("upload_format", "wav")
             )
         elif provider == "faster_whisper":
             from .implementations.faster_whisper_asr import FasterWhisperASR
@@ -54,11 +55,30 @@ class ASRFactory:
                 download_root=kwargs.get("download_root"),
                 beam_size=kwargs.get("beam_size", 5),
                 vad_filter=kwargs.get("vad_filter", True),
-                vad_parameters=kwargs.get("vad_parameters", {})
+                vad_parameters=kwargs.get("vad_parameters", {}),
+                num_workers=kwargs.get("num_workers", 1),
+                cpu_threads=kwargs.get("cpu_threads", 0),
+                batch_size=kwargs.get("batch_size", 8),
+                batch_wait_ms=kwargs.get("batch_wait_ms", 20.0),
+                streaming_partials=kwargs.get("streaming_partials", True),
+                partial_interval_ms=kwargs.get("partial_interval_ms", 800.0),
+                partial_beam_size=kwargs.get("partial_beam_size", 1),
+                worker_processes=kwargs.get("worker_processes", 0),
+                worker_timeout_s=kwargs.get("worker_timeout_s", 60.0),
+                adaptive_decoding=kwargs.get("adaptive_decoding", True),
+                short_clip_s=kwargs.get("short_clip_s", 2.0),
+                busy_pending=kwargs.get("busy_pending", 2),
+                draft_model=kwargs.get("draft_model"),
+                draft_logprob_threshold=kwargs.get("draft_logprob_threshold", -0.8)
             )
         elif provider == "mock":
             from .implementations.mock_asr import MockASR
-            return MockASR()
+            return MockASR(
+                base_latency_ms=kwargs.get("base_latency_ms", 100.0),
+                ms_per_audio_second=kwargs.get("ms_per_audio_second", 100.0),
+                jitter=kwargs.get("jitter", 0.0),
+                seed=kwargs.get("seed")
+            )
         else:
             logger.warning(f"未知的 ASR 提供商: {provider}，使用 Mock 实现")
             from .implementations.mock_asr import MockASR
@@ -0,0 +1,153 @@
+"""
+Faster-Whisper 自适应解码策略
+
+每条语音在解码前按「时长 + 当前负载」选择解码参数：
+- 负载高（排队 + 解码中的请求数 >= busy_pending）：贪心解码（beam_size=1）
+- 短句（时长 < short_clip_s，如「嗯」「好的」）：贪心解码
+- 其他情况（空闲时的长句）：使用配置的 beam_size
+
+配置了草稿模型（draft_model）时先用草稿模型贪心解码，
+平均对数概率低于 draft_logprob_threshold（或结果为空）时回退到主模型按上述策略重新解码。
+
+每次决策都会连同耗时记录到日志，并按决策原因累计统计，方便调整阈值。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from ..interface import ASRSegment
+
+
+@dataclass
+class DecodeDecision:
+    """一次解码决策"""
+    beam_size: int
+    reason: str          # idle / short / busy / fixed
+    use_draft: bool = False
+
+
+def mean_logprob(units: List[ASRSegment]) -> Optional[float]:
+    """按片段时长加权的平均对数概率（没有片段时返回 None）"""
+    total = 0.0
+    weight = 0.0
+    for unit in units:
+        duration = max(unit.end - unit.start, 1e-3)
+        total += unit.avg_logprob * duration
+        weight += duration
+    return total / weight if weight else None
+
+
+class AdaptiveDecodePolicy:
+    """
+    自适应解码策略（每个 FasterWhisperASR 实例一个，统计按实例累计）
+
+    Example:
+        >>> policy = AdaptiveDecodePolicy(beam_size=5)
+        >>> decision = policy.decide(duration_s=0.6, pending=0)
+        >>> decision.beam_size, decision.reason
+        (1, 'short')
+    """
+
+    def __init__(
+        self,
+        beam_size: int = 5,
+        enabled: bool = True,
+        short_clip_s: float = 2.0,
+        busy_pending: int = 2,
+        has_draft: bool = False,
+        draft_logprob_threshold: float = -0.8,
+    ):
+        """
+        初始化策略
+
+        Args:
+            beam_size: 空闲时长句使用的束搜索大小
+            enabled: False 时始终使用 beam_size（仍记录耗时）
+            short_clip_s: 短句阈值（秒）
+            busy_pending: 视为高负载的排队 + 解码中请求数
+            has_draft: 是否配置了草稿模型
+            draft_logprob_threshold: 草稿结果平均对数概率低于该值时回退到主模型
+        """
+        self.beam_size = beam_size
+        self.enabled = enabled
+        self.short_clip_s = short_clip_s
+        self.busy_pending = max(1, busy_pending)
+        self.has_draft = has_draft
+        self.draft_logprob_threshold = draft_logprob_threshold
+
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def decide(self, duration_s: float, pending: int) -> DecodeDecision:
+        """
+        选择解码参数
+
+        Args:
+            duration_s: 语音时长（秒）
+            pending: 当前排队 + 解码中的请求数（不含本次）
+
+        Returns:
+            DecodeDecision: 主模型的解码参数（以及是否先尝试草稿模型）
+        """
+        if not self.enabled:
+            return DecodeDecision(self.beam_size, "fixed", self.has_draft)
+        if pending >= self.busy_pending:
+            return DecodeDecision(1, "busy", self.has_draft)
+        if duration_s < self.short_clip_s:
+            return DecodeDecision(1, "short", self.has_draft)
+        return DecodeDecision(self.beam_size, "idle", self.has_draft)
+
+    def accept_draft(self, units: List[ASRSegment]) -> bool:
+        """草稿结果是否足够可信"""
+        logprob = mean_logprob(units)
+        return logprob is not None and logprob >= self.draft_logprob_threshold
+
+    def record(
+        self,
+        decision: DecodeDecision,
+        duration_s: float,
+        pending: int,
+        latency_s: float,
+        draft: Optional[str] = None,
+        logprob: Optional[float] = None,
+    ) -> None:
+        """
+        记录一次解码（日志 + 统计）
+
+        Args:
+            decision: 解码决策
+            duration_s: 语音时长
+            pending: 决策时的负载
+            latency_s: 解码总耗时（含草稿与回退）
+            draft: 草稿模型结果：accepted / fallback / None（未使用草稿）
+            logprob: 草稿结果的平均对数概率
+        """
+        key = decision.reason if draft is None else f"{decision.reason}+draft_{draft}"
+        entry = self._stats.setdefault(key, {"count": 0, "latency_s": 0.0, "audio_s": 0.0})
+        entry["count"] += 1
+        entry["latency_s"] += latency_s
+        entry["audio_s"] += duration_s
+
+        draft_info = ""
+        if draft is not None:
+            draft_info = f", draft={draft}"
+            if logprob is not None:
+                draft_info += f" (logprob={logprob:.2f})"
+        logger.info(
+            f"[AdaptiveDecodePolicy] {duration_s:.2f}s 语音, pending={pending} -> "
+            f"{decision.reason} beam={decision.beam_size}{draft_info}, "
+            f"耗时 {latency_s * 1000:.0f}ms (RTF {latency_s / max(duration_s, 1e-3):.3f})"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """按决策分类的次数、平均耗时和实时率"""
+        return {
+            key: {
+                "count": int(entry["count"]),
+                "avg_latency_ms": round(entry["latency_s"] / entry["count"] * 1000, 1),
+                "rtf": round(entry["latency_s"] / max(entry["audio_s"], 1e-3), 3),
+            }
+            for key, entry in self._stats.items()
+        }
+
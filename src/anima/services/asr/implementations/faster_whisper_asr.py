@@ -15,13 +15,19 @@ Faster-Whisper ASR 实现 - 开源免费的语音识别
 - distil-medium.en: 英文专用
 """
 
-from typing import Union, Optional
+import asyncio
+import time
+from typing import List, Union, Optional
 from pathlib import Path
 import numpy as np
 from loguru import logger
 
-from ..interface import ASRInterface
+from ..interface import ASRInterface, ASRSegment
+from .adaptive_decoding import AdaptiveDecodePolicy, mean_logprob
+from .whisper_scheduler import WhisperBatchScheduler, join_segments
+from .whisper_process_pool import WhisperProcessPool
 from ....config.core.registry import ProviderRegistry
+from ....utils.audio_codec import decode_audio
 
 
 @ProviderRegistry.register_service("asr", "faster_whisper")
@@ -29,6 +35,10 @@ class FasterWhisperASR(ASRInterface):
     """
     Faster-Whisper ASR 实现
     使用 OpenAI Whisper 模型的优化版本，速度快且完全离线运行
+
+    模型由进程级共享的 WhisperBatchScheduler 持有，多个会话的语音片段会被合并成批量解码；
+    worker_processes > 0 时改由 WhisperProcessPool 在独立进程中解码，不占用服务进程的 CPU；
+    每条语音的 beam_size 由 AdaptiveDecodePolicy 按时长和负载选择，可选先用草稿模型解码
     """
 
     # 支持的模型列表
@@ -55,6 +65,20 @@ class FasterWhisperASR(ASRInterface):
         beam_size: int = 5,
         vad_filter: bool = True,
         vad_parameters: dict = None,
+        num_workers: int = 1,
+        cpu_threads: int = 0,
+        batch_size: int = 8,
+        batch_wait_ms: float = 20.0,
+        streaming_partials: bool = True,
+        partial_interval_ms: float = 800.0,
+        partial_beam_size: int = 1,
+        worker_processes: int = 0,
+        worker_timeout_s: float = 60.0,
+        adaptive_decoding: bool = True,
+        short_clip_s: float = 2.0,
+        busy_pending: int = 2,
+        draft_model: Optional[str] = None,
+        draft_logprob_threshold: float = -0.8,
     ):
         """
         初始化 Faster-Whisper ASR
@@ -68,6 +92,20 @@ class FasterWhisperASR(ASRInterface):
             beam_size: 束搜索大小（1-10，越大越准确但越慢）
             vad_filter: 是否使用 VAD 过滤静音
             vad_parameters: VAD 参数
+            num_workers: 专用解码线程数（同一模型配置的所有会话共享）
+            cpu_threads: 每个解码线程使用的 CPU 线程数（0 = 默认）
+            batch_size: 跨会话批量解码的最大片段数（1 = 不批量）
+            batch_wait_ms: 收集批次的等待窗口（毫秒）
+            streaming_partials: 说话过程中是否推送部分识别结果
+            partial_interval_ms: 部分识别的解码间隔（毫秒）
+            partial_beam_size: 部分识别使用的束搜索大小（越小越快）
+            worker_processes: 独立解码进程数（0 = 在服务进程内用线程池解码）
+            worker_timeout_s: 多进程模式下单个请求的最长解码时间，超时重启 worker
+            adaptive_decoding: 是否按语音时长和负载自动选择 beam_size
+            short_clip_s: 短于该时长（秒）的语音使用贪心解码
+            busy_pending: 排队 + 解码中的请求数达到该值时使用贪心解码
+            draft_model: 草稿模型（如 small），先用它贪心解码，置信度不足再用主模型
+            draft_logprob_threshold: 草稿结果的平均对数概率低于该值时回退到主模型
         """
         self.model_name = model
         self.language = language
@@ -77,7 +115,29 @@ class FasterWhisperASR(ASRInterface):
         self.beam_size = beam_size
         self.vad_filter = vad_filter
         self.vad_parameters = vad_parameters or {}
-        self._model = None
+        self.streaming_partials = streaming_partials
+        self.partial_interval_ms = partial_interval_ms
+        self.partial_beam_size = partial_beam_size
+
+        self.draft_model = draft_model
+        self.worker_processes = worker_processes
+        self.worker_timeout_s = worker_timeout_s
+        self.num_workers = num_workers
+        self.cpu_threads = cpu_threads
+        self.batch_size = batch_size
+        self.batch_wait_ms = batch_wait_ms
+
+        self._scheduler = self._create_scheduler(model)
+        # 草稿模型与主模型使用同一种调度方式（线程池 / 多进程）
+        self._draft_scheduler = self._create_scheduler(draft_model) if draft_model else None
+        self._policy = AdaptiveDecodePolicy(
+            beam_size=beam_size,
+            enabled=adaptive_decoding,
+            short_clip_s=short_clip_s,
+            busy_pending=busy_pending,
+            has_draft=self._draft_scheduler is not None,
+            draft_logprob_threshold=draft_logprob_threshold,
+        )
 
         logger.info(f"Faster-Whisper ASR 初始化配置:")
         logger.info(f"  模型: {model}")
@@ -86,32 +146,42 @@ class FasterWhisperASR(ASRInterface):
         logger.info(f"  计算精度: {compute_type}")
         logger.info(f"  Beam Size: {beam_size}")
         logger.info(f"  VAD 过滤: {vad_filter}")
+        if worker_processes > 0:
+            logger.info(f"  多进程解码: processes={worker_processes}, cpu_threads={cpu_threads}")
+        else:
+            logger.info(f"  批量解码: batch_size={batch_size}, wait={batch_wait_ms}ms, workers={num_workers}")
+        logger.info(f"  流式部分识别: {streaming_partials} (间隔 {partial_interval_ms}ms)")
+        logger.info(
+            f"  自适应解码: {adaptive_decoding} (短句 < {short_clip_s}s, 高负载 >= {busy_pending}, "
+            f"草稿模型 {draft_model or '无'})"
+        )
+
+    def _create_scheduler(self, model: str):
+        """获取模型对应的进程级共享调度器"""
+        if self.worker_processes > 0:
+            return WhisperProcessPool.get_shared(
+                model=model,
+                device=self.device,
+                compute_type=self.compute_type,
+                download_root=self.download_root,
+                num_processes=self.worker_processes,
+                cpu_threads=self.cpu_threads,
+                request_timeout=self.worker_timeout_s,
+            )
+        return WhisperBatchScheduler.get_shared(
+            model=model,
+            device=self.device,
+            compute_type=self.compute_type,
+            download_root=self.download_root,
+            num_workers=self.num_workers,
+            cpu_threads=self.cpu_threads,
+            max_batch_size=self.batch_size,
+            batch_wait_ms=self.batch_wait_ms,
+        )
 
     def _get_model(self):
-        """懒加载模型"""
-        if self._model is None:
-            try:
-                from faster_whisper import WhisperModel
-
-                logger.info(f"正在加载 Faster-Whisper 模型: {self.model_name}...")
-                self._model = WhisperModel(
-                    self.model_name,
-                    device=self.device,
-                    compute_type=self.compute_type,
-                    download_root=self.download_root,
-                )
-                logger.info(f"✅ Faster-Whisper 模型加载完成")
-
-            except ImportError:
-                logger.error("faster-whisper 未安装，请运行: pip install faster-whisper")
-                raise ImportError(
-                    "faster-whisper 未安装，请运行: pip install faster-whisper"
-                )
-            except Exception as e:
-                logger.error(f"加载 Faster-Whisper 模型失败: {e}")
-                raise
-
-        return self._model
+        """懒加载模型（由共享调度器持有）"""
+        return self._scheduler.get_model()
 
     async def transcribe(
         self,
@@ -126,16 +196,13 @@ class FasterWhisperASR(ASRInterface):
                 - bytes: WAV/MP3 等格式的字节数据
                 - str/Path: 音频文件路径
                 - list/numpy array: PCM 音频数据 (float32, range [-1.0, 1.0])
+            speech_timestamps: 上游 VAD 给出的语音区间 [{"start", "end"}]（采样点），
+                存在时直接作为 clip_timestamps 解码，不再运行 faster-whisper 内部的 VAD
 
         Returns:
             str: 识别出的文本
         """
-        import asyncio
-        import wave
-        import io
-        import tempfile
-
-        model = self._get_model()
+        speech_timestamps = kwargs.get("speech_timestamps")
 
         # 处理输入数据，转换为 numpy array
         if isinstance(audio_data, np.ndarray):
@@ -160,22 +227,81 @@ class FasterWhisperASR(ASRInterface):
 
         logger.debug(f"Faster-Whisper ASR 处理音频: {len(audio_np)} 采样点")
 
-        # 在线程池中运行转录（CPU 密集型操作）
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            self._transcribe_sync,
-            audio_np
-        )
+        options = self._transcribe_options()
+        clips = None
+        if speech_timestamps:
+            # 已经由 SileroVAD 切分过，跳过内部 VAD
+            options["vad_filter"] = False
+            options.pop("vad_parameters", None)
+            clips = [(ts["start"] / 16000, ts["end"] / 16000) for ts in speech_timestamps]
+
+        result = await self._transcribe_adaptive(audio_np, options, clips)
 
         logger.info(f"Faster-Whisper ASR 识别结果: {result}")
         return result
 
-    def _transcribe_sync(self, audio_np: np.ndarray) -> str:
-        """同步转录方法"""
-        model = self._get_model()
+    async def _transcribe_adaptive(self, audio_np: np.ndarray, options: dict, clips) -> str:
+        """按策略选择 beam_size（可选先用草稿模型），交给共享调度器解码并记录耗时"""
+        duration_s = sum(end - start for start, end in clips) if clips else len(audio_np) / 16000
+        pending = self._scheduler.pending
+        if self._draft_scheduler is not None:
+            pending += self._draft_scheduler.pending
+        decision = self._policy.decide(duration_s, pending)
+        started = time.perf_counter()
+
+        draft = None
+        logprob = None
+        if decision.use_draft:
+            units = await self._draft_scheduler.transcribe_timed(
+                audio_np, dict(options, beam_size=1), clips=clips
+            )
+            logprob = mean_logprob(units)
+            if self._policy.accept_draft(units):
+                draft = "accepted"
+                result = join_segments(units)
+            else:
+                draft = "fallback"
+
+        if draft != "accepted":
+            result = await self._scheduler.transcribe(
+                audio_np, dict(options, beam_size=decision.beam_size), clips=clips
+            )
+
+        self._policy.record(decision, duration_s, pending, time.perf_counter() - started, draft, logprob)
+        return result
+
+    def decode_stats(self) -> dict:
+        """自适应解码统计（按决策分类）"""
+        return self._policy.stats()
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self.streaming_partials
+
+    async def transcribe_timed(self, audio_data: np.ndarray, **kwargs) -> List[ASRSegment]:
+        """
+        识别音频并返回词级时间戳（流式部分识别使用）
+
+        部分识别会被反复调用，使用较小的束搜索且不运行内部 VAD
+
+        Args:
+            audio_data: 16kHz float32 单声道音频
 
-        # 配置参数
+        Returns:
+            List[ASRSegment]: 词级片段
+        """
+        audio_np = np.clip(np.asarray(audio_data, dtype=np.float32), -1.0, 1.0)
+        options = self._transcribe_options()
+        options.pop("vad_parameters", None)
+        options.update({
+            "beam_size": self.partial_beam_size,
+            "vad_filter": False,
+            "word_timestamps": True,
+        })
+        return await self._scheduler.transcribe_timed(audio_np, options)
+
+    def _transcribe_options(self) -> dict:
+        """构建 model.transcribe 参数"""
         parameters = {
             "beam_size": self.beam_size,
             "language": self.language if self.language else None,
@@ -192,98 +318,17 @@ class FasterWhisperASR(ASRInterface):
                 }
             })
 
-        # 记录语言配置
-        logger.debug(f"Faster-Whisper 配置 - language={self.language}, 参数={parameters}")
-
-        # 执行转录
-        segments, info = model.transcribe(audio_np, **parameters)
-
-        # 记录检测到的语言信息
-        logger.info(f"Faster-Whisper 检测信息: language='{info.language}', language_probability={info.language_probability:.2f}")
-
-        # 提取文本
-        text_parts = [segment.text for segment in segments]
-
-        if not text_parts:
-            return ""
-        else:
-            return "".join(text_parts).strip()
+        return parameters
 
     async def _load_audio_file(self, file_path: str) -> np.ndarray:
-        """从文件加载音频"""
-        # 使用 pydub 加载音频（支持多种格式）
-        try:
-            from pydub import AudioSegment
-
-            audio_segment = AudioSegment.from_file(file_path)
-            samples = np.array(audio_segment.get_array_of_samples(), dtype=np.float32)
-
-            # 归一化到 [-1.0, 1.0]
-            if audio_segment.sample_width == 2:  # 16-bit
-                samples = samples / 32768.0
-            elif audio_segment.sample_width == 4:  # 32-bit
-                samples = samples / 2147483648.0
-
-            # 转换为单声道
-            if audio_segment.channels > 1:
-                samples = samples.reshape((-1, audio_segment.channels)).mean(axis=1)
-
-            # 重采样到 16kHz（如果需要）
-            if audio_segment.frame_rate != 16000:
-                from pydub.utils import make_chunks
-                # 简单重采样方法（可以使用 librosa 或 resampy 获得更好效果）
-                import fractions
-                ratio = 16000 / audio_segment.frame_rate
-                target_length = int(len(samples) * ratio)
-                samples = np.interp(
-                    np.linspace(0, len(samples), target_length),
-                    np.arange(len(samples)),
-                    samples
-                )
-
-            logger.debug(f"加载音频文件: {file_path}, 采样点: {len(samples)}")
-            return samples
-
-        except ImportError:
-            logger.warning("pydub 未安装，使用 wave 模块（仅支持 WAV）")
-            # 降级到 wave 模块
-            import wave
-
-            with wave.open(file_path, 'rb') as wf:
-                sample_rate = wf.getframerate()
-                frames = wf.readframes(wf.getnframes())
-                audio_data = np.frombuffer(frames, dtype=np.int16)
-
-                # 归一化并转 float32
-                samples = audio_data.astype(np.float32) / 32768.0
-
-                # 重采样到 16kHz
-                if sample_rate != 16000:
-                    ratio = 16000 / sample_rate
-                    target_length = int(len(samples) * ratio)
-                    samples = np.interp(
-                        np.linspace(0, len(samples), target_length),
-                        np.arange(len(samples)),
-                        samples
-                    )
-
-                return samples
+        """从文件加载音频（WAV 在内存中解析，其他格式经管道交给 ffmpeg）"""
+        samples = await asyncio.to_thread(decode_audio, file_path)
+        logger.debug(f"加载音频文件: {file_path}, 采样点: {len(samples)}")
+        return samples
 
     async def _load_audio_bytes(self, audio_bytes: bytes) -> np.ndarray:
-        """从 bytes 加载音频"""
-        import tempfile
-
-        # 写入临时文件
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_file.flush()
-
-            try:
-                return await self._load_audio_file(tmp_file.name)
-            finally:
-                import os
-                if os.path.exists(tmp_file.name):
-                    os.unlink(tmp_file.name)
+        """从 bytes 加载音频（不写临时文件）"""
+        return await asyncio.to_thread(decode_audio, audio_bytes)
 
     async def transcribe_stream(
         self,
@@ -312,8 +357,9 @@ class FasterWhisperASR(ASRInterface):
                 yield sentence
 
     async def close(self) -> None:
-        """清理资源"""
-        self._model = None
+        """清理资源（模型由共享调度器持有，其他会话仍在使用）"""
+        self._scheduler = None
+        self._draft_scheduler = None
         logger.debug("Faster-Whisper ASR 资源已释放")
 
     @classmethod
@@ -328,4 +374,18 @@ class FasterWhisperASR(ASRInterface):
             beam_size=config.get("beam_size", 5),
             vad_filter=config.get("vad_filter", True),
             vad_parameters=config.get("vad_parameters", {}),
+            num_workers=config.get("num_workers", 1),
+            cpu_threads=config.get("cpu_threads", 0),
+            batch_size=config.get("batch_size", 8),
+            batch_wait_ms=config.get("batch_wait_ms", 20.0),
+            streaming_partials=config.get("streaming_partials", True),
+            partial_interval_ms=config.get("partial_interval_ms", 800.0),
+            partial_beam_size=config.get("partial_beam_size", 1),
+            worker_processes=config.get("worker_processes", 0),
+            worker_timeout_s=config.get("worker_timeout_s", 60.0),
+            adaptive_decoding=config.get("adaptive_decoding", True),
+            short_clip_s=config.get("short_clip_s", 2.0),
+            busy_pending=config.get("busy_pending", 2),
+            draft_model=config.get("draft_model"),
+            draft_logprob_threshold=config.get("draft_logprob_threshold", -0.8),
         )
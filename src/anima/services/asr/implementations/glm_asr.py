@@ -4,14 +4,16 @@ GLM ASR 实现 - 使用智谱 AI GLM ASR API
 
 from typing import Union, Optional
 from pathlib import Path
-import wave
+import asyncio
 import io
 
+import numpy as np
 from loguru import logger
 
 from ..interface import ASRInterface
 from ....config.core.registry import ProviderRegistry
 from ....config.providers.asr.glm import GLMASRConfig
+from ....utils.audio_codec import encode_flac, encode_wav, is_wav, to_int16
 
 
 @ProviderRegistry.register_service("asr", "glm")
@@ -22,7 +24,11 @@ class GLMASR(ASRInterface):
     """
 
     @staticmethod
-    def _convert_to_supported_audio_bytes(audio_data, sample_rate: int = 16000) -> tuple[bytes, str]:
+    def _convert_to_supported_audio_bytes(
+        audio_data,
+        sample_rate: int = 16000,
+        upload_format: str = "wav",
+    ) -> tuple[bytes, str]:
         """
         将音频数据转换为 GLM ASR 支持的格式
 
@@ -34,80 +40,56 @@ class GLMASR(ASRInterface):
                 - list of floats
                 - bytes (已经是音频格式)
             sample_rate: 采样率，默认 16000
+            upload_format: 上传格式
+                - wav: 直接拼接 WAV 文件头（几乎零开销，体积最大）
+                - flac: 进程内无损压缩（需要 soundfile，体积约为 WAV 的一半；
+                  试验性，接口文档只列出 wav / mp3）
+                - mp3: pydub 导出（每次启动 ffmpeg 子进程，体积最小，延迟最高）
 
         Returns:
             tuple[bytes, str]: (音频数据, 文件扩展名)
         """
         # 如果已经是 bytes，假设是支持的格式
         if isinstance(audio_data, bytes):
-            return audio_data, "mp3"
+            return audio_data, "wav" if is_wav(audio_data) else "mp3"
 
-        # 转换为 numpy array
-        try:
-            import numpy as np
-            if isinstance(audio_data, list):
-                audio_np = np.array(audio_data, dtype=np.float32)
-            else:
-                audio_np = audio_data
-        except ImportError:
-            logger.error("需要安装 numpy: pip install numpy")
-            raise
-
-        # 尝试使用 pydub 转换为 MP3 (更可靠)
-        try:
-            from pydub import AudioSegment
-            import io
-
-            # 将 numpy array 转换为 AudioSegment
-            if audio_np.dtype == np.float32 or audio_np.dtype == np.float64:
-                audio_np = np.clip(audio_np, -1.0, 1.0)
-                int16_data = (audio_np * 32767).astype(np.int16)
-            else:
-                int16_data = audio_np.astype(np.int16)
-
-            # 创建 AudioSegment
-            audio_segment = AudioSegment(
-                data=int16_data.tobytes(),
-                sample_width=2,  # 16-bit
-                frame_rate=sample_rate,
-                channels=1  # 单声道
-            )
+        int16_data = to_int16(np.asarray(audio_data, dtype=np.float32)
+                              if isinstance(audio_data, list) else audio_data)
 
-            # 导出为 MP3
-            mp3_buffer = io.BytesIO()
-            audio_segment.export(mp3_buffer, format="mp3", bitrate="64k")
-            mp3_buffer.seek(0)
-
-            logger.debug(f"音频转换为 MP3: {len(mp3_buffer.getvalue())} 字节")
-            return mp3_buffer.getvalue(), "mp3"
-
-        except ImportError:
-            logger.warning("pydub 未安装，使用 WAV 格式 (pip install pydub)")
-            # 降级到 WAV 格式
-            import wave
+        if upload_format == "flac":
+            try:
+                flac_bytes = encode_flac(int16_data, sample_rate)
+                logger.debug(f"音频编码为 FLAC: {len(flac_bytes)} 字节")
+                return flac_bytes, "flac"
+            except ImportError:
+                logger.warning("soundfile 未安装，使用 WAV 格式 (pip install soundfile)")
 
-            if audio_np.dtype == np.float32 or audio_np.dtype == np.float64:
-                audio_np = np.clip(audio_np, -1.0, 1.0)
-                int16_data = (audio_np * 32767).astype(np.int16)
-            else:
-                int16_data = audio_np.astype(np.int16)
+        elif upload_format == "mp3":
+            try:
+                from pydub import AudioSegment
 
-            wav_buffer = io.BytesIO()
+                audio_segment = AudioSegment(
+                    data=int16_data.tobytes(),
+                    sample_width=2,  # 16-bit
+                    frame_rate=sample_rate,
+                    channels=1  # 单声道
+                )
+                mp3_buffer = io.BytesIO()
+                audio_segment.export(mp3_buffer, format="mp3", bitrate="64k")
 
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(int16_data.tobytes())
+                logger.debug(f"音频转换为 MP3: {len(mp3_buffer.getvalue())} 字节")
+                return mp3_buffer.getvalue(), "mp3"
+            except ImportError:
+                logger.warning("pydub 未安装，使用 WAV 格式 (pip install pydub)")
 
-            wav_buffer.seek(0)
-            return wav_buffer.read(), "wav"
+        return encode_wav(int16_data, sample_rate), "wav"
 
     def __init__(
         self,
         api_key: str,
         model: str = "glm-asr-2512",
         stream: bool = False,
+        upload_format: str = "wav",
     ):
         """
         初始化 GLM ASR 客户端
@@ -116,12 +98,22 @@ class GLMASR(ASRInterface):
             api_key: 智谱 AI API Key
             model: ASR 模型，默认为 glm-asr-2512
             stream: 是否使用流式调用
+            upload_format: PCM 输入的上传编码（wav / flac / mp3）
         """
         self.api_key = api_key
         self.model = model
         self.stream = stream
+        self.upload_format = upload_format
         self._client = None
 
+    async def _encode_upload(self, audio_data) -> tuple[bytes, str]:
+        """按配置的上传格式编码 PCM（mp3 需要启动 ffmpeg，放到线程池执行）"""
+        if self.upload_format == "mp3":
+            return await asyncio.to_thread(
+                self._convert_to_supported_audio_bytes, audio_data, 16000, self.upload_format
+            )
+        return self._convert_to_supported_audio_bytes(audio_data, 16000, self.upload_format)
+
     def _get_client(self):
         """懒加载客户端"""
         if self._client is None:
@@ -163,7 +155,7 @@ class GLMASR(ASRInterface):
 
         # 处理输入数据，获取音频 bytes 和扩展名
         if isinstance(audio_data, bytes):
-            audio_bytes, ext = audio_data, "mp3"
+            audio_bytes, ext = audio_data, "wav" if is_wav(audio_data) else "mp3"
         elif isinstance(audio_data, (str, Path)):
             # 从文件读取
             with open(str(audio_data), 'rb') as f:
@@ -171,7 +163,7 @@ class GLMASR(ASRInterface):
             ext = Path(audio_data).suffix.lstrip('.')
         else:
             # 转换为支持的音频格式
-            audio_bytes, ext = self._convert_to_supported_audio_bytes(audio_data)
+            audio_bytes, ext = await self._encode_upload(audio_data)
 
         logger.debug(f"GLM ASR 处理音频数据: {len(audio_bytes)} 字节, 格式: {ext} (stream={use_stream})")
 
@@ -293,13 +285,13 @@ class GLMASR(ASRInterface):
 
         # 处理输入数据，获取音频 bytes 和扩展名
         if isinstance(audio_data, bytes):
-            audio_bytes, ext = audio_data, "mp3"
+            audio_bytes, ext = audio_data, "wav" if is_wav(audio_data) else "mp3"
         elif isinstance(audio_data, (str, Path)):
             with open(str(audio_data), 'rb') as f:
                 audio_bytes = f.read()
             ext = Path(audio_data).suffix.lstrip('.')
         else:
-            audio_bytes, ext = self._convert_to_supported_audio_bytes(audio_data)
+            audio_bytes, ext = await self._encode_upload(audio_data)
 
         loop = asyncio.get_event_loop()
 
@@ -2,19 +2,24 @@
 Mock ASR 实现 - 用于测试和开发
 """
 
-from typing import Union
+from typing import Optional, Union
 from pathlib import Path
 
+import numpy as np
+from loguru import logger
+
 from ..interface import ASRInterface
 from ....config.core.registry import ProviderRegistry
 from ....config.providers.asr.mock import MockASRConfig
+from ....utils.mock_latency import LatencyModel, make_rng
 
 
 @ProviderRegistry.register_service("asr", "mock")
 class MockASR(ASRInterface):
     """
     Mock ASR 实现
-    不进行实际的语音识别，返回模拟的语音识别结果
+    不进行实际的语音识别，返回模拟的语音识别结果；
+    耗时 = 固定耗时 + 每秒音频耗时 × 音频时长（按配置的分布采样）
     """
 
     # 测试用的模拟文本列表
@@ -31,12 +36,36 @@ class MockASR(ASRInterface):
         "今天过得怎么样？"
     ]
 
-    def __init__(self, mock_response: str = None):
-        # 如果没有指定响应，从列表中随机选择
-        if mock_response is None:
-            import random
-            mock_response = random.choice(self.TEST_PHRASES)
+    SAMPLE_RATE = 16000
+
+    def __init__(
+        self,
+        mock_response: str = None,
+        base_latency_ms: float = 100.0,
+        ms_per_audio_second: float = 100.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            mock_response: 固定的识别结果（None 表示每次从 TEST_PHRASES 中随机选择）
+            base_latency_ms: 每次识别的固定平均耗时（毫秒）
+            ms_per_audio_second: 每秒音频的平均识别耗时（毫秒）
+            jitter: 延迟的变异系数（0 为固定延迟）
+            seed: 随机种子（固定后识别结果和延迟可复现）
+        """
         self.mock_response = mock_response
+        self._rng = make_rng(seed)
+        self.base_latency = LatencyModel(base_latency_ms, jitter, self._rng)
+        self.audio_latency = LatencyModel(ms_per_audio_second, jitter, self._rng)
+
+    def _audio_seconds(self, audio_data) -> float:
+        """音频时长：bytes 视为 int16 PCM，数组视为采样点，文件路径按 1 秒估计"""
+        if isinstance(audio_data, (bytes, bytearray)):
+            return len(audio_data) / 2 / self.SAMPLE_RATE
+        if isinstance(audio_data, (np.ndarray, list)):
+            return len(audio_data) / self.SAMPLE_RATE
+        return 1.0
 
     async def transcribe(
         self,
@@ -44,28 +73,15 @@ class MockASR(ASRInterface):
         **kwargs
     ) -> str:
         """返回模拟的识别结果"""
-        # 模拟处理延迟（根据音频长度）
-        import asyncio
-        import random
-
-        # 根据音频数据大小模拟不同的处理时间
-        if isinstance(audio_data, bytes):
-            audio_length = len(audio_data)
-            delay = min(0.5, audio_length / 32000)  # 约 0.1-0.5 秒
-        else:
-            delay = 0.3
-
-        await asyncio.sleep(delay)
+        await self.base_latency.sleep()
+        await self.audio_latency.sleep(scale=self._audio_seconds(audio_data))
 
         # 每次随机返回不同的测试文本（模拟真实语音输入的变化）
-        response = random.choice(self.TEST_PHRASES)
-
-        # 添加日志
-        from loguru import logger
+        response = self.mock_response or self._rng.choice(self.TEST_PHRASES)
         logger.info(f"[Mock ASR] 返回模拟识别结果: {response}")
 
         return response
 
     async def close(self) -> None:
         """无需清理资源"""
-        pass
\ No newline at end of file
+        pass
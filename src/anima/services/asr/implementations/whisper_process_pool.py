@@ -0,0 +1,540 @@
+"""
+Faster-Whisper 多进程解码池
+
+Whisper 解码是 CPU 密集型任务，和 Socket.IO 服务跑在同一进程里时，
+解码线程的 Python 开销会挤占事件循环。开启后（worker_processes > 0）：
+- 启动 N 个 worker 进程，每个进程加载自己的模型，CPU 线程数固定为 cpu_threads
+- 音频通过 multiprocessing.shared_memory 传递（只传共享内存名称和长度，不 pickle 大数组），
+  共享内存块按大小分级复用
+- 请求派发给「待解码音频最少」的 worker
+- 健康检查：进程退出、请求超时或空闲时 ping 无响应都会重启 worker，
+  未完成的请求重试一次
+- 每个 worker 有独立的请求队列和响应管道，强制结束一个 worker 不会卡住共享锁
+
+与 WhisperBatchScheduler 提供相同的 transcribe / transcribe_timed / stats / shutdown 接口，
+FasterWhisperASR 按配置二选一。
+"""
+
+import asyncio
+import itertools
+import multiprocessing as mp
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_connections
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from ..interface import ASRSegment
+from .whisper_scheduler import join_segments
+
+
+# 共享内存块的最小尺寸（字节），按 2 的幂向上取整以便复用
+_MIN_BLOCK_BYTES = 64 * 1024
+# 每个尺寸最多缓存的空闲块数
+_MAX_FREE_BLOCKS = 4
+
+
+def _worker_main(worker_id: int, model_config: Dict[str, Any], requests, responses) -> None:
+    """
+    worker 进程入口
+
+    消息格式：
+        请求: ("decode", req_id, shm_name, num_samples, options, clips) / ("ping", token) / None（退出）
+        响应: (kind, req_id_or_token, payload)，kind 为 ready / ok / error / pong
+    """
+    cpu_threads = model_config.get("cpu_threads") or 0
+    if cpu_threads:
+        # 限制 OpenMP / BLAS 线程数，避免多个 worker 抢占同一批核心
+        os.environ.setdefault("OMP_NUM_THREADS", str(cpu_threads))
+
+    try:
+        from faster_whisper import WhisperModel
+        from .whisper_scheduler import WhisperBatchScheduler
+
+        model = WhisperModel(
+            model_config["model"],
+            device=model_config["device"],
+            compute_type=model_config["compute_type"],
+            download_root=model_config["download_root"],
+            cpu_threads=cpu_threads,
+            num_workers=1,
+        )
+    except Exception as e:
+        responses.send(("error", None, f"模型加载失败: {e}"))
+        return
+
+    responses.send(("ready", None, os.getpid()))
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+
+        if message[0] == "ping":
+            responses.send(("pong", message[1], None))
+            continue
+
+        _, req_id, shm_name, num_samples, options, clips = message
+        try:
+            # 共享内存由主进程创建和释放（spawn 出的子进程与主进程共用 resource_tracker）
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                audio = np.ndarray((num_samples,), dtype=np.float32, buffer=shm.buf)
+                units = WhisperBatchScheduler._decode_units(model, audio, options, clips)
+                del audio
+            finally:
+                shm.close()
+            responses.send(("ok", req_id, units))
+        except Exception as e:
+            responses.send(("error", req_id, str(e)))
+
+
+@dataclass
+class _PoolRequest:
+    """已派发的请求"""
+    req_id: int
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    shm: shared_memory.SharedMemory
+    num_samples: int
+    options: Dict[str, Any]
+    clips: Optional[List[Tuple[float, float]]]
+    timed: bool
+    worker_id: int = -1
+    attempts: int = 0
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class _Worker:
+    """主进程中 worker 进程的句柄"""
+
+    def __init__(self, worker_id: int, process, requests, responses):
+        self.worker_id = worker_id
+        self.process = process
+        self.requests = requests
+        self.responses = responses
+        self.eof = False
+        self.ready = False
+        self.started_at = time.monotonic()
+        self.inflight: Dict[int, _PoolRequest] = {}
+        self.ping_sent_at: Optional[float] = None
+        self.completed = 0
+
+    @property
+    def load(self) -> Tuple[int, int]:
+        """负载：(待解码采样点数, 请求数)"""
+        return sum(r.num_samples for r in self.inflight.values()), len(self.inflight)
+
+
+class WhisperProcessPool:
+    """
+    进程级共享的 Faster-Whisper 多进程解码池
+
+    Example:
+        >>> pool = WhisperProcessPool.get_shared(model="small", device="cpu", num_processes=2)
+        >>> text = await pool.transcribe(audio_np, {"language": "zh", "beam_size": 5})
+    """
+
+    _instances: Dict[Tuple, "WhisperProcessPool"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model: str,
+        device: str = "auto",
+        compute_type: str = "default",
+        download_root: Optional[str] = None,
+        num_processes: int = 2,
+        cpu_threads: int = 0,
+        request_timeout: float = 60.0,
+        health_check_interval: float = 5.0,
+        startup_timeout: float = 600.0,
+    ):
+        """
+        初始化解码池（worker 进程在第一次请求时启动）
+
+        Args:
+            model: 模型名称或路径
+            device: 运行设备
+            compute_type: 计算精度
+            download_root: 模型下载目录
+            num_processes: worker 进程数
+            cpu_threads: 每个 worker 的 CPU 线程数（0 = CTranslate2 默认）
+            request_timeout: 单个请求的最长解码时间（秒），超过后重启该 worker
+            health_check_interval: 健康检查间隔（秒）
+            startup_timeout: 模型加载的最长时间（秒）
+        """
+        self.model_config = {
+            "model": model,
+            "device": device,
+            "compute_type": compute_type,
+            "download_root": download_root,
+            "cpu_threads": cpu_threads,
+        }
+        self.num_processes = max(1, num_processes)
+        self.request_timeout = request_timeout
+        self.health_check_interval = health_check_interval
+        self.startup_timeout = startup_timeout
+
+        self._ctx = mp.get_context("spawn")
+        self._workers: Dict[int, _Worker] = {}
+        self._lock = threading.RLock()
+        self._req_ids = itertools.count(1)
+        self._free_blocks: Dict[int, List[shared_memory.SharedMemory]] = {}
+
+        self._reader: Optional[threading.Thread] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._started = False
+        self._closed = False
+        self._startup_failures = 0
+        self._broken: Optional[str] = None
+
+        # 统计
+        self.requests = 0
+        self.restarts = 0
+        self.retries = 0
+
+    @classmethod
+    def get_shared(cls, model: str, device: str = "auto", compute_type: str = "default",
+                   download_root: Optional[str] = None, **kwargs) -> "WhisperProcessPool":
+        """获取（或创建）共享解码池"""
+        key = (model, device, compute_type, download_root)
+        with cls._instances_lock:
+            if key not in cls._instances or cls._instances[key]._closed:
+                cls._instances[key] = cls(
+                    model=model, device=device, compute_type=compute_type,
+                    download_root=download_root, **kwargs
+                )
+            return cls._instances[key]
+
+    def get_model(self):
+        """模型只存在于 worker 进程中"""
+        raise RuntimeError("多进程模式下模型位于 worker 进程中，无法在主进程直接访问")
+
+    # ---------- 进程管理 ----------
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if not self._started:
+                for worker_id in range(self.num_processes):
+                    self._workers[worker_id] = self._spawn(worker_id)
+                self._reader = threading.Thread(
+                    target=self._read_responses, name="whisper-pool-reader", daemon=True
+                )
+                self._reader.start()
+                self._started = True
+                logger.info(f"[WhisperProcessPool] 启动 {self.num_processes} 个 ASR worker 进程")
+
+        loop = asyncio.get_running_loop()
+        if self._health_task is None or self._health_task.done():
+            self._health_task = loop.create_task(self._health_loop())
+
+    def _spawn(self, worker_id: int) -> _Worker:
+        requests = self._ctx.Queue()
+        responses, child_end = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.model_config, requests, child_end),
+            name=f"whisper-asr-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        # 关闭主进程持有的写端，worker 退出时读端能收到 EOF
+        child_end.close()
+        return _Worker(worker_id, process, requests, responses)
+
+    async def _restart(self, worker: _Worker, reason: str) -> None:
+        """重启 worker，未完成的请求重试一次"""
+        logger.warning(f"[WhisperProcessPool] 重启 worker {worker.worker_id}: {reason}")
+        # kill / join / spawn（新解释器 + pickle）都是阻塞操作，放到线程中，不阻塞事件循环
+        orphans = await asyncio.to_thread(self._replace_worker, worker)
+
+        for request in orphans:
+            if request.attempts < 2 and self._broken is None and not self._closed:
+                self.retries += 1
+                # 换一个请求 id，被杀掉的进程残留在队列里的响应会被忽略
+                request.req_id = next(self._req_ids)
+                self._dispatch(request)
+            else:
+                self._finish(request, error=RuntimeError(f"ASR worker 异常: {reason}"))
+
+    def _replace_worker(self, worker: _Worker) -> List[_PoolRequest]:
+        """
+        停止旧进程并启动新进程（线程中执行），返回需要重新派发的请求
+
+        只在替换时短暂持锁；替换前派发给旧进程的请求（它已不存活，只在没有其他
+        worker 时才会被选中）也一并返回
+        """
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=1.0)
+        worker.responses.close()
+        worker.requests.cancel_join_thread()
+        replacement = None if self._closed else self._spawn(worker.worker_id)
+
+        with self._lock:
+            orphans = list(worker.inflight.values())
+            worker.inflight.clear()
+            if replacement is not None and not self._closed and self._workers.get(worker.worker_id) is worker:
+                self._workers[worker.worker_id] = replacement
+                self.restarts += 1
+                replacement = None
+        if replacement is not None:
+            # 重启期间解码池已关闭
+            replacement.process.kill()
+            replacement.responses.close()
+        return orphans
+
+    async def _health_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            now = time.monotonic()
+            if self._broken is not None:
+                continue
+            for worker in list(self._workers.values()):
+                if not worker.process.is_alive():
+                    await self._restart(worker, f"进程退出 (exitcode={worker.process.exitcode})")
+                elif not worker.ready:
+                    if now - worker.started_at > self.startup_timeout:
+                        await self._restart(worker, "模型加载超时")
+                elif worker.inflight:
+                    oldest = min(r.submitted_at for r in worker.inflight.values())
+                    if now - oldest > self.request_timeout:
+                        await self._restart(worker, f"请求超过 {self.request_timeout:.0f}s 未完成")
+                elif worker.ping_sent_at is not None:
+                    # 空闲 worker 应该立即回复 ping
+                    if now - worker.ping_sent_at > self.health_check_interval * 2:
+                        await self._restart(worker, "ping 无响应")
+                else:
+                    worker.ping_sent_at = now
+                    worker.requests.put(("ping", now))
+
+    # ---------- 共享内存 ----------
+
+    def _acquire_block(self, nbytes: int) -> shared_memory.SharedMemory:
+        size = max(_MIN_BLOCK_BYTES, 1 << (nbytes - 1).bit_length())
+        with self._lock:
+            free = self._free_blocks.get(size)
+            if free:
+                return free.pop()
+        return shared_memory.SharedMemory(create=True, size=size)
+
+    def _release_block(self, shm: shared_memory.SharedMemory) -> None:
+        with self._lock:
+            free = self._free_blocks.setdefault(shm.size, [])
+            if len(free) < _MAX_FREE_BLOCKS and not self._closed:
+                free.append(shm)
+                return
+        shm.close()
+        shm.unlink()
+
+    # ---------- 请求 ----------
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        options: Dict[str, Any],
+        clips: Optional[List[Tuple[float, float]]] = None,
+    ) -> str:
+        """提交一个语音片段并等待识别结果（参数同 WhisperBatchScheduler.transcribe）"""
+        if len(audio) == 0 or clips == []:
+            return ""
+        return await self._submit(audio, options, clips, timed=False)
+
+    async def transcribe_timed(
+        self,
+        audio: np.ndarray,
+        options: Dict[str, Any],
+        clips: Optional[List[Tuple[float, float]]] = None,
+    ) -> List[ASRSegment]:
+        """提交一个语音片段并返回带时间戳的片段"""
+        if len(audio) == 0 or clips == []:
+            return []
+        return await self._submit(audio, options, clips, timed=True)
+
+    @property
+    def pending(self) -> int:
+        """已派发、尚未完成的请求数"""
+        with self._lock:
+            return sum(len(w.inflight) for w in self._workers.values())
+
+    async def _submit(self, audio: np.ndarray, options: Dict[str, Any],
+                      clips: Optional[List[Tuple[float, float]]], timed: bool):
+        if self._closed:
+            raise RuntimeError("WhisperProcessPool 已关闭")
+        if self._broken is not None:
+            raise RuntimeError(f"ASR worker 无法启动: {self._broken}")
+        self._ensure_started()
+
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = self._acquire_block(audio.nbytes)
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+
+        loop = asyncio.get_running_loop()
+        request = _PoolRequest(
+            req_id=next(self._req_ids),
+            future=loop.create_future(),
+            loop=loop,
+            shm=shm,
+            num_samples=len(audio),
+            options=options,
+            clips=clips,
+            timed=timed,
+        )
+        self.requests += 1
+        self._dispatch(request)
+        return await request.future
+
+    def _dispatch(self, request: _PoolRequest) -> None:
+        """派发给待解码音频最少的 worker"""
+        with self._lock:
+            candidates = [w for w in self._workers.values() if w.process.is_alive()] or list(self._workers.values())
+            worker = min(candidates, key=lambda w: (not w.ready, w.load))
+            request.worker_id = worker.worker_id
+            request.attempts += 1
+            request.submitted_at = time.monotonic()
+            worker.inflight[request.req_id] = request
+            worker.requests.put((
+                "decode", request.req_id, request.shm.name, request.num_samples,
+                request.options, request.clips,
+            ))
+
+    def _read_responses(self) -> None:
+        """读取 worker 响应（后台线程）"""
+        while not self._closed:
+            with self._lock:
+                workers = {
+                    w.responses: w for w in self._workers.values()
+                    if not w.eof and not w.responses.closed
+                }
+            if not workers:
+                time.sleep(0.1)
+                continue
+
+            try:
+                ready = wait_connections(list(workers), timeout=0.5)
+            except (OSError, ValueError):
+                # 复制连接列表之后 _restart 关闭了其中的连接，重新读取 worker 列表
+                continue
+
+            for conn in ready:
+                worker = workers[conn]
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    # worker 已退出，由健康检查负责重启
+                    worker.eof = True
+                    continue
+                self._handle_response(worker, message)
+
+    def _handle_response(self, worker: _Worker, message: Tuple) -> None:
+        kind, key, payload = message
+        worker_id = worker.worker_id
+        with self._lock:
+            if self._workers.get(worker_id) is not worker:
+                # 已被替换的 worker 的残留响应
+                return
+            if kind == "ready":
+                worker.ready = True
+                self._startup_failures = 0
+                logger.info(f"[WhisperProcessPool] worker {worker_id} 就绪 (pid={payload})")
+                return
+            if kind == "pong":
+                worker.ping_sent_at = None
+                return
+            if kind == "error" and key is None:
+                # 模型加载失败：连续失败过多时停止重启，后续请求直接报错
+                logger.error(f"[WhisperProcessPool] worker {worker_id} 启动失败: {payload}")
+                self._startup_failures += 1
+                if self._startup_failures < 3 * self.num_processes:
+                    return
+                self._broken = payload
+                stranded = [r for w in self._workers.values() for r in w.inflight.values()]
+                for w in self._workers.values():
+                    w.inflight.clear()
+            else:
+                stranded = []
+                request = worker.inflight.pop(key, None)
+                if request is None:
+                    return
+                worker.completed += 1
+
+        if stranded:
+            for request in stranded:
+                self._finish(request, error=RuntimeError(f"ASR worker 无法启动: {payload}"))
+        elif kind == "ok":
+            self._finish(request, result=payload)
+        else:
+            self._finish(request, error=RuntimeError(payload))
+
+    def _finish(self, request: _PoolRequest, result=None, error: Optional[Exception] = None) -> None:
+        self._release_block(request.shm)
+        value = None
+        if error is None:
+            value = result if request.timed else join_segments(result)
+
+        def resolve():
+            if request.future.done():
+                return
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(value)
+
+        request.loop.call_soon_threadsafe(resolve)
+
+    # ---------- 统计 / 关闭 ----------
+
+    def stats(self) -> Dict[str, Any]:
+        """解码池统计"""
+        with self._lock:
+            workers = {
+                worker_id: {
+                    "pid": worker.process.pid,
+                    "alive": worker.process.is_alive(),
+                    "ready": worker.ready,
+                    "inflight": len(worker.inflight),
+                    "completed": worker.completed,
+                }
+                for worker_id, worker in self._workers.items()
+            }
+        return {
+            "requests": self.requests,
+            "restarts": self.restarts,
+            "retries": self.retries,
+            "workers": workers,
+        }
+
+    def shutdown(self) -> None:
+        """停止所有 worker 并释放共享内存"""
+        self._closed = True
+        if self._health_task and not self._health_task.done():
+            self._health_task.cancel()
+
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            try:
+                worker.requests.put(None)
+            except (OSError, ValueError):
+                pass
+        for worker in workers:
+            worker.process.join(timeout=2.0)
+            if worker.process.is_alive():
+                worker.process.kill()
+            worker.responses.close()
+            for request in worker.inflight.values():
+                self._finish(request, error=RuntimeError("WhisperProcessPool 已关闭"))
+
+        with self._lock:
+            blocks = [shm for free in self._free_blocks.values() for shm in free]
+            self._free_blocks.clear()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
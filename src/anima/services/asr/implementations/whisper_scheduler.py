@@ -0,0 +1,428 @@
+"""
+Faster-Whisper 批量识别调度器
+
+每个会话都有自己的 FasterWhisperASR 实例，但同一份模型配置在进程内只加载一次，
+由调度器统一排队：
+- 所有会话的语音片段进入同一个队列
+- 调度器在 batch_wait_ms 窗口内收集请求（最多 max_batch_size 条），
+  用 faster-whisper 的 BatchedInferencePipeline 一次性批量解码
+- 解码在专用的、固定大小的线程池中执行（不占用默认 executor）
+- 所有 worker 都忙时请求继续在队列中累积，负载越高批次越大
+
+批量解码原理：把多个片段拼接成一段音频，并为每个片段提供 clip_timestamps，
+BatchedInferencePipeline 会把每个 clip 作为独立的 chunk 送入同一个 batch，
+输出的 segment 按起始时间映射回原请求。
+"""
+
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from ..interface import ASRSegment
+
+
+SAMPLE_RATE = 16000
+
+# Whisper 单个 chunk 的最大长度（秒）
+MAX_CLIP_SECONDS = 30.0
+
+
+@dataclass
+class _Request:
+    """排队中的识别请求"""
+    audio: np.ndarray
+    options: Dict[str, Any]
+    future: asyncio.Future
+    timed: bool = False  # True 时返回 ASRSegment 列表而不是文本
+    clips: Optional[List[Tuple[float, float]]] = None  # 上游 VAD 的语音区间（秒）
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    started: bool = False  # 已交给 worker 解码
+
+    @property
+    def group_key(self) -> Tuple:
+        """只有解码参数相同的请求才能放进同一个 batch"""
+        return tuple(sorted((k, repr(v)) for k, v in self.options.items()))
+
+
+def segment_units(segment, offset: float = 0.0) -> List[ASRSegment]:
+    """把 faster-whisper 的 Segment 转成 ASRSegment（有词级时间戳时按词拆分）"""
+    logprob = getattr(segment, "avg_logprob", 0.0)
+    words = getattr(segment, "words", None)
+    if words:
+        return [ASRSegment(w.start - offset, w.end - offset, w.word, logprob) for w in words]
+    return [ASRSegment(segment.start - offset, segment.end - offset, segment.text, logprob)]
+
+
+def faster_whisper_version() -> Tuple[int, ...]:
+    """已安装的 faster-whisper 版本（只取数字部分，未安装或无法解析时为 (0,)）"""
+    try:
+        from faster_whisper import __version__
+    except ImportError:
+        return (0,)
+    parts = []
+    for part in __version__.split(".")[:3]:
+        match = re.match(r"\d+", part)
+        if match is None:
+            break
+        parts.append(int(match.group()))
+        if match.end() < len(part):
+            break  # 预发布后缀（如 1.2.0rc1）之后不再解析
+    return tuple(parts) or (0,)
+
+
+def join_segments(units: List[ASRSegment]) -> str:
+    """拼接片段文本（Whisper 的词/句文本自带前导空格）"""
+    return "".join(unit.text for unit in units).strip()
+
+
+class WhisperBatchScheduler:
+    """
+    进程级共享的 Faster-Whisper 调度器
+
+    Example:
+        >>> scheduler = WhisperBatchScheduler.get_shared(model="small", device="cpu")
+        >>> text = await scheduler.transcribe(audio_np, {"language": "zh", "beam_size": 5})
+    """
+
+    _instances: Dict[Tuple, "WhisperBatchScheduler"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model: str,
+        device: str = "auto",
+        compute_type: str = "default",
+        download_root: Optional[str] = None,
+        num_workers: int = 1,
+        cpu_threads: int = 0,
+        max_batch_size: int = 8,
+        batch_wait_ms: float = 20.0,
+    ):
+        """
+        初始化调度器
+
+        Args:
+            model: 模型名称或路径
+            device: 运行设备
+            compute_type: 计算精度
+            download_root: 模型下载目录
+            num_workers: 并行解码的 worker 数（线程池大小，同时传给 WhisperModel）
+            cpu_threads: 每个 worker 的 CPU 线程数（0 = CTranslate2 默认）
+            max_batch_size: 单个 batch 的最大请求数（1 = 不批量）
+            batch_wait_ms: 收集 batch 的等待窗口
+        """
+        self.model_name = model
+        self.device = device
+        self.compute_type = compute_type
+        self.download_root = download_root
+        self.num_workers = max(1, num_workers)
+        self.cpu_threads = cpu_threads
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_wait = batch_wait_ms / 1000.0
+
+        self._model = None
+        self._pipeline = None
+        self._model_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.num_workers,
+            thread_name_prefix="whisper-asr"
+        )
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 统计
+        self.batches = 0
+        self.requests = 0
+        self._pending = 0
+
+    @classmethod
+    def get_shared(cls, model: str, device: str = "auto", compute_type: str = "default",
+                   download_root: Optional[str] = None, **kwargs) -> "WhisperBatchScheduler":
+        """
+        获取（或创建）共享调度器
+
+        相同 model / device / compute_type / download_root 的 ASR 实例共用一个调度器和模型
+        """
+        key = (model, device, compute_type, download_root)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(
+                    model=model, device=device, compute_type=compute_type,
+                    download_root=download_root, **kwargs
+                )
+            return cls._instances[key]
+
+    # ---------- 模型 ----------
+
+    def get_model(self):
+        """懒加载模型（线程安全）"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        from faster_whisper import WhisperModel
+                    except ImportError:
+                        logger.error("faster-whisper 未安装，请运行: pip install faster-whisper")
+                        raise ImportError(
+                            "faster-whisper 未安装，请运行: pip install faster-whisper"
+                        )
+
+                    logger.info(f"正在加载 Faster-Whisper 模型: {self.model_name}...")
+                    self._model = WhisperModel(
+                        self.model_name,
+                        device=self.device,
+                        compute_type=self.compute_type,
+                        download_root=self.download_root,
+                        cpu_threads=self.cpu_threads,
+                        num_workers=self.num_workers,
+                    )
+
+                    # 批量解码传入的 clip_timestamps 以秒为单位，需要 faster-whisper >= 1.2
+                    # （1.1.x 按采样点切片，< 1.1 没有批量推理），版本不满足时退化为逐条解码
+                    if faster_whisper_version() >= (1, 2):
+                        from faster_whisper import BatchedInferencePipeline
+                        self._pipeline = BatchedInferencePipeline(model=self._model)
+                    else:
+                        logger.warning(
+                            "[WhisperBatchScheduler] 批量推理需要 faster-whisper >= 1.2，当前版本逐条解码"
+                        )
+                        self._pipeline = None
+
+                    logger.info("✅ Faster-Whisper 模型加载完成")
+        return self._model
+
+    # ---------- 调度 ----------
+
+    def _ensure_dispatcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.num_workers)
+            self._dispatcher = loop.create_task(self._dispatch_loop())
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        options: Dict[str, Any],
+        clips: Optional[List[Tuple[float, float]]] = None,
+    ) -> str:
+        """
+        提交一个语音片段并等待识别结果
+
+        Args:
+            audio: 16kHz float32 单声道音频
+            options: model.transcribe 的参数（language / beam_size / vad_filter ...）
+            clips: 语音区间 [(start, end)]（秒），存在时只解码这些区间
+
+        Returns:
+            str: 识别文本
+        """
+        if len(audio) == 0 or clips == []:
+            return ""
+        return await self._submit(audio, options, timed=False, clips=clips)
+
+    async def transcribe_timed(
+        self,
+        audio: np.ndarray,
+        options: Dict[str, Any],
+        clips: Optional[List[Tuple[float, float]]] = None,
+    ) -> List[ASRSegment]:
+        """
+        提交一个语音片段并返回带时间戳的片段
+
+        options 中带 word_timestamps=True 时返回词级片段，否则返回句级片段
+        """
+        if len(audio) == 0 or clips == []:
+            return []
+        return await self._submit(audio, options, timed=True, clips=clips)
+
+    @property
+    def pending(self) -> int:
+        """排队中 + 解码中的请求数（调用方已取消、尚未解码的请求不计入）"""
+        return self._pending
+
+    async def _submit(self, audio: np.ndarray, options: Dict[str, Any], timed: bool,
+                      clips: Optional[List[Tuple[float, float]]] = None):
+        self._ensure_dispatcher()
+        request = _Request(audio=audio, options=options, future=self._loop.create_future(),
+                           timed=timed, clips=clips)
+        self._pending += 1
+        self._queue.put_nowait(request)
+        try:
+            return await request.future
+        except asyncio.CancelledError:
+            # 还在排队：立即不再计入（请求留在队列中，派发时丢弃）；已在解码的由 _run_group 计数
+            if not request.started:
+                self._pending -= 1
+            raise
+
+    @staticmethod
+    def _drop_cancelled(requests: List[_Request]) -> List[_Request]:
+        """去掉调用方已不再等待的请求（打断 / 流重置时取消），不占用解码"""
+        return [r for r in requests if not r.future.done()]
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            # 先占用一个 worker，再开始收集 batch：worker 全忙时请求在队列中累积
+            await self._slots.acquire()
+            batch: List[_Request] = []
+            while not batch:
+                batch = self._drop_cancelled([await self._queue.get()])
+
+            deadline = time.perf_counter() + self.batch_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        request = await asyncio.wait_for(self._queue.get(), remaining)
+                    else:
+                        request = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                batch.extend(self._drop_cancelled([request]))
+
+            # 按解码参数分组，第一组使用已占用的 worker，其余组各自再占用一个
+            groups: Dict[Tuple, List[_Request]] = {}
+            for request in batch:
+                groups.setdefault(request.group_key, []).append(request)
+
+            for i, requests in enumerate(groups.values()):
+                if i > 0:
+                    await self._slots.acquire()
+                self._loop.create_task(self._run_group(requests))
+
+    async def _run_group(self, requests: List[_Request]) -> None:
+        # 等待 worker 期间被取消的请求
+        requests = self._drop_cancelled(requests)
+        for request in requests:
+            request.started = True
+        try:
+            if not requests:
+                return
+            results = await self._loop.run_in_executor(self._executor, self._decode_sync, requests)
+            for request, units in zip(requests, results):
+                if not request.future.done():
+                    request.future.set_result(units if request.timed else join_segments(units))
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._pending -= len(requests)
+            self._slots.release()
+
+    # ---------- 解码（executor 线程） ----------
+
+    def _decode_sync(self, requests: List[_Request]) -> List[List[ASRSegment]]:
+        model = self.get_model()
+        start = time.perf_counter()
+        options = dict(requests[0].options)
+
+        if len(requests) == 1 or self._pipeline is None:
+            results = [self._decode_units(model, r.audio, r.options, r.clips) for r in requests]
+        else:
+            results = self._decode_batch(requests, options)
+
+        self.batches += 1
+        self.requests += len(requests)
+        waited = max(start - r.enqueued_at for r in requests)
+        logger.debug(
+            f"[WhisperBatchScheduler] batch={len(requests)} 解码 {time.perf_counter() - start:.3f}s, "
+            f"最长排队 {waited * 1000:.0f}ms"
+        )
+        return results
+
+    @staticmethod
+    def _decode_units(model, audio: np.ndarray, options: Dict[str, Any],
+                      clips: Optional[List[Tuple[float, float]]] = None) -> List[ASRSegment]:
+        if clips:
+            # WhisperModel.transcribe 的 clip_timestamps 是 [start, end, start, end, ...]（秒）
+            options = dict(options, vad_filter=False, clip_timestamps=[t for clip in clips for t in clip])
+            options.pop("vad_parameters", None)
+        segments, info = model.transcribe(audio, **options)
+        units = []
+        for segment in segments:
+            units.extend(segment_units(segment))
+        logger.debug(
+            f"Faster-Whisper 检测信息: language='{info.language}', "
+            f"language_probability={info.language_probability:.2f}"
+        )
+        return units
+
+    def _decode_batch(self, requests: List[_Request], options: Dict[str, Any]) -> List[List[ASRSegment]]:
+        """拼接多个片段，用 clip_timestamps 一次批量解码"""
+        clips = []     # {"start", "end"}（秒）
+        owners = []    # 每个 clip 属于哪个请求
+        offsets = []   # 每个请求在拼接音频中的起点（秒）
+        offset = 0
+        for index, request in enumerate(requests):
+            offsets.append(offset / SAMPLE_RATE)
+            length = len(request.audio)
+            # 有上游 VAD 区间时只解码语音部分，否则整段；超过 30 秒的区间拆成多个 clip
+            spans = request.clips or [(0.0, length / SAMPLE_RATE)]
+            for span_start, span_end in spans:
+                clip_start = span_start
+                while True:
+                    clip_end = min(clip_start + MAX_CLIP_SECONDS, span_end)
+                    clips.append({
+                        "start": offset / SAMPLE_RATE + clip_start,
+                        "end": offset / SAMPLE_RATE + clip_end,
+                    })
+                    owners.append(index)
+                    if clip_end >= span_end:
+                        break
+                    clip_start = clip_end
+            offset += length
+
+        audio = np.concatenate([r.audio for r in requests])
+
+        # clip_timestamps 存在时 faster-whisper 不再运行内部 VAD
+        options.pop("vad_filter", None)
+        options.pop("vad_parameters", None)
+        options.pop("clip_timestamps", None)
+
+        segments, _ = self._pipeline.transcribe(
+            audio,
+            clip_timestamps=clips,
+            batch_size=len(clips),
+            **options
+        )
+
+        starts = np.array([clip["start"] for clip in clips])
+        parts: List[List[ASRSegment]] = [[] for _ in requests]
+        for segment in segments:
+            # segment.start 是绝对时间（已加上 clip 偏移），四舍五入到毫秒
+            clip_index = int(np.searchsorted(starts, segment.start + 1e-3, side="right")) - 1
+            owner = owners[max(clip_index, 0)]
+            parts[owner].extend(segment_units(segment, offsets[owner]))
+
+        return parts
+
+    def stats(self) -> Dict[str, Any]:
+        """调度统计"""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "pending": self._pending,
+        }
+
+    def shutdown(self) -> None:
+        """停止调度并释放模型"""
+        if self._dispatcher and not self._dispatcher.done():
+            self._dispatcher.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._model = None
+        self._pipeline = None
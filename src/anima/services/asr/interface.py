@@ -3,10 +3,18 @@ ASR (语音识别) 接口定义
 """
 
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import List, NamedTuple, Union
 from pathlib import Path
 
 
+class ASRSegment(NamedTuple):
+    """带时间戳的识别片段（词或句，时间单位：秒，相对于输入音频起点）"""
+    start: float
+    end: float
+    text: str
+    avg_logprob: float = 0.0  # 所属句子的平均对数概率（Whisper 解码置信度）
+
+
 class ASRInterface(ABC):
     """
     语音识别接口的抽象基类
@@ -33,6 +41,28 @@ class ASRInterface(ABC):
         """
         pass
 
+    @property
+    def supports_streaming(self) -> bool:
+        """
+        是否支持流式部分识别
+
+        支持的实现需要覆盖 transcribe_timed，返回带时间戳的片段
+        """
+        return False
+
+    async def transcribe_timed(self, audio_data, **kwargs) -> List[ASRSegment]:
+        """
+        识别音频并返回带时间戳的片段（流式部分识别使用）
+
+        Args:
+            audio_data: 16kHz float32 单声道音频
+            **kwargs: 额外参数
+
+        Returns:
+            List[ASRSegment]: 按时间排序的片段
+        """
+        raise NotImplementedError(f"{type(self).__name__} 不支持带时间戳的识别")
+
     @abstractmethod
     async def close(self) -> None:
         """清理资源"""
@@ -0,0 +1,197 @@
+"""
+流式部分识别（Local Agreement）
+
+VAD 处于 ACTIVE 状态时，按固定节奏对「未确认窗口」重新解码：
+- 窗口从上次确认的位置开始，随用户说话不断增长
+- 相邻两次解码结果的最长公共前缀（按词比较）视为稳定，提交为已确认文本，
+  窗口起点前移到最后一个确认词的结束时间
+- 每次解码后推送 user-transcript 部分结果（is_final=False）
+
+语音结束时只需解码最后一小段未确认的尾部音频，
+已确认的文本和采样点偏移通过 metadata 交给 ASRStep。
+"""
+
+import asyncio
+import re
+import time
+import unicodedata
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from .interface import ASRInterface, ASRSegment
+
+
+SAMPLE_RATE = 16000
+
+# 传给 ASRStep 的 metadata 键
+STREAM_PREFIX_KEY = "asr_stream_prefix"
+
+_PUNCT_RE = re.compile(r"[\W_]+")
+_CJK_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def _normalize_word(text: str) -> str:
+    """比较用的归一化：忽略大小写、空白和标点"""
+    return _PUNCT_RE.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def join_transcript(prefix: str, tail: str) -> str:
+    """
+    拼接已确认文本和尾部识别结果
+
+    两侧都是非中日韩字符时补一个空格
+    """
+    prefix = prefix.strip()
+    tail = tail.strip()
+    if not prefix or not tail:
+        return prefix or tail
+    if _CJK_RE.match(prefix[-1]) or _CJK_RE.match(tail[0]):
+        return prefix + tail
+    return f"{prefix} {tail}"
+
+
+class LocalAgreementTranscriber:
+    """
+    单个会话的流式识别器
+
+    Example:
+        >>> stream = LocalAgreementTranscriber(asr_engine, on_partial=send_partial)
+        >>> stream.feed(vad_engine.get_buffered_audio())   # VAD ACTIVE 期间反复调用
+        >>> prefix = stream.finish()                        # 语音结束
+        >>> metadata[STREAM_PREFIX_KEY] = prefix
+    """
+
+    def __init__(
+        self,
+        asr_engine: ASRInterface,
+        on_partial: Optional[Callable[[str], Awaitable[None]]] = None,
+        interval_ms: float = 800.0,
+        min_audio_ms: float = 1000.0,
+        max_window_s: float = 25.0,
+    ):
+        """
+        初始化流式识别器
+
+        Args:
+            asr_engine: 支持 transcribe_timed 的 ASR 引擎
+            on_partial: 部分结果回调（参数为当前完整的部分文本）
+            interval_ms: 两次解码之间至少新增的音频时长
+            min_audio_ms: 开始第一次解码前至少需要的音频时长
+            max_window_s: 未确认窗口的最大时长（超过后不再解码，等待语音结束）
+        """
+        self.asr_engine = asr_engine
+        self.on_partial = on_partial
+        self.interval_samples = int(interval_ms * SAMPLE_RATE / 1000)
+        self.min_samples = int(min_audio_ms * SAMPLE_RATE / 1000)
+        self.max_window_samples = int(max_window_s * SAMPLE_RATE)
+
+        self._task: Optional[asyncio.Task] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """开始新的一句话"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+        self.committed: List[ASRSegment] = []   # 已确认的词（绝对时间）
+        self.committed_samples = 0               # 已确认音频的结束位置
+        self._previous: List[ASRSegment] = []   # 上一次解码中未确认的词（绝对时间）
+        self._decoded_samples = 0                # 上一次解码时的音频长度
+        self._last_partial = ""
+
+        # 统计
+        self.decodes = 0
+        self.decode_seconds = 0.0
+
+    @property
+    def committed_text(self) -> str:
+        return "".join(unit.text for unit in self.committed).strip()
+
+    def feed(self, pcm: np.ndarray) -> None:
+        """
+        提供当前语音的全部缓冲音频（int16 PCM 数组），必要时在后台启动一次解码
+
+        不会阻塞调用方；上一次解码未完成时直接返回。
+        pcm 可以是 VAD 内部缓冲区的视图，需要的部分会在返回前复制出来
+        """
+        total = len(pcm)
+        if total < self.min_samples or total - self._decoded_samples < self.interval_samples:
+            return
+        if total - self.committed_samples > self.max_window_samples:
+            return
+        if self._task is not None and not self._task.done():
+            return
+
+        window = np.multiply(pcm[self.committed_samples:], 1.0 / 32767.0, dtype=np.float32)
+        self._decoded_samples = total
+        self._task = asyncio.get_running_loop().create_task(self._decode(window, self.committed_samples))
+
+    async def _decode(self, window: np.ndarray, window_start: int) -> None:
+        start = time.perf_counter()
+        try:
+            units = await self.asr_engine.transcribe_timed(window)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[LocalAgreementTranscriber] 部分识别失败: {e}")
+            return
+        self.decodes += 1
+        self.decode_seconds += time.perf_counter() - start
+
+        # 窗口在解码期间被 reset/finish 时丢弃结果
+        if window_start != self.committed_samples:
+            return
+
+        offset = window_start / SAMPLE_RATE
+        hypothesis = [ASRSegment(u.start + offset, u.end + offset, u.text) for u in units if u.text.strip()]
+        self._agree(hypothesis)
+
+        partial = "".join(u.text for u in self.committed + self._previous).strip()
+        if partial and partial != self._last_partial:
+            self._last_partial = partial
+            if self.on_partial is not None:
+                try:
+                    await self.on_partial(partial)
+                except Exception as e:
+                    logger.warning(f"[LocalAgreementTranscriber] 推送部分结果失败: {e}")
+
+    def _agree(self, hypothesis: List[ASRSegment]) -> None:
+        """提交与上一次解码结果一致的最长前缀"""
+        agreed = 0
+        for previous, current in zip(self._previous, hypothesis):
+            if _normalize_word(previous.text) != _normalize_word(current.text):
+                break
+            agreed += 1
+
+        if agreed:
+            confirmed = hypothesis[:agreed]
+            self.committed.extend(confirmed)
+            self.committed_samples = max(
+                self.committed_samples,
+                min(int(confirmed[-1].end * SAMPLE_RATE), self._decoded_samples)
+            )
+            logger.debug(f"[LocalAgreementTranscriber] 确认: {''.join(u.text for u in confirmed)!r}")
+
+        self._previous = hypothesis[agreed:]
+
+    def finish(self) -> Optional[Dict[str, object]]:
+        """
+        语音结束：停止后台解码，返回已确认的前缀
+
+        Returns:
+            {"text": 已确认文本, "samples": 已确认音频的采样点数}，没有确认内容时返回 None
+        """
+        text = self.committed_text
+        samples = self.committed_samples
+        if self.decodes:
+            logger.debug(
+                f"[LocalAgreementTranscriber] 部分解码 {self.decodes} 次，"
+                f"共 {self.decode_seconds:.2f}s，已确认 {samples / SAMPLE_RATE:.2f}s"
+            )
+        self.reset()
+        if not text or samples <= 0:
+            return None
+        return {"text": text, "samples": samples}
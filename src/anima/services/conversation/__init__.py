@@ -5,8 +5,12 @@
 
 from .orchestrator import ConversationOrchestrator
 from .session_manager import SessionManager
+from .turn_scheduler import TurnCancelled, TurnDropped, TurnScheduler
 
 __all__ = [
     "ConversationOrchestrator",
     "SessionManager",
+    "TurnScheduler",
+    "TurnCancelled",
+    "TurnDropped",
 ]
\ No newline at end of file
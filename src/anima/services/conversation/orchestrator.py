@@ -4,7 +4,8 @@
 使用 InputPipeline 和 OutputPipeline 处理数据流
 """
 
-from typing import TYPE_CHECKING, Optional, Any, Union
+import asyncio
+from typing import TYPE_CHECKING, Optional, Any, Union, List, Dict
 from dataclasses import dataclass, field
 from loguru import logger
 import numpy as np
@@ -15,6 +16,9 @@ from anima.events.core import EventBus, EventRouter, EventPriority
 from anima.core import EventType, OutputEvent
 from anima.pipeline import InputPipeline, OutputPipeline
 from anima.pipeline.steps import ASRStep, TextCleanStep, EmotionExtractionStep
+from anima.utils.metrics import ERRORS_TOTAL, INTERRUPTS_TOTAL, TTS_PENDING, TURNS_TOTAL
+from anima.utils.tracing import SPEECH_END_KEY, TRACE_RECORDER, current_trace, mark, span, trace_stream
+from .turn_scheduler import TurnCancelled, TurnDropped, TurnScheduler
 
 if TYPE_CHECKING:
     from anima.services.asr import ASRInterface
@@ -76,6 +80,10 @@ class ConversationOrchestrator:
         live2d_config=None,
         memory_system: Optional["MemorySystem"] = None,
         local_llm: Optional["LLMInterface"] = None,
+        event_bus: Optional[EventBus] = None,
+        coalesce_window_ms: float = 0.0,
+        coalesce_max_chars: int = 64,
+        max_queued_turns: int = 2,
     ):
         """
         初始化对话编排器
@@ -89,6 +97,10 @@ class ConversationOrchestrator:
             live2d_config: Live2D 配置（可选）
             memory_system: 记忆系统（可选）
             local_llm: 本地LLM（用于简单应答，无persona，可选）
+            event_bus: 事件总线（可选，默认串行分发）
+            coalesce_window_ms: 合并 LLM 文本片段的时间窗口（毫秒，0 表示不合并）
+            coalesce_max_chars: 合并后单个 sentence 事件的最大字符数
+            max_queued_turns: 上一轮未结束时最多排队的输入数
         """
         self.asr_engine = asr_engine
         self.tts_engine = tts_engine
@@ -106,16 +118,23 @@ class ConversationOrchestrator:
             self.websocket_send = adapter.send
 
         # 创建 EventBus 和 EventRouter
-        self.event_bus = EventBus()
+        self.event_bus = event_bus or EventBus()
         self.event_router = EventRouter(self.event_bus)
 
         # 创建输入和输出管线
         self.input_pipeline = InputPipeline(event_bus=self.event_bus)
-        self.output_pipeline = OutputPipeline(event_bus=self.event_bus)
+        self.output_pipeline = OutputPipeline(
+            event_bus=self.event_bus,
+            coalesce_window_ms=coalesce_window_ms,
+            coalesce_max_chars=coalesce_max_chars,
+        )
 
         # 自动组装默认管线步骤
         self._setup_default_pipeline()
 
+        # 轮次调度（每个会话同时只运行一轮）
+        self.turns = TurnScheduler(self.session_id, max_queued=max_queued_turns)
+
         # 状态
         self._is_running = False
         self._interrupted = False
@@ -240,7 +259,8 @@ class ConversationOrchestrator:
         logger.info(f"[{self.session_id}] 编排器已启动")
     
     def stop(self) -> None:
-        """停止编排器（清理所有订阅）"""
+        """停止编排器（取消进行中和排队的轮次，清理所有订阅）"""
+        self.turns.cancel_all()
         self.event_router.clear()
         self._is_running = False
         logger.info(f"[{self.session_id}] 编排器已停止")
@@ -248,7 +268,12 @@ class ConversationOrchestrator:
     def interrupt(self) -> None:
         """打断当前处理"""
         self._interrupted = True
+        INTERRUPTS_TOTAL.inc()
         self.output_pipeline.interrupt()
+        # 取消正在运行的轮次（LLM 流、TTS 合成随之取消）
+        self.turns.cancel_active()
+        # 并发分发模式下丢弃还没发出去的本轮事件
+        self.event_bus.discard_pending()
 
         # 发送惊讶表情（同步版本，用于非异步上下文）
         self._emit_expression_sync("surprised")
@@ -260,14 +285,20 @@ class ConversationOrchestrator:
         raw_input: Union[str, np.ndarray],
         metadata: Optional[dict] = None,
         from_name: str = "User",
+        speech_timestamps: Optional[List[Dict[str, int]]] = None,
     ) -> ConversationResult:
         """
         处理输入（文本或音频）
+
+        每次调用是一轮对话，整轮记录为一个追踪（轮次 ID 见结果 metadata["turn_id"]）。
+        每轮在 TurnScheduler 中作为独立任务运行：同一会话同时只有一轮，
+        上一轮未结束时本次输入排队；interrupt() 取消正在运行的轮次。
         
         Args:
             raw_input: 输入内容（文本字符串或音频 numpy 数组）
-            metadata: 元数据
+            metadata: 元数据（metadata[SPEECH_END_KEY] 为 VAD 判定说完的时刻，作为延迟指标的起点）
             from_name: 发送者名称
+            speech_timestamps: VAD 输出的语音区间（音频输入时，ASR 据此跳过内部 VAD）
             
         Returns:
             ConversationResult: 处理结果
@@ -275,17 +306,76 @@ class ConversationOrchestrator:
         if not self._is_running:
             logger.warning(f"[{self.session_id}] 编排器未启动，自动启动")
             self.start()
-        
+
+        try:
+            return await self.turns.submit(
+                lambda: self._run_turn(raw_input, metadata, from_name, speech_timestamps)
+            )
+        except TurnCancelled:
+            return ConversationResult(
+                success=False,
+                error="处理被中断",
+                metadata={"interrupted": True}
+            )
+        except TurnDropped:
+            return ConversationResult(
+                success=False,
+                error="输入过多，已丢弃较早的输入",
+                metadata={"dropped": True}
+            )
+
+    async def _run_turn(
+        self,
+        raw_input: Union[str, np.ndarray],
+        metadata: Optional[dict],
+        from_name: str,
+        speech_timestamps: Optional[List[Dict[str, int]]],
+    ) -> ConversationResult:
+        """运行一轮对话（在轮次任务中，取消时 status 记为 interrupted）"""
         self._is_processing = True
         self._interrupted = False
         self.output_pipeline.reset()
-        
+
+        trace = TRACE_RECORDER.start_turn(
+            self.session_id,
+            reference=(metadata or {}).get(SPEECH_END_KEY),
+        )
+        result = None
+        try:
+            result = await self._process_turn(raw_input, metadata, from_name, speech_timestamps)
+            # 并发分发模式下等各 Handler 处理完本轮事件
+            await self.event_bus.join()
+            if trace is not None:
+                result.metadata["turn_id"] = trace.turn_id
+            return result
+        except asyncio.CancelledError:
+            self._interrupted = True
+            logger.info(f"[{self.session_id}] 当前轮次已取消")
+            raise
+        finally:
+            self._is_processing = False
+            if self._interrupted:
+                status = "interrupted"
+            else:
+                status = "ok" if result is not None and result.success else "error"
+            TURNS_TOTAL.inc(status)
+            TRACE_RECORDER.finish_turn(trace, status)
+
+    async def _process_turn(
+        self,
+        raw_input: Union[str, np.ndarray],
+        metadata: Optional[dict],
+        from_name: str,
+        speech_timestamps: Optional[List[Dict[str, int]]],
+    ) -> ConversationResult:
+        """处理一轮输入（输入管线 -> 对话）"""
         try:
             # 使用 InputPipeline 处理输入
             ctx = await self.input_pipeline.execute(
                 raw_input=raw_input,
                 metadata=metadata,
                 from_name=from_name,
+                speech_timestamps=speech_timestamps,
             )
             
             # 检查是否有错误
@@ -322,8 +412,6 @@ class ConversationOrchestrator:
                 success=False,
                 error=str(e)
             )
-        finally:
-            self._is_processing = False
     
     async def _process_conversation(
         self,
@@ -352,11 +440,13 @@ class ConversationOrchestrator:
         original_text = text
         if self.memory_system:
             try:
-                related_memories = await self.memory_system.retrieve_context(
-                    query=text,
-                    session_id=self.session_id,
-                    max_turns=3
-                )
+                with span("memory.retrieve", "memory") as retrieve_span:
+                    related_memories = await self.memory_system.retrieve_context(
+                        query=text,
+                        session_id=self.session_id,
+                        max_turns=3
+                    )
+                    retrieve_span.set("results", len(related_memories or []))
 
                 if related_memories:
                     logger.info(f"[{self.session_id}] 检索到 {len(related_memories)} 条相关记忆")
@@ -387,7 +477,13 @@ class ConversationOrchestrator:
             logger.info(f"[{self.session_id}] 添加强制表情标签提醒")
 
         # 获取 Agent 响应流
-        agent_stream = self.agent.chat_stream(text)
+        agent_stream = trace_stream(
+            self.agent.chat_stream(text),
+            "llm.chat_stream",
+            "llm",
+            first_mark="llm.first_token",
+            engine=type(self.agent).__name__,
+        )
 
         # 发送说话表情
         await self._emit_expression("speaking")
@@ -431,9 +527,10 @@ class ConversationOrchestrator:
             try:
                 from anima.memory import MemoryTurn
 
-                # 创建记忆轮次
+                # 创建记忆轮次（与追踪使用同一个轮次 ID）
+                trace = current_trace()
                 memory_turn = MemoryTurn(
-                    turn_id=str(uuid.uuid4()),
+                    turn_id=trace.turn_id if trace is not None else str(uuid.uuid4()),
                     session_id=self.session_id,
                     timestamp=datetime.now(),
                     user_input=original_text,
@@ -446,7 +543,8 @@ class ConversationOrchestrator:
                 )
 
                 # 存储到记忆系统
-                await self.memory_system.store_turn(memory_turn)
+                with span("memory.store", "memory"):
+                    await self.memory_system.store_turn(memory_turn)
                 logger.info(f"[{self.session_id}] 对话已存储到记忆系统 (重要性: {memory_turn.importance:.2f})")
 
             except Exception as e:
@@ -483,7 +581,12 @@ class ConversationOrchestrator:
             emotions = []
 
         try:
-            audio_path = await self.tts_engine.synthesize(text)
+            TTS_PENDING.inc()
+            try:
+                with span("tts.synthesize", "tts", engine=type(self.tts_engine).__name__, chars=len(text)):
+                    audio_path = await self.tts_engine.synthesize(text)
+            finally:
+                TTS_PENDING.dec()
             logger.info(f"[{self.session_id}] TTS 完成: {audio_path}")
             logger.info(f"[{self.session_id}] 表情标签数量: {len(emotions)}, 内容: {emotions}")
 
@@ -499,9 +602,12 @@ class ConversationOrchestrator:
                 logger.warning(f"[{self.session_id}] Live2D 未启用，发送普通音频事件")
                 await self._emit_event(EventType.AUDIO, {"path": audio_path})
 
+            # EventBus 逐个等待 Handler，事件发出即音频已发送到前端
+            mark("first_audio")
             return audio_path
         except Exception as e:
             logger.error(f"[{self.session_id}] TTS 合成失败: {e}")
+            ERRORS_TOTAL.inc("tts")
             return None
 
     async def _emit_audio_with_expression(
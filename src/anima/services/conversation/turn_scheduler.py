@@ -0,0 +1,142 @@
+"""
+轮次调度器
+每个会话同一时刻只运行一轮对话，后续输入在一个小队列中排队
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional, Tuple
+
+from loguru import logger
+
+
+class TurnCancelled(Exception):
+    """轮次被打断（或会话结束）"""
+
+
+class TurnDropped(Exception):
+    """排队的输入因队列已满被丢弃"""
+
+
+TurnFactory = Callable[[], Awaitable[Any]]
+
+
+class TurnScheduler:
+    """
+    轮次调度器
+
+    每轮对话作为一个独立的 asyncio 任务运行，cancel_active() 取消它：
+    取消会传递到正在 await 的 LLM 流 / TTS 合成 / Handler，而不只是设置标志位。
+
+    - 同一时刻最多一个活动轮次
+    - 活动轮次运行时新的输入进入队列（最多 max_queued 个，超出时丢弃最早的）
+    - submit() 等待该输入对应的轮次结束并返回其结果
+
+    使用示例:
+        scheduler = TurnScheduler("session-001", max_queued=2)
+        result = await scheduler.submit(lambda: run_turn("你好"))
+
+        # 打断：取消正在运行的轮次，排队的输入照常执行
+        scheduler.cancel_active()
+    """
+
+    def __init__(self, name: str = "default", max_queued: int = 2):
+        """
+        Args:
+            name: 名称（用于日志，通常是会话 ID）
+            max_queued: 排队输入的上限
+        """
+        self.name = name
+        self.max_queued = max(0, max_queued)
+        self._queue: Deque[Tuple[TurnFactory, asyncio.Future]] = deque()
+        self._active: Optional[asyncio.Task] = None
+
+    @property
+    def is_busy(self) -> bool:
+        """是否有正在运行的轮次"""
+        return self._active is not None and not self._active.done()
+
+    @property
+    def pending(self) -> int:
+        """排队中的输入数"""
+        return len(self._queue)
+
+    async def submit(self, factory: TurnFactory) -> Any:
+        """
+        提交一轮对话
+
+        Args:
+            factory: 无参函数，返回该轮的协程（轮到它时才调用）
+
+        Returns:
+            该轮协程的返回值
+
+        Raises:
+            TurnCancelled: 轮次被打断（cancel_active / cancel_all）
+            TurnDropped: 排队时因队列已满被丢弃
+        """
+        future = asyncio.get_event_loop().create_future()
+        if not self.is_busy and not self._queue:
+            # 空闲：立即开始（同步设置活动轮次，不占用排队名额）
+            self._start(factory, future)
+        else:
+            if len(self._queue) >= self.max_queued:
+                if not self._queue:
+                    raise TurnDropped("已有轮次在运行，且不允许排队")
+                _, dropped = self._queue.popleft()
+                if not dropped.done():
+                    dropped.set_exception(TurnDropped("输入队列已满"))
+                logger.warning(f"[TurnScheduler] [{self.name}] 输入队列已满，丢弃最早的排队输入")
+            self._queue.append((factory, future))
+            logger.debug(f"[TurnScheduler] [{self.name}] 轮次进行中，输入排队 (队列: {len(self._queue)})")
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # 调用方被取消：撤回排队的输入；正在运行的轮次随之取消
+            if not future.done():
+                future.cancel()
+            raise
+
+    def _start(self, factory: TurnFactory, future: asyncio.Future) -> None:
+        task = asyncio.ensure_future(factory())
+        self._active = task
+        # 调用方不再等待时取消这一轮
+        future.add_done_callback(lambda f: task.cancel() if f.cancelled() else None)
+        task.add_done_callback(lambda t: self._finish(t, future))
+
+    def _finish(self, task: asyncio.Task, future: asyncio.Future) -> None:
+        if self._active is task:
+            self._active = None
+
+        if future.done():
+            if not task.cancelled():
+                task.exception()  # 调用方已不等待，取出异常避免未处理告警
+        elif task.cancelled():
+            future.set_exception(TurnCancelled("轮次被打断"))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+        # 下一个仍在等待的排队输入
+        while not self.is_busy and self._queue:
+            factory, future = self._queue.popleft()
+            if not future.done():
+                self._start(factory, future)
+
+    def cancel_active(self) -> bool:
+        """取消正在运行的轮次，返回是否有轮次被取消"""
+        if not self.is_busy:
+            return False
+        self._active.cancel()
+        logger.info(f"[TurnScheduler] [{self.name}] 取消当前轮次")
+        return True
+
+    def cancel_all(self) -> None:
+        """取消正在运行和排队的轮次（会话结束时使用）"""
+        while self._queue:
+            _, future = self._queue.popleft()
+            if not future.done():
+                future.set_exception(TurnCancelled("会话已结束"))
+        self.cancel_active()
@@ -11,6 +11,7 @@ import time
 import uuid
 
 from ..interface import LLMInterface
+from ..streaming import iterate_in_thread
 from anima.config.core.registry import ProviderRegistry
 from anima.config import GLMLLMConfig
 
@@ -349,9 +350,9 @@ class GLMLLM(LLMInterface):
                     timeout=self.timeout
                 )
 
-                # 处理流式响应
+                # 处理流式响应（在线程池中读取；轮次被取消时关闭 HTTP 响应）
                 chunk_count = 0
-                for chunk in response:
+                async for chunk in iterate_in_thread(response):
                     chunk_count += 1
 
                     # 处理思考内容
@@ -11,6 +11,7 @@ import torch
 from loguru import logger
 
 from ..interface import LLMInterface
+from ..streaming import iterate_in_thread
 from ....config.core.registry import ProviderRegistry
 
 
@@ -213,7 +214,7 @@ class LocalLoraLLM(LLMInterface):
 
         # 流式生成
         try:
-            from transformers import TextIteratorStreamer
+            from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
 
             streamer = TextIteratorStreamer(
                 self.tokenizer,
@@ -221,23 +222,30 @@ class LocalLoraLLM(LLMInterface):
                 skip_special_tokens=True
             )
 
+            # 轮次被取消时设置停止标志，generate 在下一个 token 处停下
+            import threading
+            stop_event = threading.Event()
+
+            class StopOnEvent(StoppingCriteria):
+                def __call__(self, input_ids, scores, **kwargs) -> bool:
+                    return stop_event.is_set()
+
             generation_kwargs["streamer"] = streamer
+            generation_kwargs["stopping_criteria"] = StoppingCriteriaList([StopOnEvent()])
 
             # 在后台线程中生成
-            import threading
-
             def generate():
                 with torch.no_grad():
                     self.model.generate(**inputs, **generation_kwargs)
 
-            thread = threading.Thread(target=generate)
+            thread = threading.Thread(target=generate, daemon=True)
             thread.start()
 
-            # 流式输出
-            for text in streamer:
+            # 流式输出（在线程池中等待 streamer，不阻塞事件循环）
+            async for text in iterate_in_thread(streamer, on_close=stop_event.set):
                 yield text
 
-            thread.join()
+            await asyncio.to_thread(thread.join)
 
         except Exception as e:
             logger.error(f"[LocalLoraLLM] 生成失败: {e}")
@@ -2,7 +2,7 @@
 Mock LLM 实现 - 用于测试和开发
 """
 
-from typing import AsyncIterator, List, Dict, Any, TYPE_CHECKING
+from typing import AsyncIterator, List, Dict, Any, Optional, TYPE_CHECKING
 import time
 import uuid
 from loguru import logger
@@ -10,6 +10,7 @@ from loguru import logger
 from ..interface import LLMInterface
 from ....config.core.registry import ProviderRegistry
 from ....config import MockLLMConfig
+from ....utils.mock_latency import LatencyModel, make_rng
 
 if TYPE_CHECKING:
     from anima.config.providers.llm.base import LLMBaseConfig
@@ -19,7 +20,7 @@ if TYPE_CHECKING:
 class MockLLM(LLMInterface):
     """
     Mock LLM 实现
-    不调用实际的 LLM，返回固定的模拟回复
+    不调用实际的 LLM，返回固定的模拟回复；按配置的首 token 延迟和逐 token 间隔模拟真实的流式时序
 
     特性:
     - 通过 @ProviderRegistry.register_service 注册
@@ -29,12 +30,31 @@ class MockLLM(LLMInterface):
     # 类级别属性：支持的配置类型
     config_class = MockLLMConfig
 
-    def __init__(self, system_prompt: str = ""):
+    def __init__(
+        self,
+        system_prompt: str = "",
+        first_token_ms: float = 100.0,
+        token_interval_ms: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            system_prompt: 系统提示词
+            first_token_ms: 首 token 平均延迟（毫秒）
+            token_interval_ms: 逐 token（逐字）平均间隔（毫秒）
+            jitter: 延迟的变异系数（0 为固定延迟）
+            seed: 随机种子（固定后延迟序列可复现）
+        """
         self.system_prompt = system_prompt
         self.history: List[Dict[str, Any]] = []
         self.call_count = 0
         self.instance_id = str(uuid.uuid4())[:8]
 
+        rng = make_rng(seed)
+        self.first_token_latency = LatencyModel(first_token_ms, jitter, rng)
+        self.token_latency = LatencyModel(token_interval_ms, jitter, rng)
+
     @classmethod
     def from_config(cls, config: "LLMBaseConfig", system_prompt: str = "", **kwargs) -> "MockLLM":
         """
@@ -48,8 +68,13 @@ class MockLLM(LLMInterface):
         Returns:
             MockLLM 实例
         """
-        # Mock 不需要配置中的任何字段
-        instance = cls(system_prompt=system_prompt)
+        instance = cls(
+            system_prompt=system_prompt,
+            first_token_ms=getattr(config, "first_token_ms", 100.0),
+            token_interval_ms=getattr(config, "token_interval_ms", 0.0),
+            jitter=getattr(config, "jitter", 0.0),
+            seed=getattr(config, "seed", None),
+        )
         logger.info(f"[MockLLM-{instance.instance_id}] 初始化完成")
         return instance
 
@@ -73,22 +98,14 @@ class MockLLM(LLMInterface):
         logger.info(f"[MockLLM:{call_id}] 输入: {user_input[:100]}{'...' if input_length > 100 else ''} (长度: {input_length})")
         logger.info(f"[MockLLM:{call_id}] 历史轮数: {history_length // 2}")
 
-        # 模拟处理延迟
-        import asyncio
-        await asyncio.sleep(0.1)
+        response = self._make_response(user_input)
+
+        # 模拟处理延迟：首 token + 其余 token 的间隔之和
+        await self.first_token_latency.sleep()
+        await self.token_latency.sleep(scale=max(0, len(response) - 1))
 
         # 记录到历史
         self.history.append({"role": "user", "content": user_input})
-
-        # 生成模拟回复
-        responses = [
-            f"这是第 {self.call_count} 条模拟回复。你刚才说的是：「{user_input}」",
-            f"收到你的消息：「{user_input}」。我是一个 Mock LLM，用于测试和开发。",
-            f"你好！你说的是：「{user_input}」。有什么我可以帮助你的吗？",
-        ]
-        response = responses[self.call_count % len(responses)]
-
-        # 记录回复到历史
         self.history.append({"role": "assistant", "content": response})
 
         # 计算耗时
@@ -120,14 +137,20 @@ class MockLLM(LLMInterface):
         logger.info(f"[MockLLM:{call_id}] 🔵 开始流式调用 (模拟模式)")
         logger.info(f"[MockLLM:{call_id}] 输入: {user_input[:100]}{'...' if input_length > 100 else ''}")
 
-        response = await self.chat(user_input, **kwargs)
+        response = self._make_response(user_input)
+        self.history.append({"role": "user", "content": user_input})
 
-        # 模拟流式输出
+        # 模拟流式输出：首 token 延迟后逐字输出，字与字之间按 token 间隔等待
+        await self.first_token_latency.sleep()
         chunk_count = 0
         for char in response:
+            if chunk_count:
+                await self.token_latency.sleep()
             chunk_count += 1
             yield char
 
+        self.history.append({"role": "assistant", "content": response})
+
         # 计算耗时
         elapsed_time = time.time() - start_time
 
@@ -136,6 +159,15 @@ class MockLLM(LLMInterface):
         logger.info(f"[MockLLM:{call_id}] 分块数: {chunk_count}")
         logger.info(f"[MockLLM:{call_id}] ═══════════════════════════════════")
 
+    def _make_response(self, user_input: str) -> str:
+        """按调用次数轮换的模拟回复（确定性）"""
+        responses = [
+            f"这是第 {self.call_count} 条模拟回复。你刚才说的是：「{user_input}」",
+            f"收到你的消息：「{user_input}」。我是一个 Mock LLM，用于测试和开发。",
+            f"你好！你说的是：「{user_input}」。有什么我可以帮助你的吗？",
+        ]
+        return responses[self.call_count % len(responses)]
+
     def set_system_prompt(self, prompt: str) -> None:
         """设置系统提示词"""
         self.system_prompt = prompt
@@ -8,6 +8,7 @@ from loguru import logger
 import ollama
 
 from ..interface import LLMInterface
+from ..streaming import iterate_in_thread
 from anima.config.core.registry import ProviderRegistry
 from anima.config import OllamaLLMConfig
 
@@ -191,7 +192,8 @@ class OllamaLLM(LLMInterface):
             
             stream = await loop.run_in_executor(None, sync_stream)
             
-            for chunk in stream:
+            # 在线程池中读取；轮次被取消时关闭 HTTP 响应
+            async for chunk in iterate_in_thread(stream):
                 if "message" in chunk and "content" in chunk["message"]:
                     content = chunk["message"]["content"]
                     full_response += content
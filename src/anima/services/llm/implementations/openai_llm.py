@@ -180,11 +180,15 @@ class OpenAILLM(LLMInterface):
                 stream=True
             )
             
-            async for chunk in response:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_response += content
-                    yield content
+            try:
+                async for chunk in response:
+                    if chunk.choices[0].delta.content:
+                        content = chunk.choices[0].delta.content
+                        full_response += content
+                        yield content
+            finally:
+                # 轮次被取消 / 提前结束时立即关闭 HTTP 响应
+                await response.close()
             
             # 更新历史
             self.history.append({"role": "user", "content": user_input})
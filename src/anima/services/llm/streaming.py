@@ -0,0 +1,73 @@
+"""
+同步流式响应的异步包装
+
+GLM / Ollama SDK 的流式接口（以及 transformers 的 TextIteratorStreamer）是同步迭代器：
+直接在协程里 for 循环会在每次读取网络 / 等待生成时阻塞事件循环，轮次任务被取消时也无法及时停下。
+
+iterate_in_thread 在线程池中逐块读取，消费方停止迭代（轮次被取消、提前 break）时：
+- 调用 on_close（如设置 StoppingCriteria 的停止标志，让 model.generate 在下一个 token 停下）
+- 关闭底层响应（stream.close()，释放 HTTP 连接）；正在读取的块返回后再关闭，避免与读取线程并发
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from loguru import logger
+
+
+_END = object()
+
+
+def _close_stream(stream: Any, on_close: Optional[Callable[[], None]]) -> None:
+    try:
+        if on_close is not None:
+            on_close()
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    except Exception as e:
+        logger.debug(f"[iterate_in_thread] 关闭流式响应失败: {e}")
+
+
+def _close_after_read(future: asyncio.Future, stream: Any) -> None:
+    if not future.cancelled():
+        future.exception()  # 读取线程中的异常已无人关心
+    _close_stream(stream, None)
+
+
+async def iterate_in_thread(
+    stream: Iterable,
+    on_close: Optional[Callable[[], None]] = None,
+) -> AsyncIterator:
+    """
+    在线程池中迭代同步流
+
+    Args:
+        stream: 同步可迭代对象（SDK 返回的流式响应）
+        on_close: 迭代结束或被取消时调用（在关闭响应之前）
+
+    Example:
+        >>> response = await loop.run_in_executor(None, sync_stream)
+        >>> async for chunk in iterate_in_thread(response):
+        ...     yield chunk.choices[0].delta.content
+    """
+    loop = asyncio.get_event_loop()
+    iterator = iter(stream)
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            pending = loop.run_in_executor(None, next, iterator, _END)
+            # shield：取消时读取线程仍在运行，pending 保持未完成，下面据此推迟关闭
+            chunk = await asyncio.shield(pending)
+            pending = None
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        if pending is not None and not pending.done():
+            # 先通知生产方停止（让读取尽快返回），读取返回后再关闭响应
+            if on_close is not None:
+                on_close()
+            pending.add_done_callback(lambda future: _close_after_read(future, stream))
+        else:
+            _close_stream(stream, on_close)
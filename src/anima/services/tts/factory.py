@@ -46,7 +46,14 @@ class TTSFactory:
             )
         elif provider == "mock":
             from .implementations.mock_tts import MockTTS
-            return MockTTS()
+            return MockTTS(
+                chars_per_second=kwargs.get("chars_per_second", 4.0),
+                real_time_factor=kwargs.get("real_time_factor", 0.1),
+                base_latency_ms=kwargs.get("base_latency_ms", 50.0),
+                jitter=kwargs.get("jitter", 0.0),
+                sample_rate=kwargs.get("sample_rate", 16000),
+                seed=kwargs.get("seed")
+            )
         else:
             logger.warning(f"未知的 TTS 提供商: {provider}，使用 Mock 实现")
             from .implementations.mock_tts import MockTTS
@@ -2,23 +2,94 @@
 Mock TTS 实现 - 用于测试和开发
 """
 
+import shutil
+import tempfile
+import wave
 from typing import Union, Optional
 from pathlib import Path
 
+import numpy as np
+from loguru import logger
+
 from ..interface import TTSInterface
 from ....config.core.registry import ProviderRegistry
 from ....config.providers.tts.mock import MockTTSConfig
+from ....utils.mock_latency import LatencyModel, make_rng
 
 
 @ProviderRegistry.register_service("tts", "mock")
 class MockTTS(TTSInterface):
     """
     Mock TTS 实现
-    不进行实际的语音合成，返回模拟的音频路径
+    不进行实际的语音合成，生成与文本长度成正比的合成「语音」WAV（谐波 + 音节包络，口型同步可用）；
+    耗时 = 固定耗时 + 音频时长 × 实时倍数（按配置的分布采样）
     """
 
-    def __init__(self, mock_audio_path: str = "/cache/mock_audio.wav"):
-        self.mock_audio_path = mock_audio_path
+    MIN_DURATION_S = 0.3
+    # 未指定输出路径时，临时 WAV 在实例目录中循环复用的文件数
+    MAX_TEMP_FILES = 64
+
+    def __init__(
+        self,
+        chars_per_second: float = 4.0,
+        real_time_factor: float = 0.1,
+        base_latency_ms: float = 50.0,
+        jitter: float = 0.0,
+        sample_rate: int = 16000,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            chars_per_second: 语速（每秒音频对应的字数），决定生成音频的时长
+            real_time_factor: 合成耗时 / 音频时长
+            base_latency_ms: 每次合成的固定平均耗时（毫秒）
+            jitter: 延迟的变异系数（0 为固定延迟）
+            sample_rate: 生成音频的采样率
+            seed: 随机种子（固定后音频和延迟可复现）
+        """
+        self.chars_per_second = chars_per_second
+        self.sample_rate = sample_rate
+        self._rng = make_rng(seed)
+        self.base_latency = LatencyModel(base_latency_ms, jitter, self._rng)
+        self.synthesis_latency = LatencyModel(real_time_factor * 1000, jitter, self._rng)
+        self._temp_dir: Optional[str] = None
+        self._temp_index = 0
+
+    def audio_duration(self, text: str) -> float:
+        """文本对应的音频时长（秒），不计空白字符"""
+        chars = sum(1 for char in text if not char.isspace())
+        return max(self.MIN_DURATION_S, chars / self.chars_per_second)
+
+    def generate_pcm(self, duration: float) -> np.ndarray:
+        """合成「语音」：随机基频的谐波，按 4-6Hz 的音节包络调制（int16）"""
+        rng = np.random.default_rng(self._rng.getrandbits(32))
+        t = np.arange(int(duration * self.sample_rate)) / self.sample_rate
+        pitch = rng.uniform(180, 260) + 25 * np.sin(2 * np.pi * rng.uniform(0.5, 1.5) * t)
+        phase = 2 * np.pi * np.cumsum(pitch) / self.sample_rate
+        voice = np.sin(phase) + 0.5 * np.sin(2 * phase) + 0.25 * np.sin(3 * phase)
+        syllables = np.clip(np.sin(2 * np.pi * rng.uniform(4, 6) * t), 0, None) ** 0.5
+        # 首尾 20ms 淡入淡出
+        fade = min(len(t), int(0.02 * self.sample_rate))
+        if fade:
+            ramp = np.linspace(0, 1, fade)
+            syllables[:fade] *= ramp
+            syllables[-fade:] *= ramp[::-1]
+        return (0.3 * 32767 / 1.75 * voice * syllables).astype(np.int16)
+
+    def _temp_path(self) -> Path:
+        """实例临时目录中的下一个 WAV 路径（最多 MAX_TEMP_FILES 个，循环覆盖，close() 时删除）"""
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix="anima_mock_tts_")
+        path = Path(self._temp_dir) / f"{self._temp_index % self.MAX_TEMP_FILES}.wav"
+        self._temp_index += 1
+        return path
+
+    def _write_wav(self, pcm: np.ndarray, output_path: Path) -> None:
+        with wave.open(str(output_path), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(pcm.tobytes())
 
     async def synthesize(
         self,
@@ -26,18 +97,31 @@ class MockTTS(TTSInterface):
         output_path: Optional[Union[str, Path]] = None,
         **kwargs
     ) -> Union[bytes, str]:
-        """返回模拟的音频路径"""
-        # 模拟处理延迟
-        import asyncio
-        await asyncio.sleep(0.1)
-        
-        if output_path:
-            # 如果指定了输出路径，返回该路径
-            return str(output_path)
-        
-        # 否则返回模拟路径
-        return self.mock_audio_path
+        """
+        生成模拟音频
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径（可选，默认写入实例临时目录）
+            **kwargs: return_bytes=True 时返回 WAV 字节
+
+        Returns:
+            Union[bytes, str]: 音频文件路径（或 WAV 字节）
+        """
+        duration = self.audio_duration(text)
+        await self.base_latency.sleep()
+        await self.synthesis_latency.sleep(scale=duration)
+
+        output_path = self._temp_path() if output_path is None else Path(output_path)
+        self._write_wav(self.generate_pcm(duration), output_path)
+        logger.debug(f"[MockTTS] {len(text)} 字符 -> {duration:.2f}s 音频: {output_path}")
+
+        if kwargs.get("return_bytes", False):
+            return output_path.read_bytes()
+        return str(output_path)
 
     async def close(self) -> None:
-        """无需清理资源"""
-        pass
\ No newline at end of file
+        """删除临时 WAV 目录"""
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
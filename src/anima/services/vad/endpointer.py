@@ -0,0 +1,195 @@
+"""
+自适应端点检测（判断一轮说话何时结束）
+
+固定的静音等待（required_misses 个窗口）对每一轮对话都是纯延迟。
+AdaptiveEndpointer 按以下信息动态决定「静音多久算说完」：
+- 说话人自己的停顿习惯：记录每次说话中途的停顿（之后又继续说了），
+  取最近停顿的 90 分位 + 余量作为基础等待时长
+- 部分识别文本：以句末标点 / 语气词结尾时缩短等待，以连词、逗号、语气填充词结尾时延长等待
+
+每次判定说完时记录实际等待的静音时长（端点延迟），按会话和进程两级统计。
+"""
+
+import re
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+from ...utils.latency_histogram import LatencyHistogram
+from ...utils.metrics import METRICS
+
+
+# 进程级端点延迟分布（所有会话）
+END_OF_TURN_LATENCY = METRICS.histogram(LatencyHistogram(
+    "end_of_turn_latency_ms",
+    buckets=(100, 200, 300, 400, 500, 600, 700, 800, 1000, 1200, 1500, 2000),
+    description="最后一个语音窗口到判定说完之间的静音时长（毫秒）",
+), name="anima_vad_end_of_turn_latency_ms")
+
+COMPLETE = "complete"
+INCOMPLETE = "incomplete"
+UNKNOWN = "unknown"
+
+# 句末标点
+_FINAL_PUNCT_RE = re.compile(r"[。！？!?…~～.]+[”」』\"')）]*$")
+# 句中标点
+_CLAUSE_PUNCT_RE = re.compile(r"[，、,;；:：\-—]$")
+# 句末语气词（中文 / 日文）
+_FINAL_PARTICLES = ("吧", "呢", "吗", "嘛", "啊", "呀", "啦", "哦", "喔", "咯", "哈", "耶",
+                    "ね", "よ", "か", "な", "わ", "です", "ます", "ました", "でした")
+# 说到一半的结尾：连词、介词、语气填充词
+_CONTINUATION_WORDS_ZH = ("然后", "但是", "可是", "因为", "所以", "而且", "还有", "就是", "那个", "这个",
+                          "如果", "或者", "的话", "还是", "和", "跟", "把", "被", "给", "在",
+                          "嗯", "呃", "额", "就", "也", "又", "是")
+_CONTINUATION_WORDS_EN = {"and", "but", "because", "so", "or", "if", "then", "the", "a", "an",
+                          "to", "of", "with", "for", "in", "on", "that", "i", "um", "uh", "like"}
+
+
+def classify_completeness(text: str) -> str:
+    """
+    判断部分识别文本是否像一句完整的话
+
+    Returns:
+        complete / incomplete / unknown
+    """
+    text = text.strip()
+    if not text:
+        return UNKNOWN
+    if _FINAL_PUNCT_RE.search(text):
+        # 省略号更像是话没说完
+        return INCOMPLETE if text.endswith(("…", "...")) else COMPLETE
+    if _CLAUSE_PUNCT_RE.search(text):
+        return INCOMPLETE
+    if text.endswith(_FINAL_PARTICLES):
+        return COMPLETE
+
+    last_word = re.split(r"\s+", text)[-1].lower()
+    if last_word in _CONTINUATION_WORDS_EN or text.endswith(_CONTINUATION_WORDS_ZH):
+        return INCOMPLETE
+    return UNKNOWN
+
+
+class AdaptiveEndpointer:
+    """
+    单个会话（说话人）的自适应端点检测
+
+    由 SileroStateMachine 在每个窗口询问当前的等待时长，并在停顿 / 说完时回报
+    """
+
+    # 短于该时长的静音不计为停顿
+    PAUSE_MIN_MS = 100
+    # 参与统计的最近停顿数
+    PAUSE_HISTORY = 50
+    # 至少观察到这么多次停顿后才使用学习到的等待时长
+    MIN_PAUSES = 5
+    # 基础等待时长 = 停顿分位数 + 余量
+    PAUSE_QUANTILE = 0.9
+    MARGIN_MS = 100
+    # 按文本完整度调整等待时长的倍率
+    COMPLETE_FACTOR = 0.5
+    INCOMPLETE_FACTOR = 1.5
+
+    def __init__(
+        self,
+        window_ms: float,
+        default_hangover_ms: float,
+        min_hangover_ms: float = 250.0,
+        max_hangover_ms: float = 1200.0,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            window_ms: VAD 窗口时长
+            default_hangover_ms: 尚未学习到停顿习惯时的等待时长
+            min_hangover_ms: 等待时长下限
+            max_hangover_ms: 等待时长上限
+            enabled: False 时始终使用 default_hangover_ms
+        """
+        self.window_ms = window_ms
+        self.default_hangover_ms = default_hangover_ms
+        self.min_hangover_ms = min(min_hangover_ms, max_hangover_ms)
+        self.max_hangover_ms = max_hangover_ms
+        self.enabled = enabled
+
+        self._pauses = deque(maxlen=self.PAUSE_HISTORY)
+        self._base_hangover_ms = default_hangover_ms
+        self._completeness = UNKNOWN
+        self.early_ends = 0
+        self.turn_latency = LatencyHistogram("session_end_of_turn_latency_ms", recent=200)
+
+    # ---------- 输入 ----------
+
+    def observe_transcript(self, text: str) -> None:
+        """更新当前这句话的部分识别文本"""
+        self._completeness = classify_completeness(text)
+
+    def record_pause(self, pause_ms: float) -> None:
+        """记录一次说话中途的停顿（停顿之后说话人继续说了）"""
+        if pause_ms < self.PAUSE_MIN_MS:
+            return
+        self._pauses.append(pause_ms)
+        # 只在停顿样本变化时重新计算分位数（每个静音窗口都会查询等待时长）
+        if len(self._pauses) >= self.MIN_PAUSES:
+            learned = np.percentile(np.fromiter(self._pauses, dtype=np.float64), self.PAUSE_QUANTILE * 100)
+            self._base_hangover_ms = float(learned) + self.MARGIN_MS
+
+    def record_early_end(self, pause_ms: float) -> None:
+        """
+        判定说完后说话人很快又开口：这段静音其实是停顿
+
+        说话中途的停顿只能观察到比当前等待时长短的部分，
+        把过早结束的这次也计入停顿样本，避免学习到的等待时长只降不升
+        """
+        self.early_ends += 1
+        self.record_pause(pause_ms)
+
+    def reset(self) -> None:
+        """开始新的一句话（保留停顿统计）"""
+        self._completeness = UNKNOWN
+
+    # ---------- 决策 ----------
+
+    @property
+    def base_hangover_ms(self) -> float:
+        """按停顿习惯学习到的基础等待时长（停顿样本不足时为 default_hangover_ms）"""
+        return self._base_hangover_ms
+
+    def hangover_ms(self) -> float:
+        """当前判定说完所需的静音时长"""
+        if not self.enabled:
+            return self.default_hangover_ms
+        hangover = self.base_hangover_ms
+        if self._completeness == COMPLETE:
+            hangover *= self.COMPLETE_FACTOR
+        elif self._completeness == INCOMPLETE:
+            hangover *= self.INCOMPLETE_FACTOR
+        return min(max(hangover, self.min_hangover_ms), self.max_hangover_ms)
+
+    def hangover_windows(self) -> int:
+        """当前判定说完所需的静音窗口数"""
+        return max(1, round(self.hangover_ms() / self.window_ms))
+
+    def on_turn_end(self, silence_ms: float, reason: str = "") -> None:
+        """判定说完：记录端点延迟"""
+        self.turn_latency.observe(silence_ms)
+        END_OF_TURN_LATENCY.observe(silence_ms)
+        logger.debug(
+            f"[AdaptiveEndpointer] 说完 ({reason}): 静音 {silence_ms:.0f}ms, "
+            f"文本={self._completeness}, 基础等待 {self.base_hangover_ms:.0f}ms, 停顿样本 {len(self._pauses)}"
+        )
+        self.reset()
+
+    def stats(self) -> Dict[str, Any]:
+        """会话级统计"""
+        pauses: Optional[np.ndarray] = np.fromiter(self._pauses, dtype=np.float64) if self._pauses else None
+        return {
+            "enabled": self.enabled,
+            "base_hangover_ms": round(self.base_hangover_ms, 1),
+            "pauses": len(self._pauses),
+            "early_ends": self.early_ends,
+            "pause_p50_ms": None if pauses is None else round(float(np.percentile(pauses, 50)), 1),
+            "pause_p90_ms": None if pauses is None else round(float(np.percentile(pauses, 90)), 1),
+            "end_of_turn_latency_ms": self.turn_latency.snapshot(),
+        }
@@ -2,13 +2,14 @@
 Mock VAD 实现（用于测试）
 """
 
-from typing import Union
+from typing import Optional, Union
 import numpy as np
 from loguru import logger
 
 from ..interface import VADInterface, VADState, VADResult
 from ....config.core.registry import ProviderRegistry
 from ....config.providers.vad.mock import MockVADConfig
+from ....utils.mock_latency import LatencyModel, make_rng
 
 
 @ProviderRegistry.register_service("vad", "mock")
@@ -26,6 +27,9 @@ class MockVAD(VADInterface):
         db_threshold: float = -30.0,
         min_speech_duration: int = 5,
         min_silence_duration: int = 15,
+        ms_per_window: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
     ):
         self.sample_rate = sample_rate
         self.db_threshold = db_threshold
@@ -44,7 +48,23 @@ class MockVAD(VADInterface):
         self.pre_buffer = []
         self.pre_buffer_max = 10
         
+        # 模拟模型推理耗时（每 512 采样点窗口，忙等占用 CPU，与真实推理一样阻塞事件循环）
+        self.window_latency = LatencyModel(ms_per_window, jitter, make_rng(seed))
+
         logger.info(f"Mock VAD 初始化: db_threshold={db_threshold}")
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        """从配置创建实例"""
+        return cls(
+            sample_rate=config.sample_rate,
+            db_threshold=config.db_threshold,
+            min_speech_duration=config.min_speech_duration,
+            min_silence_duration=config.min_silence_duration,
+            ms_per_window=config.ms_per_window,
+            jitter=config.jitter,
+            seed=config.seed,
+        )
     
     def _calculate_db(self, audio_data: np.ndarray) -> float:
         """计算音频的分贝值"""
@@ -65,6 +85,9 @@ class MockVAD(VADInterface):
             # int16 PCM 数据，归一化到 [-1.0, 1.0]
             audio_np = audio_np / 32767.0
         
+        if self.window_latency.mean_ms > 0:
+            self.window_latency.spin(scale=-(-len(audio_np) // 512))
+
         # 计算分贝值
         db = self._calculate_db(audio_np)
         is_loud = db > self.db_threshold
@@ -89,7 +112,6 @@ class MockVAD(VADInterface):
                     self.audio_buffer.extend(chunk_bytes)
                     
                     return VADResult(
-                        audio_data=b"",
                         is_speech_start=True,
                         is_speech_end=False,
                         state=VADState.ACTIVE
@@ -117,14 +139,13 @@ class MockVAD(VADInterface):
                     self.pre_buffer.clear()
                     
                     return VADResult(
-                        audio_data=audio_data,
+                        audio_data=np.frombuffer(audio_data, dtype=np.int16),
                         is_speech_start=False,
                         is_speech_end=True,
                         state=VADState.IDLE
                     )
         
         return VADResult(
-            audio_data=b"",
             is_speech_start=False,
             is_speech_end=False,
             state=self.state
@@ -0,0 +1,149 @@
+"""
+Silero VAD 推理后端
+
+- torch：silero-vad 包自带的 TorchScript 模型（需要完整的 torch 运行时）
+- onnx：silero_vad.onnx + onnxruntime，单线程会话；输入、RNN 状态和输出都预先分配，
+  通过 IOBinding 直接绑定到固定的 numpy 缓冲区，逐窗口推理不再分配内存
+
+两种后端接口相同：backend(chunk) -> 语音概率，chunk 为 window_size 个 float32 采样点。
+"""
+
+import importlib.util
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+
+def _packaged_onnx_model() -> str:
+    """silero-vad 包自带的 ONNX 模型路径（不导入包本身，避免连带导入 torch）"""
+    spec = importlib.util.find_spec("silero_vad")
+    if spec is None or not spec.submodule_search_locations:
+        raise FileNotFoundError("未找到 silero-vad 包，请运行: pip install silero-vad 或配置 onnx_model_path")
+    path = os.path.join(list(spec.submodule_search_locations)[0], "data", "silero_vad.onnx")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"silero-vad 包中没有 ONNX 模型: {path}")
+    return path
+
+
+class TorchSileroBackend:
+    """TorchScript 后端（模型内部保存 RNN 状态，每个 VAD 实例一份）"""
+
+    name = "torch"
+
+    def __init__(self, sample_rate: int = 16000):
+        import torch
+        from silero_vad import load_silero_vad
+
+        self._torch = torch
+        self.sample_rate = sample_rate
+        logger.info("正在加载 Silero-VAD 模型 (torch)...")
+        self.model = load_silero_vad()
+        logger.info("Silero-VAD 模型加载完成")
+
+    def __call__(self, chunk: np.ndarray) -> float:
+        with self._torch.no_grad():
+            # from_numpy 与 chunk 共享内存，不复制
+            return self.model(self._torch.from_numpy(chunk), self.sample_rate).item()
+
+    def reset_states(self) -> None:
+        self.model.reset_states()
+
+
+class OnnxSileroBackend:
+    """
+    onnxruntime 后端
+
+    InferenceSession 不保存状态，按模型路径在进程内共享；
+    RNN 状态、上下文和输出缓冲区属于每个后端实例。
+    """
+
+    name = "onnx"
+
+    _sessions: Dict[str, object] = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, sample_rate: int = 16000, model_path: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.window_size = 512 if sample_rate == 16000 else 256
+        self.context_size = 64 if sample_rate == 16000 else 32
+
+        self.session = self._get_session(model_path or _packaged_onnx_model())
+
+        # 输入 = 上一窗口末尾的 context + 当前窗口
+        self._input = np.zeros((1, self.context_size + self.window_size), dtype=np.float32)
+        self._window = self._input[0, self.context_size:]
+        self._sr = np.array(sample_rate, dtype=np.int64)
+        self._output = np.zeros((1, 1), dtype=np.float32)
+        # 状态双缓冲：本次输出写入另一块，下次调用交换
+        self._states = [np.zeros((2, 1, 128), dtype=np.float32) for _ in range(2)]
+        self._bindings = [self._bind(self._states[i], self._states[1 - i]) for i in range(2)]
+        self._current = 0
+
+    @classmethod
+    def _get_session(cls, model_path: str):
+        with cls._sessions_lock:
+            session = cls._sessions.get(model_path)
+            if session is None:
+                import onnxruntime
+
+                options = onnxruntime.SessionOptions()
+                options.intra_op_num_threads = 1
+                options.inter_op_num_threads = 1
+                options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+                logger.info(f"正在加载 Silero-VAD 模型 (onnx): {model_path}")
+                session = onnxruntime.InferenceSession(
+                    model_path, sess_options=options, providers=["CPUExecutionProvider"]
+                )
+                cls._sessions[model_path] = session
+                logger.info("Silero-VAD 模型加载完成")
+            return session
+
+    def _bind(self, state_in: np.ndarray, state_out: np.ndarray):
+        binding = self.session.io_binding()
+        for name, array in (("input", self._input), ("state", state_in), ("sr", self._sr)):
+            binding.bind_input(
+                name, "cpu", 0, array.dtype, list(array.shape), array.ctypes.data
+            )
+        for name, array in (("output", self._output), ("stateN", state_out)):
+            binding.bind_output(
+                name, "cpu", 0, array.dtype, list(array.shape), array.ctypes.data
+            )
+        return binding
+
+    def __call__(self, chunk: np.ndarray) -> float:
+        self._window[:] = chunk
+        self.session.run_with_iobinding(self._bindings[self._current])
+        self._current ^= 1
+        # 下一窗口的 context（同一缓冲区内前移，无分配）
+        self._input[0, :self.context_size] = self._input[0, -self.context_size:]
+        return float(self._output[0, 0])
+
+    def reset_states(self) -> None:
+        self._input.fill(0.0)
+        for state in self._states:
+            state.fill(0.0)
+        self._current = 0
+
+
+def create_backend(backend: str, sample_rate: int = 16000, onnx_model_path: Optional[str] = None):
+    """
+    创建推理后端；onnx 不可用（未安装 onnxruntime 或找不到模型）时回退到 torch
+
+    Args:
+        backend: onnx / torch
+        sample_rate: 采样率
+        onnx_model_path: 自定义 ONNX 模型路径（默认使用 silero-vad 包自带的模型）
+    """
+    if backend == "onnx":
+        try:
+            return OnnxSileroBackend(sample_rate, onnx_model_path)
+        except (ImportError, FileNotFoundError) as e:
+            logger.warning(f"Silero-VAD ONNX 后端不可用，回退到 torch: {e}")
+    try:
+        return TorchSileroBackend(sample_rate)
+    except ImportError:
+        logger.warning("silero-vad 未安装，请运行: pip install silero-vad")
+        raise
@@ -3,12 +3,15 @@ Silero VAD 实现
 参考 Open-LLM-VTuber 的 VADEngine 和 StateMachine 实现
 """
 
+import time
 from collections import deque
-from typing import Union
+from typing import Optional, Union
 import numpy as np
 from loguru import logger
 
-from ..interface import VADInterface, VADState, VADResult
+from ..endpointer import AdaptiveEndpointer
+from ..interface import EMPTY_AUDIO, VADInterface, VADState, VADResult
+from .silero_backends import create_backend
 from ....config.core.registry import ProviderRegistry
 
 
@@ -22,6 +25,11 @@ class SileroVAD(VADInterface):
     - ACTIVE -> INACTIVE: 检测到语音暂停
     - INACTIVE -> ACTIVE: 语音继续
     - INACTIVE -> IDLE: 语音完全结束，输出累积的音频
+
+    推理后端可选 onnx（onnxruntime，无需 torch）或 torch（TorchScript）
+
+    adaptive_endpointing 开启时，「静音多久算说完」由 AdaptiveEndpointer 按说话人的停顿习惯
+    和部分识别文本动态决定，不再固定等待 required_misses 个窗口两次
     """
 
     def __init__(
@@ -32,6 +40,11 @@ class SileroVAD(VADInterface):
         required_hits: int = 3,
         required_misses: int = 24,
         smoothing_window: int = 5,
+        backend: str = "onnx",
+        onnx_model_path: Optional[str] = None,
+        adaptive_endpointing: bool = True,
+        min_hangover_ms: float = 250.0,
+        max_hangover_ms: float = 1200.0,
     ):
         # 保存配置参数
         self.sample_rate = sample_rate
@@ -45,7 +58,20 @@ class SileroVAD(VADInterface):
         self.window_size_samples = 512 if sample_rate == 16000 else 256
 
         # 加载模型
-        self.model = self._load_vad_model()
+        self.model = self._load_vad_model(backend, onnx_model_path)
+
+        # 端点检测：未学习到停顿习惯前沿用固定策略的等待时长（ACTIVE→INACTIVE→IDLE 两段）
+        window_ms = self.window_size_samples * 1000 / sample_rate
+        self.endpointer = AdaptiveEndpointer(
+            window_ms=window_ms,
+            default_hangover_ms=2 * required_misses * window_ms,
+            min_hangover_ms=min_hangover_ms,
+            max_hangover_ms=max_hangover_ms,
+            enabled=adaptive_endpointing,
+        )
+
+        # 末尾不足一个窗口时的补零缓冲区（复用，不逐次分配）
+        self._tail = np.zeros(self.window_size_samples, dtype=np.float32)
 
         # 状态机
         self.state_machine = SileroStateMachine(self)
@@ -56,11 +82,14 @@ class SileroVAD(VADInterface):
         self._vad_normalized_logged = False
 
         logger.info(f"✅ Silero VAD 初始化完成")
+        logger.info(f"   - 推理后端: {self.model.name}")
         logger.info(f"   - 采样率: {sample_rate} Hz")
         logger.info(f"   - 概率阈值: {prob_threshold}")
         logger.info(f"   - 分贝阈值: {db_threshold}")
         logger.info(f"   - 开始命中次数: {required_hits}")
         logger.info(f"   - 结束未命中次数: {required_misses}")
+        if adaptive_endpointing:
+            logger.info(f"   - 自适应端点检测: {min_hangover_ms:.0f}-{max_hangover_ms:.0f}ms")
 
     @classmethod
     def from_config(cls, config, **kwargs):
@@ -72,18 +101,18 @@ class SileroVAD(VADInterface):
             required_hits=config.required_hits,
             required_misses=config.required_misses,
             smoothing_window=config.smoothing_window,
+            backend=config.backend,
+            onnx_model_path=config.onnx_model_path,
+            adaptive_endpointing=config.adaptive_endpointing,
+            min_hangover_ms=config.min_hangover_ms,
+            max_hangover_ms=config.max_hangover_ms,
         )
 
-    def _load_vad_model(self):
-        """加载 Silero VAD 模型"""
+    def _load_vad_model(self, backend: str = "onnx", onnx_model_path: Optional[str] = None):
+        """加载 Silero VAD 模型（onnx 不可用时回退到 torch）"""
         try:
-            from silero_vad import load_silero_vad
-            logger.info("正在加载 Silero-VAD 模型...")
-            model = load_silero_vad()
-            logger.info("Silero-VAD 模型加载完成")
-            return model
+            return create_backend(backend, self.sample_rate, onnx_model_path)
         except ImportError:
-            logger.warning("silero-vad 未安装，请运行: pip install silero-vad")
             raise
         except Exception as e:
             logger.error(f"加载 Silero-VAD 模型失败: {e}")
@@ -104,8 +133,6 @@ class SileroVAD(VADInterface):
         Returns:
             VADResult: 检测结果
         """
-        import torch
-
         # 转换为 numpy 数组并智能归一化
         audio_np = np.array(audio_data, dtype=np.float32)
 
@@ -154,16 +181,12 @@ class SileroVAD(VADInterface):
             # 🔥 修复：不要跳过不完整的块，也要处理
             if len(chunk_np) < self.window_size_samples:
                 # 最后一块可能不完整，填充零
-                padded_chunk = np.zeros(self.window_size_samples, dtype=np.float32)
-                padded_chunk[:len(chunk_np)] = chunk_np
-                chunk_np = padded_chunk
-
-            # 转换为 torch 张量
-            chunk_tensor = torch.Tensor(chunk_np)
+                self._tail[:len(chunk_np)] = chunk_np
+                self._tail[len(chunk_np):] = 0.0
+                chunk_np = self._tail
 
             # 计算语音概率
-            with torch.no_grad():
-                speech_prob = self.model(chunk_tensor, self.sample_rate).item()
+            speech_prob = self.model(chunk_np)
 
             # 通过状态机处理
             result = self.state_machine.process(speech_prob, chunk_np)
@@ -177,28 +200,48 @@ class SileroVAD(VADInterface):
 
         # 返回优先级最高的事件：语音结束 > 语音开始 > 普通状态
         if speech_end_event is not None:
-            logger.info(f"[VAD] 返回语音结束事件，音频长度: {len(speech_end_event.audio_data)} 字节")
+            logger.info(f"[VAD] 返回语音结束事件，音频长度: {len(speech_end_event.audio_data)} 采样点")
             return speech_end_event
         elif speech_start_event is not None:
             return speech_start_event
 
         # 没有特殊事件，返回当前状态
         return VADResult(
-            audio_data=b"",
             is_speech_start=False,
             is_speech_end=False,
             state=self.state_machine.state
         )
 
     def reset(self) -> None:
-        """重置状态机"""
-        self.state_machine = SileroStateMachine(self)
+        """重置状态机（复用已分配的缓冲区）"""
+        self.state_machine.reset()
+        self.model.reset_states()
         logger.debug("VAD 状态机已重置")
 
     def get_current_state(self) -> VADState:
         """获取当前状态"""
         return self.state_machine.state
 
+    def observe_transcript(self, text: str) -> None:
+        """部分识别文本（用于判断这句话是否已经说完整）"""
+        self.endpointer.observe_transcript(text)
+
+    def endpointer_stats(self) -> dict:
+        """端点检测统计"""
+        return self.endpointer.stats()
+
+    def get_buffered_audio(self) -> np.ndarray:
+        """获取预缓冲 + 当前语音的 int16 音频视图（与语音结束时输出的音频一致）"""
+        if self.state_machine.state == VADState.IDLE:
+            return EMPTY_AUDIO
+        return self.state_machine.buffered_audio()
+
+    def get_speech_timestamps(self):
+        """获取当前这句话的语音区间（采样点，相对于 get_buffered_audio）"""
+        if self.state_machine.state == VADState.IDLE:
+            return None
+        return self.state_machine.speech_timestamps()
+
     async def close(self) -> None:
         """清理资源"""
         self.reset()
@@ -214,42 +257,91 @@ class SileroStateMachine:
     ACTIVE -> INACTIVE: 连续未命中 required_misses 次
     INACTIVE -> ACTIVE: 连续命中 required_hits 次
     INACTIVE -> IDLE: 连续未命中 required_misses 次（输出音频）
+
+    开启自适应端点检测时，ACTIVE / INACTIVE 下连续静音达到 endpointer 给出的等待时长即输出音频；
+    说话中途的停顿（静音后又继续说）和过早结束（结束后很快又开口）回报给 endpointer 学习
+
+    同时记录语音区间（ACTIVE 段），语音结束时随音频一起输出，
+    下游 ASR 据此跳过自己的 VAD
+
+    缓冲区全部预先分配，逐窗口处理不分配内存：
+    - IDLE 状态下的预缓冲是 int16 环形缓冲区（PRE_ROLL_WINDOWS 个窗口）
+    - 语音开始时把预缓冲按时间顺序拷入语音缓冲区，之后的窗口直接写入语音缓冲区
+    - 语音缓冲区有两块轮流使用；语音结束时输出当前缓冲区的 NumPy 视图并切换到另一块，
+      因此视图在下一句话结束前保持有效（容量不足时按 2 倍扩容，扩容后不再缩小）
     """
 
+    # 语音区间两侧的填充（毫秒）
+    SPEECH_PAD_MS = 200
+
+    # 预缓冲窗口数（约 0.64 秒）
+    PRE_ROLL_WINDOWS = 20
+
+    # 语音缓冲区初始容量（秒）
+    INITIAL_CAPACITY_S = 10
+
     def __init__(self, vad_instance):
-        self.state = VADState.IDLE
         self.vad = vad_instance  # 保存 SileroVAD 实例的引用
+        window = vad_instance.window_size_samples
+
+        # 平滑窗口
+        self.prob_window = deque(maxlen=vad_instance.smoothing_window)
+        self.db_window = deque(maxlen=vad_instance.smoothing_window)
+
+        # 预缓冲环形缓冲区
+        self._ring = np.zeros(self.PRE_ROLL_WINDOWS * window, dtype=np.int16)
+        # 两块轮流使用的语音缓冲区
+        capacity = self.INITIAL_CAPACITY_S * vad_instance.sample_rate
+        self._buffers = [np.zeros(capacity, dtype=np.int16) for _ in range(2)]
+        # float32 -> int16 转换用的临时窗口
+        self._scratch = np.empty(window, dtype=np.float32)
+
+        # INACTIVE 状态超时机制（秒）
+        self._inactive_timeout = 1.0  # INACTIVE 状态超过1秒就强制结束
+        if vad_instance.endpointer.enabled:
+            # 自适应时以最大等待时长兜底
+            self._inactive_timeout = vad_instance.endpointer.max_hangover_ms / 1000
+
+        self.reset()
+
+    def reset(self) -> None:
+        """回到 IDLE 并清空所有缓冲（保留已分配的内存）"""
+        self.state = VADState.IDLE
 
         # 计数器
         self.hit_count = 0
         self.miss_count = 0
+        # 当前连续静音窗口数（ACTIVE / INACTIVE）
+        self._silence_windows = 0
+        # 上一句话结束后经过的窗口数（None 表示已超过最大等待时长，不再视为停顿）
+        self._since_end_windows = None
 
-        # 累积的音频数据
-        self.probs = []
-        self.dbs = []
-        self.bytes = bytearray()
+        self.prob_window.clear()
+        self.db_window.clear()
 
-        # 平滑窗口
-        self.prob_window = deque(maxlen=vad_instance.smoothing_window)
-        self.db_window = deque(maxlen=vad_instance.smoothing_window)
+        self._ring_next = 0    # 下一个写入的预缓冲窗口
+        self._ring_count = 0   # 预缓冲中的窗口数
+        self._active = 0       # 当前使用的语音缓冲区
+        self._length = 0       # 当前语音缓冲区中的采样点数
 
-        # 预缓冲（保存语音开始前的一些音频）
-        self.pre_buffer = deque(maxlen=20)
+        # 语音区间 [start, end]（采样点，相对于语音缓冲区起点；end 为 None 表示进行中）
+        self._segments = []
+        self._pre_samples = 0
 
         # 诊断计数器
         self._chunk_count = 0
 
-        # INACTIVE 状态超时机制（秒）
         self._inactive_start_time = None
-        self._inactive_timeout = 1.0  # INACTIVE 状态超过1秒就强制结束
+
+        self.vad.endpointer.reset()
 
     @staticmethod
     def calculate_db(audio_data: np.ndarray) -> float:
-        """计算音频的分贝值"""
+        """计算音频的分贝值（int16 幅度）"""
         # 避免空数组或全零数组导致的 sqrt 警告
         if audio_data is None or len(audio_data) == 0:
             return -np.inf
-        mean_square = np.mean(np.square(audio_data))
+        mean_square = float(np.dot(audio_data, audio_data)) / len(audio_data)
         if mean_square <= 0:
             return -np.inf
         rms = np.sqrt(mean_square)
@@ -259,19 +351,145 @@ class SileroStateMachine:
         """获取平滑后的概率和分贝值"""
         self.prob_window.append(prob)
         self.db_window.append(db)
-        return np.mean(self.prob_window), np.mean(self.db_window)
+        return sum(self.prob_window) / len(self.prob_window), sum(self.db_window) / len(self.db_window)
+
+    # ---------- 缓冲区 ----------
+
+    def _write_pre_roll(self) -> None:
+        """把当前窗口写入预缓冲环形缓冲区"""
+        window = self._scratch.size
+        start = self._ring_next * window
+        np.copyto(self._ring[start:start + window], self._scratch, casting="unsafe")
+        self._ring_next = (self._ring_next + 1) % self.PRE_ROLL_WINDOWS
+        self._ring_count = min(self._ring_count + 1, self.PRE_ROLL_WINDOWS)
+
+    def _write_speech(self) -> None:
+        """把当前窗口追加到语音缓冲区"""
+        window = self._scratch.size
+        buffer = self._buffers[self._active]
+        if self._length + window > buffer.size:
+            grown = np.zeros(buffer.size * 2, dtype=np.int16)
+            grown[:self._length] = buffer[:self._length]
+            self._buffers[self._active] = buffer = grown
+            logger.debug(f"[VAD State Machine] 语音缓冲区扩容到 {grown.size / self.vad.sample_rate:.0f}s")
+        np.copyto(buffer[self._length:self._length + window], self._scratch, casting="unsafe")
+        self._length += window
+
+    def _start_speech(self) -> None:
+        """语音开始：把预缓冲（已包含当前窗口）按时间顺序拷入语音缓冲区"""
+        window = self._scratch.size
+        buffer = self._buffers[self._active]
+        oldest = (self._ring_next - self._ring_count) % self.PRE_ROLL_WINDOWS
+        first = min(self._ring_count, self.PRE_ROLL_WINDOWS - oldest)
+        buffer[:first * window] = self._ring[oldest * window:(oldest + first) * window]
+        rest = self._ring_count - first
+        buffer[first * window:self._ring_count * window] = self._ring[:rest * window]
+        self._length = self._ring_count * window
+        self._pre_samples = self._length
+        self._ring_count = 0
+
+    def _finish_speech(self) -> np.ndarray:
+        """语音结束：返回当前语音的视图并切换到另一块缓冲区"""
+        audio = self._buffers[self._active][:self._length]
+        self._active ^= 1
+        self._length = 0
+        self._segments = []
+        self._pre_samples = 0
+        self._ring_count = 0
+        return audio
+
+    def buffered_audio(self) -> np.ndarray:
+        """当前这句话的 int16 音频视图（预缓冲 + 语音）"""
+        return self._buffers[self._active][:self._length]
+
+    # ---------- 语音区间 ----------
+
+    @property
+    def _position(self) -> int:
+        """当前位置（采样点，相对于语音缓冲区起点）"""
+        return self._length
+
+    def _open_segment(self, chunks_ago: int) -> None:
+        # 状态切换发生在连续命中 chunks_ago 块之后，语音实际开始得更早
+        start = max(0, self._position - chunks_ago * self.vad.window_size_samples)
+        self._segments.append([start, None])
+
+    def _close_segment(self, chunks_ago: int) -> None:
+        if self._segments and self._segments[-1][1] is None:
+            start = self._segments[-1][0]
+            self._segments[-1][1] = max(start, self._position - chunks_ago * self.vad.window_size_samples)
+
+    def speech_timestamps(self) -> list:
+        """
+        当前语音区间（加填充并合并重叠区间）
 
-    def update(self, chunk_bytes: bytes, prob: float, db: float) -> None:
-        """更新累积数据"""
-        self.probs.append(prob)
-        self.dbs.append(db)
-        self.bytes.extend(chunk_bytes)
+        Returns:
+            [{"start": int, "end": int}]，采样点
+        """
+        total = self._position
+        pad = self.SPEECH_PAD_MS * self.vad.sample_rate // 1000
+        merged = []
+        for start, end in self._segments:
+            start = max(0, start - pad)
+            end = min(total, (total if end is None else end) + pad)
+            if merged and start <= merged[-1]["end"]:
+                merged[-1]["end"] = max(merged[-1]["end"], end)
+            elif end > start:
+                merged.append({"start": start, "end": end})
+        return merged
+
+    # ---------- 端点检测 ----------
+
+    def _turn_ended(self) -> bool:
+        """当前静音是否已足够判定说完"""
+        endpointer = self.vad.endpointer
+        if endpointer.enabled:
+            return self._silence_windows >= endpointer.hangover_windows()
+        return self.state == VADState.INACTIVE and self.miss_count >= self.vad.required_misses
+
+    def _record_pause(self) -> None:
+        """静音后继续说话：把这段静音作为停顿回报给 endpointer"""
+        self.vad.endpointer.record_pause(self._silence_windows * self.vad.endpointer.window_ms)
+        self._silence_windows = 0
+
+    def _check_early_end(self) -> None:
+        """语音开始：上一句话结束得太早（中间只是停顿）时回报给 endpointer"""
+        if self._since_end_windows is None:
+            return
+        # 语音开始前已经连续命中了 required_hits 个窗口
+        gap_windows = self._since_end_windows - self.vad.required_hits
+        self._since_end_windows = None
+        endpointer = self.vad.endpointer
+        if endpointer.enabled and gap_windows * endpointer.window_ms < endpointer.max_hangover_ms:
+            endpointer.record_early_end(gap_windows * endpointer.window_ms)
+
+    def _end_result(self, reason: str) -> Union[VADResult, None]:
+        """语音结束：输出音频视图（太短时丢弃）"""
+        self.state = VADState.IDLE
+        self.miss_count = 0
+        self._inactive_start_time = None
 
-    def reset_buffers(self) -> None:
-        """重置缓冲区"""
-        self.probs.clear()
-        self.dbs.clear()
-        self.bytes.clear()
+        # 端点延迟 = 最后一个语音窗口之后等待的静音时长
+        self._close_segment(self._silence_windows)
+        self.vad.endpointer.on_turn_end(self._silence_windows * self.vad.endpointer.window_ms, reason)
+        self._since_end_windows = self._silence_windows
+        self._silence_windows = 0
+
+        speech_timestamps = self.speech_timestamps()
+        audio_data = self._finish_speech()
+
+        # 检查音频长度是否足够（至少0.25秒，约4000采样点）
+        if len(audio_data) > 4000:
+            logger.info(f"[VAD State Machine] ✅ 语音结束 ({reason}), 音频长度: {len(audio_data)} 采样点")
+            return VADResult(
+                audio_data=audio_data,
+                is_speech_start=False,
+                is_speech_end=True,
+                state=VADState.IDLE,
+                speech_timestamps=speech_timestamps
+            )
+        logger.debug(f"[VAD State Machine] 音频太短 ({len(audio_data)} 采样点)，丢弃")
+        return None
 
     def process(self, prob: float, float_chunk_np: np.ndarray) -> Union[VADResult, None]:
         """
@@ -279,17 +497,16 @@ class SileroStateMachine:
 
         Args:
             prob: 语音概率
-            float_chunk_np: float32 音频块
+            float_chunk_np: float32 音频块（window_size 个采样点）
 
         Returns:
             VADResult 或 None（无特殊事件时）
         """
-        # 转换为 int16 字节
-        int_chunk_np = (float_chunk_np * 32767).astype(np.int16)
-        chunk_bytes = int_chunk_np.tobytes()
+        # 转换到 int16 幅度（写入缓冲区时截断为 int16）
+        np.multiply(float_chunk_np, 32767, out=self._scratch)
 
         # 计算分贝值
-        db = self.calculate_db(int_chunk_np)
+        db = self.calculate_db(self._scratch)
 
         # 平滑处理
         smoothed_prob, smoothed_db = self.get_smoothed_values(prob, db)
@@ -302,7 +519,6 @@ class SileroStateMachine:
         #     smoothed_db >= self.vad.db_threshold
         # )
 
-        # 每5个块打印一次诊断信息（更频繁）
         self._chunk_count += 1
 
         # 临时启用诊断日志（每10个块打印一次）
@@ -312,18 +528,21 @@ class SileroStateMachine:
         # 状态机处理
         if self.state == VADState.IDLE:
             # 空闲状态：等待语音开始
-            self.pre_buffer.append(chunk_bytes)
+            self._write_pre_roll()
+            if self._since_end_windows is not None:
+                self._since_end_windows += 1
 
             if is_speech:
                 self.hit_count += 1
                 if self.hit_count >= self.vad.required_hits:
                     # 检测到语音开始
                     self.state = VADState.ACTIVE
-                    self.update(chunk_bytes, smoothed_prob, smoothed_db)
+                    self._check_early_end()
+                    self._start_speech()
+                    self._open_segment(self.vad.required_hits)
                     self.hit_count = 0
                     logger.info(f"[VAD State Machine] ✅ 语音开始: hit_count={self.hit_count}")
                     return VADResult(
-                        audio_data=b"",
                         is_speech_start=True,
                         is_speech_end=False,
                         state=VADState.ACTIVE
@@ -333,28 +552,30 @@ class SileroStateMachine:
 
         elif self.state == VADState.ACTIVE:
             # 活跃状态：正在说话
-            self.update(chunk_bytes, smoothed_prob, smoothed_db)
+            self._write_speech()
 
             if is_speech:
+                if self._silence_windows:
+                    self._record_pause()
                 self.miss_count = 0
             else:
                 self.miss_count += 1
-                # 注释掉频繁的DEBUG日志
-                # if self._chunk_count % 100 == 1 or self.miss_count % 10 == 1:
-                #     logger.debug(f"[VAD State Machine] ACTIVE: miss_count={self.miss_count}/{self.vad.required_misses}")
+                self._silence_windows += 1
+                if self._turn_ended():
+                    return self._end_result("ACTIVE→IDLE")
                 if self.miss_count >= self.vad.required_misses:
                     # 检测到语音暂停
                     self.state = VADState.INACTIVE
+                    self._close_segment(self.miss_count)
                     self.miss_count = 0
                     self._inactive_start_time = None  # 重置超时计时
                     logger.info(f"[VAD State Machine] ⏸️ 语音暂停 (ACTIVE→INACTIVE)")
 
         elif self.state == VADState.INACTIVE:
             # 暂停状态：等待语音继续或结束
-            self.update(chunk_bytes, smoothed_prob, smoothed_db)
+            self._write_speech()
 
             # 🔥 超时检查：如果 INACTIVE 状态持续超过超时时间，强制结束
-            import time
             if self._inactive_start_time is None:
                 self._inactive_start_time = time.time()
 
@@ -362,35 +583,15 @@ class SileroStateMachine:
             if inactive_duration > self._inactive_timeout:
                 # 超时强制结束
                 logger.info(f"[VAD State Machine] ⏰ INACTIVE 超时 ({inactive_duration:.2f}s > {self._inactive_timeout}s)，强制结束语音")
-                self.state = VADState.IDLE
-                self._inactive_start_time = None
-                self.miss_count = 0
-
-                # 合并预缓冲和主缓冲区的音频
-                pre_bytes = b"".join(self.pre_buffer)
-                audio_data = pre_bytes + bytes(self.bytes)
-
-                self.reset_buffers()
-                self.pre_buffer.clear()
-
-                # 检查音频长度是否足够（至少0.5秒，约8000字节）
-                if len(audio_data) > 8000:
-                    logger.info(f"[VAD State Machine] ✅ 语音结束 (INACTIVE 超时), 音频长度: {len(audio_data)} 字节")
-                    return VADResult(
-                        audio_data=audio_data,
-                        is_speech_start=False,
-                        is_speech_end=True,
-                        state=VADState.IDLE
-                    )
-                else:
-                    logger.debug(f"[VAD State Machine] 音频太短 ({len(audio_data)} 字节)，丢弃")
-                    return None
+                return self._end_result("INACTIVE 超时")
 
             if is_speech:
                 self.hit_count += 1
                 if self.hit_count >= self.vad.required_hits:
                     # 语音继续
                     self.state = VADState.ACTIVE
+                    self._record_pause()
+                    self._open_segment(self.hit_count)
                     self.hit_count = 0
                     self.miss_count = 0
                     self._inactive_start_time = None
@@ -398,32 +599,9 @@ class SileroStateMachine:
             else:
                 self.hit_count = 0
                 self.miss_count += 1
-                # 注释掉频繁的DEBUG日志
-                # if self._chunk_count % 100 == 1 or self.miss_count % 10 == 1:
-                #     logger.debug(f"[VAD State Machine] INACTIVE: miss_count={self.miss_count}/{self.vad.required_misses}, duration={inactive_duration:.2f}s")
-                if self.miss_count >= self.vad.required_misses:
+                self._silence_windows += 1
+                if self._turn_ended():
                     # 语音完全结束
-                    self.state = VADState.IDLE
-                    self.miss_count = 0
-                    self._inactive_start_time = None
-
-                    # 合并预缓冲和主缓冲区的音频
-                    pre_bytes = b"".join(self.pre_buffer)
-                    audio_data = pre_bytes + bytes(self.bytes)
-
-                    self.reset_buffers()
-                    self.pre_buffer.clear()
-
-                    # 检查音频长度是否足够（至少0.5秒，约8000字节）
-                    if len(audio_data) > 8000:
-                        logger.info(f"[VAD State Machine] ✅ 语音结束 (INACTIVE→IDLE), 音频长度: {len(audio_data)} 字节")
-                        return VADResult(
-                            audio_data=audio_data,
-                            is_speech_start=False,
-                            is_speech_end=True,
-                            state=VADState.IDLE
-                        )
-                    else:
-                        logger.debug(f"[VAD State Machine] 音频太短 ({len(audio_data)} 字节)，丢弃")
+                    return self._end_result("INACTIVE→IDLE")
 
         return None
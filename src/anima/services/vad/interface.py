@@ -3,7 +3,7 @@ VAD (语音活动检测) 接口定义
 """
 
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, Union
+from typing import AsyncGenerator, Dict, List, Optional, Union
 from enum import Enum
 import numpy as np
 
@@ -15,20 +15,33 @@ class VADState(Enum):
     INACTIVE = 3   # 语音结束（静音状态）
 
 
+# 空音频（只读，供没有音频的结果共用）
+EMPTY_AUDIO = np.zeros(0, dtype=np.int16)
+EMPTY_AUDIO.setflags(write=False)
+
+
 class VADResult:
-    """VAD 检测结果"""
+    """
+    VAD 检测结果
+
+    audio_data 为 int16 PCM 的 NumPy 数组；语音结束时通常是 VAD 内部缓冲区的视图，
+    只保证在下一句话结束前有效，需要长期保存时请自行复制
+    """
     
     def __init__(
         self,
-        audio_data: bytes = b"",
+        audio_data: np.ndarray = EMPTY_AUDIO,
         is_speech_start: bool = False,
         is_speech_end: bool = False,
-        state: VADState = VADState.IDLE
+        state: VADState = VADState.IDLE,
+        speech_timestamps: Optional[List[Dict[str, int]]] = None
     ):
         self.audio_data = audio_data
         self.is_speech_start = is_speech_start
         self.is_speech_end = is_speech_end
         self.state = state
+        # 语音结束时附带：audio_data 中的语音区间 [{"start", "end"}]（采样点）
+        self.speech_timestamps = speech_timestamps
     
     @property
     def is_special_signal(self) -> bool:
@@ -72,6 +85,30 @@ class VADInterface(ABC):
     def get_current_state(self) -> VADState:
         """获取当前状态"""
         pass
+
+    def get_buffered_audio(self) -> np.ndarray:
+        """
+        获取当前这句话已缓冲的音频（int16 PCM 数组，可能是内部缓冲区的视图）
+
+        与语音结束时 VADResult.audio_data 的开头逐采样点一致，供流式识别使用
+        """
+        return EMPTY_AUDIO
+
+    def get_speech_timestamps(self) -> Optional[List[Dict[str, int]]]:
+        """
+        获取当前这句话的语音区间 [{"start", "end"}]（采样点，相对于 get_buffered_audio）
+
+        不支持的实现返回 None
+        """
+        return None
+
+    def observe_transcript(self, text: str) -> None:
+        """
+        接收当前这句话的部分识别文本（支持自适应端点检测的实现据此调整静音等待时长）
+
+        默认忽略
+        """
+        pass
     
     @abstractmethod
     async def close(self) -> None:
@@ -51,27 +51,42 @@ else:
 
 import socketio
 import json
+import time
 import numpy as np
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 import uvicorn
 from typing import Dict, Union, Optional
 
 from anima.config import AppConfig
-from anima.service_context import ServiceContext
+from anima.service_context import ServiceContext, prepare_memory_storage
 from anima.services.conversation import (
     ConversationOrchestrator,
     SessionManager,
 )
 from anima.events.handlers import TextHandler
 from anima.events.handlers.unified_event_handler import UnifiedEventHandler
-from anima.events.core import EventPriority
+from anima.events.core import EventBus, EventPriority
+from anima.services.asr.streaming import LocalAgreementTranscriber, STREAM_PREFIX_KEY
+from anima.services.vad.endpointer import END_OF_TURN_LATENCY
+from anima.utils.loop_monitor import LOOP_MONITOR
+from anima.utils.metrics import ERRORS_TOTAL, METRICS, VAD_PROCESS_LATENCY
+from anima.utils.session_recording import SESSION_RECORDINGS
+from anima.utils.tracing import SPEECH_END_KEY, TRACE_RECORDER
 from anima.utils.logger_manager import logger_manager
 from anima.config.user_settings import UserSettings
 from anima.config.live2d import get_live2d_config
 from anima.avatar.prompt_builder import EmotionPromptBuilder
 
+class RecordingAsyncServer(socketio.AsyncServer):
+    """发往单个会话的事件同时写入该会话的录制（未启用录制时只多一次字典查找）"""
+
+    async def emit(self, event, data=None, to=None, room=None, **kwargs):
+        SESSION_RECORDINGS.record_out(to or room, event, data)
+        return await super().emit(event, data, to=to, room=room, **kwargs)
+
+
 # 创建 Socket.IO 服务器
-sio = socketio.AsyncServer(
+sio = RecordingAsyncServer(
     async_mode='asgi',
     cors_allowed_origins=['http://localhost:3000', 'http://127.0.0.1:3000', '*'],
     cors_credentials=True,
@@ -95,13 +110,16 @@ session_contexts: Dict[str, ServiceContext] = {}
 # 键: session_id, 值: ConversationOrchestrator 实例
 orchestrators: Dict[str, ConversationOrchestrator] = {}
 
-# 音频缓冲区（简单实现）
+# 音频缓冲区：每个会话一组 float32 数组块，取出时一次拼接
 audio_buffers: Dict[str, list] = {}
 
 # VAD 超时追踪（防止VAD一直检测不到语音结束）
 # 键: session_id, 值: {'active_time': 最后活跃时间戳, 'chunk_count': 接收的音频块数}
 vad_active_sessions: Dict[str, dict] = {}
 
+# 流式部分识别（ASR 引擎支持时，VAD ACTIVE 期间推送部分转录）
+asr_streams: Dict[str, LocalAgreementTranscriber] = {}
+
 # 全局配置（可被所有会话共享）
 global_config: AppConfig = None
 
@@ -117,31 +135,28 @@ logger.info(f"应用用户日志级别配置: {initial_log_level}")
 VAD_TIMEOUT_SECONDS = 15  # 如果VAD持续活跃超过15秒，强制触发ASR
 
 
+def pcm16_to_float(pcm: np.ndarray) -> np.ndarray:
+    """int16 PCM（可以是 VAD 缓冲区的视图）转为新的 float32 数组 [-1.0, 1.0]"""
+    return np.multiply(pcm, 1.0 / 32767.0, dtype=np.float32)
+
+
 class AudioBufferManager:
     """音频缓冲区管理器"""
     
     def append(self, sid: str, audio_data) -> int:
-        """追加音频数据"""
-        if sid not in audio_buffers:
-            audio_buffers[sid] = []
-        
-        if isinstance(audio_data, list):
-            audio_buffers[sid].extend(audio_data)
-        else:
-            audio_buffers[sid].append(audio_data)
-        
-        return len(audio_buffers[sid])
+        """追加音频数据（float32 数组或前端发来的浮点列表），返回累积的采样点数"""
+        chunks = audio_buffers.setdefault(sid, [])
+        chunks.append(np.asarray(audio_data, dtype=np.float32))
+        return sum(len(chunk) for chunk in chunks)
     
     def pop(self, sid: str) -> Optional[np.ndarray]:
         """获取并清空缓冲区"""
-        if sid not in audio_buffers:
-            return None
-        
-        data = audio_buffers.pop(sid)
-        if not data:
+        chunks = audio_buffers.pop(sid, None)
+        if not chunks:
             return None
         
-        return np.array(data, dtype=np.float32)
+        data = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+        return data if len(data) else None
     
     def remove(self, sid: str) -> None:
         """移除缓冲区"""
@@ -227,6 +242,14 @@ async def get_or_create_orchestrator(sid: str) -> ConversationOrchestrator:
             live2d_config=live2d_config if live2d_config.enabled else None,
             memory_system=ctx.memory_system,
             local_llm=ctx.local_llm_engine,  # 添加本地LLM（无persona）
+            event_bus=EventBus(
+                mode=ctx.config.system.event_dispatch,
+                queue_size=ctx.config.system.event_queue_size,
+                overflow=ctx.config.system.event_overflow,
+            ),
+            coalesce_window_ms=ctx.config.system.sentence_coalesce_ms,
+            coalesce_max_chars=ctx.config.system.sentence_coalesce_chars,
+            max_queued_turns=ctx.config.system.turn_queue_size,
         )
 
         # 创建并注册 TextHandler（使用 orchestrator 的 websocket_send，已通过 adapter 包装）
@@ -259,6 +282,33 @@ async def get_or_create_orchestrator(sid: str) -> ConversationOrchestrator:
     return orchestrators[sid]
 
 
+def get_asr_stream(sid: str, ctx: ServiceContext) -> Optional[LocalAgreementTranscriber]:
+    """
+    获取指定会话的流式识别器（ASR 引擎不支持流式时返回 None）
+    """
+    if ctx.asr_engine is None or not ctx.asr_engine.supports_streaming:
+        return None
+
+    if sid not in asr_streams:
+        async def send_partial(text: str):
+            # 部分识别文本同时交给 VAD 判断这句话是否说完整
+            if ctx.vad_engine is not None:
+                ctx.vad_engine.observe_transcript(text)
+            orchestrator = await get_or_create_orchestrator(sid)
+            await orchestrator.websocket_send(json.dumps({
+                "type": "user-transcript",
+                "text": text,
+                "is_final": False,
+            }))
+
+        asr_streams[sid] = LocalAgreementTranscriber(
+            ctx.asr_engine,
+            on_partial=send_partial,
+            interval_ms=getattr(ctx.asr_engine, 'partial_interval_ms', 800.0),
+        )
+    return asr_streams[sid]
+
+
 async def cleanup_context(sid: str) -> None:
     """
     清理指定会话的所有资源
@@ -266,6 +316,13 @@ async def cleanup_context(sid: str) -> None:
     Args:
         sid: session id
     """
+    SESSION_RECORDINGS.stop(sid)
+
+    # 停止流式识别
+    stream = asr_streams.pop(sid, None)
+    if stream is not None:
+        stream.reset()
+
     # 停止编排器（清理 EventRouter 中的所有订阅）
     if sid in orchestrators:
         orchestrator = orchestrators[sid]
@@ -283,11 +340,20 @@ async def cleanup_context(sid: str) -> None:
         logger.info(f"已清理会话 {sid} 的所有资源")
 
 
-async def _process_audio_input(sid: str) -> None:
+async def _process_audio_input(
+    sid: str,
+    metadata: Optional[dict] = None,
+    speech_timestamps: Optional[list] = None,
+) -> None:
     """
     处理音频输入的辅助函数
 
     从缓冲区获取音频数据并通过 ConversationOrchestrator 处理
+
+    Args:
+        sid: session id
+        metadata: 传给管线的元数据（如流式识别已确认的前缀）
+        speech_timestamps: VAD 输出的语音区间（采样点）
     """
     try:
         # 获取累积的音频数据
@@ -315,8 +381,9 @@ async def _process_audio_input(sid: str) -> None:
         # 使用编排器处理音频输入
         result = await orchestrator.process_input(
             raw_input=audio_data,
-            metadata={},
+            metadata=metadata or {},
             from_name='User',
+            speech_timestamps=speech_timestamps,
         )
 
         if result.error:
@@ -340,6 +407,7 @@ async def _process_audio_input(sid: str) -> None:
 
     except Exception as e:
         logger.error(f"[{sid}] _process_audio_input 出错: {e}", exc_info=True)
+        ERRORS_TOTAL.inc("audio_input")
         await sio.emit('error', {
             'type': 'error',
             'message': str(e)
@@ -364,6 +432,7 @@ async def connect(sid, environ):
     print(f"[OK] 客户端已连接: {sid}")
     print(f"{'='*60}\n")
     logger.info(f"客户端已连接: {sid}")
+    SESSION_RECORDINGS.start(sid, {"remote": environ.get('REMOTE_ADDR')})
 
     # 发送欢迎消息
     await sio.emit('connection-established', {
@@ -400,6 +469,7 @@ async def text_input(sid, data):
     处理文本输入
     使用 ConversationOrchestrator 处理对话
     """
+    SESSION_RECORDINGS.record_in(sid, 'text_input', data)
     text = data.get('text', '')
     logger.info(f"[{sid}] 收到文本输入: {text}")
     
@@ -437,6 +507,7 @@ async def mic_audio_data(sid, data):
     处理音频数据流
     将音频数据累积到缓冲区
     """
+    SESSION_RECORDINGS.record_in(sid, 'mic_audio_data', data)
     audio = data.get('audio', [])
     
     if audio:
@@ -450,6 +521,7 @@ async def raw_audio_data(sid, data):
     处理原始音频数据用于 VAD 检测
     参考 Open-LLM-VTuber 的 _handle_raw_audio_data 实现
     """
+    SESSION_RECORDINGS.record_in(sid, 'raw_audio_data', data)
     audio_chunk = data.get('audio', [])
 
     if not audio_chunk:
@@ -491,14 +563,16 @@ async def raw_audio_data(sid, data):
             return
 
         # 使用 VAD 检测语音（返回 VADResult 对象，不是可迭代对象）
+        vad_start = time.perf_counter()
         result = ctx.vad_engine.detect_speech(audio_chunk)
+        VAD_PROCESS_LATENCY.observe((time.perf_counter() - vad_start) * 1000)
+        asr_stream = get_asr_stream(sid, ctx)
 
         # 记录 VAD 状态（降低频率，避免刷屏）
         # if count % 50 == 0 or result.state.value != 'IDLE':
         #     logger.info(f"[{sid}] 📊 VAD 状态: {result.state.value}, 音频块: {len(audio_chunk)} 采样点 (第 {count} 块)")
 
         # 🔥 超时保护：追踪VAD活跃时间
-        import time
         current_time = time.time()
 
         if result.state.value == 'ACTIVE':
@@ -517,19 +591,22 @@ async def raw_audio_data(sid, data):
                     del vad_active_sessions[sid]
 
                 # 手动触发语音结束处理
-                # 从 VAD 状态机获取累积的音频数据
-                if hasattr(ctx.vad_engine, 'state_machine') and ctx.vad_engine.state_machine.bytes:
-                    audio_data_bytes = bytes(ctx.vad_engine.state_machine.bytes)
-
-                    if len(audio_data_bytes) > 1024:  # 至少有一些音频数据
-                        logger.info(f"[{sid}] 🚨 超时强制触发ASR，音频长度: {len(audio_data_bytes)} 字节")
+                # 从 VAD 获取累积的音频数据（预缓冲 + 语音）
+                buffered_pcm = ctx.vad_engine.get_buffered_audio()
+                speech_timestamps = ctx.vad_engine.get_speech_timestamps()
+                if len(buffered_pcm):
+                    if len(buffered_pcm) > 512:  # 至少有一些音频数据
+                        logger.info(f"[{sid}] 🚨 超时强制触发ASR，音频长度: {len(buffered_pcm)} 采样点")
 
-                        # 转换为 float32
-                        audio_float = np.frombuffer(audio_data_bytes, dtype=np.int16).astype(np.float32) / 32767.0
-                        audio_buffer_manager.append(sid, audio_float.tolist())
+                        # 转换为 float32（在重置 VAD 之前复制出缓冲区视图）
+                        audio_buffer_manager.append(sid, pcm16_to_float(buffered_pcm))
 
                         # 重置 VAD 状态机
                         ctx.vad_engine.reset()
+                        metadata = {SPEECH_END_KEY: time.perf_counter()}
+                        stream_prefix = asr_stream.finish() if asr_stream else None
+                        if stream_prefix:
+                            metadata[STREAM_PREFIX_KEY] = stream_prefix
 
                         # 发送控制信号
                         await sio.emit('control', {
@@ -538,7 +615,11 @@ async def raw_audio_data(sid, data):
                         }, to=sid)
 
                         # 触发对话处理
-                        await _process_audio_input(sid)
+                        await _process_audio_input(sid, metadata, speech_timestamps)
+
+            elif asr_stream is not None:
+                # 说话过程中按节奏重新解码，推送部分转录
+                asr_stream.feed(ctx.vad_engine.get_buffered_audio())
 
         elif result.state.value == 'IDLE' and sid in vad_active_sessions:
             # VAD 回到空闲状态，清除超时记录
@@ -548,6 +629,8 @@ async def raw_audio_data(sid, data):
         if result.is_speech_start:
             # 检测到语音开始
             logger.info(f"[{sid}] [OK] VAD 检测到语音开始")
+            if asr_stream is not None:
+                asr_stream.reset()
 
             # 🔥 自动打断：如果当前正在处理对话，则自动打断
             if sid in orchestrators and orchestrators[sid].is_processing:
@@ -559,17 +642,21 @@ async def raw_audio_data(sid, data):
                     'text': 'interrupt'
                 }, to=sid)
 
-        elif result.is_speech_end and len(result.audio_data) > 1024:
+        elif result.is_speech_end and len(result.audio_data) > 512:
             # 检测到语音结束，保存音频并触发对话
-            logger.info(f"[{sid}] [OK] VAD 检测到语音结束，音频长度: {len(result.audio_data)} 字节")
+            logger.info(f"[{sid}] [OK] VAD 检测到语音结束，音频长度: {len(result.audio_data)} 采样点")
 
             # 清除超时记录
             if sid in vad_active_sessions:
                 del vad_active_sessions[sid]
 
-            # 将 int16 字节流转换为归一化的 float32（范围：[-1.0, 1.0]）
-            audio_data = np.frombuffer(result.audio_data, dtype=np.int16).astype(np.float32) / 32767.0
-            audio_buffer_manager.append(sid, audio_data.tolist())
+            # 将 int16 视图转换为归一化的 float32（范围：[-1.0, 1.0]）
+            audio_buffer_manager.append(sid, pcm16_to_float(result.audio_data))
+            # 说完的时刻作为本轮延迟指标的起点
+            metadata = {SPEECH_END_KEY: time.perf_counter()}
+            stream_prefix = asr_stream.finish() if asr_stream else None
+            if stream_prefix:
+                metadata[STREAM_PREFIX_KEY] = stream_prefix
 
             # 发送控制信号通知前端
             await sio.emit('control', {
@@ -578,7 +665,9 @@ async def raw_audio_data(sid, data):
             }, to=sid)
 
             # 直接触发对话处理（不需要等前端发送 mic_audio_end）
-            await _process_audio_input(sid)
+            # 流式识别已确认的前缀随 metadata 传给 ASRStep，只需解码尾部
+            # VAD 的语音区间一并传入，ASR 不再重复运行 VAD
+            await _process_audio_input(sid, metadata, result.speech_timestamps)
                 
     except Exception as e:
         logger.error(f"[{sid}] VAD 处理出错: {e}", exc_info=True)
@@ -590,6 +679,7 @@ async def mic_audio_end(sid, data):
     用户说完话，触发完整对话流程
     使用 ConversationOrchestrator 处理
     """
+    SESSION_RECORDINGS.record_in(sid, 'mic_audio_end', data)
     logger.info(f"[{sid}] 音频输入结束")
     
     try:
@@ -637,6 +727,7 @@ async def interrupt_signal(sid, data):
     打断信号
     取消当前正在进行的对话和 TTS
     """
+    SESSION_RECORDINGS.record_in(sid, 'interrupt_signal', data)
     # 获取用户听到的部分回复
     heard_response = data.get('text', '')
     logger.info(f"[{sid}] 收到打断信号，已听到的回复: {heard_response[:50] if heard_response else '(空)'}...")
@@ -784,6 +875,51 @@ async def set_log_level(sid, data):
     }, to=sid)
 
 
+@sio.event
+async def endpointer_stats(sid, data):
+    """
+    获取端点检测统计（当前会话 + 全部会话的端点延迟分布）
+    """
+    ctx = session_contexts.get(sid)
+    session_stats = None
+    if ctx is not None and hasattr(ctx.vad_engine, 'endpointer_stats'):
+        session_stats = ctx.vad_engine.endpointer_stats()
+
+    await sio.emit('endpointer-stats', {
+        'type': 'endpointer-stats',
+        'session': session_stats,
+        'end_of_turn_latency_ms': END_OF_TURN_LATENCY.snapshot(),
+    }, to=sid)
+
+
+@sio.event
+async def loop_lag_stats(sid, data):
+    """
+    获取事件循环延迟统计和最近的卡顿调用栈
+
+    调用栈包含服务端文件路径，只在 system.loop_lag_stats_event 开启时响应
+
+    Args:
+        data: { blocks: int } - 返回的卡顿记录数（默认 10，最多 50）
+    """
+    if not (global_config or AppConfig.load()).system.loop_lag_stats_event:
+        await sio.emit('error', {
+            'type': 'error',
+            'message': 'loop_lag_stats 未启用（system.loop_lag_stats_event）'
+        }, to=sid)
+        return
+
+    try:
+        blocks = int((data or {}).get('blocks', 10))
+    except (AttributeError, TypeError, ValueError):
+        blocks = 10
+    blocks = max(0, min(blocks, 50))
+    await sio.emit('loop-lag-stats', {
+        'type': 'loop-lag-stats',
+        **LOOP_MONITOR.stats(blocks),
+    }, to=sid)
+
+
 # ============================================
 # 心跳检测
 # ============================================
@@ -885,11 +1021,25 @@ async def lifespan(app: FastAPI):
     # 启动时
     logger.info("服务器启动中...")
     setup_signal_handlers()
+
+    system_config = (global_config or AppConfig.load()).system
+    TRACE_RECORDER.configure(system_config.tracing, system_config.trace_file)
+    if system_config.loop_monitor:
+        LOOP_MONITOR.configure(system_config.loop_lag_interval_ms, system_config.loop_lag_threshold_ms)
+        LOOP_MONITOR.start()
+    SESSION_RECORDINGS.configure(system_config.session_recording, system_config.session_record_dir)
+    try:
+        # 会话连接之前完成（一次性完整 VACUUM 会独占数据库）
+        await asyncio.to_thread(prepare_memory_storage)
+    except Exception as e:
+        logger.warning(f"记忆数据库迁移失败: {e}")
     
     yield
     
     # 关闭时
     logger.info("服务器关闭中...")
+    await LOOP_MONITOR.stop()
+    SESSION_RECORDINGS.stop_all()
     await cleanup_all_resources()
     logger.info("服务器已关闭")
 
@@ -901,6 +1051,58 @@ app = FastAPI(title="Anima - AI Virtual Companion", lifespan=lifespan)
 socket_app = socketio.ASGIApp(sio, app)
 
 
+# ============================================
+# 运行指标（Prometheus）
+# ============================================
+
+def _audio_buffer_bytes() -> float:
+    """所有会话待处理音频缓冲区的字节数"""
+    return sum(chunk.nbytes for chunks in list(audio_buffers.values()) for chunk in chunks)
+
+
+def _executor_queue_depth() -> float:
+    """事件循环默认线程池中排队等待的任务数"""
+    executor = getattr(asyncio.get_running_loop(), "_default_executor", None)
+    work_queue = getattr(executor, "_work_queue", None)
+    return work_queue.qsize() if work_queue is not None else 0
+
+
+def _asr_pending() -> float:
+    """Whisper 共享调度器 / 解码进程池中排队 + 解码中的请求数（只统计已加载的实现）"""
+    pending = 0
+    for module_name, class_name in (
+        ("anima.services.asr.implementations.whisper_scheduler", "WhisperBatchScheduler"),
+        ("anima.services.asr.implementations.whisper_process_pool", "WhisperProcessPool"),
+    ):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            pending += sum(instance.pending for instance in list(getattr(module, class_name)._instances.values()))
+    return pending
+
+
+def _cache_lookups() -> Dict[str, float]:
+    module = sys.modules.get("anima.memory.retrieval_cache")
+    if module is None:
+        return {}
+    return {"hit": module.RetrievalCache.total_hits, "miss": module.RetrievalCache.total_misses}
+
+
+METRICS.gauge("anima_active_sessions", "活动会话数", fn=lambda: len(session_contexts))
+METRICS.gauge("anima_orchestrators", "对话编排器数量", fn=lambda: len(orchestrators))
+METRICS.gauge("anima_turns_active", "正在运行的对话轮次数", fn=lambda: sum(o.turns.is_busy for o in list(orchestrators.values())))
+METRICS.gauge("anima_turns_queued", "排队等待的对话输入数", fn=lambda: sum(o.turns.pending for o in list(orchestrators.values())))
+METRICS.gauge("anima_audio_buffer_bytes", "待处理音频缓冲区字节数", fn=_audio_buffer_bytes)
+METRICS.gauge("anima_executor_queue_depth", "默认线程池排队任务数", fn=_executor_queue_depth)
+METRICS.gauge("anima_asr_pending", "Whisper 排队 + 解码中的请求数", fn=_asr_pending)
+METRICS.counter("anima_memory_cache_lookups_total", "记忆检索缓存查询（按结果）", label="result", fn=_cache_lookups)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 抓取入口"""
+    return Response(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # ============================================
 # 启动入口
 # ============================================
@@ -0,0 +1,340 @@
+"""
+音频解码与重采样工具
+
+- WAV（PCM 8/16/24/32 位整数、32/64 位浮点、WAVE_FORMAT_EXTENSIBLE）直接用 NumPy 在内存中解析，
+  不写临时文件
+- 裸 PCM（int16 小端）在给定采样率时直接解析
+- 其他压缩格式（mp3/ogg/webm/m4a ...）通过管道交给 ffmpeg，由 ffmpeg 一次完成解码、混音和重采样
+- 重采样使用有理数倍率的多相（polyphase）Kaiser 窗 sinc 滤波器，滤波器按倍率缓存
+- 编码：WAV 直接拼接文件头与 int16 数据；FLAC 使用 soundfile（libsndfile，进程内，可选依赖）
+
+所有函数都是同步的；在事件循环中调用时请放到线程池（asyncio.to_thread）。
+"""
+
+import shutil
+import struct
+import subprocess
+from functools import lru_cache
+from math import gcd
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+TARGET_SAMPLE_RATE = 16000
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# 每次矩阵乘法处理的输出采样点数（限制临时内存）
+_RESAMPLE_BLOCK = 16384
+
+
+class AudioDecodeError(ValueError):
+    """音频无法解码"""
+
+
+# ---------- WAV ----------
+
+def is_wav(data: bytes) -> bool:
+    """是否为 RIFF/WAVE 数据"""
+    return len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    在内存中解析 WAV
+
+    Args:
+        data: 完整的 WAV 字节
+
+    Returns:
+        (float32 单声道音频 [-1, 1], 采样率)
+    """
+    if not is_wav(data):
+        raise AudioDecodeError("不是 RIFF/WAVE 数据")
+
+    fmt = None
+    payload = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, pos)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt = data[body:body + size]
+        elif chunk_id == b"data":
+            # 流式写出的 WAV 可能把 data 长度写成 0 或 0xFFFFFFFF
+            end = len(data) if size in (0, 0xFFFFFFFF) else min(len(data), body + size)
+            payload = memoryview(data)[body:end]
+            break
+        pos = body + size + (size & 1)
+
+    if fmt is None or payload is None:
+        raise AudioDecodeError("WAV 缺少 fmt 或 data 块")
+
+    format_tag, channels, sample_rate, _, block_align, bits = struct.unpack_from("<HHIIHH", fmt, 0)
+    if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        format_tag = struct.unpack_from("<H", fmt, 24)[0]
+    if channels < 1:
+        raise AudioDecodeError("WAV 声道数无效")
+
+    width = bits // 8
+    usable = len(payload) - len(payload) % (width * channels)
+    payload = payload[:usable]
+
+    if format_tag == _WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        samples = np.frombuffer(payload, dtype="<f4" if bits == 32 else "<f8").astype(np.float32)
+    elif format_tag == _WAVE_FORMAT_PCM:
+        if bits == 8:
+            samples = (np.frombuffer(payload, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif bits == 16:
+            samples = np.frombuffer(payload, dtype="<i2").astype(np.float32) / 32768.0
+        elif bits == 24:
+            raw = np.frombuffer(payload, dtype=np.uint8).reshape(-1, 3)
+            ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8)
+                    | (raw[:, 2].astype(np.int32) << 16))
+            ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+            samples = ints.astype(np.float32) / float(1 << 23)
+        elif bits == 32:
+            samples = np.frombuffer(payload, dtype="<i4").astype(np.float32) / 2147483648.0
+        else:
+            raise AudioDecodeError(f"不支持的 PCM 位深: {bits}")
+    else:
+        raise AudioDecodeError(f"不支持的 WAV 编码: format_tag={format_tag}, bits={bits}")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return samples, sample_rate
+
+
+def decode_pcm16(data: bytes) -> np.ndarray:
+    """解析裸 int16 小端 PCM（单声道）"""
+    usable = len(data) - len(data) % 2
+    return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+def to_int16(audio: np.ndarray) -> np.ndarray:
+    """float [-1, 1] 音频转 int16（整数输入直接转换类型）"""
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:
+        return audio
+    if np.issubdtype(audio.dtype, np.floating):
+        return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    return audio.astype(np.int16)
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> bytes:
+    """
+    编码为 16 位单声道 PCM WAV（直接拼接 44 字节文件头，无额外拷贝）
+
+    Args:
+        audio: float32 [-1, 1] 或 int16 音频
+        sample_rate: 采样率
+
+    Returns:
+        bytes: WAV 文件内容
+    """
+    pcm = to_int16(audio).astype("<i2", copy=False).tobytes()
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE",
+        b"fmt ", 16, _WAVE_FORMAT_PCM, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", len(pcm),
+    )
+    return header + pcm
+
+
+def encode_flac(audio: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE,
+                compression_level: float = 0.0) -> bytes:
+    """
+    编码为 16 位单声道 FLAC（进程内，需要 soundfile）
+
+    Args:
+        audio: float32 [-1, 1] 或 int16 音频
+        sample_rate: 采样率
+        compression_level: 0.0（最快）~ 1.0（最小）
+
+    Returns:
+        bytes: FLAC 文件内容
+
+    Raises:
+        ImportError: 未安装 soundfile
+    """
+    import io
+    import soundfile
+
+    buffer = io.BytesIO()
+    with soundfile.SoundFile(
+        buffer, mode="w", samplerate=sample_rate, channels=1,
+        format="FLAC", subtype="PCM_16", compression_level=compression_level,
+    ) as f:
+        f.write(to_int16(audio))
+    return buffer.getvalue()
+
+
+# ---------- ffmpeg ----------
+
+def _ffmpeg_binary() -> str:
+    binary = shutil.which("ffmpeg")
+    if binary is None:
+        raise AudioDecodeError("解码压缩音频需要 ffmpeg，请安装后加入 PATH")
+    return binary
+
+
+def decode_with_ffmpeg(source: Union[bytes, str, Path], sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    通过管道调用 ffmpeg 解码，直接输出目标采样率的 float32 单声道 PCM
+
+    Args:
+        source: 音频字节（经 stdin 传入）或文件路径
+        sample_rate: 输出采样率
+
+    Returns:
+        np.ndarray: float32 音频
+    """
+    from_stdin = isinstance(source, (bytes, bytearray, memoryview))
+    command = [
+        _ffmpeg_binary(), "-hide_banner", "-loglevel", "error",
+        *([] if from_stdin else ["-nostdin"]),
+        "-i", "pipe:0" if from_stdin else str(source),
+        "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+    result = subprocess.run(
+        command,
+        input=bytes(source) if from_stdin else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise AudioDecodeError(f"ffmpeg 解码失败: {result.stderr.decode('utf-8', 'ignore').strip()}")
+    return np.frombuffer(result.stdout, dtype="<f4").astype(np.float32, copy=False)
+
+
+# ---------- 重采样 ----------
+
+def _kaiser_beta(attenuation_db: float) -> float:
+    """按阻带衰减计算 Kaiser 窗 beta（Kaiser 经验公式）"""
+    if attenuation_db > 50:
+        return 0.1102 * (attenuation_db - 8.7)
+    if attenuation_db >= 21:
+        return 0.5842 * (attenuation_db - 21) ** 0.4 + 0.07886 * (attenuation_db - 21)
+    return 0.0
+
+
+@lru_cache(maxsize=32)
+def design_polyphase_filter(up: int, down: int, half_width: int = 16,
+                            attenuation_db: float = 80.0) -> Tuple[np.ndarray, int]:
+    """
+    设计（并缓存）多相低通滤波器
+
+    Args:
+        up: 上采样倍率
+        down: 下采样倍率
+        half_width: 每侧的零交叉数（越大过渡带越窄）
+        attenuation_db: 阻带衰减
+
+    Returns:
+        (形状为 (up, taps) 的多相系数（已反转，可直接与输入窗口做点积）, 半长度)
+    """
+    factor = max(up, down)
+    cutoff = 1.0 / factor                      # 相对于上采样后的奈奎斯特频率
+    half_len = half_width * factor
+    n = np.arange(-half_len, half_len + 1, dtype=np.float64)
+    h = cutoff * np.sinc(cutoff * n) * np.kaiser(n.size, _kaiser_beta(attenuation_db))
+    h *= up / h.sum()                          # 补偿零值插入带来的增益损失
+
+    # 补零到 up 的整数倍后拆成 up 个相位：phase[p][j] = h[p + j * up]
+    taps = -(-h.size // up)
+    padded = np.zeros(taps * up, dtype=np.float64)
+    padded[:h.size] = h
+    phases = padded.reshape(taps, up).T[:, ::-1]
+    phases = np.ascontiguousarray(phases, dtype=np.float32)
+    phases.setflags(write=False)
+    return phases, half_len
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    多相 windowed-sinc 重采样（等价于 scipy.signal.resample_poly 的零相位输出）
+
+    Args:
+        audio: float32 单声道音频
+        orig_sr: 原采样率
+        target_sr: 目标采样率
+
+    Returns:
+        np.ndarray: 重采样后的 float32 音频
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if orig_sr == target_sr or audio.size == 0:
+        return audio
+
+    g = gcd(orig_sr, target_sr)
+    up, down = target_sr // g, orig_sr // g
+    phases, half_len = design_polyphase_filter(up, down)
+    taps = phases.shape[1]
+
+    out_len = -(-audio.size * up // down)
+    # 左侧补 taps-1 个零，使窗口 [n0, n0 + taps) 对应输入 x[n0-taps+1 .. n0]
+    padded = np.zeros(audio.size + 2 * taps, dtype=np.float32)
+    padded[taps - 1:taps - 1 + audio.size] = audio
+    windows = sliding_window_view(padded, taps)
+
+    out = np.empty(out_len, dtype=np.float32)
+    for p_offset in range(min(up, out_len)):
+        # 输出 m 对应上采样域位置 t = m * down + half_len，相位 t % up，输入索引 t // up
+        t0 = p_offset * down + half_len
+        phase = phases[t0 % up]
+        start = t0 // up
+        count = len(range(p_offset, out_len, up))
+        # 同一相位的输出间隔 up 个点，对应输入窗口间隔 down 个点（均为视图，不复制）
+        rows = windows[start:start + count * down:down]
+        for block in range(0, count, _RESAMPLE_BLOCK):
+            out[p_offset + block * up:p_offset + (block + _RESAMPLE_BLOCK) * up:up] = \
+                rows[block:block + _RESAMPLE_BLOCK] @ phase
+    return out
+
+
+# ---------- 入口 ----------
+
+def decode_audio(
+    source: Union[bytes, bytearray, str, Path],
+    target_sr: int = TARGET_SAMPLE_RATE,
+    pcm_sample_rate: Optional[int] = None,
+) -> np.ndarray:
+    """
+    解码任意音频为目标采样率的 float32 单声道
+
+    Args:
+        source: 音频字节或文件路径
+        target_sr: 目标采样率
+        pcm_sample_rate: source 为裸 int16 PCM 时的采样率
+
+    Returns:
+        np.ndarray: float32 音频 [-1, 1]
+    """
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if path.suffix.lower() == ".wav":
+            source = path.read_bytes()
+        else:
+            return decode_with_ffmpeg(path, target_sr)
+
+    data = bytes(source)
+    if is_wav(data):
+        try:
+            samples, sample_rate = decode_wav(data)
+        except AudioDecodeError:
+            # 少见的 WAV 编码（ADPCM、μ-law ...）交给 ffmpeg
+            return decode_with_ffmpeg(data, target_sr)
+        return resample(samples, sample_rate, target_sr)
+
+    if pcm_sample_rate:
+        return resample(decode_pcm16(data), pcm_sample_rate, target_sr)
+
+    return decode_with_ffmpeg(data, target_sr)
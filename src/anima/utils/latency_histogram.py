@@ -0,0 +1,79 @@
+"""
+延迟直方图
+
+固定桶（累计计数，与 Prometheus histogram 语义一致）+ 最近 N 个样本（计算精确分位数）。
+"""
+
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+
+# 默认桶上界（毫秒）
+DEFAULT_BUCKETS_MS = (50, 100, 200, 300, 400, 500, 600, 800, 1000, 1500, 2000, 3000, 5000)
+
+
+class LatencyHistogram:
+    """
+    延迟分布统计
+
+    Example:
+        >>> hist = LatencyHistogram("end_of_turn_latency_ms")
+        >>> hist.observe(420.0)
+        >>> hist.snapshot()["p50"]
+        420.0
+    """
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS_MS,
+                 recent: int = 1000, description: str = ""):
+        """
+        Args:
+            name: 指标名称
+            buckets: 桶上界（升序，最后隐含 +Inf）
+            recent: 保留的最近样本数（用于分位数）
+            description: 指标说明
+        """
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._recent = deque(maxlen=recent)
+
+    def observe(self, value: float) -> None:
+        """记录一个样本"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self._recent.append(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """最近样本的分位数（没有样本时返回 None）"""
+        if not self._recent:
+            return None
+        return float(np.percentile(np.fromiter(self._recent, dtype=np.float64), q * 100))
+
+    def cumulative_buckets(self):
+        """[(上界, 累计计数)]，最后一项上界为 inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前统计（次数、均值、p50 / p90 / p99）"""
+        def rounded(value):
+            return None if value is None else round(value, 1)
+
+        return {
+            "count": self.count,
+            "mean": rounded(self.sum / self.count) if self.count else None,
+            "p50": rounded(self.quantile(0.5)),
+            "p90": rounded(self.quantile(0.9)),
+            "p99": rounded(self.quantile(0.99)),
+        }
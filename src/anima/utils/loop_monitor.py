@@ -0,0 +1,184 @@
+"""
+事件循环延迟监控
+
+两部分配合：
+- 采样协程：每 interval_ms 睡眠一次，实际醒来时间与预期之差即调度延迟（loop lag），记入直方图
+- 看门狗线程：采样协程每次醒来都会更新心跳；心跳超过 threshold_ms 没有更新说明事件循环被同步调用卡住，
+  此时抓取事件循环线程的调用栈（sys._current_frames），即正在阻塞的协程 / 回调位置
+
+卡顿结束后补上实际时长，保留最近的若干次卡顿记录，通过 /metrics 和 loop_lag_stats 事件（需开启 system.loop_lag_stats_event）查看。
+
+已知的阻塞点（会在这里以调用栈的形式出现）：GLMLLM.chat_stream 同步迭代 SDK 流、
+raw_audio_data 中同步的 detect_speech、LongTermMemory.store 同步提交 SQLite、VectorStore 同步 encode。
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from .latency_histogram import LatencyHistogram
+from .metrics import METRICS
+
+
+LOOP_LAG = METRICS.histogram(LatencyHistogram(
+    "anima_event_loop_lag_ms",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+    description="事件循环调度延迟（毫秒）",
+))
+LOOP_BLOCKS_TOTAL = METRICS.counter("anima_event_loop_blocks_total", "事件循环卡顿次数（超过阈值）")
+
+
+class LoopBlock:
+    """一次事件循环卡顿"""
+
+    __slots__ = ("started_at", "detected_after_ms", "duration_ms", "stack")
+
+    def __init__(self, started_at: float, detected_after_ms: float, stack: List[str]):
+        self.started_at = started_at          # 墙钟时间
+        self.detected_after_ms = detected_after_ms
+        self.duration_ms: Optional[float] = None   # 卡顿结束后补上
+        self.stack = stack
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "detected_after_ms": round(self.detected_after_ms, 1),
+            "duration_ms": None if self.duration_ms is None else round(self.duration_ms, 1),
+            "stack": self.stack,
+        }
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控
+
+    Example:
+        >>> monitor = LoopLagMonitor(threshold_ms=100)
+        >>> monitor.start()          # 在事件循环中调用
+        >>> monitor.stats()["lag_ms"]["p99"]
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = 50.0,
+        threshold_ms: float = 100.0,
+        stack_depth: int = 12,
+        keep: int = 50,
+    ):
+        """
+        Args:
+            interval_ms: 采样间隔
+            threshold_ms: 超过该时长视为卡顿并抓取调用栈
+            stack_depth: 保留的调用栈帧数（最内层）
+            keep: 保留的卡顿记录数
+        """
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.stack_depth = stack_depth
+        self.blocks: deque = deque(maxlen=keep)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._heartbeat = 0.0
+        self._current_block: Optional[LoopBlock] = None
+
+    def configure(self, interval_ms: float, threshold_ms: float) -> None:
+        """按系统配置调整（启动前调用）"""
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """启动采样协程和看门狗线程（必须在事件循环中调用）"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._sample_loop())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"[LoopLagMonitor] 已启动：采样间隔 {self.interval * 1000:.0f}ms，"
+            f"卡顿阈值 {self.threshold * 1000:.0f}ms"
+        )
+
+    async def stop(self) -> None:
+        """停止监控"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _sample_loop(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            LOOP_LAG.observe(lag * 1000)
+
+            block = self._current_block
+            if block is not None:
+                # 看门狗已抓到调用栈：补上实际时长
+                self._current_block = None
+                block.duration_ms = lag * 1000
+                logger.warning(
+                    f"[LoopLagMonitor] 事件循环卡顿 {block.duration_ms:.0f}ms，阻塞位置:\n  "
+                    + "\n  ".join(block.stack[-3:])
+                )
+
+    def _watch(self) -> None:
+        """看门狗线程：心跳超时时抓取事件循环线程的调用栈"""
+        check_interval = min(self.interval, self.threshold) / 2
+        while not self._stop.wait(check_interval):
+            stalled = time.perf_counter() - self._heartbeat - self.interval
+            if stalled < self.threshold or self._current_block is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = [
+                f"{entry.filename}:{entry.lineno} {entry.name}"
+                for entry in traceback.extract_stack(frame)[-self.stack_depth:]
+            ]
+            block = LoopBlock(time.time() - stalled, stalled * 1000, stack)
+            self._current_block = block
+            self.blocks.append(block)
+            LOOP_BLOCKS_TOTAL.inc()
+
+    def stats(self, blocks: int = 10) -> Dict[str, Any]:
+        """延迟分布 + 最近的卡顿记录"""
+        return {
+            "running": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": LOOP_LAG.snapshot(),
+            "blocks_total": int(LOOP_BLOCKS_TOTAL.values.get("", 0)),
+            # blocks <= 0 时不返回记录（[-0:] 会返回全部）
+            "recent_blocks": [block.to_dict() for block in list(self.blocks)[-blocks:]] if blocks > 0 else [],
+        }
+
+
+# 进程级监控实例（服务启动时按配置启动）
+LOOP_MONITOR = LoopLagMonitor()
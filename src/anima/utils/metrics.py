@@ -0,0 +1,163 @@
+"""
+Prometheus 文本格式的运行指标
+
+- Counter：单调递增计数（可带一个标签）
+- Gauge：当前值（显式 set / inc / dec，或抓取时调用回调计算）
+- 直方图：直接注册 LatencyHistogram（与 Prometheus histogram 语义一致）
+
+记录路径只做整数 / 浮点运算和一次字典查找：不加锁（记录都发生在事件循环线程中），
+不格式化字符串；所有文本格式化都在 /metrics 被抓取时由 render() 完成。
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .latency_histogram import LatencyHistogram
+
+
+class Counter:
+    """
+    单调递增计数
+
+    Example:
+        >>> turns = Counter("anima_turns_total", "对话轮次", label="status")
+        >>> turns.inc("ok")
+    """
+
+    def __init__(self, name: str, description: str = "", label: Optional[str] = None,
+                 fn: Optional[Callable[[], Dict[str, float]]] = None):
+        """
+        Args:
+            name: 指标名称
+            description: 说明
+            label: 标签名（None 表示不带标签）
+            fn: 抓取时读取计数的回调（返回 {标签值: 计数}，用于计数保存在别处的情况）
+        """
+        self.name = name
+        self.description = description
+        self.label = label
+        self.fn = fn
+        self.values: Dict[str, float] = {}
+
+    def inc(self, label_value: str = "", amount: float = 1.0) -> None:
+        self.values[label_value] = self.values.get(label_value, 0.0) + amount
+
+    def collect(self) -> Dict[str, float]:
+        return self.fn() if self.fn is not None else self.values
+
+
+class Gauge:
+    """当前值"""
+
+    def __init__(self, name: str, description: str = "", fn: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            name: 指标名称
+            description: 说明
+            fn: 抓取时计算当前值的回调（None 表示使用 set / inc / dec 维护的值）
+        """
+        self.name = name
+        self.description = description
+        self.fn = fn
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def collect(self) -> float:
+        return self.fn() if self.fn is not None else self.value
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """指标注册表（进程级一个，见 METRICS）"""
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def counter(self, name: str, description: str = "", label: Optional[str] = None,
+                fn: Optional[Callable[[], Dict[str, float]]] = None) -> Counter:
+        """获取（或注册）计数器"""
+        if name not in self._counters:
+            self._counters[name] = Counter(name, description, label, fn)
+        return self._counters[name]
+
+    def gauge(self, name: str, description: str = "", fn: Optional[Callable[[], float]] = None) -> Gauge:
+        """获取（或注册）仪表；重复注册时以最新的回调为准"""
+        gauge = self._gauges.get(name)
+        if gauge is None:
+            gauge = self._gauges[name] = Gauge(name, description, fn)
+        elif fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, hist: LatencyHistogram, name: Optional[str] = None) -> LatencyHistogram:
+        """注册已有的延迟直方图（name 默认使用 hist.name）"""
+        self._histograms[name or hist.name] = hist
+        return hist
+
+    def render(self) -> str:
+        """Prometheus 文本格式（text/plain; version=0.0.4）"""
+        lines: List[str] = []
+
+        for counter in self._counters.values():
+            lines.append(f"# HELP {counter.name} {counter.description}")
+            lines.append(f"# TYPE {counter.name} counter")
+            values = counter.collect()
+            if not values and counter.label is None:
+                values = {"": 0.0}
+            for label_value, value in sorted(values.items()):
+                labels = f'{{{counter.label}="{label_value}"}}' if counter.label else ""
+                lines.append(f"{counter.name}{labels} {_format_value(value)}")
+
+        for gauge in self._gauges.values():
+            try:
+                value = gauge.collect()
+            except Exception as e:
+                logger.debug(f"[MetricsRegistry] 读取 {gauge.name} 失败: {e}")
+                continue
+            lines.append(f"# HELP {gauge.name} {gauge.description}")
+            lines.append(f"# TYPE {gauge.name} gauge")
+            lines.append(f"{gauge.name} {_format_value(value)}")
+
+        for name, hist in self._histograms.items():
+            lines.append(f"# HELP {name} {hist.description or hist.name}")
+            lines.append(f"# TYPE {name} histogram")
+            for bound, count in hist.cumulative_buckets():
+                lines.append(f'{name}_bucket{{le="{_format_value(bound)}"}} {count}')
+            lines.append(f"{name}_sum {_format_value(round(hist.sum, 3))}")
+            lines.append(f"{name}_count {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._counters) + tuple(self._gauges) + tuple(self._histograms)
+
+
+# 进程级注册表
+METRICS = MetricsRegistry()
+
+# 通用指标（各模块直接使用）
+TURNS_TOTAL = METRICS.counter("anima_turns_total", "对话轮次（按结果）", label="status")
+INTERRUPTS_TOTAL = METRICS.counter("anima_interrupts_total", "打断次数")
+ERRORS_TOTAL = METRICS.counter("anima_errors_total", "错误次数（按来源）", label="source")
+TTS_PENDING = METRICS.gauge("anima_tts_pending", "进行中的 TTS 合成数")
+VAD_PROCESS_LATENCY = METRICS.histogram(LatencyHistogram(
+    "anima_vad_process_latency_ms",
+    buckets=(0.5, 1, 2, 5, 10, 20, 50, 100),
+    description="每个音频块的 VAD 处理耗时（毫秒）",
+))
@@ -0,0 +1,71 @@
+"""
+Mock 服务的延迟模型
+
+Mock ASR / LLM / TTS / VAD 用它模拟真实服务的耗时，使压测和基准测试在没有网络和模型的情况下
+也能覆盖真实的时序（首 token 延迟、逐 token 间隔、TTS 实时倍数、ASR 每秒音频的耗时）。
+
+- 延迟按对数正态分布采样：给定均值和变异系数（jitter = 标准差 / 均值），带长尾，接近真实服务
+- 指定 seed 时每个服务实例使用独立的 random.Random(seed)，同样的调用顺序得到同样的延迟序列
+"""
+
+import asyncio
+import math
+import random
+import time
+from typing import Optional
+
+
+def make_rng(seed: Optional[int]) -> random.Random:
+    """seed 为 None 时使用系统随机源"""
+    return random.Random(seed)
+
+
+class LatencyModel:
+    """
+    对数正态延迟分布
+
+    Example:
+        >>> first_token = LatencyModel(300, jitter=0.3, rng=make_rng(0))
+        >>> first_token.sample_ms()          # 毫秒，均值 300
+        >>> await first_token.sleep()
+    """
+
+    __slots__ = ("mean_ms", "jitter", "rng", "_mu", "_sigma")
+
+    def __init__(self, mean_ms: float, jitter: float = 0.0, rng: Optional[random.Random] = None):
+        """
+        Args:
+            mean_ms: 平均延迟（毫秒），0 表示不等待
+            jitter: 变异系数（0 表示固定延迟）
+            rng: 随机源（make_rng(seed)）
+        """
+        self.mean_ms = max(0.0, mean_ms)
+        self.jitter = max(0.0, jitter)
+        self.rng = rng or make_rng(None)
+        # 对数正态参数：使分布的均值恰好为 mean_ms
+        self._sigma = math.sqrt(math.log1p(self.jitter ** 2))
+        self._mu = math.log(self.mean_ms) - self._sigma ** 2 / 2 if self.mean_ms > 0 else 0.0
+
+    def sample_ms(self, scale: float = 1.0) -> float:
+        """采样一次延迟（scale 用于按音频时长 / 文本长度缩放均值）"""
+        if self.mean_ms <= 0 or scale <= 0:
+            return 0.0
+        if self._sigma == 0:
+            return self.mean_ms * scale
+        return self.rng.lognormvariate(self._mu, self._sigma) * scale
+
+    async def sleep(self, scale: float = 1.0) -> float:
+        """异步等待一次采样的延迟（模拟网络 / 远端推理），返回实际采样的毫秒数"""
+        delay = self.sample_ms(scale)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        return delay
+
+    def spin(self, scale: float = 1.0) -> float:
+        """忙等一次采样的延迟（模拟占用 CPU 的本地推理，会阻塞当前线程）"""
+        delay = self.sample_ms(scale)
+        if delay > 0:
+            end = time.perf_counter() + delay / 1000
+            while time.perf_counter() < end:
+                pass
+        return delay
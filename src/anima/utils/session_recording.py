@@ -0,0 +1,292 @@
+"""
+会话录制 / 回放
+
+按会话把入站事件（音频块、文本输入、打断）和出站事件（文本、音频、表情、控制信号）连同时间戳
+写入一个 gzip 压缩的 JSONL 文件，用于复现线上变慢的会话：
+- 第一行是文件头（格式版本、会话 ID、开始时间、采样率）
+- 其余每行一个事件：{"t": 相对开始的秒数, "dir": "in" / "out", "event": 事件名, "data": 数据}
+- 入站音频（前端发来的浮点列表）转成 int16 PCM 的 base64，约为 JSON 浮点列表的 1/5
+- 出站事件中的大字段（base64 音频、音量包络）只记录长度，时序分析不需要内容
+
+scripts/benchmarks/replay_session.py 把入站一侧按原速或加速回放到服务端，
+并用 timing_profile / diff_profiles 对比两次运行的每轮时序。
+"""
+
+import base64
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+
+FORMAT = "anima-session"
+VERSION = 1
+SAMPLE_RATE = 16000
+
+AUDIO_EVENTS = ("raw_audio_data", "mic_audio_data")
+# 出站事件中按「首次出现」计时的事件（及其别名）
+TRANSCRIPT_EVENTS = ("transcript", "user-transcript")
+TEXT_EVENTS = ("text", "sentence")
+AUDIO_OUT_EVENTS = ("audio_with_expression", "audio")
+
+MAX_STRING = 256   # 超过该长度的字符串只记录长度
+MAX_ITEMS = 64     # 超过该长度的列表只记录长度
+
+
+def encode_audio(samples) -> Dict[str, Any]:
+    """前端音频（[-1, 1] 浮点列表或 int16 范围的数值）-> int16 PCM base64"""
+    audio = np.asarray(samples, dtype=np.float32)
+    if audio.size and np.max(np.abs(audio)) <= 1.0:
+        audio = audio * 32767.0
+    pcm = np.clip(audio, -32768, 32767).astype(np.int16)
+    return {"pcm16": base64.b64encode(pcm.tobytes()).decode("ascii"), "n": int(pcm.size)}
+
+
+def decode_audio(data: Dict[str, Any]) -> np.ndarray:
+    """encode_audio 的逆过程，返回 [-1, 1] 的 float32"""
+    pcm = np.frombuffer(base64.b64decode(data["pcm16"]), dtype=np.int16)
+    return pcm.astype(np.float32) / 32767.0
+
+
+def _compact(value: Any) -> Any:
+    """去掉出站数据中的大字段，只保留时序分析需要的结构"""
+    if isinstance(value, str):
+        return value if len(value) <= MAX_STRING else {"omitted_chars": len(value)}
+    if isinstance(value, dict):
+        return {key: _compact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) > MAX_ITEMS:
+            return {"omitted_items": len(value)}
+        return [_compact(item) for item in value]
+    return value
+
+
+class SessionRecorder:
+    """单个会话的录制文件"""
+
+    def __init__(self, path: Path, session_id: str, meta: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.session_id = session_id
+        self.events = 0
+        self._start = time.perf_counter()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({
+            "format": FORMAT,
+            "version": VERSION,
+            "session_id": session_id,
+            "started_at": time.time(),
+            "sample_rate": SAMPLE_RATE,
+            "meta": meta or {},
+        })
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def record(self, direction: str, event: str, data: Any) -> None:
+        if direction == "in" and event in AUDIO_EVENTS and isinstance(data, dict) and "audio" in data:
+            data = {**{k: v for k, v in data.items() if k != "audio"}, "audio": encode_audio(data["audio"])}
+        elif direction == "out":
+            data = _compact(data)
+        self._write({
+            "t": round(time.perf_counter() - self._start, 4),
+            "dir": direction,
+            "event": event,
+            "data": data,
+        })
+        self.events += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SessionRecordings:
+    """
+    所有会话的录制（进程级一个，见 SESSION_RECORDINGS）
+
+    未启用时 record_in / record_out 只做一次字典查找。
+
+    Example:
+        >>> SESSION_RECORDINGS.configure(True, "logs/sessions")
+        >>> SESSION_RECORDINGS.start(sid)
+        >>> SESSION_RECORDINGS.record_in(sid, "text_input", {"text": "你好"})
+        >>> SESSION_RECORDINGS.stop(sid)   # 返回录制文件路径
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.directory = Path("logs/sessions")
+        self._recorders: Dict[str, SessionRecorder] = {}
+
+    def configure(self, enabled: bool, directory: str) -> None:
+        self.enabled = enabled
+        self.directory = Path(directory)
+        if enabled:
+            logger.info(f"[SessionRecordings] 会话录制已启用: {self.directory}")
+
+    def start(self, session_id: str, meta: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+        if not self.enabled or session_id in self._recorders:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.directory / f"{stamp}_{session_id}.jsonl.gz"
+        try:
+            self._recorders[session_id] = SessionRecorder(path, session_id, meta)
+        except OSError as e:
+            logger.warning(f"[SessionRecordings] 无法创建录制文件 {path}: {e}")
+            return None
+        return path
+
+    def record_in(self, session_id: str, event: str, data: Any) -> None:
+        recorder = self._recorders.get(session_id)
+        if recorder is not None:
+            recorder.record("in", event, data)
+
+    def record_out(self, session_id: Optional[str], event: str, data: Any) -> None:
+        # 广播（to 为空或房间列表）不属于单个会话
+        recorder = self._recorders.get(session_id) if isinstance(session_id, str) else None
+        if recorder is not None:
+            recorder.record("out", event, data)
+
+    def stop(self, session_id: str) -> Optional[Path]:
+        recorder = self._recorders.pop(session_id, None)
+        if recorder is None:
+            return None
+        recorder.close()
+        logger.info(f"[SessionRecordings] 会话 {session_id} 录制完成: {recorder.events} 个事件 -> {recorder.path}")
+        return recorder.path
+
+    def stop_all(self) -> None:
+        for session_id in list(self._recorders):
+            self.stop(session_id)
+
+
+# ---------------------------------------------------------------------------
+# 读取与时序分析
+# ---------------------------------------------------------------------------
+
+def load_session(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """读取录制文件，返回 (文件头, 事件列表)"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = iter(f)
+        header = json.loads(next(lines))
+        if header.get("format") != FORMAT:
+            raise ValueError(f"不是会话录制文件: {path}")
+        events = [json.loads(line) for line in lines if line.strip()]
+    return header, events
+
+
+def iter_inbound(events: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    return (event for event in events if event["dir"] == "in")
+
+
+def _is_turn_start(event: Dict[str, Any]) -> Optional[str]:
+    """每轮的起点：入站 text_input / mic_audio_end，或服务端 VAD 判定说完（出站 control: mic-audio-end）"""
+    if event["dir"] == "in" and event["event"] == "text_input":
+        return "text"
+    if event["dir"] == "in" and event["event"] == "mic_audio_end":
+        return "audio"
+    if event["dir"] == "out" and event["event"] == "control":
+        data = event.get("data") or {}
+        if isinstance(data, dict) and data.get("text") == "mic-audio-end":
+            return "audio"
+    return None
+
+
+def timing_profile(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    按轮次统计时序（毫秒，相对每轮起点）
+
+    Returns:
+        每轮一项：kind、start、transcript_ms、first_text_ms、first_audio_ms、last_out_ms
+    """
+    turns: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    for event in events:
+        kind = _is_turn_start(event)
+        if kind is not None:
+            current = {
+                "kind": kind,
+                "start": event["t"],
+                "transcript_ms": None,
+                "first_text_ms": None,
+                "first_audio_ms": None,
+                "last_out_ms": None,
+            }
+            turns.append(current)
+            continue
+        if current is None or event["dir"] != "out":
+            continue
+
+        elapsed = round((event["t"] - current["start"]) * 1000, 1)
+        data = event.get("data") or {}
+        name = event["event"]
+        if name in TRANSCRIPT_EVENTS and isinstance(data, dict) and data.get("is_final", True):
+            current["transcript_ms"] = current["transcript_ms"] or elapsed
+        elif name in TEXT_EVENTS and isinstance(data, dict) and data.get("text"):
+            current["first_text_ms"] = current["first_text_ms"] or elapsed
+        elif name in AUDIO_OUT_EVENTS:
+            current["first_audio_ms"] = current["first_audio_ms"] or elapsed
+        if name != "control":
+            current["last_out_ms"] = elapsed
+    return turns
+
+
+PROFILE_METRICS = ("transcript_ms", "first_text_ms", "first_audio_ms", "last_out_ms")
+
+
+def summarize_profile(turns: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """各指标的 p50 / p95 / max"""
+    summary = {}
+    for metric in PROFILE_METRICS:
+        values = np.array([turn[metric] for turn in turns if turn[metric] is not None])
+        if values.size:
+            summary[metric] = {
+                "count": int(values.size),
+                "p50": round(float(np.percentile(values, 50)), 1),
+                "p95": round(float(np.percentile(values, 95)), 1),
+                "max": round(float(values.max()), 1),
+            }
+        else:
+            summary[metric] = {"count": 0}
+    return summary
+
+
+def diff_profiles(
+    baseline: List[Dict[str, Any]], candidate: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    对比两次运行：按轮次顺序逐轮对齐，给出每个指标的差值和整体分布变化
+
+    Returns:
+        {"turns": [{index, kind, <metric>: {base, new, delta}}...], "summary": {metric: {base, new}}}
+    """
+    rows = []
+    for index, (base, new) in enumerate(zip(baseline, candidate)):
+        row: Dict[str, Any] = {"index": index, "kind": base["kind"]}
+        if base["kind"] != new["kind"]:
+            row["kind"] = f"{base['kind']}/{new['kind']}"
+        for metric in PROFILE_METRICS:
+            b, n = base[metric], new[metric]
+            row[metric] = {
+                "base": b,
+                "new": n,
+                "delta": None if b is None or n is None else round(n - b, 1),
+            }
+        rows.append(row)
+    return {
+        "turns": rows,
+        "unmatched": {"baseline": max(0, len(baseline) - len(candidate)),
+                      "candidate": max(0, len(candidate) - len(baseline))},
+        "summary": {
+            "baseline": summarize_profile(baseline),
+            "candidate": summarize_profile(candidate),
+        },
+    }
+
+
+# 进程级录制管理（服务启动时按配置启用）
+SESSION_RECORDINGS = SessionRecordings()
@@ -0,0 +1,400 @@
+"""
+对话轮次追踪
+
+每轮对话（一次 process_input）创建一个 TurnTrace，通过 contextvars 在同一个任务内传递，
+管线步骤、输出管线、EventBus 分发、ASR / LLM / TTS 调用和记忆检索 / 存储各自记录一个 span，
+关键时刻（ASR 出字、LLM 首个 token、首段音频发出）记录为 mark。
+
+由 span / mark 派生的指标（均相对于参考时刻：音频输入为 VAD 判定说完，文本输入为收到输入）：
+- asr_ms: 说完 -> ASR 文本
+- ttft_ms: 说完 -> LLM 首个 token
+- ttfa_ms: 说完 -> 首段音频发出
+- total_ms: 说完 -> 本轮结束
+
+没有活动的追踪时 span() 返回共用的空对象，开销只有一次 ContextVar 读取。
+
+导出：
+- JSONL：每轮一行（可配置为每轮结束时自动追加到文件）
+- Chrome trace：chrome://tracing 或 https://ui.perfetto.dev 直接打开
+
+    python scripts/trace_to_chrome.py traces.jsonl -o trace.json
+"""
+
+import json
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from .latency_histogram import LatencyHistogram
+from .metrics import METRICS
+
+
+# metadata 中 VAD 判定说完的时刻（time.perf_counter()）
+SPEECH_END_KEY = "speech_end_perf"
+
+# 派生指标：(指标名, mark 名)
+DERIVED_METRICS = (
+    ("asr_ms", "asr.text"),
+    ("ttft_ms", "llm.first_token"),
+    ("ttfa_ms", "first_audio"),
+)
+
+# 按 span 汇总的服务调用延迟：span 名称 -> (直方图名称, 说明)
+SPAN_METRICS = {
+    "asr.transcribe": ("anima_asr_latency_ms", "ASR 识别耗时（毫秒）"),
+    "llm.chat_stream": ("anima_llm_latency_ms", "LLM 流式生成总耗时（毫秒）"),
+    "llm.local_chat": ("anima_local_llm_latency_ms", "本地 LLM 应答耗时（毫秒）"),
+    "tts.synthesize": ("anima_tts_latency_ms", "TTS 合成耗时（毫秒）"),
+    "memory.retrieve": ("anima_memory_retrieve_latency_ms", "记忆检索耗时（毫秒）"),
+    "memory.store": ("anima_memory_store_latency_ms", "记忆存储耗时（毫秒）"),
+}
+
+_current_trace: ContextVar[Optional["TurnTrace"]] = ContextVar("anima_turn_trace", default=None)
+
+
+class Span:
+    """一段计时（with 语句）"""
+
+    __slots__ = ("trace", "name", "category", "attrs", "start", "end")
+
+    def __init__(self, trace: "TurnTrace", name: str, category: str, attrs: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.start = 0.0
+        self.end = 0.0
+
+    def set(self, key: str, value: Any) -> None:
+        """附加属性"""
+        self.attrs[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.trace.spans.append(self)
+        return False
+
+
+class _NoopSpan:
+    """没有活动追踪时使用的空 span"""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class TurnTrace:
+    """一轮对话的追踪记录"""
+
+    def __init__(self, session_id: str, turn_id: Optional[str] = None, reference: Optional[float] = None):
+        """
+        Args:
+            session_id: 会话 ID
+            turn_id: 轮次 ID（默认随机生成）
+            reference: 派生指标的参考时刻（perf_counter，默认为创建时刻）
+        """
+        self.turn_id = turn_id or uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.wall_start = time.time()
+        self.t0 = time.perf_counter()
+        self.reference = self.t0 if reference is None else reference
+        self.end: Optional[float] = None
+        self.status = "running"
+        self.spans: List[Span] = []
+        self.marks: Dict[str, float] = {}
+        self._token = None
+
+    def span(self, name: str, category: str = "", **attrs) -> Span:
+        return Span(self, name, category, attrs)
+
+    def mark(self, name: str) -> None:
+        """记录一个时刻（同名只记录第一次）"""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter()
+
+    def _ms(self, t: float) -> float:
+        """perf_counter 时刻 -> 相对于本轮开始的毫秒数"""
+        return round((t - self.t0) * 1000, 2)
+
+    def metrics(self) -> Dict[str, Optional[float]]:
+        """派生指标（毫秒，未发生的为 None）"""
+        result = {}
+        for metric, mark in DERIVED_METRICS:
+            t = self.marks.get(mark)
+            result[metric] = None if t is None else round((t - self.reference) * 1000, 1)
+        result["total_ms"] = None if self.end is None else round((self.end - self.reference) * 1000, 1)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONL 记录（时间均为相对于本轮开始的毫秒数）"""
+        return {
+            "turn_id": self.turn_id,
+            "session_id": self.session_id,
+            "start": self.wall_start,
+            "status": self.status,
+            "reference_ms": self._ms(self.reference),
+            "metrics": self.metrics(),
+            "marks": {name: self._ms(t) for name, t in self.marks.items()},
+            "spans": [
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "start_ms": self._ms(span.start),
+                    "dur_ms": round((span.end - span.start) * 1000, 2),
+                    "attrs": span.attrs,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+# ---------- 当前轮次的便捷接口 ----------
+
+def current_trace() -> Optional[TurnTrace]:
+    """当前任务中的追踪（没有时返回 None）"""
+    return _current_trace.get()
+
+
+def span(name: str, category: str = "", **attrs):
+    """
+    在当前轮次中记录一个 span
+
+    Example:
+        >>> with span("tts.synthesize", "tts", chars=len(text)):
+        ...     audio_path = await tts.synthesize(text)
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return Span(trace, name, category, attrs)
+
+
+def mark(name: str) -> None:
+    """在当前轮次中记录一个时刻（同名只记录第一次）"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.mark(name)
+
+
+async def trace_stream(
+    stream: AsyncIterator,
+    name: str,
+    category: str = "",
+    first_mark: Optional[str] = None,
+    **attrs,
+) -> AsyncIterator:
+    """
+    包装异步流：整个消费过程记录为一个 span，第一个元素到达时记录 first_mark
+
+    Args:
+        stream: 异步迭代器（如 LLM 的流式输出）
+        name: span 名称
+        category: span 分类
+        first_mark: 第一个元素到达时记录的 mark 名称
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            await _aclose(stream)
+        return
+
+    chunks = 0
+    with trace.span(name, category, **attrs) as stream_span:
+        try:
+            async for item in stream:
+                if chunks == 0 and first_mark:
+                    trace.mark(first_mark)
+                chunks += 1
+                yield item
+        finally:
+            stream_span.set("chunks", chunks)
+            await _aclose(stream)
+
+
+async def _aclose(stream: AsyncIterator) -> None:
+    """消费方提前停止时立即关闭被包装的流（触发其 finally，释放连接）"""
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+# ---------- 记录与导出 ----------
+
+class TraceRecorder:
+    """
+    进程级追踪记录器
+
+    保留最近的轮次（内存中），按派生指标和服务调用 span 累计延迟分布（注册到 METRICS），
+    配置了 export_path 时每轮结束追加一行 JSONL
+    """
+
+    def __init__(self, enabled: bool = True, export_path: Optional[str] = None, keep: int = 200):
+        """
+        Args:
+            enabled: 是否追踪
+            export_path: JSONL 自动导出路径（None 表示不导出）
+            keep: 内存中保留的轮次数
+        """
+        self.enabled = enabled
+        self.export_path = export_path
+        self.recent: deque = deque(maxlen=keep)
+        self.histograms = {
+            metric: LatencyHistogram(f"anima_turn_{metric}", description=f"对话轮次 {metric}（相对于说完）")
+            for metric in [m for m, _ in DERIVED_METRICS] + ["total_ms"]
+        }
+        self.span_histograms = {
+            span_name: LatencyHistogram(metric, description=description)
+            for span_name, (metric, description) in SPAN_METRICS.items()
+        }
+
+    def configure(self, enabled: bool = True, export_path: Optional[str] = None) -> None:
+        """按系统配置调整（服务启动时调用）"""
+        self.enabled = enabled
+        self.export_path = export_path
+        if enabled:
+            logger.info(f"[TraceRecorder] 对话轮次追踪已启用" + (f"，导出到 {export_path}" if export_path else ""))
+
+    def start_turn(
+        self,
+        session_id: str,
+        turn_id: Optional[str] = None,
+        reference: Optional[float] = None,
+    ) -> Optional[TurnTrace]:
+        """
+        开始一轮追踪并设为当前任务的追踪（未启用时返回 None）
+
+        必须在同一个任务中调用 finish_turn
+        """
+        if not self.enabled:
+            return None
+        trace = TurnTrace(session_id, turn_id, reference)
+        trace._token = _current_trace.set(trace)
+        return trace
+
+    def finish_turn(self, trace: Optional[TurnTrace], status: str = "ok") -> None:
+        """结束一轮追踪：统计、保留并导出"""
+        if trace is None:
+            return
+        trace.end = time.perf_counter()
+        trace.status = status
+        if trace._token is not None:
+            _current_trace.reset(trace._token)
+            trace._token = None
+
+        metrics = trace.metrics()
+        for metric, value in metrics.items():
+            if value is not None:
+                self.histograms[metric].observe(value)
+        for item in trace.spans:
+            hist = self.span_histograms.get(item.name)
+            if hist is not None:
+                hist.observe((item.end - item.start) * 1000)
+        self.recent.append(trace)
+
+        logger.info(
+            f"[TraceRecorder] [{trace.session_id}] 轮次 {trace.turn_id} ({status}): "
+            + ", ".join(f"{k}={'-' if v is None else f'{v:.0f}'}" for k, v in metrics.items())
+        )
+
+        if self.export_path:
+            try:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"[TraceRecorder] 写入追踪文件失败: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """各派生指标的分布"""
+        return {metric: hist.snapshot() for metric, hist in self.histograms.items()}
+
+    def export_jsonl(self, path: str) -> int:
+        """把内存中的轮次写入 JSONL，返回轮次数"""
+        records = [trace.to_dict() for trace in self.recent]
+        write_jsonl(path, records)
+        return len(records)
+
+    def export_chrome(self, path: str) -> int:
+        """把内存中的轮次写入 Chrome trace，返回轮次数"""
+        records = [trace.to_dict() for trace in self.recent]
+        Path(path).write_text(json.dumps(to_chrome_trace(records), ensure_ascii=False), encoding="utf-8")
+        return len(records)
+
+
+def write_jsonl(path: str, records: Iterable[Dict[str, Any]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_jsonl(path: str) -> List[Dict[str, Any]]:
+    """读取 JSONL 追踪记录"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def to_chrome_trace(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    JSONL 记录 -> Chrome trace（Trace Event Format）
+
+    每个会话一个进程（pid），每轮对话一个线程（tid）；span 为 X 事件，mark 为瞬时事件
+    """
+    events = []
+    pids: Dict[str, int] = {}
+    for tid, record in enumerate(records, start=1):
+        session = record["session_id"]
+        if session not in pids:
+            pids[session] = len(pids) + 1
+            events.append({"name": "process_name", "ph": "M", "pid": pids[session],
+                           "args": {"name": f"session {session}"}})
+        pid = pids[session]
+        base_us = record["start"] * 1e6
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                       "args": {"name": f"turn {record['turn_id']} ({record['status']})"}})
+        for item in record["spans"]:
+            events.append({
+                "name": item["name"],
+                "cat": item["cat"] or "turn",
+                "ph": "X",
+                "ts": base_us + item["start_ms"] * 1000,
+                "dur": item["dur_ms"] * 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": item["attrs"],
+            })
+        for name, at_ms in record["marks"].items():
+            events.append({"name": name, "cat": "mark", "ph": "i", "s": "t",
+                           "ts": base_us + at_ms * 1000, "pid": pid, "tid": tid})
+        events.append({"name": "speech_end", "cat": "mark", "ph": "i", "s": "t",
+                       "ts": base_us + record["reference_ms"] * 1000, "pid": pid, "tid": tid,
+                       "args": record["metrics"]})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+# 进程级记录器
+TRACE_RECORDER = TraceRecorder()
+for _hist in list(TRACE_RECORDER.histograms.values()) + list(TRACE_RECORDER.span_histograms.values()):
+    METRICS.histogram(_hist)